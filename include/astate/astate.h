@@ -4,6 +4,9 @@
 
 #include "astate/config.h"
 #include "astate/sharded_key.h"
+#include "astate/sharded_key_batch.h"
+#include "astate/sharding_spec.h"
+#include "astate/table_future.h"
 #include "astate/tensor_storage.h"
 #include "astate/tensor_table.h"
 #include "astate/types.h"
@@ -0,0 +1,91 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <string_view>
+#include <vector>
+
+#include "astate/sharded_key.h"
+
+namespace astate {
+
+/**
+ * Batch of sharded keys stored in flat arrays.
+ *
+ * All key names are stored in one string table, and the global shapes and offsets are stored in a single
+ * row-major int64 meta array of [size, 1 + 2 * max_ndim], whose row i is
+ * [ndim, shape_0, ..., shape_{max_ndim-1}, offset_0, ..., offset_{max_ndim-1}].
+ * The meta array could be an external buffer (e.g. a torch/numpy int64 array) kept alive by an owner, so
+ * passing a large batch across the python boundary does not create any per-key object.
+ */
+class ShardedKeyBatch {
+ public:
+    ShardedKeyBatch() = default;
+
+    /**
+     * Create a batch which owns its meta array
+     * @param names Key names
+     * @param meta Meta array of [names.size(), 1 + 2 * max_ndim]
+     * @param max_ndim Max number of dimensions of the keys
+     * @throws std::invalid_argument if the meta array does not match the names, or any key has a negative shape or an
+     * offset out of its shape
+     */
+    ShardedKeyBatch(const std::vector<std::string>& names, std::vector<int64_t> meta, int64_t max_ndim);
+
+    /**
+     * Create a batch on an external meta array without copy
+     * @param names Key names
+     * @param meta Pointer to the meta array of [names.size(), 1 + 2 * max_ndim]
+     * @param max_ndim Max number of dimensions of the keys
+     * @param owner Owner which keeps the meta array alive as long as the batch
+     * @throws std::invalid_argument if the meta array does not match the names, or any key has a negative shape or an
+     * offset out of its shape
+     */
+    ShardedKeyBatch(
+        const std::vector<std::string>& names,
+        const int64_t* meta,
+        int64_t max_ndim,
+        std::shared_ptr<const void> owner);
+
+    static ShardedKeyBatch FromShardedKeys(const std::vector<ShardedKey>& keys);
+
+    [[nodiscard]] size_t Size() const { return name_offsets_.empty() ? 0 : name_offsets_.size() - 1; }
+    [[nodiscard]] int64_t MaxNdim() const { return max_ndim_; }
+    [[nodiscard]] size_t MetaStride() const { return static_cast<size_t>((2 * max_ndim_) + 1); }
+
+    [[nodiscard]] std::string_view Name(size_t index) const {
+        return std::string_view(name_table_)
+            .substr(name_offsets_[index], name_offsets_[index + 1] - name_offsets_[index]);
+    }
+    [[nodiscard]] int64_t Ndim(size_t index) const { return meta_[index * MetaStride()]; }
+    [[nodiscard]] const int64_t* GlobalShape(size_t index) const { return meta_ + (index * MetaStride()) + 1; }
+    [[nodiscard]] const int64_t* GlobalOffset(size_t index) const {
+        return meta_ + (index * MetaStride()) + 1 + max_ndim_;
+    }
+
+    /**
+     * @return The index-th key as a ShardedKey
+     */
+    [[nodiscard]] ShardedKey GetShardedKey(size_t index) const;
+
+    /**
+     * @return All the keys as ShardedKeys
+     */
+    [[nodiscard]] std::vector<ShardedKey> ToShardedKeys() const;
+
+    [[nodiscard]] std::string ToString() const;
+
+ private:
+    void Init(const std::vector<std::string>& names, size_t meta_size);
+
+    std::string name_table_;
+    std::vector<size_t> name_offsets_;
+    // Keeps the meta array alive, shared by the copies of the batch
+    std::shared_ptr<const void> meta_owner_;
+    const int64_t* meta_{nullptr};
+    int64_t max_ndim_{0};
+};
+
+} // namespace astate
@@ -0,0 +1,94 @@
+#pragma once
+
+#include <cstdint>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+#include "astate/sharded_key.h"
+
+namespace astate {
+
+/**
+ * Compact sharding spec of a state dict, which describes how the local tensors are sharded from the global ones.
+ *
+ * A tensor is either replicated or evenly split along a single dimension across `shard_size` ranks, e.g. the
+ * column/row parallel weights of tensor parallel. The sharded keys built from the spec are cached by tensor name,
+ * so they are created only once for the same local shapes across steps.
+ *
+ * With pipeline parallel, the layers are numbered locally on each stage, e.g. `decoder.layers.0.*` exists on every
+ * stage. The layer offset of the stage is added to the layer number of the names, so the keys are the same as the
+ * ones of the whole model and do not collide across the stages.
+ */
+class ShardingSpec {
+ public:
+    static constexpr int32_t kReplicated = -1;
+
+    ShardingSpec() = default;
+
+    /**
+     * @param shard_rank Rank of the local shards, e.g. tp_rank
+     * @param shard_size Number of the shards of each sharded tensor, e.g. tp_size
+     * @param default_dim Sharded dimension of the tensors which are not set explicitly, kReplicated for not sharded
+     * @param layer_offset Number of the layers before the local pipeline stage, added to the local layer numbers
+     */
+    ShardingSpec(int32_t shard_rank, int32_t shard_size, int32_t default_dim = kReplicated, int64_t layer_offset = 0);
+
+    ShardingSpec(const ShardingSpec& other);
+    ShardingSpec& operator=(const ShardingSpec& other);
+
+    /**
+     * Set the sharded dimension of a tensor
+     * @param name Tensor name, i.e. the key of the state dict
+     * @param dim Sharded dimension, kReplicated for not sharded
+     */
+    void SetShardDim(const std::string& name, int32_t dim);
+
+    /**
+     * @return Sharded dimension of the tensor, kReplicated if not sharded
+     */
+    [[nodiscard]] int32_t GetShardDim(const std::string& name) const;
+
+    /**
+     * Get or build the sharded key of a local tensor
+     * @param name Tensor name, i.e. the key of the state dict
+     * @param local_shape Shape of the local tensor
+     * @return Copy of the cached sharded key with the global name, shape and offset of the local tensor, as the cache
+     * entry may be rebuilt concurrently once the lock is released
+     * @throws std::invalid_argument if the sharded dimension is out of range
+     */
+    ShardedKey GetShardedKey(const std::string& name, const std::vector<int64_t>& local_shape);
+
+    /**
+     * @return Name with the layer offset added to the layer number, i.e. the number after the first `layers.`
+     * component, or the name itself if no layer number is found
+     */
+    static std::string ApplyLayerOffset(const std::string& name, int64_t layer_offset);
+
+    [[nodiscard]] int32_t ShardRank() const { return shard_rank_; }
+    [[nodiscard]] int32_t ShardSize() const { return shard_size_; }
+    [[nodiscard]] int32_t DefaultDim() const { return default_dim_; }
+    [[nodiscard]] int64_t LayerOffset() const { return layer_offset_; }
+
+    /**
+     * @return Number of the cached sharded keys
+     */
+    [[nodiscard]] size_t CachedKeyCount() const;
+
+    [[nodiscard]] std::string ToString() const;
+
+ private:
+    int32_t shard_rank_{0};
+    int32_t shard_size_{1};
+    int32_t default_dim_{kReplicated};
+    int64_t layer_offset_{0};
+    std::unordered_map<std::string, int32_t> shard_dims_;
+
+    // <tensor name, <local shape, sharded key>>
+    std::unordered_map<std::string, std::pair<std::vector<int64_t>, ShardedKey>> key_cache_;
+    mutable std::mutex mutex_;
+};
+
+} // namespace astate
@@ -0,0 +1,79 @@
+#pragma once
+
+#include <chrono>
+#include <cstdint>
+#include <exception>
+#include <future>
+#include <utility>
+
+namespace astate {
+
+/**
+ * Handle of an asynchronous batch operation submitted to a TensorTable.
+ *
+ * It wraps a shared future, so the same operation could be polled, waited and read from several threads.
+ * Exceptions thrown by the underlying operation are rethrown by Get().
+ */
+class TableFuture {
+ public:
+    TableFuture() = default;
+    explicit TableFuture(std::shared_future<bool> future)
+        : future_(std::move(future)) {}
+
+    [[nodiscard]] bool Valid() const { return future_.valid(); }
+
+    /**
+     * Check whether the operation has finished without blocking
+     * @return true if the operation has finished (successfully or with an exception)
+     */
+    [[nodiscard]] bool Done() const {
+        return !future_.valid() || future_.wait_for(std::chrono::seconds(0)) == std::future_status::ready;
+    }
+
+    /**
+     * Wait for the operation to finish
+     * @param timeout_ms Max time to wait in milliseconds, negative value means waiting forever
+     * @return true if the operation has finished before timeout
+     */
+    bool Wait(int64_t timeout_ms) const {
+        if (!future_.valid()) {
+            return true;
+        }
+        if (timeout_ms < 0) {
+            future_.wait();
+            return true;
+        }
+        return future_.wait_for(std::chrono::milliseconds(timeout_ms)) == std::future_status::ready;
+    }
+
+    /**
+     * Wait for the operation to finish and get the result
+     * @return Result of the underlying operation
+     */
+    bool Get() const {
+        if (!future_.valid()) {
+            return false;
+        }
+        return future_.get();
+    }
+
+ private:
+    std::shared_future<bool> future_;
+};
+
+/**
+ * Run the function in place and wrap its result (or exception) into a completed TableFuture.
+ * It is used by the table implementations whose batch operations are synchronous in nature.
+ */
+template <typename F>
+TableFuture MakeCompletedTableFuture(F&& func) {
+    std::promise<bool> promise;
+    try {
+        promise.set_value(std::forward<F>(func)());
+    } catch (...) {
+        promise.set_exception(std::current_exception());
+    }
+    return TableFuture(promise.get_future().share());
+}
+
+} // namespace astate
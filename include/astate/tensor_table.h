@@ -1,9 +1,12 @@
 #pragma once
 
+#include <memory>
 #include <string>
+#include <unordered_map>
 #include <utility>
 
 #include "astate/sharded_key.h"
+#include "astate/table_future.h"
 #include "astate/types.h"
 
 namespace pybind11 {
@@ -12,6 +15,33 @@ class object;
 
 namespace astate {
 
+/**
+ * Prepared batch of multi_get, created by TensorTable::PrepareMultiGet.
+ *
+ * The keys and target tensors are fixed when the batch is prepared, and the read plan (e.g. the remote shards of
+ * each key and the copy routing) is built once and reused by every execution.
+ */
+class PreparedMultiGet {
+ public:
+    PreparedMultiGet() = default;
+    virtual ~PreparedMultiGet() = default;
+
+    PreparedMultiGet(const PreparedMultiGet&) = delete;
+    PreparedMultiGet& operator=(const PreparedMultiGet&) = delete;
+
+    /**
+     * Retrieve all the tensors of the batch (in-place update)
+     * @param seq_id Sequence ID used to identify data batch
+     * @return true if successful, same as TensorTable::MultiGet
+     */
+    virtual bool Execute(int64_t seq_id) = 0;
+
+    /**
+     * @return Number of tensors in the batch
+     */
+    [[nodiscard]] virtual size_t Size() const = 0;
+};
+
 class TensorTable {
  public:
     explicit TensorTable(std::string name)
@@ -66,6 +96,39 @@ class TensorTable {
       */
     virtual bool MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) = 0;
 
+    /**
+      * Store multiple tensors in batch asynchronously
+      *
+      * The tensors are captured before returning, while their data is copied in background. Callers must not modify
+      * the tensors until the returned future is done.
+      * @param seq_id Sequence ID used to identify data batch
+      * @param tensor_list Tensor list containing key-value pairs <sharded_key, tensor_object>
+      * @return Future of the operation, whose result is the same as MultiPut
+      */
+    virtual TableFuture
+    MultiPutAsync(int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) = 0;
+
+    /**
+      * Retrieve multiple tensors in batch asynchronously (in-place update)
+      *
+      * The target tensors are captured before returning, and they are updated in background. Callers must not read
+      * the tensors until the returned future is done.
+      * @param seq_id Sequence ID used to identify data batch
+      * @param tensor_list List containing keys to retrieve and the target tensors to update
+      * @return Future of the operation, whose result is the same as MultiGet
+      */
+    virtual TableFuture
+    MultiGetAsync(int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) = 0;
+
+    /**
+      * Prepare a reusable multi_get batch for the same keys and target tensors
+      * @param tensor_list List containing keys to retrieve and the target tensors to update. The target tensors
+      * are kept by the batch and updated in place by every execution
+      * @return Prepared batch which could be executed repeatedly with different sequence IDs
+      */
+    virtual std::shared_ptr<PreparedMultiGet>
+    PrepareMultiGet(const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) = 0;
+
     /**
       * Get multiple tensor objects based on metadata list
       * @param seq_id Sequence ID used to identify data batch
@@ -86,6 +149,16 @@ class TensorTable {
       */
     virtual void Complete(int64_t seq_id) = 0;
 
+    /**
+      * Complete all operations for the specified sequence ID asynchronously
+      *
+      * The call returns without waiting for the peers, e.g. the write group could start preparing the next
+      * sequence while the read group is still consuming the current one.
+      * @param seq_id Sequence ID to complete
+      * @return Future of the operation, whose result is true once Complete has finished
+      */
+    virtual TableFuture CompleteAsync(int64_t seq_id) = 0;
+
     /**
       * Scan all tensor metadata for the specified sequence ID
       * @param seq_id Sequence ID to scan
@@ -96,6 +169,12 @@ class TensorTable {
 
     virtual void PrefetchCachedTensors(int64_t seq_id) = 0;
 
+    /**
+      * Get the statistics of the table, e.g. memory usage and eviction counters
+      * @return Map of statistic name to value, empty if the table has no statistics
+      */
+    [[nodiscard]] virtual std::unordered_map<std::string, int64_t> GetStats() const { return {}; }
+
     [[nodiscard]] const std::string& Name() const { return name_; }
 
  protected:
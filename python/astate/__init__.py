@@ -4,8 +4,8 @@ Astate Client Python Interface
 A Python client library for Astate tensor storage and retrieval system.
 """
 
-from ._core import TensorStorage, TensorTableType, ShardedKey
-from astate.table import TensorTable
+from ._core import TensorStorage, TensorTableType, ShardedKey, ShardedKeyBatch, ShardingSpec
+from astate.table import TensorTable, TensorTableFuture, PreparedMultiGet
 from astate.parallel_config import Role, ParallelConfig
 from astate import utils
 
@@ -17,7 +17,11 @@ __all__ = [
     'TensorStorage',
     'TensorTableType',
     'ShardedKey',
+    'ShardedKeyBatch',
+    'ShardingSpec',
     'TensorTable',
+    'TensorTableFuture',
+    'PreparedMultiGet',
 
     # Parallel config classes
     'Role',
@@ -2,8 +2,8 @@
 Astate Client Core Module - C++ bindings
 """
 try:
-    from .astate_cpp import TensorTable, TensorTableType, ShardedKey, TorchTensorMeta, TensorStorage, AParallelConfig, ARole
-    __all__ = ['TensorTable', 'TensorTableType', 'ShardedKey', 'TorchTensorMeta', 'TensorStorage', 'AParallelConfig', 'ARole']
+    from .astate_cpp import TensorTable, TensorTableType, ShardedKey, TorchTensorMeta, TensorStorage, AParallelConfig, ARole, TableFuture, PreparedMultiGet, ShardingSpec, ShardedKeyBatch
+    __all__ = ['TensorTable', 'TensorTableType', 'ShardedKey', 'TorchTensorMeta', 'TensorStorage', 'AParallelConfig', 'ARole', 'TableFuture', 'PreparedMultiGet', 'ShardingSpec', 'ShardedKeyBatch']
 except ImportError as e:
     import sys
     print(f"Error: Failed to import C++ extension module.\n"
@@ -4,12 +4,157 @@ High-level Python API for TensorTable operations.
 This module provides a Python interface for managing TensorTable instances
 and performing tensor storage/retrieval operations using the new factory-based design.
 """
+import asyncio
 import torch
-from typing import Dict, List, Union, Optional, Tuple, Generator
-from astate._core import TensorStorage, TensorTableType, ShardedKey, TorchTensorMeta, TensorTable as CoreTensorTable
+from typing import Any, Dict, List, Union, Optional, Tuple, Generator
+from astate._core import TensorStorage, TensorTableType, ShardedKey, ShardedKeyBatch, TorchTensorMeta, TensorTable as CoreTensorTable
+from astate._core import TableFuture as CoreTableFuture, PreparedMultiGet as CorePreparedMultiGet, ShardingSpec
 from astate.parallel_config import ParallelConfig
 from astate.config_converter import convert_parallel_config
 
+def _is_key_batch_pairs(tensor_pairs: Any) -> bool:
+    """Check whether the tensor pairs of a batch operation are given as a (ShardedKeyBatch, values) tuple."""
+    return isinstance(tensor_pairs, tuple) and len(tensor_pairs) == 2 and isinstance(tensor_pairs[0], ShardedKeyBatch)
+
+
+def _create_tensor_meta(dtype: torch.dtype, size: Tuple[int, ...], device: torch.device) -> TorchTensorMeta:
+    """Create a TorchTensorMeta from the tensor metadata."""
+    tensor_meta = TorchTensorMeta()
+    tensor_meta.dtype = dtype
+    tensor_meta.size = list(size)  # Convert tuple to list for std::vector
+    tensor_meta.device = device
+    return tensor_meta
+
+
+class TensorTableFuture:
+    """
+    Handle of an asynchronous batch operation returned by TensorTable.multi_put_async/multi_get_async.
+
+    The handle keeps the submitted tensors alive until the operation finishes. It can be polled with done(),
+    blocked on with wait()/result(), or awaited from asyncio.
+
+    Example:
+        >>> future = table.multi_put_async(1, tensor_pairs)
+        >>> ...  # overlap with other work, e.g. the next optimizer step
+        >>> success = future.result()
+        >>> # or inside a coroutine
+        >>> success = await table.multi_put_async(1, tensor_pairs)
+    """
+    _future: CoreTableFuture
+    _op_name: str
+    _value: Any
+
+    def __init__(self, future: CoreTableFuture, op_name: str, value: Any = None):
+        """
+        Args:
+            future: Future of the underlying C++ operation
+            op_name: Name of the operation, used in error messages
+            value: Value to return on success instead of the raw C++ result, e.g. the updated tensor pairs
+        """
+        self._future = future
+        self._op_name = op_name
+        self._value = value
+
+    def done(self) -> bool:
+        """Check whether the operation has finished without blocking."""
+        return self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the operation to finish.
+
+        Args:
+            timeout: Max seconds to wait, None means waiting forever
+
+        Returns:
+            bool: Whether the operation has finished
+        """
+        timeout_ms = -1 if timeout is None else max(int(timeout * 1000), 0)
+        return self._future.wait(timeout_ms)
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the operation to finish and get its result.
+
+        Args:
+            timeout: Max seconds to wait, None means waiting forever
+
+        Returns:
+            Any: Result of the operation, the same as the corresponding synchronous method
+
+        Raises:
+            TimeoutError: If the operation does not finish in time
+            RuntimeError: If the operation fails
+        """
+        if not self.wait(timeout):
+            raise TimeoutError(f"{self._op_name} did not finish in {timeout} seconds")
+        try:
+            ret = self._future.result()
+        except Exception as e:
+            raise RuntimeError(f"Failed to {self._op_name} tensors: {e}") from e
+        return ret if self._value is None else self._value
+
+    def __await__(self):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(None, self.result).__await__()
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"TensorTableFuture(op='{self._op_name}', done={self.done()})"
+
+
+class PreparedMultiGet:
+    """
+    Reusable multi_get batch returned by TensorTable.prepare_multi_get.
+
+    The keys and destination tensors are fixed when the batch is prepared. The read plan, e.g. the remote
+    shards of each key, the compact groups of small tensors and the copy routing, is built once and reused
+    by every execute() call, so there is no per-step planning or Python object conversion.
+
+    Example:
+        >>> batch = table.prepare_multi_get(tensor_pairs)
+        >>> for step in range(num_steps):
+        ...     batch.execute(step)
+    """
+    _batch: CorePreparedMultiGet
+    _tensor_pairs: List[Tuple[ShardedKey, torch.Tensor]]
+
+    def __init__(self, batch: CorePreparedMultiGet, tensor_pairs: List[Tuple[ShardedKey, torch.Tensor]]):
+        """
+        Args:
+            batch: Prepared batch of the underlying C++ table
+            tensor_pairs: Key-tensor pairs of the batch, kept alive as long as the batch
+        """
+        self._batch = batch
+        self._tensor_pairs = tensor_pairs
+
+    def execute(self, seq_id: int) -> List[Tuple[ShardedKey, torch.Tensor]]:
+        """
+        Get all the tensors of the batch (in-place update).
+
+        Args:
+            seq_id: Sequence ID
+
+        Returns:
+            List[Tuple[ShardedKey, torch.Tensor]]: List of key-tensor pairs
+
+        Raises:
+            RuntimeError: If retrieval operation fails
+        """
+        try:
+            self._batch.execute(seq_id)
+            return self._tensor_pairs
+        except Exception as e:
+            raise RuntimeError(f"Failed to execute prepared multi_get for seq_id {seq_id}: {e}") from e
+
+    def __len__(self) -> int:
+        return len(self._batch)
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"PreparedMultiGet(size={len(self)})"
+
+
 class TensorTable:
     """
     High-level Python API for managing TensorTable instances.
@@ -206,7 +351,8 @@ class TensorTable:
 
     def multi_put(self,
                  seq_id: int,
-                 tensor_pairs: List[Tuple[ShardedKey, torch.Tensor]]) -> bool:
+                 tensor_pairs: Union[List[Tuple[ShardedKey, torch.Tensor]], Tuple[ShardedKeyBatch, List[torch.Tensor]]],
+                 validate: bool = True) -> bool:
         """
         Store multiple tensors in batch.
 
@@ -216,7 +362,10 @@ class TensorTable:
 
         Args:
             seq_id: Sequence ID
-            tensor_pairs: List of key-tensor pairs
+            tensor_pairs: List of key-tensor pairs, or a (ShardedKeyBatch, tensors) tuple which avoids
+                creating a ShardedKey object per tensor
+            validate: Whether to check that every value is a non-empty torch.Tensor. The check runs
+                in C++ in a single pass; pass False to skip it for trusted inputs on the hot path
 
         Returns:
             bool: Whether all successful
@@ -229,18 +378,10 @@ class TensorTable:
             return True
 
         try:
-            for key, tensor in tensor_pairs:
-                if tensor is None or not isinstance(tensor, torch.Tensor):
-                    raise ValueError(f"Value for key '{key.key}' must be a torch.Tensor")
-
-                # Additional validation
-                try:
-                    if tensor.numel() == 0:
-                        raise ValueError(f"Empty tensor for key '{key.key}'")
-                except (RuntimeError, AttributeError):
-                    raise ValueError(f"Invalid tensor for key '{key.key}': cannot determine size")
-
-            return self._table.multi_put(seq_id, tensor_pairs)
+            if _is_key_batch_pairs(tensor_pairs):
+                key_batch, tensors = tensor_pairs
+                return self._table.multi_put(seq_id, key_batch, tensors, validate)
+            return self._table.multi_put(seq_id, tensor_pairs, validate)
 
         except (TypeError, ValueError) as e:
             raise ValueError(f"Invalid input for multi_put: {e}") from e
@@ -249,7 +390,8 @@ class TensorTable:
 
     def multi_get(self,
                  seq_id: int,
-                 tensor_pairs: List[Tuple[ShardedKey, torch.Tensor]]) -> List[Tuple[ShardedKey, torch.Tensor]]:
+                 tensor_pairs: Union[List[Tuple[ShardedKey, torch.Tensor]], Tuple[ShardedKeyBatch, List[torch.Tensor]]],
+                 validate: bool = True) -> Union[List[Tuple[ShardedKey, torch.Tensor]], Tuple[ShardedKeyBatch, List[torch.Tensor]]]:
         """
         Get multiple tensors in batch.
 
@@ -259,10 +401,13 @@ class TensorTable:
         
         Args:
             seq_id: Sequence ID
-            tensor_pairs: List of key-tensor pairs to retrieve
+            tensor_pairs: List of key-tensor pairs to retrieve, or a (ShardedKeyBatch, tensors) tuple which
+                avoids creating a ShardedKey object per tensor
+            validate: Whether to check that every value is a non-empty torch.Tensor. The check runs
+                in C++ in a single pass; pass False to skip it for trusted inputs on the hot path
             
         Returns:
-            List[Tuple[ShardedKey, torch.Tensor]]: List of key-tensor pairs
+            The input tensor_pairs, whose tensors are updated in place
             
         Note:
             For tensors with existing storage, in-place updates should ideally be performed. 
@@ -274,27 +419,177 @@ class TensorTable:
             return []
             
         try:
-            for key, tensor in tensor_pairs:
-                if tensor is None or not isinstance(tensor, torch.Tensor):
-                    raise ValueError(f"Value for key '{key.key}' must be a torch.Tensor")
-                
-                # Additional validation
-                try:
-                    if tensor.numel() == 0:
-                        raise ValueError(f"Empty tensor for key '{key.key}'")
-                except (RuntimeError, AttributeError):
-                    raise ValueError(f"Invalid tensor for key '{key.key}': cannot determine size")
-
-            self._table.multi_get(seq_id, tensor_pairs)
+            if _is_key_batch_pairs(tensor_pairs):
+                key_batch, tensors = tensor_pairs
+                self._table.multi_get(seq_id, key_batch, tensors, validate)
+            else:
+                self._table.multi_get(seq_id, tensor_pairs, validate)
             return tensor_pairs
         except (TypeError, ValueError) as e:
             raise ValueError(f"Invalid input for multi_get: {e}") from e
         except Exception as e:
             raise RuntimeError(f"Failed to multi_get tensors: {e}") from e
     
+    def multi_put_async(self,
+                        seq_id: int,
+                        tensor_pairs: List[Tuple[ShardedKey, torch.Tensor]],
+                        validate: bool = True) -> TensorTableFuture:
+        """
+        Store multiple tensors in batch asynchronously.
+
+        The call returns as soon as the work is submitted, so the caller can overlap the transfer with
+        other work. The tensors must not be modified until the returned future is done.
+
+        Args:
+            seq_id: Sequence ID
+            tensor_pairs: List of key-tensor pairs
+            validate: Whether to check that every value is a non-empty torch.Tensor. The check runs
+                in C++ in a single pass; pass False to skip it for trusted inputs on the hot path
+
+        Returns:
+            TensorTableFuture: Future whose result is whether all successful
+
+        Raises:
+            ValueError: If input is invalid and validate is enabled
+            RuntimeError: If the operation cannot be submitted
+        """
+        try:
+            future = self._table.multi_put_async(seq_id, tensor_pairs, validate)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid input for multi_put_async: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Failed to submit multi_put_async: {e}") from e
+        return TensorTableFuture(future, "multi_put_async")
+
+    def multi_get_async(self,
+                        seq_id: int,
+                        tensor_pairs: List[Tuple[ShardedKey, torch.Tensor]],
+                        validate: bool = True) -> TensorTableFuture:
+        """
+        Get multiple tensors in batch asynchronously (in-place update).
+
+        The call returns as soon as the work is submitted. The tensors must not be read or modified
+        until the returned future is done.
+
+        Args:
+            seq_id: Sequence ID
+            tensor_pairs: List of key-tensor pairs to retrieve
+            validate: Whether to check that every value is a non-empty torch.Tensor. The check runs
+                in C++ in a single pass; pass False to skip it for trusted inputs on the hot path
+
+        Returns:
+            TensorTableFuture: Future whose result is the list of key-tensor pairs
+
+        Raises:
+            ValueError: If input is invalid and validate is enabled
+            RuntimeError: If the operation cannot be submitted
+        """
+        try:
+            future = self._table.multi_get_async(seq_id, tensor_pairs, validate)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid input for multi_get_async: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Failed to submit multi_get_async: {e}") from e
+        return TensorTableFuture(future, "multi_get_async", tensor_pairs)
+
+    def prepare_multi_get(self,
+                          tensor_pairs: List[Tuple[ShardedKey, torch.Tensor]],
+                          validate: bool = True) -> PreparedMultiGet:
+        """
+        Prepare a reusable multi_get batch for the same keys and destination tensors.
+
+        Use it when every step reads the same keys into the same tensors, e.g. weight updates of an
+        inference engine. The destination tensors must stay valid as long as the batch is used.
+
+        Args:
+            tensor_pairs: List of key-tensor pairs to retrieve
+            validate: Whether to check that every value is a non-empty torch.Tensor
+
+        Returns:
+            PreparedMultiGet: Batch which can be executed repeatedly with different sequence IDs
+
+        Raises:
+            ValueError: If input is invalid
+            RuntimeError: If preparation fails
+        """
+        try:
+            batch = self._table.prepare_multi_get(tensor_pairs, validate)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid input for prepare_multi_get: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Failed to prepare multi_get: {e}") from e
+        return PreparedMultiGet(batch, tensor_pairs)
+
+    def put_state_dict(self,
+                       seq_id: int,
+                       state_dict: Dict[str, torch.Tensor],
+                       sharding_spec: ShardingSpec,
+                       validate: bool = True) -> bool:
+        """
+        Store a state dict in batch.
+
+        The sharded keys are built in C++ from the sharding spec and cached by parameter name, so no
+        ShardedKey is created in Python and the keys are reused across steps.
+
+        Args:
+            seq_id: Sequence ID
+            state_dict: Dict of parameter name to local tensor
+            sharding_spec: Sharding spec of the state dict, see astate.utils.create_sharding_spec
+            validate: Whether to check that every value is a non-empty torch.Tensor
+
+        Returns:
+            bool: Whether all successful
+
+        Raises:
+            ValueError: If input is invalid
+            RuntimeError: If storage operation fails
+        """
+        if not state_dict:
+            return True
+
+        try:
+            return self._table.put_state_dict(seq_id, state_dict, sharding_spec, validate)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid input for put_state_dict: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Failed to put_state_dict: {e}") from e
+
+    def get_state_dict(self,
+                       seq_id: int,
+                       state_dict: Dict[str, torch.Tensor],
+                       sharding_spec: ShardingSpec,
+                       validate: bool = True) -> Dict[str, torch.Tensor]:
+        """
+        Get a state dict in batch (in-place update).
+
+        Args:
+            seq_id: Sequence ID
+            state_dict: Dict of parameter name to local tensor to retrieve into
+            sharding_spec: Sharding spec of the state dict, see astate.utils.create_sharding_spec
+            validate: Whether to check that every value is a non-empty torch.Tensor
+
+        Returns:
+            Dict[str, torch.Tensor]: The updated state dict
+
+        Raises:
+            ValueError: If input is invalid
+            RuntimeError: If retrieval operation fails
+        """
+        if not state_dict:
+            return state_dict
+
+        try:
+            self._table.get_state_dict(seq_id, state_dict, sharding_spec, validate)
+            return state_dict
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid input for get_state_dict: {e}") from e
+        except Exception as e:
+            raise RuntimeError(f"Failed to get_state_dict: {e}") from e
+
     def multi_get_tensors(self, 
                    seq_id: int, 
-                   tensor_pairs: List[Tuple[ShardedKey, torch.dtype, Tuple[int, ...], torch.device]]) -> List[Tuple[ShardedKey, torch.Tensor]]:
+                   tensor_pairs: Union[List[Tuple[ShardedKey, torch.dtype, Tuple[int, ...], torch.device]],
+                                       Tuple[ShardedKeyBatch, List[Tuple[torch.dtype, Tuple[int, ...], torch.device]]]]) -> List[Tuple[ShardedKey, torch.Tensor]]:
         """
         Get multiple tensors in batch for cases where no pre-allocated tensors with storage are available.
         
@@ -305,6 +600,8 @@ class TensorTable:
                 - torch.dtype: Data type of the tensor to retrieve
                 - Tuple[int, ...]: Shape/size of the tensor to retrieve  
                 - torch.device: Target device for the returned tensor
+                or a (ShardedKeyBatch, metas) tuple, where metas are the (dtype, size, device) tuples
+                in the order of the keys
                 
         Returns:
             List[Tuple[ShardedKey, torch.Tensor]]: List of key-tensor pairs
@@ -316,6 +613,11 @@ class TensorTable:
             return []
             
         try:
+            if _is_key_batch_pairs(tensor_pairs):
+                key_batch, metas = tensor_pairs
+                tensor_metas = [_create_tensor_meta(dtype, size, device) for dtype, size, device in metas]
+                return self._table.multi_get_tensor(seq_id, key_batch, tensor_metas)
+
             # Validate input parameters and create tensor meta list
             tensor_meta_list = []
             for key, dtype, size, device in tensor_pairs:
@@ -353,6 +655,31 @@ class TensorTable:
         except Exception as e:
             raise RuntimeError(f"Failed to complete operations for seq_id {seq_id}: {e}") from e
 
+    def complete_async(self, seq_id: int) -> TensorTableFuture:
+        """
+        Complete operations for a given sequence ID asynchronously.
+
+        The call returns as soon as the completion is submitted, e.g. the writer could prepare the next
+        sequence while the readers are still consuming the current one. The completion runs after the
+        multi_put_async/multi_get_async calls submitted before it, and the ones submitted after it start
+        once it has finished. No synchronous operation of the next sequence should be called until the
+        returned future is done.
+
+        Args:
+            seq_id: Sequence ID to complete operations for
+
+        Returns:
+            TensorTableFuture: Future whose result is True once the completion has finished
+
+        Raises:
+            RuntimeError: If the completion cannot be submitted
+        """
+        try:
+            future = self._table.complete_async(seq_id)
+        except Exception as e:
+            raise RuntimeError(f"Failed to submit complete_async for seq_id {seq_id}: {e}") from e
+        return TensorTableFuture(future, "complete_async")
+
     def scan_tensor_meta(self, seq_id: int) -> Generator[Tuple[str, torch.dtype, torch.Size], None, None]:
         """
         Scan all tensor metadata under a given sequence ID.
@@ -388,6 +715,20 @@ class TensorTable:
         except Exception as e:
             raise RuntimeError(f"Failed to scan tensor metadata for seq_id {seq_id}: {e}") from e
     
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the statistics of the table.
+
+        For in-memory tables it contains the memory usage and the eviction counters of the retention
+        policy: seq_num, mem_size, evicted_seq_num and evicted_mem_size (sizes in bytes). The retention
+        policy is configured by IN_MEMORY_TABLE_RETAIN_SEQ_NUM and IN_MEMORY_TABLE_MAX_MEM_SIZE and
+        applied on complete().
+
+        Returns:
+            Dict[str, int]: Statistic name to value, empty if the table has no statistics
+        """
+        return self._table.get_stats()
+
     @property
     def name(self) -> str:
         """Get table name."""
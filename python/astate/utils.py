@@ -6,7 +6,8 @@ information extraction, and debugging support.
 """
 import torch
 from typing import List, Tuple, Union, Dict, Any, Optional
-from astate._core import ShardedKey
+from astate._core import ShardedKey, ShardedKeyBatch, ShardingSpec
+from astate.parallel_config import ParallelConfig
 
 def create_sharded_key(key: str, global_shape: List[int], global_offset: List[int]) -> ShardedKey:
     """
@@ -26,6 +27,66 @@ def create_sharded_key(key: str, global_shape: List[int], global_offset: List[in
     sharded_key.globalOffset = global_offset
     return sharded_key
 
+def create_sharded_key_batch(keys: List[str],
+                             global_shapes: List[List[int]],
+                             global_offsets: List[List[int]]) -> ShardedKeyBatch:
+    """
+    Create a ShardedKeyBatch, which passes many keys to multi_put/multi_get/multi_get_tensors without
+    creating a ShardedKey object per key.
+
+    The shapes and offsets are packed into one int64 meta tensor of [len(keys), 1 + 2 * max_ndim], whose
+    rows are [ndim, *shape, *offset] padded with zeros. A prebuilt meta tensor (or numpy array via
+    torch.from_numpy) can also be passed to ShardedKeyBatch(keys, meta) directly, which is zero-copy.
+
+    Args:
+        keys: String keys
+        global_shapes: Global shape of each tensor
+        global_offsets: Global offset of each tensor
+
+    Returns:
+        ShardedKeyBatch: Created ShardedKeyBatch object
+
+    Raises:
+        ValueError: If the sizes of the arguments mismatch
+    """
+    if len(keys) != len(global_shapes) or len(keys) != len(global_offsets):
+        raise ValueError("keys, global_shapes and global_offsets must have the same length")
+
+    max_ndim = max((len(shape) for shape in global_shapes), default=0)
+    rows = []
+    for key, shape, offset in zip(keys, global_shapes, global_offsets):
+        if len(shape) != len(offset):
+            raise ValueError(f"Global shape and offset of key '{key}' must have the same length")
+        padding = [0] * (max_ndim - len(shape))
+        rows.append([len(shape), *shape, *padding, *offset, *padding])
+    meta = torch.tensor(rows, dtype=torch.int64).reshape(len(keys), 1 + 2 * max_ndim)
+    return ShardedKeyBatch(keys, meta)
+
+def create_sharding_spec(parallel_config: ParallelConfig,
+                         shard_dims: Optional[Dict[str, int]] = None,
+                         default_dim: int = ShardingSpec.REPLICATED,
+                         layer_offset: int = 0) -> ShardingSpec:
+    """
+    Create a tensor parallel ShardingSpec for TensorTable.put_state_dict/get_state_dict.
+
+    The sharded keys of the state dict are built in C++ from the spec and cached by parameter name,
+    so the spec should be created once and reused across steps.
+
+    Args:
+        parallel_config: Parallel configuration, tp_rank and tp_size are used as the shard rank and size
+        shard_dims: Sharded dimension of each parameter, ShardingSpec.REPLICATED for not sharded
+        default_dim: Sharded dimension of the parameters not in shard_dims
+        layer_offset: Number of the layers before the local pipeline stage, which is added to the
+            locally numbered layers in the parameter names, e.g. `decoder.layers.0.*` on every stage
+
+    Returns:
+        ShardingSpec: Created ShardingSpec object
+    """
+    sharding_spec = ShardingSpec(parallel_config.tp_rank, parallel_config.tp_size, default_dim, layer_offset)
+    for name, dim in (shard_dims or {}).items():
+        sharding_spec.set_shard_dim(name, dim)
+    return sharding_spec
+
 def validate_tensor(tensor: torch.Tensor) -> bool:
     """
     Validate if a tensor is valid for storage.
@@ -3,9 +3,12 @@
 #include <torch/extension.h>
 
 #include "astate/astate.h"
+#include "core/utils.h"
 
 namespace py = pybind11;
 
+using TensorList = std::vector<std::pair<astate::ShardedKey, py::object>>;
+
 PYBIND11_MODULE(astate_cpp, m) {
     m.doc() = "Astate C++ Module";
 
@@ -84,6 +87,46 @@ PYBIND11_MODULE(astate_cpp, m) {
         .def_readwrite("globalShape", &astate::ShardedKey::global_shape)
         .def_readwrite("globalOffset", &astate::ShardedKey::global_offset);
 
+    // Export ShardedKeyBatch, the batch of sharded keys stored in flat arrays
+    py::class_<astate::ShardedKeyBatch>(m, "ShardedKeyBatch")
+        .def(
+            py::init(&astate::TensorToShardedKeyBatch),
+            py::arg("names"),
+            py::arg("meta"),
+            "Create a batch on an int64 meta tensor of [len(names), 1 + 2 * max_ndim] without copy")
+        .def_static("from_keys", &astate::ShardedKeyBatch::FromShardedKeys, py::arg("keys"))
+        .def_property_readonly("max_ndim", &astate::ShardedKeyBatch::MaxNdim)
+        .def("get_key", &astate::ShardedKeyBatch::GetShardedKey, py::arg("index"))
+        .def("to_keys", &astate::ShardedKeyBatch::ToShardedKeys)
+        .def("__len__", &astate::ShardedKeyBatch::Size)
+        .def("__str__", &astate::ShardedKeyBatch::ToString)
+        .def("__repr__", &astate::ShardedKeyBatch::ToString);
+
+    // Export ShardingSpec, which builds and caches the sharded keys of state dicts
+    py::class_<astate::ShardingSpec, std::shared_ptr<astate::ShardingSpec>>(m, "ShardingSpec")
+        .def(
+            py::init<int32_t, int32_t, int32_t, int64_t>(),
+            py::arg("shard_rank"),
+            py::arg("shard_size"),
+            py::arg("default_dim") = astate::ShardingSpec::kReplicated,
+            py::arg("layer_offset") = 0)
+        .def_readonly_static("REPLICATED", &astate::ShardingSpec::kReplicated)
+        .def("set_shard_dim", &astate::ShardingSpec::SetShardDim, py::arg("name"), py::arg("dim"))
+        .def("get_shard_dim", &astate::ShardingSpec::GetShardDim, py::arg("name"))
+        .def(
+            "get_sharded_key",
+            &astate::ShardingSpec::GetShardedKey,
+            py::arg("name"),
+            py::arg("local_shape"),
+            "Get or build the sharded key of a local tensor")
+        .def_property_readonly("shard_rank", &astate::ShardingSpec::ShardRank)
+        .def_property_readonly("shard_size", &astate::ShardingSpec::ShardSize)
+        .def_property_readonly("default_dim", &astate::ShardingSpec::DefaultDim)
+        .def_property_readonly("layer_offset", &astate::ShardingSpec::LayerOffset)
+        .def("cached_key_count", &astate::ShardingSpec::CachedKeyCount)
+        .def("__str__", &astate::ShardingSpec::ToString)
+        .def("__repr__", &astate::ShardingSpec::ToString);
+
     // Export TorchTensorMeta struct
     py::class_<astate::TorchTensorMeta>(m, "TorchTensorMeta")
         .def(py::init<>())
@@ -91,22 +134,191 @@ PYBIND11_MODULE(astate_cpp, m) {
         .def_readwrite("size", &astate::TorchTensorMeta::size)
         .def_readwrite("device", &astate::TorchTensorMeta::device);
 
+    // Export TableFuture, the handle of async batch operations
+    py::class_<astate::TableFuture>(m, "TableFuture")
+        .def("done", &astate::TableFuture::Done, "Check whether the operation has finished without blocking")
+        .def(
+            "wait",
+            &astate::TableFuture::Wait,
+            py::arg("timeout_ms") = -1,
+            py::call_guard<py::gil_scoped_release>(),
+            "Wait for the operation to finish, return false if timeout")
+        .def(
+            "result",
+            &astate::TableFuture::Get,
+            py::call_guard<py::gil_scoped_release>(),
+            "Wait for the operation to finish and get the result");
+
+    // Export PreparedMultiGet, the reusable multi_get batch
+    py::class_<astate::PreparedMultiGet, std::shared_ptr<astate::PreparedMultiGet>>(m, "PreparedMultiGet")
+        .def("execute", &astate::PreparedMultiGet::Execute, py::arg("seq_id"), "Retrieve all the tensors of the batch")
+        .def("size", &astate::PreparedMultiGet::Size, "Get the number of tensors in the batch")
+        .def("__len__", &astate::PreparedMultiGet::Size);
+
     // Export abstract TensorTable interface with proper shared_ptr handling
     py::class_<astate::TensorTable, std::shared_ptr<astate::TensorTable>>(m, "TensorTable")
         .def("put", &astate::TensorTable::Put, "Store a single tensor to the table")
         .def("get", &astate::TensorTable::Get, "Retrieve a single tensor from the table (in-place update)")
         .def("get_tensor", &astate::TensorTable::GetTensor, "Get tensor object based on metadata")
-        .def("multi_put", &astate::TensorTable::MultiPut, "Store multiple tensors in batch")
-        .def("multi_get", &astate::TensorTable::MultiGet, "Retrieve multiple tensors in batch (in-place update)")
+        .def(
+            "multi_put",
+            [](astate::TensorTable& table, int64_t seq_id, const TensorList& tensor_list, bool validate) {
+                if (validate) {
+                    astate::ValidateTensorList(tensor_list);
+                }
+                return table.MultiPut(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("tensor_list"),
+            py::arg("validate") = false,
+            "Store multiple tensors in batch")
+        .def(
+            "multi_get",
+            [](astate::TensorTable& table, int64_t seq_id, TensorList& tensor_list, bool validate) {
+                if (validate) {
+                    astate::ValidateTensorList(tensor_list);
+                }
+                return table.MultiGet(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("tensor_list"),
+            py::arg("validate") = false,
+            "Retrieve multiple tensors in batch (in-place update)")
+        .def(
+            "multi_put",
+            [](astate::TensorTable& table,
+               int64_t seq_id,
+               const astate::ShardedKeyBatch& key_batch,
+               const std::vector<py::object>& tensors,
+               bool validate) {
+                if (validate) {
+                    astate::ValidateTensorList(key_batch, tensors);
+                }
+                auto tensor_list = astate::ZipShardedKeyBatch(key_batch, tensors);
+                return table.MultiPut(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("key_batch"),
+            py::arg("tensors"),
+            py::arg("validate") = false,
+            "Store multiple tensors in batch with a ShardedKeyBatch")
+        .def(
+            "multi_get",
+            [](astate::TensorTable& table,
+               int64_t seq_id,
+               const astate::ShardedKeyBatch& key_batch,
+               const std::vector<py::object>& tensors,
+               bool validate) {
+                if (validate) {
+                    astate::ValidateTensorList(key_batch, tensors);
+                }
+                auto tensor_list = astate::ZipShardedKeyBatch(key_batch, tensors);
+                return table.MultiGet(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("key_batch"),
+            py::arg("tensors"),
+            py::arg("validate") = false,
+            "Retrieve multiple tensors in batch with a ShardedKeyBatch (in-place update)")
+        .def(
+            "multi_put_async",
+            [](astate::TensorTable& table, int64_t seq_id, const TensorList& tensor_list, bool validate) {
+                if (validate) {
+                    astate::ValidateTensorList(tensor_list);
+                }
+                return table.MultiPutAsync(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("tensor_list"),
+            py::arg("validate") = false,
+            "Store multiple tensors in batch asynchronously")
+        .def(
+            "multi_get_async",
+            [](astate::TensorTable& table, int64_t seq_id, const TensorList& tensor_list, bool validate) {
+                if (validate) {
+                    astate::ValidateTensorList(tensor_list);
+                }
+                return table.MultiGetAsync(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("tensor_list"),
+            py::arg("validate") = false,
+            "Retrieve multiple tensors in batch asynchronously (in-place update)")
+        .def(
+            "put_state_dict",
+            [](astate::TensorTable& table,
+               int64_t seq_id,
+               const py::dict& state_dict,
+               astate::ShardingSpec& sharding_spec,
+               bool validate) {
+                auto tensor_list = astate::StateDictToTensorList(state_dict, sharding_spec);
+                if (validate) {
+                    astate::ValidateTensorList(tensor_list);
+                }
+                return table.MultiPut(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("state_dict"),
+            py::arg("sharding_spec"),
+            py::arg("validate") = false,
+            "Store a state dict in batch, the sharded keys are built from the sharding spec")
+        .def(
+            "get_state_dict",
+            [](astate::TensorTable& table,
+               int64_t seq_id,
+               const py::dict& state_dict,
+               astate::ShardingSpec& sharding_spec,
+               bool validate) {
+                auto tensor_list = astate::StateDictToTensorList(state_dict, sharding_spec);
+                if (validate) {
+                    astate::ValidateTensorList(tensor_list);
+                }
+                return table.MultiGet(seq_id, tensor_list);
+            },
+            py::arg("seq_id"),
+            py::arg("state_dict"),
+            py::arg("sharding_spec"),
+            py::arg("validate") = false,
+            "Retrieve a state dict in batch (in-place update), the sharded keys are built from the sharding spec")
+        .def(
+            "prepare_multi_get",
+            [](astate::TensorTable& table, const TensorList& tensor_list, bool validate) {
+                if (validate) {
+                    astate::ValidateTensorList(tensor_list);
+                }
+                return table.PrepareMultiGet(tensor_list);
+            },
+            py::arg("tensor_list"),
+            py::arg("validate") = false,
+            "Prepare a reusable multi_get batch for the same keys and target tensors")
         .def(
             "multi_get_tensor",
             &astate::TensorTable::MultiGetTensor,
             "Get multiple tensor objects based on metadata list")
+        .def(
+            "multi_get_tensor",
+            [](astate::TensorTable& table,
+               int64_t seq_id,
+               const astate::ShardedKeyBatch& key_batch,
+               const std::vector<astate::TorchTensorMeta>& tensor_metas) {
+                astate::ValidateTensorMetaList(key_batch, tensor_metas);
+                return table.MultiGetTensor(seq_id, astate::ZipShardedKeyBatch(key_batch, tensor_metas));
+            },
+            py::arg("seq_id"),
+            py::arg("key_batch"),
+            py::arg("tensor_metas"),
+            "Get multiple tensor objects based on a ShardedKeyBatch and the metadata list")
         .def("complete", &astate::TensorTable::Complete, "Complete all operations for the specified sequence ID")
+        .def(
+            "complete_async",
+            &astate::TensorTable::CompleteAsync,
+            py::arg("seq_id"),
+            "Complete all operations for the specified sequence ID asynchronously")
         .def(
             "scan_tensor_meta",
             &astate::TensorTable::ScanTensorMeta,
             "Scan all tensor metadata for the specified sequence ID")
+        .def("get_stats", &astate::TensorTable::GetStats, "Get the statistics of the tensor table")
         .def("name", &astate::TensorTable::Name, "Get the name of the tensor table");
 
     // Export TensorStorage with proper return value policy
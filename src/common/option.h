@@ -113,12 +113,19 @@ OPTION(TRANSFER_ENGINE_READ_TIMEOUT_MS, INT, "120000") // 120s
 OPTION(TRANSFER_ENGINE_WRITE_TIMEOUT_MS, INT, "120000") // 120s
 OPTION(TRANSFER_ENGINE_READ_THREAD_NUM, INT, "32")
 OPTION(TRANSFER_ENGINE_COPY_THREAD_NUM, INT, "32")
-OPTION(TRANSFER_ENGINE_COPY_BUCKET_MEM_SIZE, INT64, "524288000") // 500MB
-OPTION(TRANSFER_ENGINE_COPY_LARGE_THREAD_NUM, INT, "2")
-OPTION(TRANSFER_ENGINE_COPY_LARGE_BUCKET_MEM_SIZE, INT64, "3145728000") // 3000MB
+// pinned staging memory shared by the copy threads, grown lazily in slabs of power of two sizes up to the capacity
+OPTION(TRANSFER_ENGINE_COPY_STAGING_POOL_CAPACITY, INT64, "8589934592") // 8GB
+OPTION(TRANSFER_ENGINE_COPY_STAGING_MIN_SLAB_SIZE, INT64, "4194304") // 4MB
 OPTION(TRANSFER_ENGINE_COPY_SMALL_THREAD_NUM, INT, "8")
+// dispatcher threads for multi_put/multi_get async, complete_async runs on its own thread after the operations
+// submitted before it, and the operations submitted after it start once it has finished
+OPTION(TRANSFER_ENGINE_ASYNC_THREAD_NUM, INT, "1")
 OPTION(TRANSFER_ENGINE_SMALL_TENSOR_COMPACT_CACHE_SIZE, INT64, "2097152") // 2M
 OPTION(TRANSFER_ENGINE_SMALL_TENSOR_SIZE, INT64, "524288") // 512KB
+// read the needed rows of the non-contiguous shard regions by segments, 0 to read the whole shards instead
+OPTION(TRANSFER_ENGINE_READ_MAX_SEGMENT_NUM, INT, "4096")
+// merge the read segments with gaps up to this size, to save the per-read overhead
+OPTION(TRANSFER_ENGINE_READ_SEGMENT_MAX_GAP_SIZE, INT64, "65536") // 64KB
 OPTION(TRANSFER_ENGINE_ENABLE_PERF_METRICS, BOOL, "false")
 OPTION(TRANSFER_ENGINE_PERF_STATS_INTERVAL_MS, INT64, "200") // 200ms
 OPTION(TRANSFER_ENGINE_LOCAL_CACHE_TENSORS_SIZE, INT64, "20971520000") // 20GB
@@ -132,8 +139,11 @@ OPTION(TRANSFER_ENGINE_TRAINING_PARALLEL_CONFIG, STRING_LIST,
        "") // Training ParallelConfig, e.g., "dp=4,pp=2,tp=2"
 OPTION(TRANSFER_ENGINE_INFERENCE_PARALLEL_CONFIG, STRING_LIST,
        "") // Inference ParallelConfig
+// "key:dim" sets the dim to split the tensors replicated in training, which is 1 by default
 OPTION(TRANSFER_ENGINE_TENSOR_RESHARDING_KEYS, STRING_LIST,
        "") // e.g., "down_proj,gate_proj,up_proj"
+// reshard all the tensors by the training and inference parallel configs, otherwise the resharding keys only
+OPTION(TRANSFER_ENGINE_ENABLE_AUTO_RESHARDING, BOOL, "true")
 
 // Transfer Engine Control Service Options
 OPTION(TRANSFER_ENGINE_SERVICE_TYPE, STRING, "")
@@ -146,6 +156,14 @@ OPTION(DISCOVERY_WORLD_SIZE_RETRY_COUNT, INT,
        "270") // sleep interval 10s, total 2700s
 OPTION(DISCOVERY_CONFIG_CENTER_TYPE, STRING, "FILE") // TCPStore, HTTP, FILE
 OPTION(TRANSFER_ENGINE_LOG_TENSOR_META, BOOL, "true")
+// announce the ready tensors of every put batch, so readers could start before all the peers complete
+OPTION(TRANSFER_ENGINE_ENABLE_TENSOR_READY_STREAMING, BOOL, "true")
+// codec of the tensor rdma meta messages: BINARY, or JSON for debugging
+OPTION(TRANSFER_ENGINE_META_MESSAGE_CODEC, STRING, "BINARY")
+// replica to read a tensor from: RANK, ROUND_ROBIN, LEAST_OUTSTANDING or TOPOLOGY_AWARE
+OPTION(TRANSFER_ENGINE_REPLICA_SELECTOR, STRING, "LEAST_OUTSTANDING")
+// how long a node is not read from after its read failed, if another replica is available
+OPTION(TRANSFER_ENGINE_REPLICA_FAILURE_BACKOFF_MS, INT, "10000")
 
 // skip rdma exception for test environment when rdma not working
 OPTION(TRANSFER_ENGINE_SKIP_RDMA_EXCEPTION, BOOL, "false")
@@ -155,6 +173,9 @@ OPTION(TRANSPORT_RECEIVE_RETRY_COUNT, INT, "30")
 OPTION(TRANSPORT_RECEIVE_RETRY_SLEEP_MS, INT, "3000")
 OPTION(TRANSPORT_SEND_RETRY_COUNT, INT, "30")
 OPTION(TRANSPORT_SEND_RETRY_SLEEP_MS, INT, "5000")
+OPTION(TRANSPORT_ASYNC_THREAD_NUM, INT, "32") // threads running the async transfers of the rdma transport
+// max in-flight reads of the transfer service, reads beyond TRANSPORT_ASYNC_THREAD_NUM only queue in the transport
+OPTION(TRANSFER_ENGINE_MAX_INFLIGHT_TRANSFERS, INT, "32")
 
 // NUMA Options
 OPTION(TRANSFER_ENGINE_ENABLE_NUMA_RUN_BINDING, BOOL, "true") // cpu affinity
@@ -167,6 +188,13 @@ OPTION(BRPC_TRANSPORT_TIMEOUT_MS, INT, "10000")
 
 OPTION(DISCOVERY_USE_BATCH_API, BOOL, "true")
 
+// In-memory Table Options
+OPTION(IN_MEMORY_TABLE_RETAIN_SEQ_NUM, INT, "0") // keep the latest N seqs on complete, 0 for unlimited
+OPTION(IN_MEMORY_TABLE_MAX_MEM_SIZE, INT64, "0") // evict the LRU seqs on complete, 0 for unlimited
+// CLONE or REUSE_BUFFER for all the in-memory tables, or per table as "table_name:REUSE_BUFFER"
+OPTION(IN_MEMORY_TABLE_PUT_MODE, STRING_LIST, "CLONE")
+OPTION(IN_MEMORY_TABLE_COPY_THREAD_NUM, INT, "8") // threads copying the tensors of multi_get, 0 for serial copy
+
 // Log Options
 OPTION(ASTATE_LOG_BACKEND, STRING, "SPDLOG") // SPDLOG, GLOG
 OPTION(ASTATE_LOG_DIR, STRING, "/tmp/astate")
@@ -0,0 +1,281 @@
+#pragma once
+
+#include <algorithm>
+#include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <stdexcept>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace astate {
+
+/*
+ * SlabPool is a pool of staging buffers (slabs) shared by the worker threads. The slab sizes are the size classes of
+ * power of two, and the slabs are created lazily up to the capacity, then reused by the later acquirings. An
+ * acquiring is served by a free slab of its size class, otherwise a new slab if the capacity allows, otherwise the
+ * smallest free slab which fits. Otherwise the free slabs of the smaller size classes are destroyed if that leaves
+ * room for the new slab, so a large acquiring is not starved by the capacity taken by the small slabs, or it waits
+ * until the slabs in use are released.
+ *
+ * The slabs are destroyed by the slab destroyer, e.g. deregistered from the transport, when they are freed for a
+ * larger slab. The rest are kept until the pool is destroyed. The pool must outlive all the leases.
+ */
+template <typename SlabType>
+class SlabPool {
+ public:
+    struct Stats {
+        size_t capacity{0};
+        // Bytes of the created slabs
+        size_t allocated_bytes{0};
+        // Bytes of the slabs in use, and the bytes actually requested by them
+        size_t in_use_bytes{0};
+        size_t requested_bytes{0};
+        size_t peak_in_use_bytes{0};
+        size_t slab_num{0};
+        uint64_t acquire_count{0};
+        // Number of the acquirings which waited for the slabs in use, and the total/max time they waited
+        uint64_t wait_count{0};
+        uint64_t wait_time_us{0};
+        uint64_t max_wait_time_us{0};
+        // Number of the free slabs destroyed to make room for the larger slabs
+        uint64_t freed_slab_num{0};
+    };
+
+ private:
+    struct Slab {
+        SlabType resource;
+        size_t size;
+    };
+
+ public:
+    /*
+     * Lease of a slab, which returns the slab to the pool when destroyed.
+     */
+    class Lease {
+     public:
+        Lease() = default;
+        Lease(const Lease&) = delete;
+        Lease& operator=(const Lease&) = delete;
+        Lease(Lease&& other) noexcept { *this = std::move(other); }
+        Lease& operator=(Lease&& other) noexcept {
+            if (this != &other) {
+                Reset();
+                pool_ = std::exchange(other.pool_, nullptr);
+                slab_ = std::exchange(other.slab_, nullptr);
+                requested_ = std::exchange(other.requested_, 0);
+            }
+            return *this;
+        }
+        ~Lease() { Reset(); }
+
+        [[nodiscard]] bool Valid() const { return slab_ != nullptr; }
+        SlabType& Get() { return slab_->resource; }
+        // Size of the slab, which is not less than the requested size
+        [[nodiscard]] size_t Size() const { return slab_ == nullptr ? 0 : slab_->size; }
+
+        void Reset() {
+            if (slab_ != nullptr) {
+                pool_->Release(slab_, requested_);
+            }
+            pool_ = nullptr;
+            slab_ = nullptr;
+            requested_ = 0;
+        }
+
+     private:
+        friend class SlabPool;
+        Lease(SlabPool* pool, Slab* slab, size_t requested)
+            : pool_(pool),
+              slab_(slab),
+              requested_(requested) {}
+
+        SlabPool* pool_{nullptr};
+        Slab* slab_{nullptr};
+        size_t requested_{0};
+    };
+
+    /*
+     * @param: slab_creator: Creates a slab of the given size in bytes.
+     * @param: capacity: Max total bytes of the slabs.
+     * @param: min_slab_size: Size of the smallest size class, rounded up to a power of two.
+     * @param: slab_destroyer: Called on a free slab before it is destroyed to make room for a larger slab.
+     */
+    SlabPool(
+        std::function<SlabType(size_t)> slab_creator,
+        size_t capacity,
+        size_t min_slab_size,
+        std::function<void(SlabType&)> slab_destroyer = nullptr)
+        : slab_creator_(std::move(slab_creator)),
+          slab_destroyer_(std::move(slab_destroyer)),
+          capacity_(capacity),
+          min_slab_size_(RoundUpToPowerOfTwo(std::max<size_t>(min_slab_size, 1))) {
+        stats_.capacity = capacity_;
+    }
+
+    SlabPool(const SlabPool&) = delete;
+    SlabPool& operator=(const SlabPool&) = delete;
+
+    /*
+     * Acquire a slab of at least size bytes, which blocks while the capacity is exhausted.
+     * @return: The lease of the slab.
+     * @throws: std::invalid_argument if the size class exceeds the capacity.
+     */
+    Lease Acquire(size_t size) {
+        size_t slab_size = GetSlabSize(size);
+        if (slab_size > capacity_) {
+            throw std::invalid_argument(
+                "slab size " + std::to_string(slab_size) + " for " + std::to_string(size)
+                + " bytes exceeds the slab pool capacity " + std::to_string(capacity_));
+        }
+
+        std::unique_lock<std::mutex> lock(mutex_);
+        ++stats_.acquire_count;
+        auto wait_start = std::chrono::steady_clock::time_point{};
+        std::vector<std::unique_ptr<Slab>> freed_slabs;
+        while (true) {
+            // A free slab of the size class is preferred, then a new slab, then a free slab of a larger size class
+            auto it = free_slabs_.lower_bound(slab_size);
+            bool can_grow = stats_.allocated_bytes + slab_size <= capacity_;
+            if (it != free_slabs_.end() && (it->first == slab_size || !can_grow)) {
+                Slab* slab = it->second.back();
+                it->second.pop_back();
+                if (it->second.empty()) {
+                    free_slabs_.erase(it);
+                }
+                OnAcquired(slab->size, size, wait_start);
+                return Lease(this, slab, size);
+            }
+            if (can_grow) {
+                break;
+            }
+            // All the free slabs are smaller than the size class here, free them if that leaves room for the new slab
+            if (stats_.in_use_bytes + slab_size <= capacity_) {
+                freed_slabs = TakeFreeSlabs(stats_.allocated_bytes + slab_size - capacity_);
+                break;
+            }
+            if (wait_start == std::chrono::steady_clock::time_point{}) {
+                wait_start = std::chrono::steady_clock::now();
+                ++stats_.wait_count;
+            }
+            condition_.wait(lock);
+        }
+
+        // Reserve the bytes, and destroy the freed slabs and create the new slab without the lock since it might be
+        // slow, e.g. pinned and registered
+        stats_.allocated_bytes += slab_size;
+        OnAcquired(slab_size, size, wait_start);
+        lock.unlock();
+        std::unique_ptr<Slab> slab;
+        try {
+            DestroySlabs(freed_slabs);
+            slab = std::make_unique<Slab>(Slab{slab_creator_(slab_size), slab_size});
+        } catch (...) {
+            lock.lock();
+            stats_.allocated_bytes -= slab_size;
+            stats_.in_use_bytes -= slab_size;
+            stats_.requested_bytes -= size;
+            lock.unlock();
+            condition_.notify_all();
+            throw;
+        }
+        lock.lock();
+        Slab* slab_ptr = slab.get();
+        slabs_.push_back(std::move(slab));
+        stats_.slab_num = slabs_.size();
+        return Lease(this, slab_ptr, size);
+    }
+
+    [[nodiscard]] Stats GetStats() const {
+        std::lock_guard<std::mutex> lock(mutex_);
+        return stats_;
+    }
+
+    // Size class of the slab to serve size bytes
+    [[nodiscard]] size_t GetSlabSize(size_t size) const { return std::max(min_slab_size_, RoundUpToPowerOfTwo(size)); }
+
+    static size_t RoundUpToPowerOfTwo(size_t size) {
+        size_t ret = 1;
+        while (ret < size) {
+            ret <<= 1;
+        }
+        return ret;
+    }
+
+ private:
+    void OnAcquired(size_t slab_size, size_t requested, std::chrono::steady_clock::time_point wait_start) {
+        stats_.in_use_bytes += slab_size;
+        stats_.requested_bytes += requested;
+        stats_.peak_in_use_bytes = std::max(stats_.peak_in_use_bytes, stats_.in_use_bytes);
+        if (wait_start != std::chrono::steady_clock::time_point{}) {
+            auto wait_time_us = static_cast<uint64_t>(
+                std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::steady_clock::now() - wait_start)
+                    .count());
+            stats_.wait_time_us += wait_time_us;
+            stats_.max_wait_time_us = std::max(stats_.max_wait_time_us, wait_time_us);
+        }
+    }
+
+    // Take the free slabs of the largest size classes first until at least bytes are freed, the lock must be held
+    std::vector<std::unique_ptr<Slab>> TakeFreeSlabs(size_t bytes) {
+        std::vector<std::unique_ptr<Slab>> freed_slabs;
+        size_t freed_bytes = 0;
+        while (freed_bytes < bytes && !free_slabs_.empty()) {
+            auto it = std::prev(free_slabs_.end());
+            Slab* slab = it->second.back();
+            it->second.pop_back();
+            if (it->second.empty()) {
+                free_slabs_.erase(it);
+            }
+            auto slab_it = std::find_if(slabs_.begin(), slabs_.end(), [slab](const std::unique_ptr<Slab>& owned_slab) {
+                return owned_slab.get() == slab;
+            });
+            freed_slabs.push_back(std::move(*slab_it));
+            slabs_.erase(slab_it);
+            freed_bytes += slab->size;
+        }
+        stats_.allocated_bytes -= freed_bytes;
+        stats_.freed_slab_num += freed_slabs.size();
+        stats_.slab_num = slabs_.size();
+        return freed_slabs;
+    }
+
+    void DestroySlabs(std::vector<std::unique_ptr<Slab>>& slabs) {
+        for (auto& slab : slabs) {
+            if (slab_destroyer_) {
+                slab_destroyer_(slab->resource);
+            }
+            slab.reset();
+        }
+    }
+
+    void Release(Slab* slab, size_t requested) {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            free_slabs_[slab->size].push_back(slab);
+            stats_.in_use_bytes -= slab->size;
+            stats_.requested_bytes -= requested;
+        }
+        condition_.notify_all();
+    }
+
+    std::function<SlabType(size_t)> slab_creator_;
+    std::function<void(SlabType&)> slab_destroyer_;
+    const size_t capacity_;
+    const size_t min_slab_size_;
+
+    std::vector<std::unique_ptr<Slab>> slabs_;
+    // slab size -> free slabs of the size
+    std::map<size_t, std::vector<Slab*>> free_slabs_;
+    Stats stats_;
+    mutable std::mutex mutex_;
+    std::condition_variable condition_;
+};
+
+} // namespace astate
@@ -0,0 +1,228 @@
+#include "common/slab_pool.h"
+
+#include <atomic>
+#include <chrono>
+#include <cstddef>
+#include <stdexcept>
+#include <thread>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+namespace astate {
+
+class SlabPoolTest : public ::testing::Test {
+ protected:
+    using Pool = SlabPool<std::vector<char>>;
+
+    std::atomic<int> created_{0};
+};
+
+TEST_F(SlabPoolTest, SizeClass) {
+    Pool pool([](size_t size) { return std::vector<char>(size); }, 1 << 20, 1000);
+    EXPECT_EQ(pool.GetSlabSize(1), 1024);
+    EXPECT_EQ(pool.GetSlabSize(1024), 1024);
+    EXPECT_EQ(pool.GetSlabSize(1025), 2048);
+    EXPECT_EQ(pool.GetSlabSize(5000), 8192);
+    EXPECT_THROW(pool.Acquire((1 << 20) + 1), std::invalid_argument);
+}
+
+TEST_F(SlabPoolTest, LazyGrowthAndReuse) {
+    Pool pool(
+        [this](size_t size) {
+            ++created_;
+            return std::vector<char>(size);
+        },
+        1 << 20,
+        1024);
+    EXPECT_EQ(pool.GetStats().allocated_bytes, 0);
+    {
+        auto lease = pool.Acquire(3000);
+        ASSERT_TRUE(lease.Valid());
+        EXPECT_EQ(lease.Size(), 4096);
+        EXPECT_EQ(lease.Get().size(), 4096);
+        auto stats = pool.GetStats();
+        EXPECT_EQ(stats.allocated_bytes, 4096);
+        EXPECT_EQ(stats.in_use_bytes, 4096);
+        EXPECT_EQ(stats.requested_bytes, 3000);
+    }
+    EXPECT_EQ(pool.GetStats().in_use_bytes, 0);
+
+    // The released slab of the size class is reused
+    auto lease = pool.Acquire(4000);
+    EXPECT_EQ(created_, 1);
+    // A new slab of the size class is preferred to the larger free slabs while the capacity allows
+    auto small_lease = pool.Acquire(100);
+    EXPECT_EQ(small_lease.Size(), 1024);
+    EXPECT_EQ(created_, 2);
+    auto stats = pool.GetStats();
+    EXPECT_EQ(stats.allocated_bytes, 4096 + 1024);
+    EXPECT_EQ(stats.slab_num, 2);
+    EXPECT_EQ(stats.acquire_count, 3);
+    EXPECT_EQ(stats.wait_count, 0);
+}
+
+TEST_F(SlabPoolTest, LargerSlabServedWhenCapacityExhausted) {
+    Pool pool([](size_t size) { return std::vector<char>(size); }, 4096, 1024);
+    {
+        auto lease = pool.Acquire(4096);
+    }
+    // No capacity left to grow, the free slab of the larger size class is used
+    auto lease = pool.Acquire(10);
+    EXPECT_EQ(lease.Size(), 4096);
+    EXPECT_EQ(pool.GetStats().allocated_bytes, 4096);
+}
+
+TEST_F(SlabPoolTest, FreeSmallerSlabsForLargerRequest) {
+    std::vector<size_t> destroyed;
+    Pool pool(
+        [](size_t size) { return std::vector<char>(size); },
+        4096,
+        1024,
+        [&destroyed](std::vector<char>& slab) { destroyed.push_back(slab.size()); });
+    {
+        auto first = pool.Acquire(1024);
+        auto second = pool.Acquire(2048);
+    }
+    // The free slabs are too small, the larger one is destroyed first which leaves enough room
+    auto lease = pool.Acquire(2049);
+    EXPECT_EQ(lease.Size(), 4096);
+    EXPECT_EQ(destroyed, std::vector<size_t>({2048, 1024}));
+    auto stats = pool.GetStats();
+    EXPECT_EQ(stats.allocated_bytes, 4096);
+    EXPECT_EQ(stats.slab_num, 1);
+    EXPECT_EQ(stats.freed_slab_num, 2);
+}
+
+TEST_F(SlabPoolTest, ManySmallSlabsThenLargeRequest) {
+    const size_t capacity = 64 * 1024;
+    std::atomic<int> destroyed{0};
+    Pool pool(
+        [this](size_t size) {
+            ++created_;
+            return std::vector<char>(size);
+        },
+        capacity,
+        1024,
+        [&destroyed](std::vector<char>& /*slab*/) { ++destroyed; });
+    {
+        std::vector<Pool::Lease> leases;
+        for (size_t i = 0; i < capacity / 1024; ++i) {
+            leases.push_back(pool.Acquire(1000));
+        }
+        EXPECT_EQ(pool.GetStats().allocated_bytes, capacity);
+    }
+
+    // The capacity is taken by the free small slabs, which are freed for the large request
+    auto large_lease = pool.Acquire(capacity / 2);
+    EXPECT_EQ(large_lease.Size(), capacity / 2);
+    EXPECT_EQ(destroyed, 32);
+    auto stats = pool.GetStats();
+    EXPECT_EQ(stats.allocated_bytes, capacity);
+    EXPECT_EQ(stats.slab_num, 33);
+    EXPECT_EQ(stats.wait_count, 0);
+
+    // The remaining small slabs are still reused
+    auto small_lease = pool.Acquire(1000);
+    EXPECT_EQ(small_lease.Size(), 1024);
+    EXPECT_EQ(created_, 65);
+}
+
+TEST_F(SlabPoolTest, WaitForSmallerSlabsInUse) {
+    Pool pool([](size_t size) { return std::vector<char>(size); }, 4096, 1024);
+    auto first = pool.Acquire(1024);
+    {
+        auto second = pool.Acquire(2048);
+    }
+
+    // Freeing the free slab is not enough while the first is in use
+    std::atomic<bool> acquired{false};
+    std::thread waiter([&] {
+        auto lease = pool.Acquire(4096);
+        acquired = true;
+    });
+    std::this_thread::sleep_for(std::chrono::milliseconds(50));
+    EXPECT_FALSE(acquired);
+
+    first.Reset();
+    waiter.join();
+    EXPECT_TRUE(acquired);
+    auto stats = pool.GetStats();
+    EXPECT_EQ(stats.allocated_bytes, 4096);
+    EXPECT_EQ(stats.freed_slab_num, 2);
+    EXPECT_EQ(stats.wait_count, 1);
+}
+
+TEST_F(SlabPoolTest, BackpressureWhenExhausted) {
+    Pool pool([](size_t size) { return std::vector<char>(size); }, 2048, 1024);
+    auto first = pool.Acquire(1024);
+    auto second = pool.Acquire(1024);
+
+    std::atomic<bool> acquired{false};
+    std::thread waiter([&] {
+        auto lease = pool.Acquire(1000);
+        acquired = true;
+    });
+    std::this_thread::sleep_for(std::chrono::milliseconds(50));
+    EXPECT_FALSE(acquired);
+
+    first.Reset();
+    waiter.join();
+    EXPECT_TRUE(acquired);
+    auto stats = pool.GetStats();
+    EXPECT_EQ(stats.allocated_bytes, 2048);
+    EXPECT_EQ(stats.wait_count, 1);
+    EXPECT_GE(stats.max_wait_time_us, 40000);
+    EXPECT_EQ(stats.in_use_bytes, 1024);
+    EXPECT_EQ(stats.peak_in_use_bytes, 2048);
+}
+
+TEST_F(SlabPoolTest, ConcurrentAcquire) {
+    const size_t capacity = 64 * 1024;
+    Pool pool([](size_t size) { return std::vector<char>(size); }, capacity, 1024);
+    std::atomic<size_t> max_in_use{0};
+    std::vector<std::thread> threads;
+    threads.reserve(16);
+    for (int i = 0; i < 16; ++i) {
+        threads.emplace_back([&, i] {
+            for (int j = 0; j < 100; ++j) {
+                auto lease = pool.Acquire(static_cast<size_t>(1024 << ((i + j) % 4)));
+                lease.Get()[0] = 1;
+                auto in_use = pool.GetStats().in_use_bytes;
+                size_t expected = max_in_use.load();
+                while (in_use > expected && !max_in_use.compare_exchange_weak(expected, in_use)) {
+                }
+            }
+        });
+    }
+    for (auto& thread : threads) {
+        thread.join();
+    }
+    auto stats = pool.GetStats();
+    EXPECT_LE(stats.allocated_bytes, capacity);
+    EXPECT_LE(max_in_use.load(), capacity);
+    EXPECT_EQ(stats.in_use_bytes, 0);
+    EXPECT_EQ(stats.requested_bytes, 0);
+    EXPECT_EQ(stats.acquire_count, 1600);
+}
+
+TEST_F(SlabPoolTest, CreatorFailure) {
+    bool fail = true;
+    Pool pool(
+        [&fail](size_t size) {
+            if (fail) {
+                throw std::runtime_error("allocation failed");
+            }
+            return std::vector<char>(size);
+        },
+        4096,
+        1024);
+    EXPECT_THROW(pool.Acquire(4096), std::runtime_error);
+    EXPECT_EQ(pool.GetStats().allocated_bytes, 0);
+    EXPECT_EQ(pool.GetStats().in_use_bytes, 0);
+    fail = false;
+    auto lease = pool.Acquire(4096);
+    EXPECT_TRUE(lease.Valid());
+}
+
+} // namespace astate
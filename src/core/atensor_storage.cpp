@@ -50,7 +50,13 @@ ATensorStorageImpl::CreateTable(TensorTableType table_type, const std::string& t
     std::shared_ptr<TensorTable> table;
     switch (table_type) {
         case TensorTableType::IN_MEMORY:
-            table = std::make_shared<InMemoryTensorTable>(table_name);
+            table = std::make_shared<InMemoryTensorTable>(
+                table_name,
+                GetOptionValue<int>(ctx_->options, IN_MEMORY_TABLE_RETAIN_SEQ_NUM),
+                GetOptionValue<long>(ctx_->options, IN_MEMORY_TABLE_MAX_MEM_SIZE),
+                ParseInMemoryPutMode(
+                    GetOptionValue<std::vector<std::string>>(ctx_->options, IN_MEMORY_TABLE_PUT_MODE), table_name),
+                GetOptionValue<int>(ctx_->options, IN_MEMORY_TABLE_COPY_THREAD_NUM));
             break;
         case TensorTableType::REMOTE:
             table = std::make_shared<RemoteTensorTable>(table_name, ctx_);
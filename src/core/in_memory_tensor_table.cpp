@@ -1,12 +1,19 @@
+#include <algorithm>
 #include <cstdint>
 #include <exception>
+#include <future>
+#include <optional>
+#include <shared_mutex>
 #include <stdexcept>
 #include <string>
 #include <unordered_map>
+#include <utility>
 #include <vector>
 
 #include <ATen/Context.h>
+#include <ATen/cuda/CUDAEvent.h>
 #include <c10/core/TensorImpl.h>
+#include <c10/cuda/CUDAStream.h>
 #include <pybind11/pybind11.h>
 #include <spdlog/spdlog.h>
 #include <torch/csrc/autograd/generated/variable_factories.h>
@@ -24,19 +31,105 @@
 
 namespace astate {
 
-InMemoryTensorTable::InMemoryTensorTable(const std::string& name)
-    : TensorTable(name) {
+namespace {
+
+bool IsReusableBuffer(const torch::Tensor& buffer, const torch::Tensor& source_tensor) {
+    return buffer.scalar_type() == source_tensor.scalar_type() && buffer.sizes() == source_tensor.sizes()
+        && buffer.device() == source_tensor.device() && buffer.is_contiguous();
+}
+
+// The readers copy from the references of the stored tensors, see GetTensorShards
+bool HasNoReader(const std::shared_ptr<torch::Tensor>& buffer) {
+    return buffer.use_count() == 1 && buffer->use_count() == 1 && buffer->storage().use_count() == 1;
+}
+
+InMemoryPutMode ToInMemoryPutMode(const std::string& mode) {
+    if (mode == "CLONE") {
+        return InMemoryPutMode::CLONE;
+    }
+    if (mode == "REUSE_BUFFER") {
+        return InMemoryPutMode::REUSE_BUFFER;
+    }
+    throw std::invalid_argument("Unknown in-memory table put mode: " + mode);
+}
+
+// Split the target tensors into copy batches: one batch per CUDA device, so that each device is synchronized once,
+// and the CPU tensors into at most cpu_batch_num batches of similar bytes.
+std::vector<std::vector<size_t>>
+SplitCopyBatches(const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list, size_t cpu_batch_num) {
+    std::vector<std::vector<size_t>> batches;
+    std::unordered_map<c10::DeviceIndex, size_t> cuda_batch_indices;
+    std::vector<size_t> cpu_indices;
+    int64_t cpu_bytes = 0;
+    for (size_t i = 0; i < tensor_list.size(); ++i) {
+        const torch::Tensor& target_tensor = tensor_list[i].second;
+        if (target_tensor.is_cuda()) {
+            auto [batch_it, inserted] = cuda_batch_indices.emplace(target_tensor.device().index(), batches.size());
+            if (inserted) {
+                batches.emplace_back();
+            }
+            batches[batch_it->second].push_back(i);
+        } else {
+            cpu_indices.push_back(i);
+            cpu_bytes += static_cast<int64_t>(target_tensor.nbytes());
+        }
+    }
+    if (cpu_indices.empty()) {
+        return batches;
+    }
+
+    auto batch_num = static_cast<int64_t>(std::max<size_t>(cpu_batch_num, 1));
+    int64_t batch_bytes_limit = std::max<int64_t>((cpu_bytes + batch_num - 1) / batch_num, 1);
+    int64_t batch_bytes = 0;
+    batches.emplace_back();
+    for (size_t index : cpu_indices) {
+        if (batch_bytes >= batch_bytes_limit) {
+            batches.emplace_back();
+            batch_bytes = 0;
+        }
+        batches.back().push_back(index);
+        batch_bytes += static_cast<int64_t>(tensor_list[index].second.nbytes());
+    }
+    return batches;
+}
+
+} // namespace
+
+InMemoryPutMode ParseInMemoryPutMode(const std::vector<std::string>& put_mode_config, const std::string& table_name) {
+    auto put_mode = InMemoryPutMode::CLONE;
+    for (const auto& item : put_mode_config) {
+        auto pos = item.find(':');
+        if (pos == std::string::npos) {
+            put_mode = ToInMemoryPutMode(item);
+        } else if (item.substr(0, pos) == table_name) {
+            return ToInMemoryPutMode(item.substr(pos + 1));
+        }
+    }
+    return put_mode;
+}
+
+InMemoryTensorTable::InMemoryTensorTable(
+    const std::string& name,
+    int32_t retain_seq_num,
+    int64_t max_mem_size,
+    InMemoryPutMode put_mode,
+    int32_t copy_thread_num)
+    : TensorTable(name),
+      retain_seq_num_(retain_seq_num),
+      max_mem_size_(max_mem_size),
+      put_mode_(put_mode),
+      copy_thread_num_(std::max(copy_thread_num, 0)) {
+    if (copy_thread_num_ > 0) {
+        copy_thread_pool_ = std::make_unique<ThreadPool>(copy_thread_num_);
+    }
 }
 
 // InMemoryTensorTable implementation
 bool InMemoryTensorTable::Put(int64_t seq_id, const ShardedKey& tensor_key, pybind11::object& py_tensor) {
-    std::lock_guard<std::recursive_mutex> lock(mutex_);
-
     try {
-        const torch::Tensor& tensor_data = PyObjectToTensor(py_tensor);
-        SPDLOG_INFO("put tensor {} dtype: {}", tensor_data.sizes().size(), toString(tensor_data.scalar_type()));
-        table_data_[seq_id][tensor_key] = std::make_shared<torch::Tensor>(tensor_data.clone());
-        return true;
+        torch::Tensor tensor_data = PyObjectToTensor(py_tensor);
+        pybind11::gil_scoped_release release;
+        return PutTensors(seq_id, {{tensor_key, tensor_data}});
     } catch (const std::exception& e) {
         SPDLOG_ERROR("Error in put: {}", e.what());
         return false;
@@ -44,52 +137,36 @@ bool InMemoryTensorTable::Put(int64_t seq_id, const ShardedKey& tensor_key, pybi
 }
 
 bool InMemoryTensorTable::Get(int64_t seq_id, const ShardedKey& tensor_key, pybind11::object& py_tensor) {
-    std::lock_guard<std::recursive_mutex> lock(mutex_);
-
-    const torch::Tensor& target_tensor = PyObjectToTensor(py_tensor);
-    auto tensor_shards = GetTensorShards(tensor_key, seq_id, target_tensor);
-    if (tensor_shards.empty()) {
-        return false;
-    }
-
-    for (auto& pair : tensor_shards) {
-        CopyTensorWithShardedKeysUnsafe(pair.first, pair.second, tensor_key, target_tensor);
-    }
-    cudaDeviceSynchronize();
-    return true;
+    torch::Tensor target_tensor = PyObjectToTensor(py_tensor);
+    pybind11::gil_scoped_release release;
+    return CopyTensors(seq_id, {{tensor_key, target_tensor}}).front() != 0;
 }
 
 pybind11::object
 InMemoryTensorTable::GetTensor(int64_t seq_id, const ShardedKey& tensor_key, const TorchTensorMeta& tensor_meta) {
-    std::lock_guard<std::recursive_mutex> lock(mutex_);
-
-    auto target_tensor = torch::zeros(
-        tensor_meta.size,
-        torch::TensorOptions().dtype(tensor_meta.dtype).device(tensor_meta.device).requires_grad(false));
-    auto tensor_shards = GetTensorShards(tensor_key, seq_id, target_tensor);
-    if (tensor_shards.empty()) {
-        return pybind11::none();
+    torch::Tensor target_tensor;
+    {
+        pybind11::gil_scoped_release release;
+        target_tensor = torch::zeros(
+            tensor_meta.size,
+            torch::TensorOptions().dtype(tensor_meta.dtype).device(tensor_meta.device).requires_grad(false));
+        if (CopyTensors(seq_id, {{tensor_key, target_tensor}}).front() == 0) {
+            target_tensor.reset();
+        }
     }
 
-    for (auto& pair : tensor_shards) {
-        CopyTensorWithShardedKeysUnsafe(pair.first, pair.second, tensor_key, target_tensor);
+    if (!target_tensor.defined()) {
+        return pybind11::none();
     }
-    cudaDeviceSynchronize();
     return TensorToPyObject(target_tensor);
 }
 
 bool InMemoryTensorTable::MultiPut(
     int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
-    std::lock_guard<std::recursive_mutex> lock(mutex_);
-
     try {
-        auto& seq_data = table_data_[seq_id];
-        for (const auto& pair : tensor_list) {
-            const torch::Tensor& tensor_data = PyObjectToTensor(pair.second);
-            SPDLOG_INFO("multi_put tensor {}", tensor_data.sizes().size());
-            seq_data[pair.first] = std::make_shared<torch::Tensor>(tensor_data.clone());
-        }
-        return true;
+        auto tensors = PyObjectsToShardedTensors(tensor_list);
+        pybind11::gil_scoped_release release;
+        return PutTensors(seq_id, tensors);
     } catch (const std::exception& e) {
         SPDLOG_ERROR("Error in multi_put: {}", e.what());
         return false;
@@ -97,82 +174,425 @@ bool InMemoryTensorTable::MultiPut(
 }
 
 bool InMemoryTensorTable::MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
-    bool found_any = false;
     try {
-        for (auto& pair : tensor_list) {
-            ShardedKey key = pair.first;
-            if (Get(seq_id, key, pair.second)) {
-                found_any = true;
-            } else {
-                SPDLOG_ERROR("tensor {} not found", pair.first.key);
-                return false;
-            }
-        }
+        auto tensors = PyObjectsToShardedTensors(tensor_list);
+        pybind11::gil_scoped_release release;
+        return GetTensors(seq_id, tensors);
     } catch (const std::exception& e) {
         SPDLOG_ERROR("Error in multi_get: {}", e.what());
         return false;
     }
+}
+
+bool InMemoryTensorTable::PutTensors(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list) {
+    std::shared_lock<std::shared_mutex> evict_lock(evict_mutex_);
+    if (put_mode_ == InMemoryPutMode::REUSE_BUFFER) {
+        return PutTensorsReusingBuffers(seq_id, tensor_list);
+    }
 
-    return found_any;
+    // Clone outside the lock, so puts of different tensors do not serialize on the copies.
+    std::vector<std::shared_ptr<torch::Tensor>> local_copies;
+    local_copies.reserve(tensor_list.size());
+    for (const auto& pair : tensor_list) {
+        SPDLOG_INFO("put tensor {} dtype: {}", pair.second.sizes().size(), toString(pair.second.scalar_type()));
+        local_copies.push_back(std::make_shared<torch::Tensor>(pair.second.clone()));
+    }
+
+    int64_t mem_size_delta = 0;
+    for (size_t i = 0; i < tensor_list.size(); ++i) {
+        const ShardedKey& tensor_key = tensor_list[i].first;
+        mem_size_delta += static_cast<int64_t>(local_copies[i]->nbytes());
+        std::shared_ptr<torch::Tensor> replaced_tensor;
+        {
+            auto& stripe = GetStripe(tensor_key.key);
+            RWSpinGuard guard(stripe.lock, true);
+            auto& tensor_shards = stripe.data[seq_id][tensor_key.key];
+            auto shard_it = std::find_if(tensor_shards.begin(), tensor_shards.end(), [&](const ShardedTensor& shard) {
+                return shard.first == tensor_key;
+            });
+            if (shard_it != tensor_shards.end()) {
+                replaced_tensor = std::exchange(shard_it->second, std::move(local_copies[i]));
+            } else {
+                tensor_shards.emplace_back(tensor_key, std::move(local_copies[i]));
+            }
+        }
+        if (replaced_tensor != nullptr) {
+            mem_size_delta -= static_cast<int64_t>(replaced_tensor->nbytes());
+        }
+    }
+    UpdateSeqStat(seq_id, mem_size_delta);
+    return true;
 }
 
-std::vector<std::pair<ShardedKey, pybind11::object>> InMemoryTensorTable::MultiGetTensor(
-    int64_t seq_id, const std::vector<std::pair<ShardedKey, TorchTensorMeta>>& tensor_meta_list) {
-    std::vector<std::pair<ShardedKey, pybind11::object>> ret;
+bool InMemoryTensorTable::PutTensorsReusingBuffers(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list) {
+    // Copy the data only, the buffers must not be tracked by autograd
+    torch::NoGradGuard no_grad;
+    int64_t mem_size_delta = 0;
+    for (const auto& pair : tensor_list) {
+        const ShardedKey& tensor_key = pair.first;
+        const torch::Tensor& source_tensor = pair.second;
+        SPDLOG_INFO("put tensor {} dtype: {}", source_tensor.sizes().size(), toString(source_tensor.scalar_type()));
+
+        std::shared_ptr<torch::Tensor> buffer;
+        std::shared_ptr<torch::Tensor> replaced_tensor;
+        bool reused_in_place = false;
+        {
+            auto& stripe = GetStripe(tensor_key.key);
+            RWSpinGuard guard(stripe.lock, true);
+            auto& tensor_shards = stripe.data[seq_id][tensor_key.key];
+            auto shard_it = std::find_if(tensor_shards.begin(), tensor_shards.end(), [&](const ShardedTensor& shard) {
+                return shard.first == tensor_key;
+            });
+            if (shard_it != tensor_shards.end() && IsReusableBuffer(*shard_it->second, source_tensor)) {
+                buffer = shard_it->second;
+                reused_in_place = true;
+            } else {
+                buffer = TakeReusableBuffer(stripe, tensor_key, source_tensor);
+                if (buffer == nullptr) {
+                    buffer
+                        = std::make_shared<torch::Tensor>(torch::empty(source_tensor.sizes(), source_tensor.options()));
+                }
+                if (shard_it != tensor_shards.end()) {
+                    replaced_tensor = std::exchange(shard_it->second, buffer);
+                } else {
+                    tensor_shards.emplace_back(tensor_key, buffer);
+                }
+            }
+        }
+
+        // Readers of the same seq may see a partially copied tensor, which is the same as overwriting a key.
+        buffer->copy_(source_tensor);
 
-    for (const auto& meta_pair : tensor_meta_list) {
-        const ShardedKey& tensor_key = meta_pair.first;
-        const TorchTensorMeta& tensor_meta = meta_pair.second;
-        auto tensor = GetTensor(seq_id, tensor_key, tensor_meta);
-        if (tensor.is_none()) {
+        if (reused_in_place) {
             continue;
         }
-        ret.emplace_back(tensor_key, tensor);
+        // The buffer is either newly allocated or taken from an evicted seq, whose bytes have been released
+        mem_size_delta += static_cast<int64_t>(buffer->nbytes());
+        if (replaced_tensor != nullptr) {
+            mem_size_delta -= static_cast<int64_t>(replaced_tensor->nbytes());
+        }
+    }
+    UpdateSeqStat(seq_id, mem_size_delta);
+    return true;
+}
+
+std::shared_ptr<torch::Tensor> InMemoryTensorTable::TakeReusableBuffer(
+    TableStripe& stripe, const ShardedKey& tensor_key, const torch::Tensor& source_tensor) {
+    auto buffer_it = stripe.idle_buffers.find(tensor_key);
+    if (buffer_it == stripe.idle_buffers.end() || !IsReusableBuffer(*buffer_it->second, source_tensor)
+        || !HasNoReader(buffer_it->second)) {
+        return nullptr;
+    }
+    auto buffer = std::move(buffer_it->second);
+    stripe.idle_buffers.erase(buffer_it);
+    return buffer;
+}
+
+bool InMemoryTensorTable::GetTensors(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list) {
+    TouchSeqStat(seq_id);
+    auto found = CopyTensors(seq_id, tensor_list);
+    for (size_t i = 0; i < tensor_list.size(); ++i) {
+        if (found[i] == 0) {
+            SPDLOG_ERROR("tensor {} not found", tensor_list[i].first.key);
+            return false;
+        }
     }
+    return !tensor_list.empty();
+}
 
+std::vector<uint8_t>
+InMemoryTensorTable::CopyTensors(int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list) {
+    std::vector<uint8_t> found(tensor_list.size(), 0);
+    auto batches = SplitCopyBatches(tensor_list, static_cast<size_t>(copy_thread_num_) + 1);
+    auto get_caller_stream = [&](const std::vector<size_t>& batch) -> std::optional<c10::cuda::CUDAStream> {
+        const torch::Tensor& target_tensor = tensor_list[batch.front()].second;
+        if (!target_tensor.is_cuda()) {
+            return std::nullopt;
+        }
+        return c10::cuda::getCurrentCUDAStream(target_tensor.device().index());
+    };
+    if (copy_thread_pool_ == nullptr || batches.size() <= 1) {
+        for (const auto& batch : batches) {
+            CopyTensorBatch(seq_id, tensor_list, batch, get_caller_stream(batch), found);
+        }
+        return found;
+    }
+
+    // The calling thread copies the first batch, and waits for all the others before returning even on error,
+    // as the tasks refer to the local variables.
+    std::vector<std::future<void>> futures;
+    futures.reserve(batches.size() - 1);
+    for (size_t i = 1; i < batches.size(); ++i) {
+        futures.push_back(copy_thread_pool_->Submit([&, i, caller_stream = get_caller_stream(batches[i])]() {
+            CopyTensorBatch(seq_id, tensor_list, batches[i], caller_stream, found);
+        }));
+    }
+    std::exception_ptr error;
+    try {
+        CopyTensorBatch(seq_id, tensor_list, batches.front(), get_caller_stream(batches.front()), found);
+    } catch (...) {
+        error = std::current_exception();
+    }
+    for (auto& future : futures) {
+        try {
+            future.get();
+        } catch (...) {
+            if (error == nullptr) {
+                error = std::current_exception();
+            }
+        }
+    }
+    if (error != nullptr) {
+        std::rethrow_exception(error);
+    }
+    return found;
+}
+
+void InMemoryTensorTable::CopyTensorBatch(
+    int64_t seq_id,
+    const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list,
+    const std::vector<size_t>& batch,
+    const std::optional<c10::cuda::CUDAStream>& caller_stream,
+    std::vector<uint8_t>& found) {
+    std::optional<c10::cuda::CUDAStream> stream;
+    if (caller_stream.has_value()) {
+        // Copy on a side stream, ordered after the pending work of the caller on the targets
+        stream = c10::cuda::getStreamFromPool(false, caller_stream->device_index());
+        at::cuda::CUDAEvent targets_ready;
+        targets_ready.record(*caller_stream);
+        targets_ready.block(*stream);
+    }
+
+    // The shards hold the references of the stored tensors, so they are copied without holding the lock, and kept
+    // until the stream is synchronized in case the tensors are evicted meanwhile.
+    std::vector<std::vector<std::pair<ShardedKey, torch::Tensor>>> batch_shards;
+    batch_shards.reserve(batch.size());
+    for (size_t index : batch) {
+        const auto& [tensor_key, target_tensor] = tensor_list[index];
+        auto tensor_shards = GetTensorShards(tensor_key, seq_id, target_tensor);
+        found[index] = tensor_shards.empty() ? 0 : 1;
+        for (const auto& pair : tensor_shards) {
+            CopyTensorWithShardedKeysUnsafe(
+                pair.first,
+                pair.second,
+                tensor_key,
+                target_tensor,
+                stream.has_value() ? &stream.value() : nullptr,
+                /*non_blocking_copy=*/true,
+                /*sync_stream=*/false);
+        }
+        batch_shards.push_back(std::move(tensor_shards));
+    }
+    if (stream.has_value()) {
+        stream->synchronize();
+    }
+}
+
+bool InMemoryTensorTable::InMemoryPreparedMultiGet::Execute(int64_t seq_id) {
+    pybind11::gil_scoped_release release;
+    return table_->GetTensors(seq_id, tensors_);
+}
+
+TableFuture InMemoryTensorTable::MultiPutAsync(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    // In-memory operations are done in place, so the returned future has been completed already.
+    return MakeCompletedTableFuture([&]() { return MultiPut(seq_id, tensor_list); });
+}
+
+TableFuture InMemoryTensorTable::MultiGetAsync(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    return MakeCompletedTableFuture([&]() {
+        std::vector<std::pair<ShardedKey, pybind11::object>> targets(tensor_list);
+        return MultiGet(seq_id, targets);
+    });
+}
+
+std::shared_ptr<PreparedMultiGet>
+InMemoryTensorTable::PrepareMultiGet(const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    return std::make_shared<InMemoryPreparedMultiGet>(shared_from_this(), PyObjectsToShardedTensors(tensor_list));
+}
+
+std::vector<std::pair<ShardedKey, pybind11::object>> InMemoryTensorTable::MultiGetTensor(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, TorchTensorMeta>>& tensor_meta_list) {
+    std::vector<std::pair<ShardedKey, torch::Tensor>> tensors;
+    {
+        pybind11::gil_scoped_release release;
+        std::vector<std::pair<ShardedKey, torch::Tensor>> targets;
+        targets.reserve(tensor_meta_list.size());
+        for (const auto& meta_pair : tensor_meta_list) {
+            const TorchTensorMeta& tensor_meta = meta_pair.second;
+            targets.emplace_back(
+                meta_pair.first,
+                torch::zeros(
+                    tensor_meta.size,
+                    torch::TensorOptions().dtype(tensor_meta.dtype).device(tensor_meta.device).requires_grad(false)));
+        }
+        auto found = CopyTensors(seq_id, targets);
+        tensors.reserve(targets.size());
+        for (size_t i = 0; i < targets.size(); ++i) {
+            if (found[i] != 0) {
+                tensors.push_back(std::move(targets[i]));
+            }
+        }
+    }
+
+    std::vector<std::pair<ShardedKey, pybind11::object>> ret;
+    ret.reserve(tensors.size());
+    for (const auto& pair : tensors) {
+        ret.emplace_back(pair.first, TensorToPyObject(pair.second));
+    }
     return ret;
 }
 
 void InMemoryTensorTable::Complete(int64_t seq_id) {
-    // For in-memory table, complete is essentially a no-op
-    // All operations are synchronous and immediately committed
-
-    // Optional: Log completion for debugging
+    // All operations are synchronous and immediately committed, so complete only applies the retention policy.
     SPDLOG_INFO("Complete called for seq_id: {}", seq_id);
+    if (retain_seq_num_ <= 0 && max_mem_size_ <= 0) {
+        return;
+    }
+
+    pybind11::gil_scoped_release release;
+    std::unique_lock<std::shared_mutex> evict_lock(evict_mutex_);
+    for (int64_t evicted_seq_id : SelectEvictedSeqs(seq_id)) {
+        EvictSeq(evicted_seq_id);
+    }
+}
 
-    // In a more complex implementation, this might:
-    // - Flush any pending writes
-    // - Mark the sequence as completed
-    // - Trigger cleanup or persistence operations
+TableFuture InMemoryTensorTable::CompleteAsync(int64_t seq_id) {
+    return MakeCompletedTableFuture([&]() {
+        Complete(seq_id);
+        return true;
+    });
 }
 
-std::vector<std::pair<std::string, TorchTensorMeta>> InMemoryTensorTable::ScanTensorMeta(int64_t seq_id) {
-    std::lock_guard<std::recursive_mutex> lock(mutex_);
+std::unordered_map<std::string, int64_t> InMemoryTensorTable::GetStats() const {
+    std::lock_guard<std::mutex> lock(seq_stat_mutex_);
+    return {
+        {"seq_num", static_cast<int64_t>(seq_stats_.size())},
+        {"mem_size", mem_size_},
+        {"evicted_seq_num", evicted_seq_num_},
+        {"evicted_mem_size", evicted_mem_size_}};
+}
 
-    std::vector<std::pair<std::string, TorchTensorMeta>> result;
+void InMemoryTensorTable::UpdateSeqStat(int64_t seq_id, int64_t mem_size_delta) {
+    std::lock_guard<std::mutex> lock(seq_stat_mutex_);
+    auto& seq_stat = seq_stats_[seq_id];
+    seq_stat.mem_size += mem_size_delta;
+    seq_stat.last_access = ++access_clock_;
+    mem_size_ += mem_size_delta;
+}
 
-    auto seq_it = table_data_.find(seq_id);
-    if (seq_it == table_data_.end()) {
-        return result; // Return empty vector if seq_id not found
+void InMemoryTensorTable::TouchSeqStat(int64_t seq_id) {
+    std::lock_guard<std::mutex> lock(seq_stat_mutex_);
+    auto seq_it = seq_stats_.find(seq_id);
+    if (seq_it != seq_stats_.end()) {
+        seq_it->second.last_access = ++access_clock_;
     }
+}
 
-    for (const auto& tensor_pair : seq_it->second) {
-        const ShardedKey& sharded_key = tensor_pair.first;
-        const torch::Tensor& tensor = *tensor_pair.second;
+std::vector<int64_t> InMemoryTensorTable::SelectEvictedSeqs(int64_t completed_seq_id) {
+    std::lock_guard<std::mutex> lock(seq_stat_mutex_);
 
-        // Create TorchTensorMeta from the stored tensor
-        TorchTensorMeta meta{tensor.scalar_type(), {}, tensor.device()};
+    // Candidates in ascending order of seq id
+    std::vector<int64_t> candidates;
+    candidates.reserve(seq_stats_.size());
+    for (const auto& seq_pair : seq_stats_) {
+        if (seq_pair.first != completed_seq_id) {
+            candidates.push_back(seq_pair.first);
+        }
+    }
 
-        // Convert tensor sizes to std::vector<int64_t>
-        auto tensor_sizes = tensor.sizes();
-        meta.size.clear();
-        meta.size.reserve(tensor_sizes.size());
-        for (int64_t size : tensor_sizes) {
-            meta.size.push_back(size);
+    std::vector<int64_t> evicted_seqs;
+    if (retain_seq_num_ > 0 && seq_stats_.size() > static_cast<size_t>(retain_seq_num_)) {
+        size_t evict_num = std::min(seq_stats_.size() - retain_seq_num_, candidates.size());
+        evicted_seqs.assign(candidates.begin(), candidates.begin() + static_cast<int64_t>(evict_num));
+        candidates.erase(candidates.begin(), candidates.begin() + static_cast<int64_t>(evict_num));
+    }
+
+    int64_t remaining_mem_size = mem_size_;
+    for (int64_t seq_id : evicted_seqs) {
+        remaining_mem_size -= seq_stats_[seq_id].mem_size;
+    }
+    if (max_mem_size_ > 0 && remaining_mem_size > max_mem_size_) {
+        std::sort(candidates.begin(), candidates.end(), [this](int64_t lhs, int64_t rhs) {
+            return seq_stats_[lhs].last_access < seq_stats_[rhs].last_access;
+        });
+        for (int64_t seq_id : candidates) {
+            if (remaining_mem_size <= max_mem_size_) {
+                break;
+            }
+            remaining_mem_size -= seq_stats_[seq_id].mem_size;
+            evicted_seqs.push_back(seq_id);
         }
+    }
 
-        // Add to result using the key string
-        result.emplace_back(sharded_key.key, meta);
+    for (int64_t seq_id : evicted_seqs) {
+        auto seq_it = seq_stats_.find(seq_id);
+        mem_size_ -= seq_it->second.mem_size;
+        evicted_mem_size_ += seq_it->second.mem_size;
+        ++evicted_seq_num_;
+        seq_stats_.erase(seq_it);
+    }
+    if (!evicted_seqs.empty()) {
+        SPDLOG_INFO(
+            "Evict {} seqs on complete of seq_id {}, mem size {} bytes, total evicted {} bytes",
+            evicted_seqs.size(),
+            completed_seq_id,
+            mem_size_,
+            evicted_mem_size_);
+    }
+    return evicted_seqs;
+}
+
+void InMemoryTensorTable::EvictSeq(int64_t seq_id) {
+    for (auto& stripe : stripes_) {
+        decltype(stripe.data)::node_type evicted_node;
+        std::vector<std::shared_ptr<torch::Tensor>> replaced_buffers;
+        {
+            RWSpinGuard guard(stripe.lock, true);
+            evicted_node = stripe.data.extract(seq_id);
+            if (!evicted_node.empty() && put_mode_ == InMemoryPutMode::REUSE_BUFFER) {
+                // Keep the buffers for the later puts, which take them only once the readers are done
+                for (auto& tensor_pair : evicted_node.mapped()) {
+                    for (auto& shard : tensor_pair.second) {
+                        auto& idle_buffer = stripe.idle_buffers[shard.first];
+                        if (idle_buffer != nullptr) {
+                            replaced_buffers.push_back(std::move(idle_buffer));
+                        }
+                        idle_buffer = std::move(shard.second);
+                    }
+                }
+            }
+        }
+        // The tensors of the seq are released here without holding the lock
+    }
+}
+
+std::vector<std::pair<std::string, TorchTensorMeta>> InMemoryTensorTable::ScanTensorMeta(int64_t seq_id) {
+    pybind11::gil_scoped_release release;
+
+    std::vector<std::pair<std::string, TorchTensorMeta>> result;
+    for (auto& stripe : stripes_) {
+        RWSpinGuard guard(stripe.lock, false);
+        auto seq_it = stripe.data.find(seq_id);
+        if (seq_it == stripe.data.end()) {
+            continue;
+        }
+
+        for (const auto& tensor_pair : seq_it->second) {
+            for (const auto& shard : tensor_pair.second) {
+                const torch::Tensor& tensor = *shard.second;
+
+                // Create TorchTensorMeta from the stored tensor
+                TorchTensorMeta meta{tensor.scalar_type(), tensor.sizes().vec(), tensor.device()};
+
+                // Add to result using the key string
+                result.emplace_back(shard.first.key, std::move(meta));
+            }
+        }
     }
 
     return result;
@@ -181,24 +601,26 @@ std::vector<std::pair<std::string, TorchTensorMeta>> InMemoryTensorTable::ScanTe
 std::vector<std::pair<ShardedKey, torch::Tensor>> InMemoryTensorTable::GetTensorShards(
     const ShardedKey& sharded_key, int64_t seq_id, const torch::Tensor& target_tensor) {
     std::vector<std::pair<ShardedKey, torch::Tensor>> ret;
-    std::lock_guard<std::recursive_mutex> lock(mutex_);
+    auto& stripe = GetStripe(sharded_key.key);
+    RWSpinGuard guard(stripe.lock, false);
 
-    auto seq_it = table_data_.find(seq_id);
-    if (seq_it == table_data_.end()) {
+    auto seq_it = stripe.data.find(seq_id);
+    if (seq_it == stripe.data.end()) {
         return ret; // Return empty vector if seq_id not found
     }
+    auto tensor_it = seq_it->second.find(sharded_key.key);
+    if (tensor_it == seq_it->second.end()) {
+        return ret;
+    }
 
-    for (const auto& tensor_pair : seq_it->second) {
-        const ShardedKey& cached_sharded_key = tensor_pair.first;
-        const torch::Tensor& tensor = *tensor_pair.second;
+    ret.reserve(tensor_it->second.size());
+    for (const auto& shard : tensor_it->second) {
+        const torch::Tensor& tensor = *shard.second;
         // Verify the tensor matches the expected metadata
         if (tensor.scalar_type() != target_tensor.scalar_type()) {
-            throw std::runtime_error("Tensor dtype mismatch for key " + cached_sharded_key.key);
-        }
-
-        if (cached_sharded_key.key == sharded_key.key) {
-            ret.emplace_back(cached_sharded_key, tensor);
+            throw std::runtime_error("Tensor dtype mismatch for key " + shard.first.key);
         }
+        ret.emplace_back(shard.first, tensor);
     }
 
     return ret;
@@ -1,9 +1,13 @@
 #include "core/remote_tensor_table.h"
 
+#include <algorithm>
 #include <chrono>
 #include <cstdint>
 #include <exception>
+#include <functional>
+#include <future>
 #include <memory>
+#include <mutex>
 #include <random>
 #include <stdexcept>
 #include <string>
@@ -47,6 +51,8 @@ RemoteTensorTable::RemoteTensorTable(const std::string& name, std::shared_ptr<AT
       pinned_memory_enabled_(torch::cuda::is_available()),
       enable_numa_allocation_(GetOptionValue<bool>(ctx_->options, TRANSFER_ENGINE_ENABLE_NUMA_ALLOCATION)) {
     is_debug_mode_ = GetOptionValue<bool>(ctx_->options, ASTATE_DEBUG_MODE);
+    read_max_segment_num_ = GetOptionValue<int>(ctx_->options, TRANSFER_ENGINE_READ_MAX_SEGMENT_NUM);
+    read_segment_max_gap_size_ = GetOptionValue<long>(ctx_->options, TRANSFER_ENGINE_READ_SEGMENT_MAX_GAP_SIZE);
     numa_allocator_.Initialize();
 
     UpdateGlobalParallelConfig(ctx_->options);
@@ -60,9 +66,8 @@ RemoteTensorTable::RemoteTensorTable(const std::string& name, std::shared_ptr<AT
 
     SPDLOG_INFO("Enable GPU async copy: write {}, read {}", enable_write_gpu_async_copy_, enable_read_gpu_async_copy_);
     int copy_thread_num = GetOptionValue<int>(ctx_->options, TRANSFER_ENGINE_COPY_THREAD_NUM);
-    long copy_bucket_mem_size = GetOptionValue<long>(ctx_->options, TRANSFER_ENGINE_COPY_BUCKET_MEM_SIZE);
-    long copy_large_bucket_mem_size = GetOptionValue<long>(ctx_->options, TRANSFER_ENGINE_COPY_LARGE_BUCKET_MEM_SIZE);
-    int copy_large_thread_num = GetOptionValue<int>(ctx_->options, TRANSFER_ENGINE_COPY_LARGE_THREAD_NUM);
+    long staging_pool_capacity = GetOptionValue<long>(ctx_->options, TRANSFER_ENGINE_COPY_STAGING_POOL_CAPACITY);
+    long staging_min_slab_size = GetOptionValue<long>(ctx_->options, TRANSFER_ENGINE_COPY_STAGING_MIN_SLAB_SIZE);
     int copy_small_thread_num = GetOptionValue<int>(ctx_->options, TRANSFER_ENGINE_COPY_SMALL_THREAD_NUM);
 
 
@@ -73,20 +78,27 @@ RemoteTensorTable::RemoteTensorTable(const std::string& name, std::shared_ptr<AT
             "small_tensor_size_: {}",
             small_tensor_compact_cache_size_,
             small_tensor_size_);
-        throw std::invalid_argument("illegal state: small_tensor_compact_cache_size_ < "
-                                    "small_tensor_size_");
+        throw std::invalid_argument(
+            "illegal state: small_tensor_compact_cache_size_ < "
+            "small_tensor_size_");
     }
-    if (small_tensor_compact_cache_size_ > copy_bucket_mem_size) {
+    if (small_tensor_compact_cache_size_ > staging_pool_capacity) {
         SPDLOG_ERROR(
-            "small_tensor_compact_cache_size_ > copy_bucket_mem_size, "
+            "small_tensor_compact_cache_size_ > staging_pool_capacity, "
             "small_tensor_compact_cache_size_: {}, "
-            "copy_bucket_mem_size: {}",
+            "staging_pool_capacity: {}",
             small_tensor_compact_cache_size_,
-            copy_bucket_mem_size);
-        throw std::invalid_argument("illegal state: small_tensor_compact_cache_size_ > "
-                                    "copy_bucket_mem_size");
+            staging_pool_capacity);
+        throw std::invalid_argument(
+            "illegal state: small_tensor_compact_cache_size_ > "
+            "staging_pool_capacity");
     }
 
+    // Dispatcher of the async batch operations, which waits for the tasks submitted to the copy thread pools.
+    int async_thread_num = GetOptionValue<int>(ctx_->options, TRANSFER_ENGINE_ASYNC_THREAD_NUM);
+    async_thread_pool_ = std::make_unique<astate::ThreadPool>(async_thread_num);
+    complete_thread_pool_ = std::make_unique<astate::ThreadPool>(1);
+
     perf_metrics_controller_ = std::make_shared<PerfMetricsController>("remote_tensor_table", ctx_->options);
     enable_log_tensor_meta_ = GetOptionValue<bool>(ctx_->options, TRANSFER_ENGINE_LOG_TENSOR_META);
     SPDLOG_INFO(
@@ -95,37 +107,18 @@ RemoteTensorTable::RemoteTensorTable(const std::string& name, std::shared_ptr<AT
         perf_metrics_controller_->IsPerfMetricsEnabled());
 
     if (ctx_->parallel_config.IsInference()) {
-        copy_thread_pool_ = std::make_unique<astate::CUDAStreamResourceThreadPool<torch::Tensor>>(
-            [&, copy_bucket_mem_size]() {
-                torch::Tensor tensor = CreateZeroTensor(
-                    {copy_bucket_mem_size},
-                    torch::ScalarType::Byte,
-                    torch::DeviceType::CPU,
-                    false,
-                    pinned_memory_enabled_);
-                ATStorage atensor_storage = TensorStorageToATStorage(tensor);
-                ctx_->transfer_service->PreRegisterMemory(atensor_storage);
-                return tensor;
-            },
-            [](torch::Tensor& tensor) { tensor.reset(); },
+        // The staging buffers are created on demand by the copy tasks, instead of a fixed bucket per copy thread.
+        staging_pool_ = std::make_unique<StagingPool>(
+            [this](size_t size) { return CreateStagingBuffer(size); },
+            static_cast<size_t>(staging_pool_capacity),
+            static_cast<size_t>(staging_min_slab_size),
+            [this](torch::Tensor& buffer) { DestroyStagingBuffer(buffer); });
+        copy_thread_pool_ = std::make_unique<astate::CUDAStreamThreadPool>(copy_thread_num);
+        SPDLOG_INFO(
+            "Copy staging pool: capacity {} MB, min slab size {} KB, copy threads {}",
+            staging_pool_capacity / 1024 / 1024,
+            staging_min_slab_size / 1024,
             copy_thread_num);
-        copy_bucket_mem_size_ = copy_bucket_mem_size;
-
-        copy_large_thread_pool_ = std::make_unique<astate::CUDAStreamResourceThreadPool<torch::Tensor>>(
-            [&, copy_large_bucket_mem_size]() {
-                torch::Tensor tensor = CreateZeroTensor(
-                    {copy_large_bucket_mem_size},
-                    torch::ScalarType::Byte,
-                    torch::DeviceType::CPU,
-                    false,
-                    pinned_memory_enabled_);
-                ATStorage atensor_storage = TensorStorageToATStorage(tensor);
-                ctx_->transfer_service->PreRegisterMemory(atensor_storage);
-                return tensor;
-            },
-            [](torch::Tensor& tensor) { tensor.reset(); },
-            copy_large_thread_num);
-        copy_large_bucket_mem_size_ = copy_large_bucket_mem_size;
     } else {
         thread_pool_ = std::make_unique<astate::CUDAStreamThreadPool>(copy_thread_num);
         small_tensor_compact_cache_offset_ = 0;
@@ -153,7 +146,7 @@ bool RemoteTensorTable::Put(int64_t seq_id, const ShardedKey& tensor_key, pybind
             c10::cuda::CUDAStreamGuard guard(stream);
             local_copy->copy_(source_tensor, true);
             stream.synchronize();
-        } else {
+        } else if (!CopyShardsToTensorUnsafe({{tensor_key, &source_tensor}}, tensor_key, *local_copy)) {
             local_copy->copy_(source_tensor);
         }
         std::shared_ptr<ATensor> atensor = TensorToATensor(*local_copy);
@@ -193,7 +186,20 @@ bool RemoteTensorTable::Get(int64_t seq_id, const ShardedKey& tensor_key, pybind
 
 bool RemoteTensorTable::MultiPut(
     int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    auto tensors = PyObjectsToShardedTensors(tensor_list);
     pybind11::gil_scoped_release release;
+    return MultiPutTensors(seq_id, tensors);
+}
+
+TableFuture RemoteTensorTable::MultiPutAsync(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    auto tensors
+        = std::make_shared<std::vector<std::pair<ShardedKey, torch::Tensor>>>(PyObjectsToShardedTensors(tensor_list));
+    return SubmitBatchOperation([this, seq_id, tensors]() { return MultiPutTensors(seq_id, *tensors); });
+}
+
+bool RemoteTensorTable::MultiPutTensors(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list) {
     if (is_debug_mode_) {
         SPDLOG_INFO("RemoteTensorTable::multi_put for seq_id {} with {} tensors", seq_id, tensor_list.size());
     }
@@ -209,7 +215,7 @@ bool RemoteTensorTable::MultiPut(
             copy_futures.push_back(thread_pool_->Submit([this, seq_id, &pair](
                                                             const std::shared_ptr<c10::cuda::CUDAStream>& stream) {
                 auto start_time = std::chrono::high_resolution_clock::now();
-                const torch::Tensor& source_tensor = PyObjectToTensor(pair.second);
+                const torch::Tensor& source_tensor = pair.second;
                 if (stream != nullptr && source_tensor.device().index() != stream->device_index()) {
                     SPDLOG_ERROR(
                         "multi_put: source_tensor device index {} does not "
@@ -231,7 +237,8 @@ bool RemoteTensorTable::MultiPut(
                         c10::cuda::CUDAStreamGuard guard(*stream);
                         local_copy->copy_(reshard_source_tensor, true);
                         stream->synchronize();
-                    } else {
+                    } else if (!CopyShardsToTensorUnsafe(
+                                   {{sharded_key, &reshard_source_tensor}}, sharded_key, *local_copy)) {
                         local_copy->copy_(reshard_source_tensor);
                     }
 
@@ -285,58 +292,132 @@ bool RemoteTensorTable::MultiPut(
 }
 
 bool RemoteTensorTable::MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_dict) {
+    auto tensors = PyObjectsToShardedTensors(tensor_dict);
     pybind11::gil_scoped_release release;
+    return MultiGetTensors(seq_id, tensors);
+}
+
+TableFuture RemoteTensorTable::MultiGetAsync(
+    int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    auto tensors
+        = std::make_shared<std::vector<std::pair<ShardedKey, torch::Tensor>>>(PyObjectsToShardedTensors(tensor_list));
+    return SubmitBatchOperation([this, seq_id, tensors]() { return MultiGetTensors(seq_id, *tensors); });
+}
+
+bool RemoteTensorTable::MultiGetTensors(
+    int64_t seq_id, std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_dict) {
+    MultiGetPlan plan;
+    BuildMultiGetPlan(tensor_dict, plan);
+    return ExecuteMultiGetPlan(seq_id, plan);
+}
+
+std::shared_ptr<PreparedMultiGet>
+RemoteTensorTable::PrepareMultiGet(const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    auto tensors = PyObjectsToShardedTensors(tensor_list);
+    pybind11::gil_scoped_release release;
+    auto prepared = std::make_shared<RemotePreparedMultiGet>(shared_from_this());
+    BuildMultiGetPlan(tensors, prepared->plan);
+    prepared->plan.reusable = true;
+    SPDLOG_INFO(
+        "Prepared multi_get with {} tensors: small tensors {}, large tensors {}",
+        prepared->plan.tensors.size(),
+        prepared->plan.small_tensors.size(),
+        prepared->plan.large_tensors.size());
+    return prepared;
+}
+
+bool RemoteTensorTable::RemotePreparedMultiGet::Execute(int64_t seq_id) {
+    pybind11::gil_scoped_release release;
+    // Executions of the same batch share the frozen plan, so they have to be serialized.
+    std::lock_guard<std::mutex> lock(mutex);
+    return table->ExecuteMultiGetPlan(seq_id, plan);
+}
+
+void RemoteTensorTable::BuildMultiGetPlan(
+    std::vector<std::pair<ShardedKey, torch::Tensor>>& tensors, MultiGetPlan& plan) {
+    plan.tensors = std::move(tensors);
+
+    // Shuffle the tensors to spread the reading load across the remote instances.
+    auto rng = std::default_random_engine{};
+    std::shuffle(plan.tensors.begin(), plan.tensors.end(), rng);
+    for (size_t i = 0; i < plan.tensors.size(); i++) {
+        const auto& pair = plan.tensors[i];
+        const torch::Tensor& target_tensor = pair.second;
+        SPDLOG_INFO("[REMOTETensorTable] multi get device index: {}", target_tensor.get_device());
+
+        size_t tensor_size = GetTensorTotalByteSize(target_tensor);
+        plan.total_tensor_size += tensor_size;
+        if (tensor_size <= small_tensor_size_) {
+            plan.small_tensors.emplace(pair.first, target_tensor);
+            plan.total_small_tensor_size += tensor_size;
+            continue;
+        }
+        plan.large_tensors.push_back(i);
+    }
+}
+
+bool RemoteTensorTable::ExecuteMultiGetPlan(int64_t seq_id, MultiGetPlan& plan) {
     auto total_start_time = std::chrono::high_resolution_clock::now();
 
     try {
-        // Step 1: Initialize data structures
+        // Step 1: Resolve the remote shards of the large tensors once for a reusable plan, otherwise they are looked
+        // up in the copy tasks concurrently.
         auto step1_start = std::chrono::high_resolution_clock::now();
-        std::unordered_map<ShardedKey, std::vector<std::pair<ShardedKey, torch::Tensor>>&, ShardedKeyHash>
-            candidates_map;
-        std::vector<std::pair<ShardedKey, ATensor>> query_list;
+        uint64_t remote_layout_version = SyncRemoteLayoutVersion();
+        if (plan.reusable && plan.remote_layout_version != remote_layout_version) {
+            // The remote tensors were reallocated, added or removed since the plan was resolved
+            plan.large_tensor_shards.clear();
+            plan.compact_planned = false;
+            plan.compact_tensor_infos.clear();
+            plan.compact_targets.clear();
+            plan.remote_layout_version = remote_layout_version;
+        }
+        if (plan.reusable && plan.large_tensor_shards.size() != plan.large_tensors.size()) {
+            plan.large_tensor_shards.clear();
+            plan.large_tensor_shards.reserve(plan.large_tensors.size());
+            for (size_t index : plan.large_tensors) {
+                const auto& pair = plan.tensors[index];
+                plan.large_tensor_shards.push_back(
+                    GetRemoteTensorShards(pair.first, seq_id, *TensorToATensor(pair.second)));
+            }
+        }
         auto step1_end = std::chrono::high_resolution_clock::now();
         auto step1_duration = std::chrono::duration_cast<std::chrono::microseconds>(step1_end - step1_start);
-        SPDLOG_INFO("Step 1 - Initialize data structures: {} us", step1_duration.count());
+        SPDLOG_INFO("Step 1 - Resolve remote tensor shards: {} us", step1_duration.count());
 
-        // Step 2: Convert py_objects to tensors and get candidates
+        // Step 2: Submit copy tasks of the large tensors
         auto step2_start = std::chrono::high_resolution_clock::now();
-        size_t total_tensor_size = 0;
-        size_t total_small_tensor_size = 0;
+        for (const auto& pair : plan.tensors) {
+            UpdateReadingTensorsMeta(seq_id, pair.first, pair.second);
+        }
         std::vector<std::future<void>> copy_futures;
-        std::unordered_map<ShardedKey, const torch::Tensor&, ShardedKeyHash> small_tensors;
-
-        auto rng = std::default_random_engine{};
-        std::shuffle(tensor_dict.begin(), tensor_dict.end(), rng);
-        for (auto& pair : tensor_dict) {
-            const torch::Tensor& target_tensor = PyObjectToTensor(pair.second);
-            SPDLOG_INFO("[REMOTETensorTable] multi get device index: {}", target_tensor.get_device());
-            UpdateReadingTensorsMeta(seq_id, pair.first, target_tensor);
-
-            size_t tensor_size = GetTensorTotalByteSize(target_tensor);
-            total_tensor_size += tensor_size;
-            if (tensor_size <= small_tensor_size_) {
-                small_tensors.emplace(pair.first, target_tensor);
-                total_small_tensor_size += tensor_size;
-                continue;
-            }
-
-            copy_futures.push_back(SubmitTransferTask(seq_id, pair.first, target_tensor));
+        copy_futures.reserve(plan.large_tensors.size());
+        for (size_t i = 0; i < plan.large_tensors.size(); i++) {
+            const auto& pair = plan.tensors[plan.large_tensors[i]];
+            copy_futures.push_back(SubmitTransferTask(
+                seq_id, pair.first, pair.second, plan.reusable ? plan.large_tensor_shards[i].get() : nullptr));
         }
         auto step2_end = std::chrono::high_resolution_clock::now();
         auto step2_duration = std::chrono::duration_cast<std::chrono::microseconds>(step2_end - step2_start);
         SPDLOG_INFO(
-            "Step 2 - Convert py_objects and Submit copy tasks: {} us, "
+            "Step 2 - Submit copy tasks: {} us, "
             "copy_futures size: {}",
             step2_duration.count(),
             copy_futures.size());
 
         auto step3_start = std::chrono::high_resolution_clock::now();
-        MultiGetCompactTensors(seq_id, small_tensors);
+        if (!plan.small_tensors.empty()) {
+            if (!plan.compact_planned) {
+                PlanCompactTensors(seq_id, plan.small_tensors, plan.compact_tensor_infos, plan.compact_targets);
+                plan.compact_planned = true;
+            }
+            ReadCompactTensors(seq_id, plan.compact_tensor_infos, plan.compact_targets, plan.small_tensors.size());
+        }
         auto step3_end = std::chrono::high_resolution_clock::now();
         auto step3_duration = std::chrono::duration_cast<std::chrono::microseconds>(step3_end - step3_start);
         SPDLOG_INFO("Step 3 - multi_get_compact_tensors: {} us", step3_duration.count());
 
-        // Step 3: Wait for all copy operations to complete
+        // Step 4: Wait for all copy operations to complete
         auto step4_start = std::chrono::high_resolution_clock::now();
         for (auto& future : copy_futures) {
             future.get();
@@ -344,6 +425,7 @@ bool RemoteTensorTable::MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKe
         auto step4_end = std::chrono::high_resolution_clock::now();
         auto step4_duration = std::chrono::duration_cast<std::chrono::microseconds>(step4_end - step4_start);
         SPDLOG_INFO("Step 4 - Wait for copy operations completion: {} us", step4_duration.count());
+        LogStagingPoolStats(seq_id);
 
         // Total time calculation
         auto total_end_time = std::chrono::high_resolution_clock::now();
@@ -353,8 +435,8 @@ bool RemoteTensorTable::MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKe
             "tensor size: {} MB - Total small tensor "
             "size: {} MB - Total time: {} us ({:.2f} ms)",
             seq_id,
-            total_tensor_size / 1024 / 1024,
-            total_small_tensor_size / 1024 / 1024,
+            plan.total_tensor_size / 1024 / 1024,
+            plan.total_small_tensor_size / 1024 / 1024,
             total_duration.count(),
             total_duration.count() / 1000.0);
 
@@ -369,17 +451,25 @@ bool RemoteTensorTable::MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKe
 
 bool RemoteTensorTable::MultiGetCompactTensors(
     int64_t seq_id, const std::unordered_map<ShardedKey, const torch::Tensor&, ShardedKeyHash>& small_tensors) {
+    std::vector<CompactTensorInfo> compact_tensor_infos;
+    CompactTargetMap target_tensor_map;
+    PlanCompactTensors(seq_id, small_tensors, compact_tensor_infos, target_tensor_map);
+    return ReadCompactTensors(seq_id, compact_tensor_infos, target_tensor_map, small_tensors.size());
+}
+
+void RemoteTensorTable::PlanCompactTensors(
+    int64_t seq_id,
+    const std::unordered_map<ShardedKey, const torch::Tensor&, ShardedKeyHash>& small_tensors,
+    std::vector<CompactTensorInfo>& compact_tensor_infos,
+    CompactTargetMap& target_tensor_map) {
     auto start_time = std::chrono::high_resolution_clock::now();
     std::unordered_map<ShardedKey, ATensor, ShardedKeyHash> tensor_shards;
-    std::unordered_map<ShardedKey, std::vector<std::pair<ShardedKey, const torch::Tensor&>>, ShardedKeyHash>
-        target_tensor_map;
     for (const auto& pair : small_tensors) {
         ShardedKey sharded_key = pair.first;
         const torch::Tensor& target_tensor = pair.second;
 
-        const std::vector<std::tuple<ShardedKey, ShardedKey, ATensor>>& candidates
-            = GetRemoteTensorShards(sharded_key, seq_id, *TensorToATensor(target_tensor), false);
-        for (const std::tuple<ShardedKey, ShardedKey, ATensor>& candidate : candidates) {
+        auto candidates = GetRemoteTensorShards(sharded_key, seq_id, *TensorToATensor(target_tensor), false);
+        for (const ShardedATensorTuple& candidate : *candidates) {
             const ShardedKey& raw_sharded_key = std::get<0>(candidate);
             const ATensor& atensor = std::get<2>(candidate);
             tensor_shards.emplace(raw_sharded_key, atensor);
@@ -387,7 +477,6 @@ bool RemoteTensorTable::MultiGetCompactTensors(
         }
     }
 
-    std::vector<CompactTensorInfo> compact_tensor_infos;
     {
         std::lock_guard<std::mutex> lock(mutex_);
         compact_tensor_infos = compact_tensor_infos_;
@@ -407,91 +496,98 @@ bool RemoteTensorTable::MultiGetCompactTensors(
         compact_tensor_infos_duration.count(),
         compact_tensor_infos.size(),
         small_tensors.size());
+}
 
+bool RemoteTensorTable::ReadCompactTensors(
+    int64_t seq_id,
+    const std::vector<CompactTensorInfo>& compact_tensor_infos,
+    const CompactTargetMap& target_tensor_map,
+    size_t small_tensor_num) {
     auto submit_start = std::chrono::high_resolution_clock::now();
     std::vector<std::future<bool>> read_futures{};
     read_futures.reserve(compact_tensor_infos.size());
     for (const auto& compact_tensor_info : compact_tensor_infos) {
-        read_futures.push_back(copy_thread_pool_->Submit(
-            [&](torch::Tensor& local_cache, const std::shared_ptr<c10::cuda::CUDAStream>& stream) {
-                ATStorage astorage = TensorStorageToATStorage(local_cache);
-                if (!ctx_->transfer_service->RawGet(
-                        seq_id,
-                        astorage,
-                        compact_tensor_info.node_info,
-                        compact_tensor_info.addr,
-                        compact_tensor_info.size)) {
-                    SPDLOG_ERROR(
-                        "Failed to read tensor from remote for seq_id {} and "
-                        "compact_tensor_info.node_info: {}:{} and "
-                        "compact_tensor_info.addr: {} and "
-                        "compact_tensor_info.size: {} local_addr:{} "
-                        "local_size:{}",
-                        seq_id,
-                        compact_tensor_info.node_info.hostname_or_ip,
-                        compact_tensor_info.node_info.rdma_port,
-                        compact_tensor_info.addr,
-                        compact_tensor_info.size,
-                        astorage.data,
-                        astorage.storage_size);
-                    throw std::runtime_error("Failed to read tensor from remote for seq_id " + std::to_string(seq_id));
-                }
+        read_futures.push_back(copy_thread_pool_->Submit([&](const std::shared_ptr<c10::cuda::CUDAStream>& stream) {
+            auto staging = staging_pool_->Acquire(compact_tensor_info.size);
+            torch::Tensor& local_cache = staging.Get();
+            ATStorage astorage = TensorStorageToATStorage(local_cache);
+            if (!ctx_->transfer_service->RawGet(
+                    seq_id,
+                    astorage,
+                    compact_tensor_info.node_info,
+                    compact_tensor_info.addr,
+                    compact_tensor_info.size)) {
+                SPDLOG_ERROR(
+                    "Failed to read tensor from remote for seq_id {} and "
+                    "compact_tensor_info.node_info: {}:{} and "
+                    "compact_tensor_info.addr: {} and "
+                    "compact_tensor_info.size: {} local_addr:{} "
+                    "local_size:{}",
+                    seq_id,
+                    compact_tensor_info.node_info.hostname_or_ip,
+                    compact_tensor_info.node_info.rdma_port,
+                    compact_tensor_info.addr,
+                    compact_tensor_info.size,
+                    astorage.data,
+                    astorage.storage_size);
+                throw std::runtime_error("Failed to read tensor from remote for seq_id " + std::to_string(seq_id));
+            }
 
-                for (const auto& pair : compact_tensor_info.atensors) {
-                    const ShardedKey& shard_key = pair.first;
-                    const ATensor& atensor = pair.second;
-
-                    char* local_cache_ptr = static_cast<char*>(local_cache.data_ptr())
-                        + GetStorageByteOffset(pair.second.dtype, atensor.storage_offset);
-
-                    std::vector<int64_t> sizes(pair.second.size, pair.second.size + pair.second.dim_num);
-                    std::vector<int64_t> strides(pair.second.stride, pair.second.stride + pair.second.dim_num);
-                    torch::Tensor local_tensor = torch::from_blob(
-                        local_cache_ptr,
-                        sizes,
-                        strides,
-                        torch::TensorOptions()
-                            .dtype(ATDtypeToTorchDtype(pair.second.dtype))
-                            .device(torch::Device(torch::DeviceType::CPU))
-                            .layout(torch::Layout::Strided)
-                            .memory_format(torch::MemoryFormat::Contiguous)
-                            .pinned_memory(pinned_memory_enabled_)
-                            .requires_grad(false));
-
-                    const auto& target_pair_list = target_tensor_map.at(shard_key);
-                    for (const auto& target_pair : target_pair_list) {
-                        const torch::Tensor& target_tensor = target_pair.second;
-                        if (stream != nullptr && target_tensor.device().is_cuda()
-                            && target_tensor.device().index() != stream->device_index()) {
-                            SPDLOG_ERROR(
-                                "multi_get_compact_tensors: target_tensor "
-                                "device index {} not match thread pool device "
-                                "index {}",
-                                target_tensor.device().index(),
-                                stream->device_index());
-                        }
-
-                        if (target_tensor.requires_grad()) {
-                            CopyTensorWithShardedKeysUnsafe(
-                                shard_key,
-                                local_tensor,
-                                target_pair.first,
-                                target_tensor.detach(),
-                                stream.get(),
-                                enable_read_gpu_async_copy_);
-                        } else {
-                            CopyTensorWithShardedKeysUnsafe(
-                                shard_key,
-                                local_tensor,
-                                target_pair.first,
-                                target_tensor,
-                                stream.get(),
-                                enable_read_gpu_async_copy_);
-                        }
+            for (const auto& pair : compact_tensor_info.atensors) {
+                const ShardedKey& shard_key = pair.first;
+                const ATensor& atensor = pair.second;
+
+                char* local_cache_ptr = static_cast<char*>(local_cache.data_ptr())
+                    + GetStorageByteOffset(pair.second.dtype, atensor.storage_offset);
+
+                std::vector<int64_t> sizes(pair.second.size, pair.second.size + pair.second.dim_num);
+                std::vector<int64_t> strides(pair.second.stride, pair.second.stride + pair.second.dim_num);
+                torch::Tensor local_tensor = torch::from_blob(
+                    local_cache_ptr,
+                    sizes,
+                    strides,
+                    torch::TensorOptions()
+                        .dtype(ATDtypeToTorchDtype(pair.second.dtype))
+                        .device(torch::Device(torch::DeviceType::CPU))
+                        .layout(torch::Layout::Strided)
+                        .memory_format(torch::MemoryFormat::Contiguous)
+                        .pinned_memory(pinned_memory_enabled_)
+                        .requires_grad(false));
+
+                const auto& target_pair_list = target_tensor_map.at(shard_key);
+                for (const auto& target_pair : target_pair_list) {
+                    const torch::Tensor& target_tensor = target_pair.second;
+                    if (stream != nullptr && target_tensor.device().is_cuda()
+                        && target_tensor.device().index() != stream->device_index()) {
+                        SPDLOG_ERROR(
+                            "multi_get_compact_tensors: target_tensor "
+                            "device index {} not match thread pool device "
+                            "index {}",
+                            target_tensor.device().index(),
+                            stream->device_index());
+                    }
+
+                    if (target_tensor.requires_grad()) {
+                        CopyTensorWithShardedKeysUnsafe(
+                            shard_key,
+                            local_tensor,
+                            target_pair.first,
+                            target_tensor.detach(),
+                            stream.get(),
+                            enable_read_gpu_async_copy_);
+                    } else {
+                        CopyTensorWithShardedKeysUnsafe(
+                            shard_key,
+                            local_tensor,
+                            target_pair.first,
+                            target_tensor,
+                            stream.get(),
+                            enable_read_gpu_async_copy_);
                     }
                 }
-                return true;
-            }));
+            }
+            return true;
+        }));
     }
     auto submit_end = std::chrono::high_resolution_clock::now();
     auto submit_duration = std::chrono::duration_cast<std::chrono::microseconds>(submit_end - submit_start);
@@ -509,7 +605,7 @@ bool RemoteTensorTable::MultiGetCompactTensors(
         "for {} tasks and {} small tensors",
         read_duration.count(),
         read_futures.size(),
-        small_tensors.size());
+        small_tensor_num);
     return true;
 }
 
@@ -532,8 +628,12 @@ RemoteTensorTable::GetTensor(int64_t seq_id, const ShardedKey& tensor_key, const
         // Copy data to target tensor
         copy_future.get();
 
-        // Convert to pybind11 object
-        auto result = TensorToPyObject(ret);
+        // Convert to pybind11 object, which requires the GIL
+        pybind11::object result;
+        {
+            pybind11::gil_scoped_acquire acquire;
+            result = TensorToPyObject(ret);
+        }
 
         // Total time calculation - 只在seq_id变化时打印
         // if (print_cuda) {
@@ -585,11 +685,14 @@ std::vector<std::pair<ShardedKey, pybind11::object>> RemoteTensorTable::MultiGet
             future.get();
         }
 
-        // Convert results to pybind11 objects
+        // Convert results to pybind11 objects, which requires the GIL
         std::vector<std::pair<ShardedKey, pybind11::object>> result;
         result.reserve(tensor_map.size());
-        for (auto& pair : tensor_map) {
-            result.emplace_back(pair.first, TensorToPyObject(pair.second));
+        {
+            pybind11::gil_scoped_acquire acquire;
+            for (auto& pair : tensor_map) {
+                result.emplace_back(pair.first, TensorToPyObject(pair.second));
+            }
         }
 
         // Total time calculation
@@ -608,7 +711,49 @@ std::vector<std::pair<ShardedKey, pybind11::object>> RemoteTensorTable::MultiGet
 
 void RemoteTensorTable::Complete(int64_t seq_id) {
     pybind11::gil_scoped_release release;
+    CompleteSeq(seq_id);
+}
+
+TableFuture RemoteTensorTable::SubmitBatchOperation(std::function<bool()> operation) {
+    std::lock_guard<std::mutex> lock(async_order_mutex_);
+    auto future = async_thread_pool_
+                      ->Submit([complete_future = pending_complete_future_, operation = std::move(operation)]() {
+                          if (complete_future.valid()) {
+                              complete_future.wait();
+                          }
+                          return operation();
+                      })
+                      .share();
+    pending_batch_futures_.erase(
+        std::remove_if(
+            pending_batch_futures_.begin(),
+            pending_batch_futures_.end(),
+            [](const std::shared_future<bool>& pending) {
+                return pending.wait_for(std::chrono::seconds(0)) == std::future_status::ready;
+            }),
+        pending_batch_futures_.end());
+    pending_batch_futures_.push_back(future);
+    return TableFuture(future);
+}
 
+TableFuture RemoteTensorTable::CompleteAsync(int64_t seq_id) {
+    std::lock_guard<std::mutex> lock(async_order_mutex_);
+    std::vector<std::shared_future<bool>> batch_futures;
+    batch_futures.swap(pending_batch_futures_);
+    pending_complete_future_ = complete_thread_pool_
+                                   ->Submit([this, seq_id, batch_futures = std::move(batch_futures)]() {
+                                       // The batch operations submitted before belong to the seq to complete
+                                       for (const auto& batch_future : batch_futures) {
+                                           batch_future.wait();
+                                       }
+                                       CompleteSeq(seq_id);
+                                       return true;
+                                   })
+                                   .share();
+    return TableFuture(pending_complete_future_);
+}
+
+void RemoteTensorTable::CompleteSeq(int64_t seq_id) {
     // cudaDeviceSynchronize();
 
     ctx_->transfer_service->Complete();
@@ -617,13 +762,8 @@ void RemoteTensorTable::Complete(int64_t seq_id) {
     // 重置last_logged_seq_id，为下一个seq_id做准备
     last_logged_seq_id_.store(-1);
 
-    SPDLOG_INFO(
-        "Seq {} completed. copy_task_counter_ {} copy_large_task_counter_ {}",
-        seq_id,
-        copy_task_counter_,
-        copy_large_task_counter_);
+    SPDLOG_INFO("Seq {} completed. copy_task_counter_ {}", seq_id, copy_task_counter_);
     copy_task_counter_ = 0;
-    copy_large_task_counter_ = 0;
     // SPDLOG_INFO("Seq {} completed.", seq_id);
 
     // For remote table, this could potentially be implemented to:
@@ -700,7 +840,11 @@ RemoteTensorTable::GetLocalPrefetchCachedTensor(const ShardedKey& sharded_key, c
 }
 
 std::shared_ptr<TensorDict> RemoteTensorTable::ReadTensors(
-    int64_t seq_id, const ShardedKey& sharded_key, const torch::Tensor& target_tensor, torch::Tensor& local_cache) {
+    int64_t seq_id,
+    const ShardedKey& sharded_key,
+    const torch::Tensor& target_tensor,
+    StagingPool::Lease& staging,
+    const std::vector<ShardedATensorTuple>* planned_shards) {
     std::shared_ptr<TensorDict> tensors = std::make_shared<TensorDict>();
 
     // Part of the tensors are cached locally. For the updating of these tensors, we can directly use the
@@ -709,36 +853,58 @@ std::shared_ptr<TensorDict> RemoteTensorTable::ReadTensors(
     if (local_cached_tensor != nullptr) {
         tensors->emplace(sharded_key, local_cached_tensor);
     } else {
-        // Get remote tensor shards that need to be fetched
-        const auto& remote_shards = GetRemoteTensorShards(sharded_key, seq_id, *TensorToATensor(target_tensor));
+        // Get remote tensor shards that need to be fetched, which are held until the read finishes
+        RemoteShardsPtr looked_up_shards;
+        if (planned_shards == nullptr) {
+            looked_up_shards = GetRemoteTensorShards(sharded_key, seq_id, *TensorToATensor(target_tensor));
+        }
+        const auto& remote_shards = planned_shards != nullptr ? *planned_shards : *looked_up_shards;
+        if (remote_shards.empty()) {
+            return tensors;
+        }
 
         // Step 1: Initialize data structures
         std::vector<std::pair<ShardedKey, ATensor>> remote_query_list;
         remote_query_list.reserve(remote_shards.size());
+        std::vector<std::vector<TensorSegment>> remote_query_segments;
+        remote_query_segments.reserve(remote_shards.size());
+        bool has_segments = false;
 
-        char* local_cache_ptr = static_cast<char*>(local_cache.data_ptr());
+        // The region read by segments keeps the layout of the remote shard, so it spans until the last segment
+        auto get_staging_size = [](const ShardedATensorTuple& tuple) {
+            const auto& atensor = std::get<2>(tuple);
+            const auto& segments = std::get<3>(tuple);
+            auto item_size = static_cast<int64_t>(GetItemSizeFromDtype(ATDtypeToTorchDtype(atensor.dtype)));
+            return segments.empty() ? static_cast<int64_t>(GetTensorTotalByteSize(atensor))
+                                    : segments.back().second * item_size;
+        };
+        int64_t total_size = 0;
+        for (const auto& tuple : remote_shards) {
+            total_size += get_staging_size(tuple);
+        }
+        // Wait for the staging buffer if the staging pool is exhausted
+        try {
+            staging = staging_pool_->Acquire(static_cast<size_t>(total_size));
+        } catch (const std::exception& e) {
+            SPDLOG_ERROR(
+                "Failed to acquire staging buffer of {} bytes for tensor {}: {}",
+                total_size,
+                sharded_key.key,
+                e.what());
+            throw;
+        }
+        char* local_cache_ptr = static_cast<char*>(staging.Get().data_ptr());
 
         // Step 2: Create tensors and get candidates
         int64_t offset = 0;
-        auto total_size = GetTensorTotalByteSize(local_cache);
         for (const auto& tuple : remote_shards) {
             ShardedKey raw_sharded_key = std::get<0>(tuple);
             ShardedKey adjusted_sharded_key = std::get<1>(tuple);
             const auto& atensor = std::get<2>(tuple);
+            const auto& segments = std::get<3>(tuple);
 
-            auto size = static_cast<int64_t>(GetTensorTotalByteSize(atensor));
-            // Check if the local cache is large enough to hold the remote shard
-            if (offset + size > total_size) {
-                SPDLOG_ERROR(
-                    "Copy bucket memory size is too small for tensor {} with "
-                    "total size {} and current size {}",
-                    sharded_key.key,
-                    total_size,
-                    (offset + size));
-                throw std::runtime_error(
-                    "Copy bucket memory size is too small for tensor " + sharded_key.key + " with total size "
-                    + std::to_string(total_size) + " and current size " + std::to_string(offset + size));
-            }
+            auto item_size = static_cast<int64_t>(GetItemSizeFromDtype(ATDtypeToTorchDtype(atensor.dtype)));
+            auto size = get_staging_size(tuple);
             std::vector<int64_t> sizes(atensor.size, atensor.size + atensor.dim_num);
             std::vector<int64_t> strides(atensor.stride, atensor.stride + atensor.dim_num);
             torch::Tensor tensor = torch::from_blob(
@@ -758,21 +924,33 @@ std::shared_ptr<TensorDict> RemoteTensorTable::ReadTensors(
             std::shared_ptr<ATensor> atensor_ptr = TensorToATensor(tensor);
             atensor_ptr->storage_offset = atensor.storage_offset;
             remote_query_list.emplace_back(raw_sharded_key, *atensor_ptr);
+            std::vector<TensorSegment> byte_segments;
+            byte_segments.reserve(segments.size());
+            for (const auto& segment : segments) {
+                byte_segments.push_back(
+                    TensorSegment{
+                        static_cast<size_t>(segment.first * item_size),
+                        static_cast<size_t>((segment.second - segment.first) * item_size)});
+            }
+            has_segments = has_segments || !byte_segments.empty();
+            remote_query_segments.push_back(std::move(byte_segments));
             tensors->emplace(adjusted_sharded_key, std::make_shared<torch::Tensor>(std::move(tensor)));
             offset += size;
         }
 
-        // Step 3: Fetch all data from remote in one batch
+        // Step 3: Fetch all data from remote in one batch, the shards are read concurrently into the disjoint
+        // ranges of the local cache.
         if (!remote_query_list.empty()) {
-            // if (!ctx_->transfer_service->MultiGet(seq_id, remote_query_list)) {
-            //     SPDLOG_ERROR("Failed to read tensor from remote for seq_id {}", seq_id);
-            //     throw std::runtime_error("Failed to read tensor from remote for seq_id " + std::to_string(seq_id));
-            // }
-            for (auto query : remote_query_list) {
-                if (!ctx_->transfer_service->Get(seq_id, query.first, query.second)) {
-                    SPDLOG_ERROR("Failed to read tensor from remote for seq_id {}: {}", seq_id, query.first.ToString());
-                    throw std::runtime_error("Failed to read tensor from remote for seq_id " + std::to_string(seq_id));
-                }
+            bool read_ok = has_segments
+                ? ctx_->transfer_service->MultiGet(seq_id, remote_query_list, remote_query_segments)
+                : ctx_->transfer_service->MultiGet(seq_id, remote_query_list);
+            if (!read_ok) {
+                SPDLOG_ERROR(
+                    "Failed to read tensor from remote for seq_id {}: {} with {} shards",
+                    seq_id,
+                    sharded_key.ToString(),
+                    remote_query_list.size());
+                throw std::runtime_error("Failed to read tensor from remote for seq_id " + std::to_string(seq_id));
             }
         }
     }
@@ -782,12 +960,21 @@ std::shared_ptr<TensorDict> RemoteTensorTable::ReadTensors(
 
 std::future<void> RemoteTensorTable::SubmitTransferTask(
     int64_t seq_id, const ShardedKey& sharded_key, const torch::Tensor& target_tensor) {
-    auto copy_task = [seq_id, sharded_key, &target_tensor, this](
-                         torch::Tensor& local_cache, const std::shared_ptr<c10::cuda::CUDAStream>& stream) mutable {
+    return SubmitTransferTask(seq_id, sharded_key, target_tensor, nullptr);
+}
+
+std::future<void> RemoteTensorTable::SubmitTransferTask(
+    int64_t seq_id,
+    const ShardedKey& sharded_key,
+    const torch::Tensor& target_tensor,
+    const std::vector<ShardedATensorTuple>* planned_shards) {
+    auto copy_task = [seq_id, sharded_key, &target_tensor, planned_shards, this](
+                         const std::shared_ptr<c10::cuda::CUDAStream>& stream) mutable {
         auto start_time = std::chrono::high_resolution_clock::now();
 
-        // Read tensors from local cache or remote instances
-        std::shared_ptr<TensorDict> tensors = ReadTensors(seq_id, sharded_key, target_tensor, local_cache);
+        // Read tensors from local cache or remote instances, the staging buffer is released after the copy
+        StagingPool::Lease staging;
+        std::shared_ptr<TensorDict> tensors = ReadTensors(seq_id, sharded_key, target_tensor, staging, planned_shards);
 
         auto copy_time = std::chrono::high_resolution_clock::now();
         if (stream != nullptr && target_tensor.device().is_cuda()
@@ -799,9 +986,21 @@ std::future<void> RemoteTensorTable::SubmitTransferTask(
                 stream->device_index());
         }
 
-        for (const auto& pair : *tensors) {
-            CopyTensorWithShardedKeysUnsafe(
-                pair.first, *pair.second, sharded_key, target_tensor, stream.get(), enable_read_gpu_async_copy_);
+        // Assemble a CPU target from all the read shards in one call, otherwise copy them one by one
+        bool assembled = false;
+        if (target_tensor.device().is_cpu()) {
+            std::vector<std::pair<ShardedKey, const torch::Tensor*>> sources;
+            sources.reserve(tensors->size());
+            for (const auto& pair : *tensors) {
+                sources.emplace_back(pair.first, pair.second.get());
+            }
+            assembled = CopyShardsToTensorUnsafe(sources, sharded_key, target_tensor);
+        }
+        if (!assembled) {
+            for (const auto& pair : *tensors) {
+                CopyTensorWithShardedKeysUnsafe(
+                    pair.first, *pair.second, sharded_key, target_tensor, stream.get(), enable_read_gpu_async_copy_);
+            }
         }
         // cudaDeviceSynchronize();
 
@@ -822,67 +1021,78 @@ std::future<void> RemoteTensorTable::SubmitTransferTask(
         }
     };
 
-    size_t cache_size_needed = GetTensorTotalByteSize(target_tensor) * ctx_->parallel_config.tp_size;
-    if (cache_size_needed <= this->copy_bucket_mem_size_) {
-        copy_task_counter_++;
-        return copy_thread_pool_->Submit(copy_task);
+    copy_task_counter_++;
+    return copy_thread_pool_->Submit(copy_task);
+}
+
+torch::Tensor RemoteTensorTable::CreateStagingBuffer(size_t size) {
+    auto start_time = std::chrono::high_resolution_clock::now();
+    torch::Tensor tensor = CreateZeroTensor(
+        {static_cast<int64_t>(size)}, torch::ScalarType::Byte, torch::DeviceType::CPU, false, pinned_memory_enabled_);
+    ATStorage atensor_storage = TensorStorageToATStorage(tensor);
+    ctx_->transfer_service->PreRegisterMemory(atensor_storage);
+    auto end_time = std::chrono::high_resolution_clock::now();
+    SPDLOG_INFO(
+        "Created staging buffer of {} KB, cost {} us",
+        size / 1024,
+        std::chrono::duration_cast<std::chrono::microseconds>(end_time - start_time).count());
+    return tensor;
+}
+
+void RemoteTensorTable::DestroyStagingBuffer(torch::Tensor& buffer) {
+    ATStorage atensor_storage = TensorStorageToATStorage(buffer);
+    if (!ctx_->transfer_service->DeregisterMemory(atensor_storage)) {
+        SPDLOG_WARN("Failed to deregister staging buffer of {} KB", buffer.nbytes() / 1024);
     }
-    if (cache_size_needed <= this->copy_large_bucket_mem_size_) {
-        copy_large_task_counter_++;
-        return copy_large_thread_pool_->Submit(copy_task);
+    SPDLOG_INFO("Freed staging buffer of {} KB for a larger one", buffer.nbytes() / 1024);
+    buffer = torch::Tensor();
+}
+
+void RemoteTensorTable::LogStagingPoolStats(int64_t seq_id) const {
+    if (staging_pool_ == nullptr) {
+        return;
     }
-    SPDLOG_WARN(
-        "{} with size might be needed {} and copy large bucket mem size {}",
-        "Copy bucket memory size might be too small for tensor " + sharded_key.key,
-        cache_size_needed,
-        this->copy_large_bucket_mem_size_);
-    copy_large_task_counter_++;
-    return copy_large_thread_pool_->Submit(copy_task);
+    auto stats = staging_pool_->GetStats();
+    SPDLOG_INFO(
+        "Staging pool for seq_id {}: allocated {} MB in {} slabs of capacity {} MB, in use {} MB (requested {} MB), "
+        "peak in use {} MB, acquired {} times, waited {} times for {} us in total and {} us at most, freed {} slabs",
+        seq_id,
+        stats.allocated_bytes / 1024 / 1024,
+        stats.slab_num,
+        stats.capacity / 1024 / 1024,
+        stats.in_use_bytes / 1024 / 1024,
+        stats.requested_bytes / 1024 / 1024,
+        stats.peak_in_use_bytes / 1024 / 1024,
+        stats.acquire_count,
+        stats.wait_count,
+        stats.wait_time_us,
+        stats.max_wait_time_us,
+        stats.freed_slab_num);
 }
 
 std::vector<ReshardingInfo>
 RemoteTensorTable::ReshardTensor(const ShardedKey& tensor_key, const torch::Tensor& source_tensor) const {
-    std::vector<ReshardingInfo> ret;
-
-    // TODO(root): Following is the temp solution to reshard the tensor in column dimension by configuration.
-    // It is supposed to find the the resharding strategy according to the training and inference tensor layouts
-    // automatically in the furture.
-    int infer_tp_size = inference_parallel_config_.tp_size;
-    if (infer_tp_size <= 0) {
-        return ret; // Train tp size or infer tp size not configured.
+    // Split the training shard at the boundaries of the inference blocks, along the dimension partitioned by training,
+    // or the configured one if the tensor is replicated in training
+    auto ret = resharding_planner_.Plan(tensor_key, source_tensor.sizes().vec(), GetTensorReshardingDim(tensor_key));
+    if (ret.empty()) {
+        return ret;
     }
 
-    int dim_index = 1; // only consider the resharding in column dimension currently
-    size_t origin_size = source_tensor.size(dim_index);
-    size_t split_size = tensor_key.global_shape[dim_index] / infer_tp_size;
-    auto split_num = origin_size / split_size;
     SPDLOG_INFO(
-        "Start to reshard tensor {}: dim_index={}, origin_size={}, "
-        "split_num={}, split_size={}",
+        "Start to reshard tensor {}: dim_index={}, origin_size={}, split_num={}",
         tensor_key.ToString(),
-        dim_index,
-        origin_size,
-        split_num,
-        split_size);
-
-    for (auto i = 0; i < split_num; i++) {
-        ReshardingInfo reshard_info;
-        ShardedKey reshard_key = tensor_key;
-        reshard_key.global_offset[dim_index] += static_cast<int64_t>(i * split_size);
-        SetShardedKey(reshard_info, reshard_key);
-        SetDimIndex(reshard_info, dim_index);
-        SetStart(reshard_info, i * split_size);
-        SetOffset(reshard_info, split_size);
+        GetDimIndex(ret.front()),
+        source_tensor.size(GetDimIndex(ret.front())),
+        ret.size());
+    for (const auto& reshard_info : ret) {
         SPDLOG_INFO(
             "Reshard info: key={}, dim_index={}, start={}, offset={}",
             GetShardedKey(reshard_info).ToString(),
             GetDimIndex(reshard_info),
             GetStart(reshard_info),
             GetOffset(reshard_info));
-
-        ret.emplace_back(reshard_info);
     }
-
     return ret;
 }
 
@@ -890,7 +1100,8 @@ std::unordered_map<ShardedKey, torch::Tensor, ShardedKeyHash>
 RemoteTensorTable::GetOrCreateLocalReshardTensors(const ShardedKey& tensor_key, const torch::Tensor& source_tensor) {
     std::unordered_map<ShardedKey, torch::Tensor, ShardedKeyHash> ret;
 
-    if (!IsTensorReshardingKey(tensor_key) || GetTensorTotalByteSize(source_tensor) <= small_tensor_size_) {
+    if (!resharding_planner_.NeedsResharding() || (!enable_auto_resharding_ && !IsTensorReshardingKey(tensor_key))
+        || GetTensorTotalByteSize(source_tensor) <= small_tensor_size_) {
         ret.emplace(tensor_key, source_tensor);
     } else {
         std::vector<ReshardingInfo> reshard_infos;
@@ -986,10 +1197,11 @@ RemoteTensorTable::GetOrCreateLocalTensorCopy(const ShardedKey& tensor_key, cons
     }
 }
 
-const std::vector<ShardedATensorTuple>& RemoteTensorTable::GetRemoteTensorShards(
+RemoteTensorTable::RemoteShardsPtr RemoteTensorTable::GetRemoteTensorShards(
     const ShardedKey& sharded_key, int64_t seq_id, const ATensor& target_tensor, bool try_prune_redundant_shard) {
+    SyncRemoteLayoutVersion();
     {
-        std::lock_guard<std::mutex> lock(mutex_);
+        RWSpinGuard lock(shard_mapping_lock_, false);
 
         auto it = shard_mapping_.find(sharded_key);
         if (it != shard_mapping_.end()) {
@@ -997,54 +1209,105 @@ const std::vector<ShardedATensorTuple>& RemoteTensorTable::GetRemoteTensorShards
         }
     }
 
-    std::shared_ptr<std::vector<std::pair<ShardedKey, ATensor>>> tensor_meta_list
-        = std::atomic_load(&tensor_meta_list_);
-    if (tensor_meta_list == nullptr) {
-        std::lock_guard<std::mutex> lock(tensor_meta_mutex_);
-        if (tensor_meta_list_ == nullptr) {
-            std::atomic_store(
-                &tensor_meta_list_,
-                std::make_shared<std::vector<std::pair<ShardedKey, ATensor>>>(
-                    ctx_->transfer_service->GetAllTensorShards(
-                        seq_id, [](const ShardedKey& /*candidate*/) -> bool { return true; })));
-        }
-        tensor_meta_list = tensor_meta_list_;
-    }
-
-    std::vector<std::pair<ShardedKey, ATensor>> atensor_list{};
-    for (const auto& pair : *tensor_meta_list) {
-        if (pair.first.key == sharded_key.key) {
-            atensor_list.emplace_back(pair);
-        }
-    }
-    auto target_candidates = astate::FindCoveringCandidates(atensor_list, sharded_key, target_tensor);
-    std::vector<ShardedATensorTuple> ret;
+    auto remote_shard_index = GetRemoteShardIndex(seq_id);
+    static const ShardIntervalIndex kNoShards;
+    auto index_it = remote_shard_index->find(sharded_key.key);
+    const auto& shard_index = index_it == remote_shard_index->end() ? kNoShards : index_it->second;
+    auto target_candidates = shard_index.FindCoveringCandidates(sharded_key, target_tensor);
+    const auto& atensor_list = shard_index.GetCandidates();
+    auto ret = std::make_shared<std::vector<ShardedATensorTuple>>();
     for (const auto& op : target_candidates) {
-        auto& atensor = atensor_list[op.candidate_index].second;
+        ATensor atensor{atensor_list[op.candidate_index].second};
         ShardedKey adjusted_sharded_key{atensor_list[op.candidate_index].first};
+        std::vector<std::pair<int64_t, int64_t>> segments;
         if (try_prune_redundant_shard) {
-            TryAdjustGlobalOffset(atensor, op.copy_shape, op.src_offset, adjusted_sharded_key);
+            // Read the needed region only, by the segments of the remote memory if it is not contiguous, e.g. the
+            // column range of a column parallel weight read by a different tp size
+            auto item_size
+                = std::max<int64_t>(static_cast<int64_t>(GetItemSizeFromDtype(ATDtypeToTorchDtype(atensor.dtype))), 1);
+            TryAdjustGlobalOffsetWithSegments(
+                atensor,
+                op.copy_shape,
+                op.src_offset,
+                read_segment_max_gap_size_ / item_size,
+                read_max_segment_num_,
+                adjusted_sharded_key,
+                segments);
         }
-        ret.emplace_back(atensor_list[op.candidate_index].first, adjusted_sharded_key, atensor);
+        ret->emplace_back(
+            atensor_list[op.candidate_index].first, adjusted_sharded_key, std::move(atensor), std::move(segments));
     }
 
     {
-        std::lock_guard<std::mutex> lock(mutex_);
+        RWSpinGuard lock(shard_mapping_lock_, true);
 
-        shard_mapping_.emplace(sharded_key, ret);
-        auto it = shard_mapping_.find(sharded_key);
-        if (it != shard_mapping_.end()) {
-            return it->second;
-        }
-        throw std::runtime_error("Failed to get remote tensor shards for seq_id " + std::to_string(seq_id));
+        return shard_mapping_.emplace(sharded_key, std::move(ret)).first->second;
     }
 }
 
-const std::vector<ShardedATensorTuple>&
+RemoteTensorTable::RemoteShardsPtr
 RemoteTensorTable::GetRemoteTensorShards(const ShardedKey& sharded_key, int64_t seq_id, const ATensor& target_tensor) {
     return GetRemoteTensorShards(sharded_key, seq_id, target_tensor, true);
 }
 
+uint64_t RemoteTensorTable::SyncRemoteLayoutVersion() {
+    uint64_t layout_version = ctx_->transfer_service->GetRemoteLayoutVersion();
+    if (layout_version == remote_layout_version_) {
+        return layout_version;
+    }
+
+    std::lock_guard<std::mutex> lock(tensor_meta_mutex_);
+    if (layout_version == remote_layout_version_) {
+        return layout_version;
+    }
+    // The version is read before the caches are cleared, so a change meanwhile invalidates them again
+    std::atomic_store(&remote_shard_index_, std::shared_ptr<const RemoteShardIndex>(nullptr));
+    {
+        RWSpinGuard shard_mapping_lock(shard_mapping_lock_, true);
+        shard_mapping_.clear();
+    }
+    {
+        std::lock_guard<std::mutex> compact_lock(mutex_);
+        compact_tensor_infos_.clear();
+        cached_small_tensor_shards_.clear();
+    }
+    SPDLOG_INFO(
+        "Remote tensor layout changed from version {} to {}, invalidated the remote tensor caches",
+        remote_layout_version_.load(),
+        layout_version);
+    remote_layout_version_ = layout_version;
+    return layout_version;
+}
+
+std::shared_ptr<const RemoteTensorTable::RemoteShardIndex> RemoteTensorTable::GetRemoteShardIndex(int64_t seq_id) {
+    auto remote_shard_index = std::atomic_load(&remote_shard_index_);
+    if (remote_shard_index != nullptr) {
+        return remote_shard_index;
+    }
+
+    std::lock_guard<std::mutex> lock(tensor_meta_mutex_);
+    if (remote_shard_index_ == nullptr) {
+        auto tensor_meta_list = ctx_->transfer_service->GetAllTensorShards(
+            seq_id, [](const ShardedKey& /*candidate*/) -> bool { return true; });
+        std::unordered_map<std::string, std::vector<std::pair<ShardedKey, ATensor>>> shards_by_name;
+        for (auto& pair : tensor_meta_list) {
+            shards_by_name[pair.first.key].push_back(std::move(pair));
+        }
+        auto index = std::make_shared<RemoteShardIndex>();
+        for (auto& shards : shards_by_name) {
+            try {
+                index->emplace(shards.first, ShardIntervalIndex(std::move(shards.second)));
+            } catch (const std::exception& e) {
+                // The tensor fails to be read later as no shard is found, while the other tensors are still readable
+                SPDLOG_ERROR("Failed to index remote shards of tensor {}: {}", shards.first, e.what());
+            }
+        }
+        SPDLOG_INFO("Loaded {} remote tensor shards of {} tensors", tensor_meta_list.size(), index->size());
+        std::atomic_store(&remote_shard_index_, std::shared_ptr<const RemoteShardIndex>(std::move(index)));
+    }
+    return remote_shard_index_;
+}
+
 void RemoteTensorTable::PrefetchCachedTensors(int64_t seq_id) {
     auto start_time = std::chrono::high_resolution_clock::now();
     try {
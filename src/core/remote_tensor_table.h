@@ -1,6 +1,12 @@
 #pragma once
 
+#include <atomic>
+#include <cstdint>
 #include <exception>
+#include <functional>
+#include <future>
+#include <memory>
+#include <mutex>
 #include <unordered_map>
 
 #include "astate/sharded_key.h"
@@ -8,10 +14,12 @@
 #include "common/metric_utils.h"
 #include "common/numa_aware_allocator.h"
 #include "common/option.h"
+#include "common/slab_pool.h"
 #include "common/string_utils.h"
 #include "common/thread_pool.h"
 #include "core/atensor.h"
 #include "core/atensor_storage.h"
+#include "core/resharding_planner.h"
 #include "core/shardedkey.h"
 #include "core/tensor_sharded_ops.h"
 #include "core/tensor_table.h"
@@ -20,7 +28,7 @@
 namespace astate {
 
 // Remote implementation of TensorTable
-class RemoteTensorTable : public TensorTable {
+class RemoteTensorTable : public TensorTable, public std::enable_shared_from_this<RemoteTensorTable> {
  public:
     RemoteTensorTable(const std::string& name, std::shared_ptr<ATensorStorageCtx> ctx);
     ~RemoteTensorTable() override = default;
@@ -39,6 +47,15 @@ class RemoteTensorTable : public TensorTable {
 
     bool MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_dict) override;
 
+    TableFuture
+    MultiPutAsync(int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
+
+    TableFuture
+    MultiGetAsync(int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
+
+    std::shared_ptr<PreparedMultiGet>
+    PrepareMultiGet(const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
+
     // New interface methods - currently not implemented for RemoteTensorTable
     pybind11::object
     GetTensor(int64_t seq_id, const ShardedKey& tensor_key, const TorchTensorMeta& tensor_meta) override;
@@ -48,8 +65,56 @@ class RemoteTensorTable : public TensorTable {
 
     void Complete(int64_t seq_id) override;
 
+    TableFuture CompleteAsync(int64_t seq_id) override;
+
     std::vector<std::pair<std::string, TorchTensorMeta>> ScanTensorMeta(int64_t seq_id) override;
 
+    /**
+     * @brief [Sender] Store the tensors in batch, which is shared by MultiPut and MultiPutAsync.
+     * @param seq_id step id for current training.
+     * @param tensor_list the tensors to store, which have been converted from python objects.
+     * @return True if success.
+     */
+    bool MultiPutTensors(int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list);
+
+    /**
+     * @brief [Receiver] Read the tensors in batch, which is shared by MultiGet and MultiGetAsync.
+     * @param seq_id step id for current inferencing.
+     * @param tensor_list the target tensors to update, which have been converted from python objects.
+     * @return True if success.
+     */
+    bool MultiGetTensors(int64_t seq_id, std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list);
+
+    /**
+     * @brief Submit an async batch operation, i.e. of MultiPutAsync or MultiGetAsync, to the dispatcher. The operation
+     * starts once the CompleteAsync submitted before it has finished, as it belongs to a later seq.
+     * @param operation the batch operation to run.
+     * @return Future of the operation.
+     */
+    TableFuture SubmitBatchOperation(std::function<bool()> operation);
+
+    /**
+     * @brief Complete the sequence without the GIL, which is shared by Complete and CompleteAsync.
+     * @param seq_id step id to complete.
+     */
+    void CompleteSeq(int64_t seq_id);
+
+    /**
+     * @brief [Receiver] Build the read plan of multi_get, e.g. small/large tensor split and the copy routing.
+     * @param tensors the target tensors, which are moved into the plan.
+     * @param plan the plan to build.
+     */
+    void BuildMultiGetPlan(std::vector<std::pair<ShardedKey, torch::Tensor>>& tensors, MultiGetPlan& plan);
+
+    /**
+     * @brief [Receiver] Execute the read plan of multi_get. The parts of the plan which depend on the remote tensor
+     * metas are resolved in the first execution and reused later.
+     * @param seq_id step id for current inferencing.
+     * @param plan the plan to execute.
+     * @return True if success.
+     */
+    bool ExecuteMultiGetPlan(int64_t seq_id, MultiGetPlan& plan);
+
     /**
      * @brief [Receiver] Compact the small tensors, e.g. KB, into a tensor for better performance in further transfer.
      * @param seq_id step id for current inferencing.
@@ -59,6 +124,24 @@ class RemoteTensorTable : public TensorTable {
     bool MultiGetCompactTensors(
         int64_t seq_id, const std::unordered_map<ShardedKey, const torch::Tensor&, ShardedKeyHash>& small_tensors);
 
+    /**
+     * @brief [Receiver] Find the remote compact shards of the small tensors and the compact tensor infos to read.
+     */
+    void PlanCompactTensors(
+        int64_t seq_id,
+        const std::unordered_map<ShardedKey, const torch::Tensor&, ShardedKeyHash>& small_tensors,
+        std::vector<CompactTensorInfo>& compact_tensor_infos,
+        CompactTargetMap& target_tensor_map);
+
+    /**
+     * @brief [Receiver] Read the compact tensors and copy the data into the target small tensors.
+     */
+    bool ReadCompactTensors(
+        int64_t seq_id,
+        const std::vector<CompactTensorInfo>& compact_tensor_infos,
+        const CompactTargetMap& target_tensor_map,
+        size_t small_tensor_num);
+
     /**
      * @brief [Receiver] Prefetch the tensors which are marked as cached in receiver, and this method is called in
      * transfer service, e.g. when inference node has received all tensor ready messages from senders.
@@ -69,6 +152,49 @@ class RemoteTensorTable : public TensorTable {
     void PrefetchCachedTensors(int64_t seq_id) override;
 
  private:
+    // <raw sharded key of remote compact shard, [<sharded key of target tensor, target tensor>]>
+    using CompactTargetMap
+        = std::unordered_map<ShardedKey, std::vector<std::pair<ShardedKey, const torch::Tensor&>>, ShardedKeyHash>;
+    // Remote shards of a target tensor, which are shared with the readers so that they outlive the invalidation
+    using RemoteShardsPtr = std::shared_ptr<const std::vector<ShardedATensorTuple>>;
+
+    // [Receiver] Read plan of multi_get, which is built once and could be executed repeatedly for the same tensors.
+    struct MultiGetPlan {
+        // Target tensors, which are shuffled once to spread the reading load across the remote instances.
+        std::vector<std::pair<ShardedKey, torch::Tensor>> tensors;
+        // Small tensors which are read via the compact tensors, referring to the elements of tensors.
+        std::unordered_map<ShardedKey, const torch::Tensor&, ShardedKeyHash> small_tensors;
+        // Large tensors which are read by the copy tasks, as the indexes in tensors.
+        std::vector<size_t> large_tensors;
+        size_t total_tensor_size = 0;
+        size_t total_small_tensor_size = 0;
+        // Whether the plan is executed repeatedly, i.e. prepared by PrepareMultiGet.
+        bool reusable = false;
+
+        // Following are resolved in the first execution, since the remote tensor metas are needed, and resolved again
+        // once the remote layout version changes.
+        uint64_t remote_layout_version = 0;
+        // Remote shards of the large tensors, which are the entries of shard_mapping_.
+        std::vector<RemoteShardsPtr> large_tensor_shards;
+        bool compact_planned = false;
+        std::vector<CompactTensorInfo> compact_tensor_infos;
+        CompactTargetMap compact_targets;
+    };
+
+    class RemotePreparedMultiGet : public PreparedMultiGet {
+     public:
+        explicit RemotePreparedMultiGet(std::shared_ptr<RemoteTensorTable> remote_table)
+            : table(std::move(remote_table)) {}
+
+        bool Execute(int64_t seq_id) override;
+
+        [[nodiscard]] size_t Size() const override { return plan.tensors.size(); }
+
+        std::shared_ptr<RemoteTensorTable> table;
+        std::mutex mutex;
+        MultiGetPlan plan;
+    };
+
     bool is_debug_mode_{false};
     std::shared_ptr<ATensorStorageCtx> ctx_;
 
@@ -76,36 +202,58 @@ class RemoteTensorTable : public TensorTable {
     std::mutex mutex_;
     RWSpinLock rw_spin_lock_;
 
+    // Remote tensor shards grouped by tensor name, and indexed for the covering queries
+    using RemoteShardIndex = std::unordered_map<std::string, ShardIntervalIndex>;
     std::mutex tensor_meta_mutex_;
-    std::shared_ptr<std::vector<std::pair<ShardedKey, ATensor>>> tensor_meta_list_ = nullptr;
+    // Built once when the remote tensor metas are loaded, and read without lock afterwards until the remote layout
+    // changes
+    std::shared_ptr<const RemoteShardIndex> remote_shard_index_ = nullptr;
+    // Remote layout version of the transfer service which the remote tensor caches are derived from, i.e.
+    // remote_shard_index_, shard_mapping_ and compact_tensor_infos_
+    std::atomic<uint64_t> remote_layout_version_{0};
     GlobalParallelConfig training_parallel_config_;
     GlobalParallelConfig inference_parallel_config_;
+    // Plans the resharding of the put tensors by the training and inference parallel configs
+    ReshardingPlanner resharding_planner_;
 
     bool enable_write_gpu_async_copy_{false};
     bool enable_read_gpu_async_copy_{false};
-    // Copy thread pool for parallel tensor operations
-    std::unique_ptr<astate::CUDAStreamResourceThreadPool<torch::Tensor>> copy_thread_pool_;
-    long copy_bucket_mem_size_;
-    // Copy thread pool for large tensors
-    std::unique_ptr<astate::CUDAStreamResourceThreadPool<torch::Tensor>> copy_large_thread_pool_;
-    long copy_large_bucket_mem_size_;
+    // Pinned and registered staging buffers which the copy tasks read the remote tensors into, sized by the bytes read
+    using StagingPool = SlabPool<torch::Tensor>;
+    std::unique_ptr<StagingPool> staging_pool_;
+    // Copy thread pool for parallel tensor operations, declared after staging_pool_ so that it is destroyed first and
+    // the pending copy tasks never use a destroyed staging pool
+    std::unique_ptr<astate::CUDAStreamThreadPool> copy_thread_pool_;
 
     // tmp counter for copy task
     int32_t copy_task_counter_ = 0;
-    int32_t copy_large_task_counter_ = 0;
 
     long small_tensor_compact_cache_size_ = 0;
     long small_tensor_size_ = 0;
+    // Max number of segments to read the needed region of a non-contiguous remote shard, 0 to read the whole shard
+    int read_max_segment_num_ = 0;
+    // The read segments with gaps up to this size are merged
+    long read_segment_max_gap_size_ = 0;
     long small_tensor_compact_cache_offset_ = 0;
     torch::Tensor small_tensor_compact_cache_;
     std::vector<torch::Tensor> small_tensor_compact_cache_list_;
 
     std::unique_ptr<astate::CUDAStreamThreadPool> thread_pool_;
+    // Thread pool to run the async batch operations, i.e. MultiPutAsync and MultiGetAsync
+    std::unique_ptr<astate::ThreadPool> async_thread_pool_;
+    // Single thread running CompleteAsync in order, so that waiting for the peers never holds a dispatcher thread
+    std::unique_ptr<astate::ThreadPool> complete_thread_pool_;
+    // Orders the async operations by seq: a complete waits for the batch operations submitted before it, and the
+    // batch operations submitted after it wait for the complete
+    std::mutex async_order_mutex_;
+    std::vector<std::shared_future<bool>> pending_batch_futures_;
+    std::shared_future<bool> pending_complete_future_;
 
     // The cached remote tensor shards for current seq
     bool enable_local_cache_prefetch_ = false;
-    // TODO(root): The cached remote tensor shards should be updated while the remote tensors were reallocated.
-    std::unordered_map<ShardedKey, std::vector<ShardedATensorTuple>, ShardedKeyHash> shard_mapping_;
+    // Read-mostly, the entries are added once and cleared when the remote layout changes
+    std::unordered_map<ShardedKey, RemoteShardsPtr, ShardedKeyHash> shard_mapping_;
+    RWSpinLock shard_mapping_lock_;
     // Cached local tensors which could be updated before the reading request submitted from inference engine.
     // The bool variable is whether the tensor is cached for current seq.
     TensorExtDict<bool> local_cached_tensors_;
@@ -118,7 +266,10 @@ class RemoteTensorTable : public TensorTable {
 
     // Mapping from training tensor keys to their sharded inference tensor keys, e.g. column parallel(TP) tensors
     TensorShardingMap tensor_resharding_map_;
-    std::unordered_set<std::string> tensor_resharding_key_set_;
+    // Substrings of the keys to reshard -> dimension to split if the tensor is not partitioned by training
+    std::unordered_map<std::string, int> tensor_resharding_key_dims_;
+    // Reshard all the tensors by the plan, otherwise only the ones in tensor_resharding_key_dims_
+    bool enable_auto_resharding_{true};
     // Local tensor mapping for storing tensor copies: ShardedKey -> (ShardedKey, shared_ptr<Tensor>)
     std::unordered_map<ShardedKey, std::pair<ShardedKey, std::shared_ptr<torch::Tensor>>, ShardedKeyHash>
         local_tensor_mapping_;
@@ -190,7 +341,8 @@ class RemoteTensorTable : public TensorTable {
 
     /**
      * @brief [Sender] Reshard the source tensor, e.g. column parallel tensors, into several partial tensors which have
-     * exclusive cpu/gpu memory space.
+     * exclusive cpu/gpu memory space, each of which is read by a single inference rank as planned by
+     * resharding_planner_.
      * @param tensor_key Sharded key of source tensor.
      * @param source_tensor Source torch tensor.
      * @return Resharding info.
@@ -217,11 +369,24 @@ class RemoteTensorTable : public TensorTable {
      * @param try_prune_redundant_shard Indicate whether to prune the redundancy data in current tensor.
      @ @return The sharding info of remote tensors which will be used for reading.
      */
-    const std::vector<ShardedATensorTuple>& GetRemoteTensorShards(
+    RemoteShardsPtr GetRemoteTensorShards(
         const ShardedKey& sharded_key, int64_t seq_id, const ATensor& target_tensor, bool try_prune_redundant_shard);
 
-    const std::vector<ShardedATensorTuple>&
-    GetRemoteTensorShards(const ShardedKey& sharded_key, int64_t seq_id, const ATensor& target_tensor);
+    RemoteShardsPtr GetRemoteTensorShards(const ShardedKey& sharded_key, int64_t seq_id, const ATensor& target_tensor);
+
+    /**
+     * @brief [Receiver] Invalidate the caches derived from the remote tensor metas if the remote layout has changed
+     * since they were built, e.g. the remote tensors were reallocated, added or removed.
+     * @return The remote layout version which the caches are derived from.
+     */
+    uint64_t SyncRemoteLayoutVersion();
+
+    /**
+     * @brief [Receiver] Get the index of all the remote tensor shards, which is loaded on the first call.
+     * @param seq_id Step id.
+     * @return The remote tensor shards grouped by tensor name.
+     */
+    std::shared_ptr<const RemoteShardIndex> GetRemoteShardIndex(int64_t seq_id);
 
     /**
      * @brief [Receiver] Get the local cached tensors which were prefetch before reading. If local cached tensor was not
@@ -238,11 +403,16 @@ class RemoteTensorTable : public TensorTable {
      * @param seq_id Step id of current inferencing.
      * @param shardedKey Sharded key of target tensor.
      * @param target_tensor Target torch tensor.
-     * @param local_cache Temp local torch which is used to store the tensor data read.
+     * @param staging Lease of the staging buffer acquired to store the tensor data read, which must be held until the
+     * returned tensors are copied.
      * @return The tensors which will be copied into the target tensor.
      */
     std::shared_ptr<TensorDict> ReadTensors(
-        int64_t seq_id, const ShardedKey& sharded_key, const torch::Tensor& target_tensor, torch::Tensor& local_cache);
+        int64_t seq_id,
+        const ShardedKey& sharded_key,
+        const torch::Tensor& target_tensor,
+        StagingPool::Lease& staging,
+        const std::vector<ShardedATensorTuple>* planned_shards = nullptr);
 
     /**
      * @brief [Receiver] Submit the async task to read the data for the specified target tensor.
@@ -250,6 +420,29 @@ class RemoteTensorTable : public TensorTable {
     std::future<void>
     SubmitTransferTask(int64_t seq_id, const ShardedKey& sharded_key, const torch::Tensor& target_tensor);
 
+    /**
+     * @brief [Receiver] Submit the async task to read the data for the specified target tensor with the remote shards
+     * planned before.
+     * @param planned_shards Remote shards of the target tensor, or nullptr to look them up.
+     */
+    std::future<void> SubmitTransferTask(
+        int64_t seq_id,
+        const ShardedKey& sharded_key,
+        const torch::Tensor& target_tensor,
+        const std::vector<ShardedATensorTuple>* planned_shards);
+
+    /**
+     * @brief [Receiver] Create a pinned staging buffer for the staging pool, which is registered to the transport.
+     * @param size Size of the buffer in bytes.
+     */
+    torch::Tensor CreateStagingBuffer(size_t size);
+
+    // [Receiver] Deregister and free a staging buffer, which is freed by the staging pool to make room for a larger one.
+    void DestroyStagingBuffer(torch::Tensor& buffer);
+
+    // [Receiver] Log the occupancy and the wait time of the staging pool.
+    void LogStagingPoolStats(int64_t seq_id) const;
+
     // [Receiver] Record the tensor metas in first step.
     void UpdateReadingTensorsMeta(const int64_t seq_id, const ShardedKey& tensor_key, const torch::Tensor& atensor) {
         // only update the reading_tensors_meta_ when first step (-1)
@@ -307,10 +500,12 @@ class RemoteTensorTable : public TensorTable {
             = GetOptionValue<std::vector<std::string>>(options, TRANSFER_ENGINE_INFERENCE_PARALLEL_CONFIG);
         auto reshard_keys_str
             = GetOptionValue<std::vector<std::string>>(options, TRANSFER_ENGINE_TENSOR_RESHARDING_KEYS);
+        enable_auto_resharding_ = GetOptionValue<bool>(options, TRANSFER_ENGINE_ENABLE_AUTO_RESHARDING);
 
         try {
             training_parallel_config_ = ParseParallelConfig(train_config_str);
             inference_parallel_config_ = ParseParallelConfig(infer_config_str);
+            resharding_planner_ = ReshardingPlanner(training_parallel_config_, inference_parallel_config_);
             SPDLOG_INFO(
                 "Parsed parallel config[T={}, I={}]: train={}, infer={}",
                 ToString(train_config_str),
@@ -320,12 +515,23 @@ class RemoteTensorTable : public TensorTable {
 
             if (!reshard_keys_str.empty()) {
                 for (const auto& key : reshard_keys_str) {
-                    if (!key.empty()) {
-                        tensor_resharding_key_set_.insert(key);
+                    if (key.empty()) {
+                        continue;
+                    }
+                    // "key" splits the column dimension as before, while "key:dim" sets the dimension
+                    auto pos = key.rfind(':');
+                    if (pos == std::string::npos) {
+                        tensor_resharding_key_dims_[key] = 1;
+                    } else {
+                        tensor_resharding_key_dims_[key.substr(0, pos)] = std::stoi(key.substr(pos + 1));
                     }
                 }
                 SPDLOG_INFO("Parsed tensor sharding map keys: {}", ToString(reshard_keys_str));
             }
+            SPDLOG_INFO(
+                "Auto resharding: {}, needs resharding: {}",
+                enable_auto_resharding_,
+                resharding_planner_.NeedsResharding());
         } catch (std::exception& e) {
             SPDLOG_ERROR(
                 "Failed to parse parallel config: train={}, infer={}, error={}",
@@ -335,11 +541,15 @@ class RemoteTensorTable : public TensorTable {
         }
     }
 
-    bool IsTensorReshardingKey(const ShardedKey& tensor_key) {
-        return std::any_of(
-            tensor_resharding_key_set_.begin(),
-            tensor_resharding_key_set_.end(),
-            [&tensor_key](const auto& reshard_key) { return tensor_key.key.find(reshard_key) != std::string::npos; });
+    bool IsTensorReshardingKey(const ShardedKey& tensor_key) const { return GetTensorReshardingDim(tensor_key) >= 0; }
+
+    // @return The configured dimension to split the tensor, -1 if the key is not configured
+    int GetTensorReshardingDim(const ShardedKey& tensor_key) const {
+        auto it = std::find_if(
+            tensor_resharding_key_dims_.begin(), tensor_resharding_key_dims_.end(), [&tensor_key](const auto& pair) {
+                return tensor_key.key.find(pair.first) != std::string::npos;
+            });
+        return it == tensor_resharding_key_dims_.end() ? -1 : it->second;
     }
 };
 
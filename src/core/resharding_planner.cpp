@@ -0,0 +1,100 @@
+#include "core/resharding_planner.h"
+
+#include <algorithm>
+#include <utility>
+
+#include <spdlog/spdlog.h>
+
+namespace astate {
+
+ReshardingPlanner::ReshardingPlanner(
+    const GlobalParallelConfig& training_config, const GlobalParallelConfig& inference_config)
+    : training_config_(training_config),
+      inference_config_(inference_config) {
+}
+
+bool ReshardingPlanner::NeedsResharding() const {
+    int32_t infer_tp_size = inference_config_.tp_size;
+    if (infer_tp_size <= 1) {
+        return false;
+    }
+    // Every training shard lies in a single inference block if the inference blocks are the unions of the training
+    // ones, and the training tp size is unknown for the tensors replicated in training
+    int32_t train_tp_size = std::max(training_config_.tp_size, 1);
+    return train_tp_size % infer_tp_size != 0;
+}
+
+std::vector<ReshardingInfo> ReshardingPlanner::Plan(
+    const ShardedKey& tensor_key, const std::vector<int64_t>& local_shape, int replicated_dim) const {
+    std::vector<ReshardingInfo> ret;
+    if (!NeedsResharding()) {
+        return ret;
+    }
+    const auto ndim = static_cast<int>(local_shape.size());
+    if (tensor_key.global_shape.size() != local_shape.size() || tensor_key.global_offset.size() != local_shape.size()) {
+        return ret;
+    }
+
+    // Split the first dimension partitioned by the training tp which crosses an inference block boundary. The
+    // inference blocks only apply to the tp dimension, so the dimensions partitioned otherwise, e.g. by pp or ep, are
+    // skipped
+    const int64_t train_tp_size = std::max(training_config_.tp_size, 1);
+    const int64_t infer_tp_size = inference_config_.tp_size;
+    auto crosses_blocks = [&](int dim) {
+        int64_t global_size = tensor_key.global_shape[dim];
+        if (global_size <= 0 || global_size % infer_tp_size != 0) {
+            return false;
+        }
+        int64_t block_size = global_size / infer_tp_size;
+        int64_t begin = tensor_key.global_offset[dim];
+        int64_t end = begin + local_shape[dim];
+        return local_shape[dim] > 0 && begin / block_size != (end - 1) / block_size;
+    };
+    int dim = -1;
+    bool tp_partitioned = false;
+    for (int i = 0; i < ndim && dim < 0; ++i) {
+        if (local_shape[i] >= tensor_key.global_shape[i]) {
+            continue;
+        }
+        if (local_shape[i] * train_tp_size != tensor_key.global_shape[i]) {
+            SPDLOG_DEBUG(
+                "Skip resharding dim {} of tensor {}, local size {} of {} is not partitioned by training tp {}",
+                i,
+                tensor_key.key,
+                local_shape[i],
+                tensor_key.global_shape[i],
+                train_tp_size);
+            continue;
+        }
+        tp_partitioned = true;
+        if (crosses_blocks(i)) {
+            dim = i;
+        }
+    }
+    if (dim < 0 && !tp_partitioned && replicated_dim >= 0 && replicated_dim < ndim
+        && local_shape[replicated_dim] == tensor_key.global_shape[replicated_dim] && crosses_blocks(replicated_dim)) {
+        dim = replicated_dim;
+    }
+    if (dim < 0) {
+        return ret;
+    }
+
+    int64_t block_size = tensor_key.global_shape[dim] / infer_tp_size;
+    int64_t begin = tensor_key.global_offset[dim];
+    int64_t end = begin + local_shape[dim];
+    for (int64_t pos = begin; pos < end;) {
+        int64_t block_end = std::min(((pos / block_size) + 1) * block_size, end);
+        ShardedKey reshard_key = tensor_key;
+        reshard_key.global_offset[dim] = pos;
+        ReshardingInfo reshard_info;
+        SetShardedKey(reshard_info, reshard_key);
+        SetDimIndex(reshard_info, dim);
+        SetStart(reshard_info, static_cast<size_t>(pos - begin));
+        SetOffset(reshard_info, static_cast<size_t>(block_end - pos));
+        ret.push_back(std::move(reshard_info));
+        pos = block_end;
+    }
+    return ret;
+}
+
+} // namespace astate
@@ -0,0 +1,83 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <tuple>
+#include <vector>
+
+#include "core/atensor.h"
+#include "core/shardedkey.h"
+
+namespace astate {
+
+// <sharded_key, dim_index, start, offset>
+using ReshardingInfo = std::tuple<ShardedKey, int, size_t, size_t>;
+
+inline const ShardedKey& GetShardedKey(const ReshardingInfo& reshard_info) {
+    return std::get<0>(reshard_info);
+}
+inline void SetShardedKey(ReshardingInfo& reshard_info, const ShardedKey& value) {
+    std::get<0>(reshard_info) = value;
+}
+inline int GetDimIndex(const ReshardingInfo& reshard_info) {
+    return std::get<1>(reshard_info);
+}
+inline void SetDimIndex(ReshardingInfo& reshard_info, int value) {
+    std::get<1>(reshard_info) = value;
+}
+inline size_t GetStart(const ReshardingInfo& reshard_info) {
+    return std::get<2>(reshard_info);
+}
+inline void SetStart(ReshardingInfo& reshard_info, size_t value) {
+    std::get<2>(reshard_info) = value;
+}
+inline size_t GetOffset(const ReshardingInfo& reshard_info) {
+    return std::get<3>(reshard_info);
+}
+inline void SetOffset(ReshardingInfo& reshard_info, size_t value) {
+    std::get<3>(reshard_info) = value;
+}
+
+/**
+ * Plans how the training tensor shards are split into sub-blocks matching the inference layout.
+ *
+ * The inference side evenly splits a tensor along one dimension by its tp size. A training shard which spans several
+ * inference blocks of that dimension is split at the block boundaries, so that every sub-block is read by exactly
+ * one inference rank from its own contiguous memory, instead of the readers fetching the whole shard and narrowing
+ * it locally. The split dimension is the one partitioned by the training tp, i.e. whose local size is the global size
+ * divided by the training tp size, or the given one for the tensors replicated in training tp. The dimensions
+ * partitioned otherwise, e.g. the pp or expert ones, are never split.
+ */
+class ReshardingPlanner {
+ public:
+    ReshardingPlanner() = default;
+
+    /**
+     * @param training_config Parallel config of the training side which puts the tensors
+     * @param inference_config Parallel config of the inference side which reads the tensors
+     */
+    ReshardingPlanner(const GlobalParallelConfig& training_config, const GlobalParallelConfig& inference_config);
+
+    /**
+     * Plan the sub-blocks of a training shard
+     * @param tensor_key Sharded key of the training shard
+     * @param local_shape Shape of the training shard
+     * @param replicated_dim Dimension to split if the shard is not partitioned by the training tp, -1 for none
+     * @return Resharding infos of the sub-blocks in the order of the split dimension, or empty if the shard is read
+     * as a whole by the inference ranks
+     */
+    [[nodiscard]] std::vector<ReshardingInfo>
+    Plan(const ShardedKey& tensor_key, const std::vector<int64_t>& local_shape, int replicated_dim = -1) const;
+
+    /**
+     * @return Whether a training shard could span several inference blocks, i.e. the inference tp size is not a
+     * divisor of the training tp size
+     */
+    [[nodiscard]] bool NeedsResharding() const;
+
+ private:
+    GlobalParallelConfig training_config_;
+    GlobalParallelConfig inference_config_;
+};
+
+} // namespace astate
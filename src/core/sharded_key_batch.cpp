@@ -0,0 +1,113 @@
+#include "astate/sharded_key_batch.h"
+
+#include <algorithm>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <utility>
+
+namespace astate {
+
+ShardedKeyBatch::ShardedKeyBatch(const std::vector<std::string>& names, std::vector<int64_t> meta, int64_t max_ndim)
+    : max_ndim_(max_ndim) {
+    auto owned_meta = std::make_shared<const std::vector<int64_t>>(std::move(meta));
+    meta_ = owned_meta->data();
+    meta_owner_ = owned_meta;
+    Init(names, owned_meta->size());
+}
+
+ShardedKeyBatch::ShardedKeyBatch(
+    const std::vector<std::string>& names, const int64_t* meta, int64_t max_ndim, std::shared_ptr<const void> owner)
+    : meta_owner_(std::move(owner)),
+      meta_(meta),
+      max_ndim_(max_ndim) {
+    Init(names, meta == nullptr ? 0 : names.size() * MetaStride());
+}
+
+void ShardedKeyBatch::Init(const std::vector<std::string>& names, size_t meta_size) {
+    if (max_ndim_ < 0) {
+        throw std::invalid_argument("Invalid max ndim of sharded key batch: " + std::to_string(max_ndim_));
+    }
+    if (meta_size != names.size() * MetaStride() || (meta_ == nullptr && !names.empty())) {
+        throw std::invalid_argument(
+            "Meta size of sharded key batch mismatch, expect " + std::to_string(names.size() * MetaStride()) + ", got "
+            + std::to_string(meta_size));
+    }
+
+    size_t total_name_size = 0;
+    for (const auto& name : names) {
+        total_name_size += name.size();
+    }
+    name_table_.reserve(total_name_size);
+    name_offsets_.reserve(names.size() + 1);
+    name_offsets_.push_back(0);
+    for (size_t i = 0; i < names.size(); ++i) {
+        int64_t ndim = Ndim(i);
+        if (ndim < 0 || ndim > max_ndim_) {
+            throw std::invalid_argument(
+                "Invalid ndim " + std::to_string(ndim) + " of key " + names[i] + ", max ndim is "
+                + std::to_string(max_ndim_));
+        }
+        const int64_t* shape = GlobalShape(i);
+        const int64_t* offset = GlobalOffset(i);
+        for (int64_t dim = 0; dim < ndim; ++dim) {
+            if (shape[dim] < 0 || offset[dim] < 0 || offset[dim] > shape[dim]) {
+                throw std::invalid_argument(
+                    "Invalid global shape " + std::to_string(shape[dim]) + " and offset " + std::to_string(offset[dim])
+                    + " at dim " + std::to_string(dim) + " of key " + names[i]);
+            }
+        }
+        name_table_.append(names[i]);
+        name_offsets_.push_back(name_table_.size());
+    }
+}
+
+ShardedKeyBatch ShardedKeyBatch::FromShardedKeys(const std::vector<ShardedKey>& keys) {
+    int64_t max_ndim = 0;
+    std::vector<std::string> names;
+    names.reserve(keys.size());
+    for (const auto& key : keys) {
+        if (key.global_shape.size() != key.global_offset.size()) {
+            throw std::invalid_argument("Global shape and offset size mismatch of key " + key.key);
+        }
+        max_ndim = std::max(max_ndim, static_cast<int64_t>(key.global_shape.size()));
+        names.push_back(key.key);
+    }
+
+    size_t stride = (2 * max_ndim) + 1;
+    std::vector<int64_t> meta(keys.size() * stride, 0);
+    for (size_t i = 0; i < keys.size(); ++i) {
+        int64_t* row = meta.data() + (i * stride);
+        row[0] = static_cast<int64_t>(keys[i].global_shape.size());
+        std::copy(keys[i].global_shape.begin(), keys[i].global_shape.end(), row + 1);
+        std::copy(keys[i].global_offset.begin(), keys[i].global_offset.end(), row + 1 + max_ndim);
+    }
+    return {names, std::move(meta), max_ndim};
+}
+
+ShardedKey ShardedKeyBatch::GetShardedKey(size_t index) const {
+    auto ndim = Ndim(index);
+    const int64_t* shape = GlobalShape(index);
+    const int64_t* offset = GlobalOffset(index);
+    return {
+        std::string(Name(index)),
+        std::vector<int64_t>(shape, shape + ndim),
+        std::vector<int64_t>(offset, offset + ndim)};
+}
+
+std::vector<ShardedKey> ShardedKeyBatch::ToShardedKeys() const {
+    std::vector<ShardedKey> keys;
+    keys.reserve(Size());
+    for (size_t i = 0; i < Size(); ++i) {
+        keys.push_back(GetShardedKey(i));
+    }
+    return keys;
+}
+
+std::string ShardedKeyBatch::ToString() const {
+    std::ostringstream oss;
+    oss << "size=" << Size() << ", maxNdim=" << max_ndim_;
+    return oss.str();
+}
+
+} // namespace astate
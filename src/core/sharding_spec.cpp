@@ -0,0 +1,125 @@
+#include "astate/sharding_spec.h"
+
+#include <cctype>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+
+namespace astate {
+
+ShardingSpec::ShardingSpec(int32_t shard_rank, int32_t shard_size, int32_t default_dim, int64_t layer_offset)
+    : shard_rank_(shard_rank),
+      shard_size_(shard_size),
+      default_dim_(default_dim),
+      layer_offset_(layer_offset) {
+    if (shard_size <= 0 || shard_rank < 0 || shard_rank >= shard_size || layer_offset < 0) {
+        throw std::invalid_argument(
+            "Invalid sharding spec: shard_rank=" + std::to_string(shard_rank)
+            + ", shard_size=" + std::to_string(shard_size) + ", layer_offset=" + std::to_string(layer_offset));
+    }
+}
+
+ShardingSpec::ShardingSpec(const ShardingSpec& other) {
+    std::lock_guard<std::mutex> lock(other.mutex_);
+    shard_rank_ = other.shard_rank_;
+    shard_size_ = other.shard_size_;
+    default_dim_ = other.default_dim_;
+    layer_offset_ = other.layer_offset_;
+    shard_dims_ = other.shard_dims_;
+    key_cache_ = other.key_cache_;
+}
+
+ShardingSpec& ShardingSpec::operator=(const ShardingSpec& other) {
+    if (this == &other) {
+        return *this;
+    }
+    std::scoped_lock lock(mutex_, other.mutex_);
+    shard_rank_ = other.shard_rank_;
+    shard_size_ = other.shard_size_;
+    default_dim_ = other.default_dim_;
+    layer_offset_ = other.layer_offset_;
+    shard_dims_ = other.shard_dims_;
+    key_cache_ = other.key_cache_;
+    return *this;
+}
+
+void ShardingSpec::SetShardDim(const std::string& name, int32_t dim) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    shard_dims_[name] = dim;
+    key_cache_.erase(name);
+}
+
+int32_t ShardingSpec::GetShardDim(const std::string& name) const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    auto it = shard_dims_.find(name);
+    return it != shard_dims_.end() ? it->second : default_dim_;
+}
+
+std::string ShardingSpec::ApplyLayerOffset(const std::string& name, int64_t layer_offset) {
+    static const std::string kLayers = "layers.";
+    if (layer_offset == 0) {
+        return name;
+    }
+    for (size_t pos = name.find(kLayers); pos != std::string::npos; pos = name.find(kLayers, pos + 1)) {
+        // Only a whole name component, e.g. not `num_layers.`
+        if (pos != 0 && name[pos - 1] != '.') {
+            continue;
+        }
+        size_t begin = pos + kLayers.size();
+        size_t end = begin;
+        while (end < name.size() && std::isdigit(static_cast<unsigned char>(name[end])) != 0) {
+            ++end;
+        }
+        if (end == begin || (end < name.size() && name[end] != '.')) {
+            continue;
+        }
+        int64_t layer = std::stoll(name.substr(begin, end - begin)) + layer_offset;
+        return name.substr(0, begin) + std::to_string(layer) + name.substr(end);
+    }
+    return name;
+}
+
+ShardedKey ShardingSpec::GetShardedKey(const std::string& name, const std::vector<int64_t>& local_shape) {
+    std::lock_guard<std::mutex> lock(mutex_);
+
+    auto cache_it = key_cache_.find(name);
+    if (cache_it != key_cache_.end() && cache_it->second.first == local_shape) {
+        return cache_it->second.second;
+    }
+
+    auto dim_it = shard_dims_.find(name);
+    int32_t dim = dim_it != shard_dims_.end() ? dim_it->second : default_dim_;
+
+    ShardedKey sharded_key{
+        ApplyLayerOffset(name, layer_offset_), local_shape, std::vector<int64_t>(local_shape.size(), 0)};
+    // Scalars and replicated tensors keep the local shape as global shape.
+    if (dim != kReplicated && !local_shape.empty()) {
+        if (dim < 0 || dim >= static_cast<int32_t>(local_shape.size())) {
+            throw std::invalid_argument(
+                "Invalid shard dim " + std::to_string(dim) + " for tensor " + name + " with "
+                + std::to_string(local_shape.size()) + " dims");
+        }
+        sharded_key.global_shape[dim] = local_shape[dim] * shard_size_;
+        sharded_key.global_offset[dim] = local_shape[dim] * shard_rank_;
+    }
+
+    auto& entry = key_cache_[name];
+    entry = std::make_pair(local_shape, std::move(sharded_key));
+    return entry.second;
+}
+
+size_t ShardingSpec::CachedKeyCount() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return key_cache_.size();
+}
+
+std::string ShardingSpec::ToString() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    std::ostringstream oss;
+    oss << "shardRank=" << shard_rank_ << ", shardSize=" << shard_size_ << ", defaultDim=" << default_dim_
+        << ", layerOffset=" << layer_offset_ << ", shardDims=" << shard_dims_.size()
+        << ", cachedKeys=" << key_cache_.size();
+    return oss.str();
+}
+
+} // namespace astate
@@ -1,5 +1,11 @@
 #include "core/tensor_sharded_ops.h"
 
+#include <cstring>
+#include <limits>
+#include <utility>
+
+#include <ATen/Parallel.h>
+
 namespace astate {
 
 void CheckCandidatesCoverage(
@@ -122,8 +128,51 @@ ShardedTensorToFlatIntervals(const ShardedKey& sharded_key, const ATensor& tenso
     return intervals;
 } // sharded_tensor_to_flat_intervals
 
+std::vector<std::pair<int64_t, int64_t>> CopyRegionToSegments(
+    const ATensor& src_tensor,
+    const std::vector<int64_t>& src_offset,
+    const std::vector<int64_t>& copy_shape,
+    int64_t max_gap) {
+    const auto dims = static_cast<size_t>(src_tensor.dim_num);
+    if (dims == 0 || src_offset.size() != dims || copy_shape.size() != dims
+        || std::any_of(copy_shape.begin(), copy_shape.end(), [](int64_t size) { return size <= 0; })) {
+        return {};
+    }
+
+    // The flat intervals are the memory segments only if the source tensor is contiguous, the strides of the
+    // dimensions of size 1 do not matter
+    std::vector<int64_t> src_shape(src_tensor.size, src_tensor.size + dims);
+    int64_t stride = 1;
+    for (auto i = static_cast<int64_t>(dims) - 1; i >= 0; --i) {
+        if (src_shape[i] != 1 && src_tensor.stride[i] != stride) {
+            return {};
+        }
+        stride *= src_shape[i];
+    }
+
+    ATensor region(src_tensor);
+    for (size_t i = 0; i < dims; ++i) {
+        region.size[i] = copy_shape[i];
+    }
+    auto intervals = ShardedTensorToFlatIntervals(ShardedKey{"", src_shape, src_offset}, region);
+
+    // The intervals are in ascending order, merge the adjacent ones and the ones with small gaps
+    std::vector<std::pair<int64_t, int64_t>> segments;
+    const int64_t region_start = intervals.front().first;
+    for (const auto& interval : intervals) {
+        int64_t start = interval.first - region_start;
+        int64_t end = interval.second - region_start;
+        if (!segments.empty() && start - segments.back().second <= max_gap) {
+            segments.back().second = end;
+        } else {
+            segments.emplace_back(start, end);
+        }
+    }
+    return segments;
+} // copy_region_to_segments
+
 std::vector<CopyOperation> FindCoveringCandidatesUnsafe(
-    std::vector<std::pair<ShardedKey, ATensor>>& candidates,
+    const std::vector<std::pair<ShardedKey, ATensor>>& candidates,
     const ShardedKey& target_shard,
     const ATensor& target_tensor) {
     std::vector<CopyOperation> copy_operations;
@@ -282,11 +331,408 @@ void ValidateCandidateFilterParams(
 }
 
 std::vector<CopyOperation> FindCoveringCandidates(
-    std::vector<std::pair<ShardedKey, ATensor>>& candidates,
+    const std::vector<std::pair<ShardedKey, ATensor>>& candidates,
     const ShardedKey& target_shard,
     const ATensor& target_tensor) {
     ValidateCandidateFilterParams(candidates, target_shard, target_tensor);
     return FindCoveringCandidatesUnsafe(candidates, target_shard, target_tensor);
 } // find_covering_candidates
 
+ShardIntervalIndex::ShardIntervalIndex(std::vector<std::pair<ShardedKey, ATensor>> candidates)
+    : candidates_(std::move(candidates)) {
+    if (candidates_.empty()) {
+        return;
+    }
+    global_shape_ = candidates_.front().first.global_shape;
+    dtype_ = candidates_.front().second.dtype;
+    dims_ = global_shape_.size();
+    for (const auto& candidate : candidates_) {
+        if (candidate.first.global_shape != global_shape_ || candidate.first.global_offset.size() != dims_
+            || static_cast<size_t>(candidate.second.dim_num) != dims_) {
+            SPDLOG_ERROR(
+                "All candidates must have same globalShape for shardedKey: {}, candidate: {}",
+                candidates_.front().first.key,
+                candidate.first.ToString());
+            throw std::runtime_error("All candidates must have same globalShape");
+        }
+        if (candidate.second.dtype != dtype_) {
+            SPDLOG_ERROR(
+                "All candidates must have same data type for shardedKey: {}, candidate: {}",
+                candidates_.front().first.key,
+                candidate.first.ToString());
+            throw std::runtime_error("All candidates must have same data type");
+        }
+    }
+
+    // Sweep the dimension partitioned the finest, so the candidates overlapping the target there are few
+    size_t max_distinct = 0;
+    std::vector<int64_t> offsets(candidates_.size());
+    for (size_t dim = 0; dim < dims_; ++dim) {
+        for (size_t i = 0; i < candidates_.size(); ++i) {
+            offsets[i] = candidates_[i].first.global_offset[dim];
+        }
+        std::sort(offsets.begin(), offsets.end());
+        auto distinct = static_cast<size_t>(std::unique(offsets.begin(), offsets.end()) - offsets.begin());
+        if (distinct > max_distinct) {
+            max_distinct = distinct;
+            sweep_dim_ = dim;
+        }
+    }
+
+    order_.resize(candidates_.size());
+    for (size_t i = 0; i < order_.size(); ++i) {
+        order_[i] = i;
+    }
+    if (dims_ > 0) {
+        std::stable_sort(order_.begin(), order_.end(), [this](size_t lhs, size_t rhs) {
+            return candidates_[lhs].first.global_offset[sweep_dim_] < candidates_[rhs].first.global_offset[sweep_dim_];
+        });
+    }
+
+    box_starts_.resize(candidates_.size() * dims_);
+    box_ends_.resize(candidates_.size() * dims_);
+    for (size_t pos = 0; pos < order_.size(); ++pos) {
+        const auto& candidate = candidates_[order_[pos]];
+        for (size_t dim = 0; dim < dims_; ++dim) {
+            box_starts_[pos * dims_ + dim] = candidate.first.global_offset[dim];
+            box_ends_[pos * dims_ + dim] = candidate.first.global_offset[dim] + candidate.second.size[dim];
+        }
+    }
+    if (dims_ > 0) {
+        max_ends_.resize(order_.size());
+        BuildMaxEnds(0, order_.size());
+    }
+}
+
+int64_t ShardIntervalIndex::BuildMaxEnds(size_t lo, size_t hi) {
+    if (lo >= hi) {
+        return std::numeric_limits<int64_t>::min();
+    }
+    size_t mid = lo + ((hi - lo) / 2);
+    max_ends_[mid] = std::max({box_ends_[mid * dims_ + sweep_dim_], BuildMaxEnds(lo, mid), BuildMaxEnds(mid + 1, hi)});
+    return max_ends_[mid];
+}
+
+void ShardIntervalIndex::QueryOverlaps(
+    size_t lo, size_t hi, int64_t start, int64_t end, std::vector<size_t>& positions) const {
+    // The left subtrees start earlier and the right ones later, so a subtree is skipped once it ends before the
+    // target starts, and the right subtree once the root starts after the target ends
+    while (lo < hi) {
+        size_t mid = lo + ((hi - lo) / 2);
+        if (max_ends_[mid] <= start) {
+            return;
+        }
+        QueryOverlaps(lo, mid, start, end, positions);
+        if (box_starts_[mid * dims_ + sweep_dim_] >= end) {
+            return;
+        }
+        if (box_ends_[mid * dims_ + sweep_dim_] > start) {
+            positions.push_back(mid);
+        }
+        lo = mid + 1;
+    }
+}
+
+std::vector<CopyOperation>
+ShardIntervalIndex::FindCoveringCandidates(const ShardedKey& target_shard, const ATensor& target_tensor) const {
+    if (candidates_.empty()) {
+        SPDLOG_ERROR(
+            "candidates cannot be empty for shardedKey: {}, targetTensor: {}",
+            target_shard.ToString(),
+            target_tensor.GetTensorMetaInfo());
+        throw std::runtime_error("candidates cannot be empty");
+    }
+    if (target_shard.global_shape.size() != static_cast<size_t>(target_tensor.dim_num)
+        || target_shard.global_offset.size() != target_shard.global_shape.size()) {
+        SPDLOG_ERROR(
+            "targetShard dimensions must match targetTensor dimensions for shardedKey: {}, targetTensor: {}",
+            target_shard.ToString(),
+            target_tensor.GetTensorMetaInfo());
+        throw std::runtime_error("targetShard dimensions must match targetTensor dimensions");
+    }
+    if (target_shard.global_shape != global_shape_) {
+        SPDLOG_ERROR(
+            "All candidates must have same globalShape as target for shardedKey: {}, candidate: {}",
+            target_shard.ToString(),
+            candidates_.front().first.ToString());
+        throw std::runtime_error("All candidates must have same globalShape as target");
+    }
+    if (target_tensor.dtype != dtype_) {
+        SPDLOG_ERROR(
+            "All candidates must have same data type as target for shardedKey: {} expected_dtype: {} "
+            "candidate_dtype: {}",
+            target_shard.key,
+            static_cast<int>(target_tensor.dtype),
+            static_cast<int>(dtype_));
+        throw std::runtime_error("All candidates must have same data type as target");
+    }
+    int64_t target_volume = 1;
+    for (size_t i = 0; i < dims_; ++i) {
+        int64_t max_shape = target_shard.global_shape[i] - target_shard.global_offset[i];
+        if (target_tensor.size[i] > max_shape) {
+            throw std::runtime_error(
+                "Target tensor shape must be less than or equal to maxShape at dimension " + std::to_string(i)
+                + ": tensor=" + std::to_string(target_tensor.size[i]) + ", maxShape=" + std::to_string(max_shape));
+        }
+        target_volume *= target_tensor.size[i];
+    }
+
+    std::vector<size_t> positions;
+    if (dims_ == 0) {
+        // Scalars are covered by any candidate
+        positions.resize(order_.size());
+        for (size_t pos = 0; pos < positions.size(); ++pos) {
+            positions[pos] = pos;
+        }
+    } else {
+        int64_t sweep_start = target_shard.global_offset[sweep_dim_];
+        QueryOverlaps(0, order_.size(), sweep_start, sweep_start + target_tensor.size[sweep_dim_], positions);
+    }
+
+    // Intersect the candidates overlapping at the sweep dimension with the target at the other dimensions
+    std::vector<size_t> matched;
+    int64_t covered_volume = 0;
+    for (size_t pos : positions) {
+        int64_t volume = 1;
+        for (size_t i = 0; i < dims_ && volume > 0; ++i) {
+            int64_t target_start = target_shard.global_offset[i];
+            int64_t start = std::max(box_starts_[pos * dims_ + i], target_start);
+            int64_t end = std::min(box_ends_[pos * dims_ + i], target_start + target_tensor.size[i]);
+            volume = start < end ? volume * (end - start) : 0;
+        }
+        if (volume > 0) {
+            matched.push_back(pos);
+            covered_volume += volume;
+        }
+    }
+
+    // The positions are in the sweep order, so a matched candidate can only overlap the ones after it starting before
+    // it ends at the sweep dimension
+    auto has_overlap = [&]() {
+        for (size_t m = 0; m < matched.size(); ++m) {
+            size_t lhs = matched[m];
+            for (size_t n = m + 1; n < matched.size(); ++n) {
+                size_t rhs = matched[n];
+                if (box_starts_[rhs * dims_ + sweep_dim_] >= box_ends_[lhs * dims_ + sweep_dim_]) {
+                    break;
+                }
+                bool overlap = true;
+                for (size_t i = 0; i < dims_ && overlap; ++i) {
+                    overlap = box_starts_[lhs * dims_ + i] < box_ends_[rhs * dims_ + i]
+                        && box_starts_[rhs * dims_ + i] < box_ends_[lhs * dims_ + i];
+                }
+                if (overlap) {
+                    return true;
+                }
+            }
+        }
+        return false;
+    };
+    if (covered_volume != target_volume || (dims_ > 0 && has_overlap())) {
+        // Not covered or the candidates overlap, check the flat intervals of the matched candidates, which throws
+        // with the missing interval
+        std::vector<std::pair<ShardedKey, ATensor>> matched_candidates;
+        matched_candidates.reserve(matched.size());
+        for (size_t pos : matched) {
+            matched_candidates.push_back(candidates_[order_[pos]]);
+        }
+        CheckCandidatesCoverage(matched_candidates, target_shard, target_tensor);
+    }
+
+    std::sort(matched.begin(), matched.end(), [this](size_t lhs, size_t rhs) { return order_[lhs] < order_[rhs]; });
+    std::vector<CopyOperation> copy_operations;
+    copy_operations.reserve(matched.size());
+    for (size_t pos : matched) {
+        CopyOperation copy_op;
+        copy_op.candidate_index = order_[pos];
+        copy_op.src_offset.resize(dims_);
+        copy_op.target_offset.resize(dims_);
+        copy_op.copy_shape.resize(dims_);
+        for (size_t i = 0; i < dims_; ++i) {
+            int64_t target_start = target_shard.global_offset[i];
+            int64_t start = std::max(box_starts_[pos * dims_ + i], target_start);
+            int64_t end = std::min(box_ends_[pos * dims_ + i], target_start + target_tensor.size[i]);
+            copy_op.src_offset[i] = start - box_starts_[pos * dims_ + i];
+            copy_op.target_offset[i] = start - target_start;
+            copy_op.copy_shape[i] = end - start;
+        }
+        copy_operations.push_back(std::move(copy_op));
+    }
+    return copy_operations;
+} // shard_interval_index_find_covering_candidates
+
+namespace {
+
+// Bytes copied by an intra-op task at least, the smaller copies run on the calling thread
+constexpr int64_t kParallelCopyGrainBytes = 1 << 20;
+
+// Innermost contiguous rows of a copy region
+struct CopyRowBlock {
+    char* target;
+    const char* src;
+    // Shape and byte strides of the dimensions outside the rows
+    std::vector<int64_t> outer_shape;
+    std::vector<int64_t> target_strides;
+    std::vector<int64_t> src_strides;
+    size_t row_bytes;
+    int64_t rows;
+};
+
+bool IsHostStridedTensor(const torch::Tensor& tensor, torch::ScalarType dtype) {
+    return tensor.device().is_cpu() && tensor.layout() == torch::kStrided && tensor.scalar_type() == dtype
+        && !tensor.is_conj() && !tensor.is_neg();
+}
+
+void CopyRows(const CopyRowBlock& block, int64_t begin, int64_t end) {
+    const auto outer_dims = static_cast<int64_t>(block.outer_shape.size());
+    for (int64_t row = begin; row < end; ++row) {
+        char* target = block.target;
+        const char* src = block.src;
+        int64_t index = row;
+        for (int64_t i = outer_dims - 1; i >= 0; --i) {
+            int64_t coord = index % block.outer_shape[i];
+            index /= block.outer_shape[i];
+            target += coord * block.target_strides[i];
+            src += coord * block.src_strides[i];
+        }
+        std::memcpy(target, src, block.row_bytes);
+    }
+}
+
+} // namespace
+
+bool CopyRegionsToTensorUnsafe(
+    const std::vector<const torch::Tensor*>& sources,
+    const std::vector<CopyOperation>& copy_operations,
+    const torch::Tensor& target_tensor) {
+    const auto dtype = target_tensor.scalar_type();
+    if (!IsHostStridedTensor(target_tensor, dtype)) {
+        return false;
+    }
+    const auto dims = static_cast<size_t>(target_tensor.dim());
+    const auto item_size = static_cast<int64_t>(target_tensor.element_size());
+
+    std::vector<CopyRowBlock> blocks;
+    blocks.reserve(copy_operations.size());
+    for (const auto& op : copy_operations) {
+        if (op.candidate_index >= sources.size() || sources[op.candidate_index] == nullptr) {
+            return false;
+        }
+        const auto& src_tensor = *sources[op.candidate_index];
+        if (!IsHostStridedTensor(src_tensor, dtype) || static_cast<size_t>(src_tensor.dim()) != dims
+            || op.copy_shape.size() != dims || op.src_offset.size() != dims || op.target_offset.size() != dims) {
+            return false;
+        }
+
+        CopyRowBlock block{};
+        block.target = static_cast<char*>(target_tensor.data_ptr());
+        block.src = static_cast<const char*>(src_tensor.data_ptr());
+        int64_t numel = 1;
+        for (size_t i = 0; i < dims; ++i) {
+            block.target += target_tensor.stride(static_cast<int64_t>(i)) * op.target_offset[i] * item_size;
+            block.src += src_tensor.stride(static_cast<int64_t>(i)) * op.src_offset[i] * item_size;
+            numel *= op.copy_shape[i];
+        }
+        if (numel <= 0) {
+            continue;
+        }
+
+        // Merge the innermost dimensions into the rows while both sides stay contiguous
+        int64_t row_numel = 1;
+        size_t outer_dims = dims;
+        while (outer_dims > 0) {
+            auto dim = static_cast<int64_t>(outer_dims - 1);
+            if (op.copy_shape[dim] != 1
+                && (target_tensor.stride(dim) != row_numel || src_tensor.stride(dim) != row_numel)) {
+                break;
+            }
+            row_numel *= op.copy_shape[dim];
+            --outer_dims;
+        }
+        if (dims > 0 && op.copy_shape[dims - 1] != 1
+            && (target_tensor.stride(static_cast<int64_t>(dims) - 1) != 1
+                || src_tensor.stride(static_cast<int64_t>(dims) - 1) != 1)) {
+            // The innermost dimension is not contiguous, memcpy of single elements is no faster than ATen
+            return false;
+        }
+
+        block.outer_shape.assign(op.copy_shape.begin(), op.copy_shape.begin() + static_cast<int64_t>(outer_dims));
+        for (size_t i = 0; i < outer_dims; ++i) {
+            block.target_strides.push_back(target_tensor.stride(static_cast<int64_t>(i)) * item_size);
+            block.src_strides.push_back(src_tensor.stride(static_cast<int64_t>(i)) * item_size);
+        }
+        block.row_bytes = static_cast<size_t>(row_numel * item_size);
+        block.rows = numel / row_numel;
+        blocks.push_back(std::move(block));
+    }
+    if (blocks.empty()) {
+        return true;
+    }
+
+    // Split the rows of all the blocks among the intra-op threads, each task copies at least the grain bytes
+    std::vector<int64_t> row_ends(blocks.size());
+    int64_t total_rows = 0;
+    int64_t total_bytes = 0;
+    for (size_t i = 0; i < blocks.size(); ++i) {
+        total_rows += blocks[i].rows;
+        total_bytes += blocks[i].rows * static_cast<int64_t>(blocks[i].row_bytes);
+        row_ends[i] = total_rows;
+    }
+    int64_t grain_rows = std::max<int64_t>(kParallelCopyGrainBytes / std::max<int64_t>(total_bytes / total_rows, 1), 1);
+    at::parallel_for(0, total_rows, grain_rows, [&](int64_t begin, int64_t end) {
+        auto block_index
+            = static_cast<size_t>(std::upper_bound(row_ends.begin(), row_ends.end(), begin) - row_ends.begin());
+        for (int64_t row = begin; row < end; ++block_index) {
+            int64_t block_begin = row_ends[block_index] - blocks[block_index].rows;
+            int64_t block_end = std::min(row_ends[block_index], end);
+            CopyRows(blocks[block_index], row - block_begin, block_end - block_begin);
+            row = block_end;
+        }
+    });
+    return true;
+} // copy_regions_to_tensor_unsafe
+
+bool CopyShardsToTensorUnsafe(
+    const std::vector<std::pair<ShardedKey, const torch::Tensor*>>& sources,
+    const ShardedKey& target_sharded_key,
+    const torch::Tensor& target_tensor) {
+    const size_t dims = target_sharded_key.global_shape.size();
+    std::vector<const torch::Tensor*> src_tensors;
+    std::vector<CopyOperation> copy_operations;
+    src_tensors.reserve(sources.size());
+    copy_operations.reserve(sources.size());
+    for (const auto& source : sources) {
+        const auto& src_sharded_key = source.first;
+        const auto& src_tensor = *source.second;
+        if (src_sharded_key.global_offset.size() != dims || static_cast<size_t>(src_tensor.dim()) != dims
+            || static_cast<size_t>(target_tensor.dim()) != dims) {
+            return false;
+        }
+
+        CopyOperation copy_op;
+        copy_op.candidate_index = src_tensors.size();
+        copy_op.src_offset.resize(dims);
+        copy_op.target_offset.resize(dims);
+        copy_op.copy_shape.resize(dims);
+        bool has_intersection = true;
+        for (size_t i = 0; i < dims && has_intersection; ++i) {
+            const int64_t src_start = src_sharded_key.global_offset[i];
+            const int64_t target_start = target_sharded_key.global_offset[i];
+            const int64_t start = std::max(src_start, target_start);
+            const int64_t end = std::min(
+                src_start + src_tensor.size(static_cast<int64_t>(i)),
+                target_start + target_tensor.size(static_cast<int64_t>(i)));
+            has_intersection = start < end;
+            copy_op.src_offset[i] = start - src_start;
+            copy_op.target_offset[i] = start - target_start;
+            copy_op.copy_shape[i] = end - start;
+        }
+        if (has_intersection) {
+            src_tensors.push_back(&src_tensor);
+            copy_operations.push_back(std::move(copy_op));
+        }
+    }
+    return CopyRegionsToTensorUnsafe(src_tensors, copy_operations, target_tensor);
+} // copy_shards_to_tensor_unsafe
+
 } // namespace astate
@@ -73,6 +73,8 @@ inline void ValidateShardedCopyParams(
  * @param targetShardedKey Target ShardedKey (pre-validated)
  * @param targetTensor Target tensor (pre-validated, modified in-place)
  * @param non_blocking_copy Whether to perform non-blocking copy (default: false)
+ * @param sync_stream Whether to synchronize the stream after a non-blocking copy (default: true), the caller must
+ * synchronize the stream before using the target tensor otherwise
  * @note PERFORMANCE CRITICAL: Assumes all inputs have been validated
  * @note Call validate_sharded_copy_params() once before high-frequency usage
  */
@@ -82,7 +84,8 @@ inline bool CopyTensorWithShardedKeysUnsafe(
     const ShardedKey& target_sharded_key,
     const torch::Tensor& target_tensor,
     const c10::cuda::CUDAStream* stream = nullptr,
-    const bool non_blocking_copy = false) {
+    const bool non_blocking_copy = false,
+    const bool sync_stream = true) {
     const size_t dims = src_sharded_key.global_shape.size();
 
     // Pre-allocate vectors with known size for performance
@@ -136,7 +139,9 @@ inline bool CopyTensorWithShardedKeysUnsafe(
             // Synchronous copy on specified stream
             c10::cuda::CUDAStreamGuard guard(*stream);
             target_view.copy_(src_view, /*non_blocking=*/true);
-            stream->synchronize();
+            if (sync_stream) {
+                stream->synchronize();
+            }
         } else {
             target_view.copy_(src_view);
         }
@@ -195,6 +200,23 @@ inline int64_t CoordsToFlatIndex(const std::vector<int64_t>& coords, const std::
 std::vector<std::pair<int64_t, int64_t>>
 ShardedTensorToFlatIntervals(const ShardedKey& sharded_key, const ATensor& tensor);
 
+/**
+ * @brief Convert a copy region of a contiguous source tensor to the segments of its memory to read
+ * @param srcTensor Source tensor
+ * @param srcOffset Offset of the region in the source tensor
+ * @param copyShape Shape of the region
+ * @param maxGap Max number of elements between two segments to merge them into one
+ * @return Vector of (start, end) element intervals relative to the first element of the region, or empty if the
+ * source tensor is not contiguous or the region is empty
+ * @note The rows of the region are the flattened intervals in the source tensor, merging the gaps costs reading the
+ * elements in them but saves a read
+ */
+std::vector<std::pair<int64_t, int64_t>> CopyRegionToSegments(
+    const ATensor& src_tensor,
+    const std::vector<int64_t>& src_offset,
+    const std::vector<int64_t>& copy_shape,
+    int64_t max_gap);
+
 /**
  * @brief Check if candidates can fully cover the target tensor using interval merging
  * @param candidates Vector of candidate shard pairs
@@ -237,7 +259,7 @@ void ValidateCandidateFilterParams(
  *       are violated, the algorithm will need optimization
  */
 std::vector<CopyOperation> FindCoveringCandidatesUnsafe(
-    std::vector<std::pair<ShardedKey, ATensor>>& candidates,
+    const std::vector<std::pair<ShardedKey, ATensor>>& candidates,
     const ShardedKey& target_shard,
     const ATensor& target_tensor);
 
@@ -251,8 +273,98 @@ std::vector<CopyOperation> FindCoveringCandidatesUnsafe(
  * @note For high-frequency usage, prefer validate_candidate_filter_params() + find_covering_candidates_unsafe()
  */
 std::vector<CopyOperation> FindCoveringCandidates(
-    std::vector<std::pair<ShardedKey, ATensor>>& candidates,
+    const std::vector<std::pair<ShardedKey, ATensor>>& candidates,
     const ShardedKey& target_shard,
     const ATensor& target_tensor);
 
+/**
+ * @brief Index of the candidate shards of a tensor, to find the covering candidates of many targets
+ * @note The candidates are sorted by their start at the dimension with the most distinct offsets, i.e. the one
+ *       partitioned the finest, and an implicit interval tree over the sorted order keeps the max end of each subtree.
+ *       A query visits O(log n + k) nodes, where k is the number of candidates overlapping the target at that
+ *       dimension, instead of testing all the candidates. The boxes of the candidates are kept in flat arrays, so
+ *       nothing is allocated until a candidate matches.
+ */
+class ShardIntervalIndex {
+ public:
+    ShardIntervalIndex() = default;
+
+    /**
+     * @brief Build the index
+     * @param candidates Candidate shards, which must have the same global shape and data type
+     * @throws std::runtime_error if the candidates are inconsistent
+     */
+    explicit ShardIntervalIndex(std::vector<std::pair<ShardedKey, ATensor>> candidates);
+
+    /**
+     * @brief Find the copy operations to fill the target, and verify the target is covered in the same pass
+     * @param targetShard Target shard key
+     * @param targetTensor Target tensor
+     * @return std::vector<CopyOperation> Copy operations in the order of the candidates, same as
+     *         FindCoveringCandidates
+     * @throws std::runtime_error if the target mismatches the candidates or cannot be covered
+     * @note The target is covered if the intersections are disjoint and sum up to its volume, which holds for the
+     *       non-overlapping training shards. Otherwise the flat intervals of the matched candidates are checked.
+     */
+    [[nodiscard]] std::vector<CopyOperation>
+    FindCoveringCandidates(const ShardedKey& target_shard, const ATensor& target_tensor) const;
+
+    /**
+     * @return Indexed candidates, referred by CopyOperation::candidate_index
+     */
+    [[nodiscard]] const std::vector<std::pair<ShardedKey, ATensor>>& GetCandidates() const { return candidates_; }
+
+    [[nodiscard]] size_t Size() const { return candidates_.size(); }
+
+ private:
+    // Compute the max sweep end of the subtree of the sorted range [lo, hi), rooted at its middle
+    int64_t BuildMaxEnds(size_t lo, size_t hi);
+
+    // Collect the sorted positions of the candidates overlapping [start, end) at the sweep dimension
+    void QueryOverlaps(size_t lo, size_t hi, int64_t start, int64_t end, std::vector<size_t>& positions) const;
+
+    std::vector<std::pair<ShardedKey, ATensor>> candidates_;
+    std::vector<int64_t> global_shape_;
+    ATDtype dtype_{ATDtype::Undefined};
+    size_t dims_{0};
+    size_t sweep_dim_{0};
+    // Sorted position -> candidate index
+    std::vector<size_t> order_;
+    // Boxes of the candidates in the sorted order, dims_ values per candidate
+    std::vector<int64_t> box_starts_;
+    std::vector<int64_t> box_ends_;
+    // Max sweep end of the subtree rooted at each sorted position
+    std::vector<int64_t> max_ends_;
+};
+
+/**
+ * @brief Copy the regions of the copy operations from the source tensors into the target tensor in one call by
+ *        memcpy of their innermost contiguous rows, split among the intra-op threads (CPU tensors only)
+ * @param sources Source tensors, referred by CopyOperation::candidate_index
+ * @param copyOperations Regions to copy
+ * @param targetTensor Target tensor (modified in-place)
+ * @return true if copied, false without copying anything if a tensor is not a strided CPU tensor of the target dtype,
+ *         or the innermost dimension of a region is not contiguous, so the caller copies by ATen instead
+ * @note PERFORMANCE CRITICAL: Assumes the copy operations are within the tensors, and saves the ATen dispatch and
+ *       view allocation per region, which dominate the copies of many small shards
+ */
+bool CopyRegionsToTensorUnsafe(
+    const std::vector<const torch::Tensor*>& sources,
+    const std::vector<CopyOperation>& copy_operations,
+    const torch::Tensor& target_tensor);
+
+/**
+ * @brief Copy the overlapping regions of the source shards into the target shard in one call (CPU tensors only)
+ * @param sources Source shards with their ShardedKeys
+ * @param targetShardedKey Target ShardedKey
+ * @param targetTensor Target tensor (modified in-place)
+ * @return true if copied, false without copying anything if CopyRegionsToTensorUnsafe cannot copy them
+ * @note Same as CopyTensorWithShardedKeysUnsafe for every source, e.g. to assemble a tensor from the read shards or to
+ *       copy a tensor into its local copy
+ */
+bool CopyShardsToTensorUnsafe(
+    const std::vector<std::pair<ShardedKey, const torch::Tensor*>>& sources,
+    const ShardedKey& target_sharded_key,
+    const torch::Tensor& target_tensor);
+
 } // namespace astate
@@ -1,8 +1,15 @@
 #pragma once
 
+#include <array>
 #include <cstddef>
 #include <cstdint>
+#include <functional>
+#include <map>
 #include <memory>
+#include <mutex>
+#include <optional>
+#include <shared_mutex>
+#include <string>
 #include <unordered_map>
 #include <utility>
 
@@ -10,7 +17,10 @@
 #include <torch/torch.h>
 
 #include "astate/tensor_table.h"
+#include "common/lock_utils.h"
+#include "common/thread_pool.h"
 #include "core/atensor.h"
+#include "core/resharding_planner.h"
 #include "core/shardedkey.h"
 
 namespace astate {
@@ -24,25 +34,49 @@ using TensorKeyList = std::vector<ShardedKey>;
 
 using ATensorDict = std::unordered_map<ShardedKey, ATensor, ShardedKeyHash>;
 using ShardedATensor = std::pair<ShardedKey, std::shared_ptr<ATensor>>;
-using ShardedATensorTuple = std::tuple<ShardedKey, ShardedKey, ATensor>;
+// <raw sharded key, adjusted sharded key, remote tensor, element segments of the remote tensor to read, empty to read the
+// whole tensor>
+using ShardedATensorTuple = std::tuple<ShardedKey, ShardedKey, ATensor, std::vector<std::pair<int64_t, int64_t>>>;
 
-// <sharded_key, dim_index, start, offset>
-using ReshardingInfo = std::tuple<ShardedKey, int, size_t, size_t>;
 // Mapping from a tensor key to its shard keys, e.g. training tensors to the sharded inference tensors
 using TensorShardingMap = std::unordered_map<ShardedKey, std::vector<ReshardingInfo>, ShardedKeyHash>;
 
-#define GetShardedKey(reshard_info) std::get<0>(reshard_info)
-#define SetShardedKey(reshard_info, value) std::get<0>(reshard_info) = value
-#define GetDimIndex(reshard_info) std::get<1>(reshard_info)
-#define SetDimIndex(reshard_info, value) std::get<1>(reshard_info) = value
-#define GetStart(reshard_info) std::get<2>(reshard_info)
-#define SetStart(reshard_info, value) std::get<2>(reshard_info) = value
-#define GetOffset(reshard_info) std::get<3>(reshard_info)
-#define SetOffset(reshard_info, value) std::get<3>(reshard_info) = value
+enum class InMemoryPutMode {
+    // Clone the tensor into a newly allocated buffer on every put
+    CLONE,
+    // Copy the tensor into the buffer of the same sharded key, dtype, shape and device from the same seq, or from an
+    // evicted seq once no reader refers to it. It suits tables with a retention policy used as a rolling buffer of
+    // the latest tensors.
+    REUSE_BUFFER,
+};
 
-class InMemoryTensorTable : public TensorTable {
+/**
+ * Parse the put mode of an in-memory table
+ * @param put_mode_config Items of "MODE" for all the tables or "table_name:MODE" for the specified table, where
+ * MODE is CLONE or REUSE_BUFFER. The per-table item takes precedence
+ * @param table_name Table name
+ * @return Put mode of the table
+ * @throws std::invalid_argument if the mode is unknown
+ */
+InMemoryPutMode ParseInMemoryPutMode(const std::vector<std::string>& put_mode_config, const std::string& table_name);
+
+class InMemoryTensorTable : public TensorTable, public std::enable_shared_from_this<InMemoryTensorTable> {
  public:
-    explicit InMemoryTensorTable(const std::string& name);
+    /**
+     * @param name Table name
+     * @param retain_seq_num Number of the latest seqs kept on Complete(), 0 for unlimited
+     * @param max_mem_size Max memory size of the stored tensors in bytes, the least recently used seqs are evicted
+     * on Complete() once exceeded, 0 for unlimited
+     * @param put_mode How the buffers of the stored tensors are allocated on put
+     * @param copy_thread_num Number of the threads copying the tensors of multi_get in parallel with the calling
+     * thread, 0 to copy on the calling thread only
+     */
+    explicit InMemoryTensorTable(
+        const std::string& name,
+        int32_t retain_seq_num = 0,
+        int64_t max_mem_size = 0,
+        InMemoryPutMode put_mode = InMemoryPutMode::CLONE,
+        int32_t copy_thread_num = 0);
     ~InMemoryTensorTable() override = default;
 
     // Disable copy constructor and assignment operator
@@ -57,22 +91,112 @@ class InMemoryTensorTable : public TensorTable {
     GetTensor(int64_t seq_id, const ShardedKey& tensor_key, const TorchTensorMeta& tensor_meta) override;
     bool MultiPut(int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
     bool MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
+    TableFuture
+    MultiPutAsync(int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
+    TableFuture
+    MultiGetAsync(int64_t seq_id, const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
+    std::shared_ptr<PreparedMultiGet>
+    PrepareMultiGet(const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) override;
     std::vector<std::pair<ShardedKey, pybind11::object>> MultiGetTensor(
         int64_t seq_id, const std::vector<std::pair<ShardedKey, TorchTensorMeta>>& tensor_meta_list) override;
     void Complete(int64_t seq_id) override;
+    TableFuture CompleteAsync(int64_t seq_id) override;
     std::vector<std::pair<std::string, TorchTensorMeta>> ScanTensorMeta(int64_t seq_id) override;
 
     void PrefetchCachedTensors(int64_t /*seq_id*/) override {
         throw std::runtime_error("prefetch_cached_tensors is not supported for in-memory table");
     }
 
+    [[nodiscard]] std::unordered_map<std::string, int64_t> GetStats() const override;
+
  private:
-    // Internal storage structure: seq_id -> (tensor_key -> tensor)
-    using TableData = std::unordered_map<int64_t, TensorDict>;
-    TableData table_data_;
+    static constexpr size_t kTableStripeNum = 64;
+
+    // Shards of a tensor: <sharded key, tensor>
+    using TensorShards = std::vector<ShardedTensor>;
+
+    // One stripe of the table storage: seq_id -> (tensor name -> shards).
+    // Tensors are assigned to the stripes by name, so operations on different tensors rarely contend.
+    struct TableStripe {
+        RWSpinLock lock;
+        std::unordered_map<int64_t, std::unordered_map<std::string, TensorShards>> data;
+        // Buffers of the evicted seqs kept for the puts of REUSE_BUFFER mode, at most one per sharded key
+        std::unordered_map<ShardedKey, std::shared_ptr<torch::Tensor>, ShardedKeyHash> idle_buffers;
+    };
+    std::array<TableStripe, kTableStripeNum> stripes_;
+
+    TableStripe& GetStripe(const std::string& tensor_name) {
+        return stripes_[std::hash<std::string>{}(tensor_name) % kTableStripeNum];
+    }
 
-    // Mutex for thread-safe access
-    mutable std::recursive_mutex mutex_;
+    // Memory usage and recency of a seq, used by the retention policy
+    struct SeqStat {
+        int64_t mem_size{0};
+        uint64_t last_access{0};
+    };
+
+    int32_t retain_seq_num_;
+    int64_t max_mem_size_;
+    InMemoryPutMode put_mode_;
+    int32_t copy_thread_num_;
+    std::unique_ptr<ThreadPool> copy_thread_pool_;
+    // Puts hold it shared and the retention policy exclusively, so a put never lands between the selection of the
+    // evicted seqs and the removal of their tensors, which would leave the tensors and the seq stats inconsistent
+    std::shared_mutex evict_mutex_;
+    mutable std::mutex seq_stat_mutex_;
+    std::map<int64_t, SeqStat> seq_stats_;
+    uint64_t access_clock_{0};
+    int64_t mem_size_{0};
+    int64_t evicted_seq_num_{0};
+    int64_t evicted_mem_size_{0};
+
+    void UpdateSeqStat(int64_t seq_id, int64_t mem_size_delta);
+    void TouchSeqStat(int64_t seq_id);
+    // Select the seqs to evict by the retention policy and remove their stats, the completed seq is never evicted.
+    // evict_mutex_ must be held exclusively until the seqs are evicted
+    std::vector<int64_t> SelectEvictedSeqs(int64_t completed_seq_id);
+    void EvictSeq(int64_t seq_id);
+
+    // There is no read plan for in-memory table, so the prepared batch simply replays the batch get.
+    class InMemoryPreparedMultiGet : public PreparedMultiGet {
+     public:
+        InMemoryPreparedMultiGet(
+            std::shared_ptr<InMemoryTensorTable> table, std::vector<std::pair<ShardedKey, torch::Tensor>> tensors)
+            : table_(std::move(table)),
+              tensors_(std::move(tensors)) {}
+
+        bool Execute(int64_t seq_id) override;
+
+        [[nodiscard]] size_t Size() const override { return tensors_.size(); }
+
+     private:
+        std::shared_ptr<InMemoryTensorTable> table_;
+        std::vector<std::pair<ShardedKey, torch::Tensor>> tensors_;
+    };
+
+    // The following methods work on torch tensors and must be called without holding the GIL.
+    bool PutTensors(int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list);
+    bool PutTensorsReusingBuffers(int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list);
+    // Take the idle buffer of the sharded key if it fits the source tensor and has no reader, the stripe lock must be
+    // held
+    static std::shared_ptr<torch::Tensor>
+    TakeReusableBuffer(TableStripe& stripe, const ShardedKey& tensor_key, const torch::Tensor& source_tensor);
+    bool GetTensors(int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list);
+    /**
+     * Copy the stored shards into the target tensors. The targets are split into batches, one per CUDA device or
+     * several of similar bytes on CPU, which are copied in parallel on the copy thread pool and the calling thread.
+     * @return Whether the shards of each target tensor are found
+     */
+    std::vector<uint8_t>
+    CopyTensors(int64_t seq_id, const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list);
+    // Copy one batch of the target tensors, the copies to a CUDA device are synchronized once on a side stream
+    // which waits for caller_stream first
+    void CopyTensorBatch(
+        int64_t seq_id,
+        const std::vector<std::pair<ShardedKey, torch::Tensor>>& tensor_list,
+        const std::vector<size_t>& batch,
+        const std::optional<c10::cuda::CUDAStream>& caller_stream,
+        std::vector<uint8_t>& found);
 
     std::vector<std::pair<ShardedKey, torch::Tensor>>
     GetTensorShards(const ShardedKey& sharded_key, int64_t seq_id, const torch::Tensor& target_tensor);
@@ -3,6 +3,8 @@
 #include <cstdint>
 #include <exception>
 #include <stdexcept>
+#include <utility>
+#include <vector>
 
 #include <c10/util/typeid.h>
 #include <pybind11/pybind11.h>
@@ -12,8 +14,11 @@
 #include <torch/python.h>
 #include <torch/torch.h>
 
+#include "astate/sharded_key_batch.h"
+#include "astate/sharding_spec.h"
 #include "core/atensor.h"
 #include "core/shardedkey.h"
+#include "core/tensor_sharded_ops.h"
 
 namespace astate {
 
@@ -484,6 +489,41 @@ inline bool TryAdjustGlobalOffset(
     return false;
 }
 
+/**
+ * @brief Narrow the shard to the copy region, which is read by the segments of its memory if it is not contiguous
+ * @param max_gap Max number of elements between two segments to merge them
+ * @param max_segment_num Max number of segments to read, the shard is not narrowed if more are needed
+ * @param segments Segments relative to the first element of the region, empty if the region is contiguous
+ * @return true if the shard is narrowed
+ */
+inline bool TryAdjustGlobalOffsetWithSegments(
+    astate::ATensor& atensor,
+    const std::vector<int64_t>& copy_shape,
+    const std::vector<int64_t>& copy_offset,
+    int64_t max_gap,
+    int64_t max_segment_num,
+    astate::ShardedKey& sharded_key,
+    std::vector<std::pair<int64_t, int64_t>>& segments) {
+    segments.clear();
+    if (TryAdjustGlobalOffset(atensor, copy_shape, copy_offset, sharded_key)) {
+        return true;
+    }
+    if (max_segment_num <= 0) {
+        return false;
+    }
+    auto region_segments = astate::CopyRegionToSegments(atensor, copy_offset, copy_shape, max_gap);
+    if (region_segments.empty() || static_cast<int64_t>(region_segments.size()) > max_segment_num) {
+        return false;
+    }
+    for (int32_t i = 0; i < atensor.dim_num; ++i) {
+        atensor.storage_offset += atensor.stride[i] * copy_offset[i];
+        atensor.size[i] = copy_shape[i];
+        sharded_key.global_offset[i] += copy_offset[i];
+    }
+    segments = std::move(region_segments);
+    return true;
+}
+
 /**
  * @brief Convert ATStorage to torch::Tensor compatible storage information
  * @param atstorage ATensor storage
@@ -666,6 +706,187 @@ inline std::vector<torch::Tensor> ATensorsToTensors(const std::vector<std::share
     return tensors;
 }
 
+/**
+ * @brief Validate the tensors of batch operations in a single pass, the GIL must be held by the caller
+ * @param tensor_list Python tensor list
+ * @throws std::invalid_argument if any value is not a torch tensor or is empty
+ */
+inline void ValidateTensorList(const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    for (const auto& pair : tensor_list) {
+        PyObject* py_obj = pair.second.ptr();
+        if (py_obj == nullptr || py_obj == Py_None || !THPVariable_Check(py_obj)) {
+            throw std::invalid_argument("Value for key '" + pair.first.key + "' must be a torch.Tensor");
+        }
+        if (THPVariable_Unpack(reinterpret_cast<THPVariable*>(py_obj)).numel() == 0) {
+            throw std::invalid_argument("Empty tensor for key '" + pair.first.key + "'");
+        }
+    }
+}
+
+/**
+ * @brief Batch convert <ShardedKey, py::object> pairs to <ShardedKey, torch::Tensor> pairs
+ * @param tensor_list Python tensor list
+ * @return std::vector<std::pair<ShardedKey, torch::Tensor>> Converted tensor list, which shares the storage with
+ * the python tensors and could be used without holding the GIL
+ * @throws std::runtime_error if conversion fails
+ */
+inline std::vector<std::pair<ShardedKey, torch::Tensor>>
+PyObjectsToShardedTensors(const std::vector<std::pair<ShardedKey, pybind11::object>>& tensor_list) {
+    std::vector<std::pair<ShardedKey, torch::Tensor>> tensors;
+    tensors.reserve(tensor_list.size());
+
+    for (const auto& pair : tensor_list) {
+        tensors.emplace_back(pair.first, PyObjectToTensor(pair.second));
+    }
+
+    return tensors;
+}
+
+/**
+ * @brief Convert a state dict to <ShardedKey, py::object> pairs, the GIL must be held by the caller
+ * @param state_dict Python dict of <parameter name, torch.Tensor>
+ * @param sharding_spec Sharding spec which builds and caches the sharded keys
+ * @return std::vector<std::pair<ShardedKey, pybind11::object>> Tensor list in the order of the state dict
+ * @throws std::invalid_argument if any key is not a string or any value is not a torch tensor
+ */
+inline std::vector<std::pair<ShardedKey, pybind11::object>>
+StateDictToTensorList(const pybind11::dict& state_dict, ShardingSpec& sharding_spec) {
+    std::vector<std::pair<ShardedKey, pybind11::object>> tensor_list;
+    tensor_list.reserve(state_dict.size());
+
+    for (const auto& item : state_dict) {
+        if (!pybind11::isinstance<pybind11::str>(item.first)) {
+            throw std::invalid_argument("Keys of the state dict must be str");
+        }
+        auto name = item.first.cast<std::string>();
+        PyObject* py_obj = item.second.ptr();
+        if (py_obj == nullptr || !THPVariable_Check(py_obj)) {
+            throw std::invalid_argument("Value for key '" + name + "' must be a torch.Tensor");
+        }
+        const auto& tensor = THPVariable_Unpack(reinterpret_cast<THPVariable*>(py_obj));
+        tensor_list.emplace_back(
+            sharding_spec.GetShardedKey(name, tensor.sizes().vec()),
+            pybind11::reinterpret_borrow<pybind11::object>(item.second));
+    }
+
+    return tensor_list;
+}
+
+/**
+ * @brief Create a ShardedKeyBatch on an int64 meta tensor without copy
+ * @param names Key names
+ * @param meta CPU contiguous int64 tensor of [names.size(), 1 + 2 * max_ndim], see ShardedKeyBatch
+ * @return ShardedKeyBatch Batch which keeps a reference to the meta tensor
+ * @throws std::invalid_argument if the meta tensor is invalid
+ */
+inline ShardedKeyBatch TensorToShardedKeyBatch(const std::vector<std::string>& names, const torch::Tensor& meta) {
+    if (meta.dim() != 2 || meta.scalar_type() != torch::kInt64 || !meta.device().is_cpu() || !meta.is_contiguous()) {
+        throw std::invalid_argument("Meta of ShardedKeyBatch must be a 2-dim contiguous CPU int64 tensor");
+    }
+    if (meta.size(0) != static_cast<int64_t>(names.size()) || meta.size(1) % 2 != 1) {
+        throw std::invalid_argument(
+            "Meta of ShardedKeyBatch must be of [" + std::to_string(names.size()) + ", 1 + 2 * max_ndim], got ["
+            + std::to_string(meta.size(0)) + ", " + std::to_string(meta.size(1)) + "]");
+    }
+    auto owner = std::make_shared<const torch::Tensor>(meta);
+    return {names, meta.data_ptr<int64_t>(), (meta.size(1) - 1) / 2, owner};
+}
+
+/**
+ * @brief Zip a ShardedKeyBatch and the values (e.g. python tensors or tensor metas) to <ShardedKey, T> pairs
+ * @param key_batch Sharded key batch
+ * @param values Values in the order of the keys
+ * @return std::vector<std::pair<ShardedKey, T>> Pairs of the keys and values
+ * @throws std::invalid_argument if the sizes mismatch
+ */
+template <typename T>
+inline std::vector<std::pair<ShardedKey, T>>
+ZipShardedKeyBatch(const ShardedKeyBatch& key_batch, const std::vector<T>& values) {
+    if (key_batch.Size() != values.size()) {
+        throw std::invalid_argument(
+            "Size mismatch of ShardedKeyBatch and values: " + std::to_string(key_batch.Size()) + " vs "
+            + std::to_string(values.size()));
+    }
+    std::vector<std::pair<ShardedKey, T>> pairs;
+    pairs.reserve(values.size());
+    for (size_t i = 0; i < values.size(); ++i) {
+        pairs.emplace_back(key_batch.GetShardedKey(i), values[i]);
+    }
+    return pairs;
+}
+
+/**
+ * @brief Validate the local shape of the index-th key of a batch against the global shape and offset in the flat meta
+ * array, without materializing the key
+ * @param key_batch Sharded key batch
+ * @param index Index of the key
+ * @param sizes Local shape of the value
+ * @throws std::invalid_argument if the ndim mismatches or the shard exceeds the global shape
+ */
+inline void ValidateShardedKeyBatchShape(const ShardedKeyBatch& key_batch, size_t index, c10::IntArrayRef sizes) {
+    auto ndim = key_batch.Ndim(index);
+    if (static_cast<int64_t>(sizes.size()) != ndim) {
+        throw std::invalid_argument(
+            "Ndim mismatch for key '" + std::string(key_batch.Name(index)) + "', key " + std::to_string(ndim)
+            + " vs value " + std::to_string(sizes.size()));
+    }
+    const int64_t* shape = key_batch.GlobalShape(index);
+    const int64_t* offset = key_batch.GlobalOffset(index);
+    for (int64_t dim = 0; dim < ndim; ++dim) {
+        if (sizes[dim] < 0 || offset[dim] + sizes[dim] > shape[dim]) {
+            throw std::invalid_argument(
+                "Shard of key '" + std::string(key_batch.Name(index)) + "' exceeds the global shape at dim "
+                + std::to_string(dim) + ": offset " + std::to_string(offset[dim]) + " + size "
+                + std::to_string(sizes[dim]) + " > " + std::to_string(shape[dim]));
+        }
+    }
+}
+
+/**
+ * @brief Validate the tensors of a ShardedKeyBatch operation in a single pass, the GIL must be held by the caller
+ * @param key_batch Sharded key batch
+ * @param tensors Python tensors in the order of the keys
+ * @throws std::invalid_argument if the sizes mismatch, any value is not a non-empty torch tensor or its shape does not
+ * fit its key
+ */
+inline void ValidateTensorList(const ShardedKeyBatch& key_batch, const std::vector<pybind11::object>& tensors) {
+    if (key_batch.Size() != tensors.size()) {
+        throw std::invalid_argument(
+            "Size mismatch of ShardedKeyBatch and values: " + std::to_string(key_batch.Size()) + " vs "
+            + std::to_string(tensors.size()));
+    }
+    for (size_t i = 0; i < tensors.size(); ++i) {
+        PyObject* py_obj = tensors[i].ptr();
+        if (py_obj == nullptr || py_obj == Py_None || !THPVariable_Check(py_obj)) {
+            throw std::invalid_argument(
+                "Value for key '" + std::string(key_batch.Name(i)) + "' must be a torch.Tensor");
+        }
+        const auto& tensor = THPVariable_Unpack(reinterpret_cast<THPVariable*>(py_obj));
+        if (tensor.numel() == 0) {
+            throw std::invalid_argument("Empty tensor for key '" + std::string(key_batch.Name(i)) + "'");
+        }
+        ValidateShardedKeyBatchShape(key_batch, i, tensor.sizes());
+    }
+}
+
+/**
+ * @brief Validate the tensor metas of a ShardedKeyBatch operation against the keys
+ * @param key_batch Sharded key batch
+ * @param tensor_metas Tensor metas in the order of the keys
+ * @throws std::invalid_argument if the sizes mismatch or any meta shape does not fit its key
+ */
+inline void
+ValidateTensorMetaList(const ShardedKeyBatch& key_batch, const std::vector<astate::TorchTensorMeta>& tensor_metas) {
+    if (key_batch.Size() != tensor_metas.size()) {
+        throw std::invalid_argument(
+            "Size mismatch of ShardedKeyBatch and values: " + std::to_string(key_batch.Size()) + " vs "
+            + std::to_string(tensor_metas.size()));
+    }
+    for (size_t i = 0; i < tensor_metas.size(); ++i) {
+        ValidateShardedKeyBatchShape(key_batch, i, tensor_metas[i].size);
+    }
+}
+
 inline astate::TorchTensorMeta GetTorchTensorMeta(const astate::ATensor& atensor) {
     return {
         ATDtypeToTorchDtype(atensor.dtype),
@@ -0,0 +1,299 @@
+#include "protocol/message_codec.h"
+
+#include <cstddef>
+#include <cstdint>
+#include <stdexcept>
+#include <string>
+#include <string_view>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+#include <spdlog/spdlog.h>
+
+namespace astate {
+
+namespace {
+
+constexpr char kBinaryMagic[] = {'A', 'M'};
+constexpr uint8_t kBinaryVersion = 1;
+
+class BinaryWriter {
+ public:
+    void PutByte(uint8_t value) { buffer_.push_back(static_cast<char>(value)); }
+
+    void PutVarint(uint64_t value) {
+        while (value >= 0x80) {
+            PutByte(static_cast<uint8_t>(value | 0x80));
+            value >>= 7;
+        }
+        PutByte(static_cast<uint8_t>(value));
+    }
+
+    void PutSignedVarint(int64_t value) {
+        PutVarint((static_cast<uint64_t>(value) << 1) ^ static_cast<uint64_t>(value >> 63));
+    }
+
+    void PutString(std::string_view value) {
+        PutVarint(value.size());
+        buffer_.append(value);
+    }
+
+    void PutRaw(std::string_view value) { buffer_.append(value); }
+
+    std::string& Buffer() { return buffer_; }
+
+ private:
+    std::string buffer_;
+};
+
+class BinaryReader {
+ public:
+    explicit BinaryReader(std::string_view data)
+        : data_(data) {}
+
+    uint8_t GetByte() {
+        if (pos_ >= data_.size()) {
+            throw std::runtime_error("Truncated binary message at " + std::to_string(pos_));
+        }
+        return static_cast<uint8_t>(data_[pos_++]);
+    }
+
+    uint64_t GetVarint() {
+        uint64_t value = 0;
+        for (int shift = 0; shift < 64; shift += 7) {
+            uint8_t byte = GetByte();
+            value |= static_cast<uint64_t>(byte & 0x7F) << shift;
+            if ((byte & 0x80) == 0) {
+                return value;
+            }
+        }
+        throw std::runtime_error("Invalid varint in binary message at " + std::to_string(pos_));
+    }
+
+    int64_t GetSignedVarint() {
+        uint64_t value = GetVarint();
+        return static_cast<int64_t>(value >> 1) ^ -static_cast<int64_t>(value & 1);
+    }
+
+    std::string_view GetString() {
+        uint64_t size = GetVarint();
+        if (size > Remaining()) {
+            throw std::runtime_error("Truncated string in binary message at " + std::to_string(pos_));
+        }
+        std::string_view value = data_.substr(pos_, size);
+        pos_ += size;
+        return value;
+    }
+
+    // Read a count of the following items, each of which takes at least one byte
+    size_t GetCount() {
+        uint64_t count = GetVarint();
+        if (count > Remaining()) {
+            throw std::runtime_error("Invalid count " + std::to_string(count) + " in binary message");
+        }
+        return count;
+    }
+
+    [[nodiscard]] size_t Remaining() const { return data_.size() - pos_; }
+
+ private:
+    std::string_view data_;
+    size_t pos_{0};
+};
+
+// Interns the repeated strings of a message
+class StringTable {
+ public:
+    uint64_t Intern(const std::string& value) {
+        auto [it, inserted] = indices_.emplace(value, strings_.size());
+        if (inserted) {
+            strings_.push_back(&it->first);
+        }
+        return it->second;
+    }
+
+    void Write(BinaryWriter& writer) const {
+        writer.PutVarint(strings_.size());
+        for (const auto* value : strings_) {
+            writer.PutString(*value);
+        }
+    }
+
+ private:
+    std::unordered_map<std::string, uint64_t> indices_;
+    std::vector<const std::string*> strings_;
+};
+
+std::vector<std::string_view> ReadStringTable(BinaryReader& reader) {
+    std::vector<std::string_view> strings(reader.GetCount());
+    for (auto& value : strings) {
+        value = reader.GetString();
+    }
+    return strings;
+}
+
+std::string_view GetInternedString(BinaryReader& reader, const std::vector<std::string_view>& strings) {
+    uint64_t index = reader.GetVarint();
+    if (index >= strings.size()) {
+        throw std::runtime_error("Invalid string index " + std::to_string(index) + " in binary message");
+    }
+    return strings[index];
+}
+
+void PutNodeInfo(BinaryWriter& writer, const NodeInfo& info) {
+    writer.PutString(info.hostname_or_ip);
+    writer.PutVarint(info.rdma_port);
+    writer.PutVarint(info.ctrl_flow_port);
+}
+
+NodeInfo GetNodeInfo(BinaryReader& reader) {
+    NodeInfo info;
+    info.hostname_or_ip = std::string(reader.GetString());
+    info.rdma_port = static_cast<int>(reader.GetVarint());
+    info.ctrl_flow_port = static_cast<int>(reader.GetVarint());
+    return info;
+}
+
+void PutInt64Array(BinaryWriter& writer, const std::vector<int64_t>& values) {
+    writer.PutVarint(values.size());
+    for (auto value : values) {
+        writer.PutSignedVarint(value);
+    }
+}
+
+std::vector<int64_t> GetInt64Array(BinaryReader& reader) {
+    std::vector<int64_t> values(reader.GetCount());
+    for (auto& value : values) {
+        value = reader.GetSignedVarint();
+    }
+    return values;
+}
+
+void PutATensor(BinaryWriter& writer, const ATensor& atensor) {
+    writer.PutSignedVarint(atensor.storage_offset);
+    int32_t dim_num = (atensor.size != nullptr && atensor.stride != nullptr) ? atensor.dim_num : 0;
+    writer.PutVarint(dim_num);
+    writer.PutByte(static_cast<uint8_t>(atensor.dtype));
+    writer.PutByte(
+        static_cast<uint8_t>(atensor.conj) | (static_cast<uint8_t>(atensor.neg) << 1)
+        | (static_cast<uint8_t>(atensor.requires_grad) << 2));
+    for (int32_t i = 0; i < dim_num; ++i) {
+        writer.PutSignedVarint(atensor.size[i]);
+    }
+    for (int32_t i = 0; i < dim_num; ++i) {
+        writer.PutSignedVarint(atensor.stride[i]);
+    }
+    // The data pointer is process specific, so it is not encoded, the same as JSON
+    writer.PutVarint(atensor.storage.storage_size);
+    writer.PutByte(static_cast<uint8_t>(atensor.storage.device.device_type));
+    writer.PutByte(static_cast<uint8_t>(atensor.storage.device.device_index));
+}
+
+ATensor GetATensor(BinaryReader& reader) {
+    ATensor atensor;
+    atensor.storage_offset = reader.GetSignedVarint();
+    auto dim_num = static_cast<int32_t>(reader.GetCount());
+    atensor.dtype = static_cast<ATDtype>(static_cast<int8_t>(reader.GetByte()));
+    uint8_t flags = reader.GetByte();
+    atensor.conj = (flags & 0x1) != 0;
+    atensor.neg = (flags & 0x2) != 0;
+    atensor.requires_grad = (flags & 0x4) != 0;
+    if (dim_num > 0) {
+        // Owned by atensor as soon as allocated, so they are freed if the decoding fails
+        atensor.dim_num = dim_num;
+        atensor.size = new int64_t[dim_num];
+        atensor.stride = new int64_t[dim_num];
+        for (int32_t i = 0; i < dim_num; ++i) {
+            atensor.size[i] = reader.GetSignedVarint();
+        }
+        for (int32_t i = 0; i < dim_num; ++i) {
+            atensor.stride[i] = reader.GetSignedVarint();
+        }
+    }
+    atensor.storage.storage_size = reader.GetVarint();
+    atensor.storage.device.device_type = static_cast<ATDeviceType>(static_cast<int8_t>(reader.GetByte()));
+    atensor.storage.device.device_index = static_cast<ATDeviceIndex>(static_cast<int8_t>(reader.GetByte()));
+    atensor.storage.data = nullptr;
+    return atensor;
+}
+
+} // namespace
+
+std::string ToBinary(const TensorRDMAMetaPublishMessage& msg) {
+    try {
+        StringTable strings;
+        BinaryWriter body;
+        body.PutSignedVarint(msg.seq_id);
+        PutNodeInfo(body, msg.node_info);
+        body.PutVarint(msg.tensor_rdma_metas.size());
+        for (const auto& [key, info] : msg.tensor_rdma_metas) {
+            body.PutVarint(strings.Intern(key.key));
+            PutInt64Array(body, key.global_shape);
+            PutInt64Array(body, key.global_offset);
+            body.PutVarint(reinterpret_cast<uintptr_t>(info.addr));
+            body.PutVarint(info.size);
+            body.PutVarint(strings.Intern(info.rkey));
+            PutATensor(body, info.atensor_meta);
+        }
+
+        BinaryWriter writer;
+        writer.PutRaw(std::string_view(kBinaryMagic, sizeof(kBinaryMagic)));
+        writer.PutByte(kBinaryVersion);
+        strings.Write(writer);
+        writer.PutRaw(body.Buffer());
+        return std::move(writer.Buffer());
+    } catch (const std::exception& e) {
+        SPDLOG_ERROR("Failed to encode TensorRDMAMetaPublishMessage: {}", e.what());
+        throw;
+    }
+}
+
+TensorRDMAMetaPublishMessage FromBinary(const std::string& data, const TensorRDMAMetaPublishMessage&) {
+    try {
+        BinaryReader reader(data);
+        if (reader.GetByte() != kBinaryMagic[0] || reader.GetByte() != kBinaryMagic[1]) {
+            throw std::runtime_error("Invalid magic of binary message");
+        }
+        uint8_t version = reader.GetByte();
+        if (version != kBinaryVersion) {
+            throw std::runtime_error("Unsupported binary message version: " + std::to_string(version));
+        }
+        auto strings = ReadStringTable(reader);
+
+        TensorRDMAMetaPublishMessage msg;
+        msg.seq_id = reader.GetSignedVarint();
+        msg.node_info = GetNodeInfo(reader);
+        size_t meta_num = reader.GetCount();
+        msg.tensor_rdma_metas.reserve(meta_num);
+        for (size_t i = 0; i < meta_num; ++i) {
+            ShardedKey key;
+            key.key = std::string(GetInternedString(reader, strings));
+            key.global_shape = GetInt64Array(reader);
+            key.global_offset = GetInt64Array(reader);
+            if (key.global_shape.size() != key.global_offset.size()) {
+                throw std::runtime_error("Shape and offset dimensions do not match of key " + key.key);
+            }
+
+            auto addr = static_cast<uintptr_t>(reader.GetVarint());
+            size_t size = reader.GetVarint();
+            if (size == 0) {
+                throw std::runtime_error("Invalid memory size of key " + key.key);
+            }
+            std::string rkey(GetInternedString(reader, strings));
+            msg.tensor_rdma_metas.emplace(
+                std::move(key),
+                TensorMemoryRDMAInfo{reinterpret_cast<void*>(addr), size, std::move(rkey), GetATensor(reader)});
+        }
+        if (reader.Remaining() != 0) {
+            throw std::runtime_error(
+                "Unexpected trailing bytes of binary message: " + std::to_string(reader.Remaining()));
+        }
+        return msg;
+    } catch (const std::exception& e) {
+        SPDLOG_ERROR("Failed to decode TensorRDMAMetaPublishMessage: {}", e.what());
+        throw;
+    }
+}
+
+} // namespace astate
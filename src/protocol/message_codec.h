@@ -0,0 +1,27 @@
+#pragma once
+
+#include <string>
+
+#include "protocol/messages.h"
+
+namespace astate {
+
+/*
+ * Compact binary codec of the control messages, used instead of JSON for the large messages, e.g. the RDMA metas
+ * of all the tensor shards of a node.
+ *
+ * A message is encoded as the magic "AM", a version byte, a string table and the body. Integers are LEB128 varints
+ * (zigzag-encoded if signed) and strings are length-prefixed. The repeated strings, e.g. the key names shared by
+ * the shards of a tensor and the rkeys, are interned into the string table and referred by their indices.
+ */
+std::string ToBinary(const TensorRDMAMetaPublishMessage& msg);
+
+/*
+ * Decode the message encoded by ToBinary.
+ * @param data: The encoded message.
+ * @return: The decoded message.
+ * @throws std::runtime_error if the data is truncated or malformed.
+ */
+TensorRDMAMetaPublishMessage FromBinary(const std::string& data, const TensorRDMAMetaPublishMessage&);
+
+} // namespace astate
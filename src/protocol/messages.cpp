@@ -379,6 +379,12 @@ Json::Value ToJson(const WeightReadyMessage& msg) {
         Json::Value root;
         root["seq_id"] = Json::Value::Int64(msg.seq_id);
         root["node_info"] = toJson(msg.node_info);
+        root["layout_hash"] = Json::Value::UInt64(msg.layout_hash);
+        Json::Value keys(Json::arrayValue);
+        for (const auto& key : msg.removed_keys) {
+            keys.append(ToJson(key));
+        }
+        root["removed_keys"] = keys;
         return root;
     } catch (const std::exception& e) {
         SPDLOG_ERROR("Failed to serialize WeightReadyMessage: {}", e.what());
@@ -397,6 +403,21 @@ WeightReadyMessage FromJson(const Json::Value& root, const WeightReadyMessage&)
         WeightReadyMessage msg;
         msg.seq_id = root["seq_id"].asInt64();
         msg.node_info = fromJson(root["node_info"], NodeInfo{});
+        // 布局哈希和移除的张量为可选字段，兼容旧版本的消息
+        if (root.isMember("layout_hash")) {
+            // 较小的值会被解析为intValue，因此不检查具体的类型
+            if (!root["layout_hash"].isUInt64()) {
+                throw std::runtime_error("Invalid type for field: layout_hash");
+            }
+            msg.layout_hash = root["layout_hash"].asUInt64();
+        }
+        if (root.isMember("removed_keys")) {
+            checkFieldType(root, "removed_keys", Json::arrayValue);
+            msg.removed_keys.reserve(root["removed_keys"].size());
+            for (const auto& key : root["removed_keys"]) {
+                msg.removed_keys.push_back(FromJson(key, ShardedKey{}));
+            }
+        }
         return msg;
     } catch (const std::exception& e) {
         SPDLOG_ERROR("Failed to deserialize WeightReadyMessage: {}", e.what());
@@ -404,6 +425,48 @@ WeightReadyMessage FromJson(const Json::Value& root, const WeightReadyMessage&)
     }
 }
 
+// TensorReadyMessage 序列化
+Json::Value ToJson(const TensorReadyMessage& msg) {
+    try {
+        Json::Value root;
+        root["seq_id"] = Json::Value::Int64(msg.seq_id);
+        root["node_info"] = toJson(msg.node_info);
+        Json::Value keys(Json::arrayValue);
+        for (const auto& key : msg.tensor_keys) {
+            keys.append(ToJson(key));
+        }
+        root["tensor_keys"] = keys;
+        return root;
+    } catch (const std::exception& e) {
+        SPDLOG_ERROR("Failed to serialize TensorReadyMessage: {}", e.what());
+        throw;
+    }
+}
+
+TensorReadyMessage FromJson(const Json::Value& root, const TensorReadyMessage&) {
+    try {
+        checkRequiredField(root, "seq_id");
+        checkRequiredField(root, "node_info");
+        checkRequiredField(root, "tensor_keys");
+
+        checkFieldType(root, "seq_id", Json::intValue);
+        checkFieldType(root, "node_info", Json::objectValue);
+        checkFieldType(root, "tensor_keys", Json::arrayValue);
+
+        TensorReadyMessage msg;
+        msg.seq_id = root["seq_id"].asInt64();
+        msg.node_info = fromJson(root["node_info"], NodeInfo{});
+        msg.tensor_keys.reserve(root["tensor_keys"].size());
+        for (const auto& key : root["tensor_keys"]) {
+            msg.tensor_keys.push_back(FromJson(key, ShardedKey{}));
+        }
+        return msg;
+    } catch (const std::exception& e) {
+        SPDLOG_ERROR("Failed to deserialize TensorReadyMessage: {}", e.what());
+        throw;
+    }
+}
+
 // WeightConsumedMessage 序列化
 Json::Value ToJson(const WeightConsumedMessage& msg) {
     try {
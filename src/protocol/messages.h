@@ -111,9 +111,20 @@ struct TensorRDMAMetaPublishMessage {
     std::unordered_map<ShardedKey, TensorMemoryRDMAInfo, ShardedKeyHash> tensor_rdma_metas{};
 };
 
+// 权重就绪消息，携带本节点本轮的张量布局哈希，以及相比上一轮被移除的张量
 struct WeightReadyMessage {
     int64_t seq_id{};
     NodeInfo node_info;
+    // 0表示未携带布局哈希
+    uint64_t layout_hash{};
+    std::vector<ShardedKey> removed_keys;
+};
+
+// 部分张量就绪消息，每个put批次发送一次
+struct TensorReadyMessage {
+    int64_t seq_id{};
+    NodeInfo node_info;
+    std::vector<ShardedKey> tensor_keys;
 };
 
 // 权重消费完成消息
@@ -145,6 +156,7 @@ Json::Value ToJson(const TensorMemoryRDMAInfo& info);
 Json::Value ToJson(const ShardedKey& key);
 Json::Value ToJson(const TensorRDMAMetaPublishMessage& msg);
 Json::Value ToJson(const WeightReadyMessage& msg);
+Json::Value ToJson(const TensorReadyMessage& msg);
 Json::Value ToJson(const WeightConsumedMessage& msg);
 
 // 反序列化函数声明
@@ -153,6 +165,7 @@ TensorMemoryRDMAInfo FromJson(const Json::Value& root, const TensorMemoryRDMAInf
 ShardedKey FromJson(const Json::Value& root, const ShardedKey&);
 TensorRDMAMetaPublishMessage FromJson(const Json::Value& root, const TensorRDMAMetaPublishMessage&);
 WeightReadyMessage FromJson(const Json::Value& root, const WeightReadyMessage&);
+TensorReadyMessage FromJson(const Json::Value& root, const TensorReadyMessage&);
 WeightConsumedMessage FromJson(const Json::Value& root, const WeightConsumedMessage&);
 
 } // namespace astate
@@ -0,0 +1,217 @@
+#include <memory>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <pybind11/embed.h>
+#include <pybind11/pybind11.h>
+#include <torch/torch.h>
+
+#include "core/tensor_table.h"
+#include "core/utils.h"
+
+using namespace astate;
+
+class InMemoryTensorTableTest : public ::testing::Test {
+ protected:
+    static void SetUpTestSuite() {
+        // 初始化Python解释器（如果还没有初始化）
+        if (!Py_IsInitialized()) {
+            pybind11::initialize_interpreter();
+        }
+    }
+
+    // 写入一个seq，每个seq一个4KB的张量
+    static void PutSeq(InMemoryTensorTable& table, int64_t seq_id) {
+        std::vector<std::pair<ShardedKey, pybind11::object>> tensor_list{
+            {ShardedKey{"weight", {1024}, {0}}, TensorToPyObject(torch::full({1024}, seq_id, torch::kFloat32))}};
+        ASSERT_TRUE(table.MultiPut(seq_id, tensor_list));
+    }
+
+    static bool GetSeq(InMemoryTensorTable& table, int64_t seq_id) {
+        std::vector<std::pair<ShardedKey, pybind11::object>> tensor_list{
+            {ShardedKey{"weight", {1024}, {0}}, TensorToPyObject(torch::zeros({1024}, torch::kFloat32))}};
+        return table.MultiGet(seq_id, tensor_list);
+    }
+};
+
+// 测试分片存储的读写
+TEST_F(InMemoryTensorTableTest, sharded_put_get) {
+    auto table = std::make_shared<InMemoryTensorTable>("sharded_put_get");
+    std::vector<std::pair<ShardedKey, pybind11::object>> tensor_list{
+        {ShardedKey{"weight", {4, 2}, {0, 0}}, TensorToPyObject(torch::ones({2, 2}, torch::kFloat32))},
+        {ShardedKey{"weight", {4, 2}, {2, 0}}, TensorToPyObject(torch::full({2, 2}, 2, torch::kFloat32))}};
+    ASSERT_TRUE(table->MultiPut(1, tensor_list));
+
+    torch::Tensor target = torch::zeros({4, 2}, torch::kFloat32);
+    std::vector<std::pair<ShardedKey, pybind11::object>> get_list{
+        {ShardedKey{"weight", {4, 2}, {0, 0}}, TensorToPyObject(target)}};
+    ASSERT_TRUE(table->MultiGet(1, get_list));
+    EXPECT_TRUE(torch::equal(target.slice(0, 0, 2), torch::ones({2, 2}, torch::kFloat32)));
+    EXPECT_TRUE(torch::equal(target.slice(0, 2, 4), torch::full({2, 2}, 2, torch::kFloat32)));
+
+    // 重复写入同一分片不会增加内存
+    ASSERT_TRUE(table->MultiPut(1, tensor_list));
+    EXPECT_EQ(table->GetStats()["mem_size"], 32);
+    EXPECT_EQ(table->ScanTensorMeta(1).size(), 2);
+}
+
+// 测试按seq数量保留
+TEST_F(InMemoryTensorTableTest, retain_seq_num) {
+    auto table = std::make_shared<InMemoryTensorTable>("retain_seq_num", 2);
+    for (int64_t seq_id = 1; seq_id <= 4; ++seq_id) {
+        PutSeq(*table, seq_id);
+        table->Complete(seq_id);
+    }
+
+    EXPECT_FALSE(GetSeq(*table, 1));
+    EXPECT_FALSE(GetSeq(*table, 2));
+    EXPECT_TRUE(GetSeq(*table, 3));
+    EXPECT_TRUE(GetSeq(*table, 4));
+
+    auto stats = table->GetStats();
+    EXPECT_EQ(stats["seq_num"], 2);
+    EXPECT_EQ(stats["mem_size"], 2 * 4096);
+    EXPECT_EQ(stats["evicted_seq_num"], 2);
+    EXPECT_EQ(stats["evicted_mem_size"], 2 * 4096);
+}
+
+// 测试按内存预算LRU淘汰
+TEST_F(InMemoryTensorTableTest, max_mem_size_lru) {
+    auto table = std::make_shared<InMemoryTensorTable>("max_mem_size_lru", 0, 2 * 4096);
+    PutSeq(*table, 1);
+    PutSeq(*table, 2);
+    // 访问seq 1，使seq 2成为最久未使用的seq
+    EXPECT_TRUE(GetSeq(*table, 1));
+
+    PutSeq(*table, 3);
+    table->Complete(3);
+    EXPECT_TRUE(GetSeq(*table, 1));
+    EXPECT_FALSE(GetSeq(*table, 2));
+    EXPECT_TRUE(GetSeq(*table, 3));
+    EXPECT_EQ(table->GetStats()["evicted_mem_size"], 4096);
+
+    // 刚完成的seq不会被淘汰
+    auto small_table = std::make_shared<InMemoryTensorTable>("max_mem_size_small", 0, 1);
+    PutSeq(*small_table, 1);
+    small_table->Complete(1);
+    EXPECT_TRUE(GetSeq(*small_table, 1));
+}
+
+// 测试并发写入与淘汰后统计与数据一致
+TEST_F(InMemoryTensorTableTest, concurrent_put_and_complete) {
+    auto table = std::make_shared<InMemoryTensorTable>("concurrent_put_and_complete", 2);
+    constexpr int64_t kThreadNum = 4;
+    constexpr int64_t kSeqNum = 64;
+    {
+        pybind11::gil_scoped_release release;
+        std::vector<std::thread> threads;
+        threads.reserve(kThreadNum);
+        for (int64_t t = 0; t < kThreadNum; ++t) {
+            threads.emplace_back([&table, t]() {
+                pybind11::gil_scoped_acquire acquire;
+                for (int64_t seq_id = t + 1; seq_id <= kSeqNum; seq_id += kThreadNum) {
+                    PutSeq(*table, seq_id);
+                    table->Complete(seq_id);
+                }
+            });
+        }
+        for (auto& thread : threads) {
+            thread.join();
+        }
+    }
+
+    int64_t stored_seq_num = 0;
+    for (int64_t seq_id = 1; seq_id <= kSeqNum; ++seq_id) {
+        stored_seq_num += GetSeq(*table, seq_id) ? 1 : 0;
+    }
+    auto stats = table->GetStats();
+    EXPECT_EQ(stats["seq_num"], stored_seq_num);
+    EXPECT_EQ(stats["mem_size"], stored_seq_num * 4096);
+    EXPECT_EQ(stats["evicted_seq_num"] + stats["seq_num"], kSeqNum);
+}
+
+// 测试复用缓冲区的写入模式
+TEST_F(InMemoryTensorTableTest, reuse_buffer_put_mode) {
+    auto table = std::make_shared<InMemoryTensorTable>("reuse_buffer", 2, 0, InMemoryPutMode::REUSE_BUFFER);
+    auto expect_seq = [&table](int64_t seq_id) {
+        torch::Tensor target = torch::zeros({1024}, torch::kFloat32);
+        std::vector<std::pair<ShardedKey, pybind11::object>> get_list{
+            {ShardedKey{"weight", {1024}, {0}}, TensorToPyObject(target)}};
+        ASSERT_TRUE(table->MultiGet(seq_id, get_list));
+        EXPECT_TRUE(torch::equal(target, torch::full({1024}, seq_id, torch::kFloat32)));
+    };
+    PutSeq(*table, 1);
+    table->Complete(1);
+    PutSeq(*table, 2);
+    table->Complete(2);
+
+    // 未淘汰的seq的缓冲区不会被复用
+    PutSeq(*table, 3);
+    expect_seq(1);
+    expect_seq(2);
+    expect_seq(3);
+    EXPECT_EQ(table->GetStats()["mem_size"], 3 * 4096);
+
+    // seq 1被淘汰后，其缓冲区被seq 4复用，其他seq不受影响
+    table->Complete(3);
+    EXPECT_FALSE(GetSeq(*table, 1));
+    PutSeq(*table, 4);
+    expect_seq(2);
+    expect_seq(3);
+    expect_seq(4);
+    EXPECT_EQ(table->GetStats()["mem_size"], 3 * 4096);
+
+    EXPECT_EQ(
+        ParseInMemoryPutMode({"CLONE", "reuse_buffer:REUSE_BUFFER"}, "reuse_buffer"), InMemoryPutMode::REUSE_BUFFER);
+    EXPECT_EQ(ParseInMemoryPutMode({"REUSE_BUFFER", "other:CLONE"}, "reuse_buffer"), InMemoryPutMode::REUSE_BUFFER);
+    EXPECT_EQ(ParseInMemoryPutMode({"other:REUSE_BUFFER"}, "reuse_buffer"), InMemoryPutMode::CLONE);
+    EXPECT_THROW(ParseInMemoryPutMode({"MOVE"}, "reuse_buffer"), std::invalid_argument);
+}
+
+// 测试多线程并行读取
+TEST_F(InMemoryTensorTableTest, parallel_multi_get) {
+    auto table = std::make_shared<InMemoryTensorTable>("parallel_multi_get", 0, 0, InMemoryPutMode::CLONE, 4);
+    std::vector<std::pair<ShardedKey, pybind11::object>> tensor_list;
+    std::vector<std::pair<ShardedKey, pybind11::object>> get_list;
+    std::vector<std::pair<ShardedKey, TorchTensorMeta>> meta_list;
+    std::vector<torch::Tensor> targets;
+    for (int64_t i = 0; i < 16; ++i) {
+        ShardedKey key{"tensor_" + std::to_string(i), {(i + 1) * 64}, {0}};
+        tensor_list.emplace_back(key, TensorToPyObject(torch::full({(i + 1) * 64}, i, torch::kFloat32)));
+        targets.push_back(torch::zeros({(i + 1) * 64}, torch::kFloat32));
+        get_list.emplace_back(key, TensorToPyObject(targets.back()));
+        meta_list.emplace_back(key, TorchTensorMeta(torch::kFloat32, {(i + 1) * 64}, torch::Device(torch::kCPU)));
+    }
+    ASSERT_TRUE(table->MultiPut(1, tensor_list));
+    ASSERT_TRUE(table->MultiGet(1, get_list));
+    for (int64_t i = 0; i < 16; ++i) {
+        EXPECT_TRUE(torch::equal(targets[i], torch::full({(i + 1) * 64}, i, torch::kFloat32)));
+    }
+
+    // 不存在的张量不会出现在结果中
+    meta_list.emplace_back(ShardedKey{"missing", {64}, {0}}, TorchTensorMeta(torch::kFloat32, {64}, torch::kCPU));
+    auto result = table->MultiGetTensor(1, meta_list);
+    ASSERT_EQ(result.size(), 16);
+    for (int64_t i = 0; i < 16; ++i) {
+        EXPECT_EQ(result[i].first.key, "tensor_" + std::to_string(i));
+        EXPECT_TRUE(torch::equal(PyObjectToTensor(result[i].second), torch::full({(i + 1) * 64}, i, torch::kFloat32)));
+    }
+    EXPECT_FALSE(GetSeq(*table, 1));
+}
+
+// 测试异步完成seq
+TEST_F(InMemoryTensorTableTest, complete_async) {
+    auto table = std::make_shared<InMemoryTensorTable>("complete_async", 1);
+    PutSeq(*table, 1);
+    PutSeq(*table, 2);
+    auto future = table->CompleteAsync(2);
+    ASSERT_TRUE(future.Wait(-1));
+    EXPECT_TRUE(future.Done());
+    EXPECT_TRUE(future.Get());
+    EXPECT_FALSE(GetSeq(*table, 1));
+    EXPECT_TRUE(GetSeq(*table, 2));
+}
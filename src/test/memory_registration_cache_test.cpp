@@ -0,0 +1,155 @@
+#include "transport/memory_registration_cache.h"
+
+#include <atomic>
+#include <cstdint>
+#include <stdexcept>
+#include <thread>
+#include <utility>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+using namespace astate;
+
+namespace {
+
+void* Addr(uintptr_t addr) {
+    return reinterpret_cast<void*>(addr);
+}
+
+} // namespace
+
+// 测试已注册的内存不会重复注册
+TEST(MemoryRegistrationCacheTest, skip_registered_range) {
+    MemoryRegistrationCache cache;
+    int register_count = 0;
+    auto register_func = [&register_count]() {
+        ++register_count;
+        return true;
+    };
+
+    EXPECT_TRUE(cache.RegisterIfAbsent(Addr(0x1000), 0x1000, false, 0, register_func));
+    EXPECT_TRUE(cache.RegisterIfAbsent(Addr(0x1000), 0x1000, false, 0, register_func));
+    // 已注册区间的子区间
+    EXPECT_TRUE(cache.RegisterIfAbsent(Addr(0x1800), 0x100, false, 0, register_func));
+    EXPECT_EQ(register_count, 1);
+    EXPECT_EQ(cache.GetHitCount(), 2);
+    EXPECT_EQ(cache.GetMissCount(), 1);
+
+    // 相同地址、不同设备需要重新注册
+    EXPECT_TRUE(cache.RegisterIfAbsent(Addr(0x1000), 0x1000, true, 0, register_func));
+    EXPECT_TRUE(cache.RegisterIfAbsent(Addr(0x1000), 0x1000, true, 1, register_func));
+    EXPECT_EQ(register_count, 3);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 3 * 0x1000);
+}
+
+// 测试重叠和相邻区间的合并只用于字节统计，查询需要单个已注册区间完整覆盖
+TEST(MemoryRegistrationCacheTest, merge_ranges) {
+    MemoryRegistrationCache cache;
+    int register_count = 0;
+    auto register_func = [&register_count]() {
+        ++register_count;
+        return true;
+    };
+
+    cache.RegisterIfAbsent(Addr(0x1000), 0x1000, false, 0, register_func);
+    cache.RegisterIfAbsent(Addr(0x3000), 0x1000, false, 0, register_func);
+    EXPECT_EQ(cache.GetRangeCount(), 2);
+    EXPECT_FALSE(cache.Contains(Addr(0x1800), 0x2000, false, 0));
+
+    // 相邻区间合并统计，但跨越两个区间的范围不被覆盖
+    cache.RegisterIfAbsent(Addr(0x2000), 0x1000, false, 0, register_func);
+    EXPECT_EQ(cache.GetRangeCount(), 1);
+    EXPECT_EQ(cache.GetRegionCount(), 3);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 0x3000);
+    EXPECT_TRUE(cache.Contains(Addr(0x2800), 0x800, false, 0));
+    EXPECT_FALSE(cache.Contains(Addr(0x1800), 0x2000, false, 0));
+
+    // 跨区间的范围需要单独注册，已注册部分不重复计数
+    EXPECT_EQ(register_count, 3);
+    cache.RegisterIfAbsent(Addr(0x1800), 0x2000, false, 0, register_func);
+    EXPECT_EQ(register_count, 4);
+    EXPECT_TRUE(cache.Contains(Addr(0x1800), 0x2000, false, 0));
+    cache.RegisterIfAbsent(Addr(0x3800), 0x1000, false, 0, register_func);
+    EXPECT_EQ(cache.GetRangeCount(), 1);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 0x3800);
+    EXPECT_FALSE(cache.Contains(Addr(0x1000), 0x3800, false, 0));
+
+    cache.Clear();
+    EXPECT_EQ(cache.GetRangeCount(), 0);
+    EXPECT_EQ(cache.GetRegionCount(), 0);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 0);
+}
+
+// 测试释放内存时注销所有重叠的区间
+TEST(MemoryRegistrationCacheTest, deregister) {
+    MemoryRegistrationCache cache;
+    auto register_func = []() { return true; };
+    std::vector<std::pair<uintptr_t, size_t>> deregistered;
+    auto deregister_func = [&deregistered](const void* addr, size_t len) {
+        deregistered.emplace_back(reinterpret_cast<uintptr_t>(addr), len);
+        return true;
+    };
+
+    cache.RegisterIfAbsent(Addr(0x1000), 0x1000, false, 0, register_func);
+    cache.RegisterIfAbsent(Addr(0x1800), 0x1000, false, 0, register_func);
+    cache.RegisterIfAbsent(Addr(0x4000), 0x1000, false, 0, register_func);
+    cache.RegisterIfAbsent(Addr(0x1000), 0x1000, true, 0, register_func);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 0x1800 + 0x1000 + 0x1000);
+
+    // 未注册的范围无需注销
+    EXPECT_TRUE(cache.Deregister(Addr(0x3000), 0x1000, false, 0, deregister_func));
+    EXPECT_TRUE(deregistered.empty());
+
+    EXPECT_TRUE(cache.Deregister(Addr(0x2000), 0x800, false, 0, deregister_func));
+    ASSERT_EQ(deregistered.size(), 1);
+    EXPECT_EQ(deregistered[0], std::make_pair(uintptr_t{0x1800}, size_t{0x1000}));
+    EXPECT_FALSE(cache.Contains(Addr(0x1800), 0x1000, false, 0));
+    EXPECT_TRUE(cache.Contains(Addr(0x1000), 0x1000, false, 0));
+    EXPECT_TRUE(cache.Contains(Addr(0x1000), 0x1000, true, 0));
+    EXPECT_EQ(cache.GetRegionCount(), 3);
+    EXPECT_EQ(cache.GetRangeCount(), 3);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 0x1000 + 0x1000 + 0x1000);
+
+    // 注销失败时区间仍被移除
+    EXPECT_FALSE(cache.Deregister(Addr(0), 0x10000, false, 0, [](const void*, size_t) { return false; }));
+    EXPECT_EQ(cache.GetRegionCount(), 1);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 0x1000);
+    EXPECT_FALSE(cache.Contains(Addr(0x4000), 0x1000, false, 0));
+}
+
+// 测试注册失败的区间不会被记录
+TEST(MemoryRegistrationCacheTest, register_failure) {
+    MemoryRegistrationCache cache;
+    EXPECT_FALSE(cache.RegisterIfAbsent(Addr(0x1000), 0x1000, false, 0, []() { return false; }));
+    EXPECT_THROW(
+        cache.RegisterIfAbsent(
+            Addr(0x1000), 0x1000, false, 0, []() -> bool { throw std::runtime_error("register failed"); }),
+        std::runtime_error);
+    EXPECT_FALSE(cache.Contains(Addr(0x1000), 0x1000, false, 0));
+    EXPECT_TRUE(cache.RegisterIfAbsent(Addr(0x1000), 0x1000, false, 0, []() { return true; }));
+    EXPECT_TRUE(cache.Contains(Addr(0x1000), 0x1000, false, 0));
+}
+
+// 测试并发注册同一区间只注册一次
+TEST(MemoryRegistrationCacheTest, concurrent_register) {
+    MemoryRegistrationCache cache;
+    std::atomic<int> register_count{0};
+    std::vector<std::thread> threads;
+    for (int i = 0; i < 8; ++i) {
+        threads.emplace_back([&cache, &register_count]() {
+            for (uintptr_t addr = 0x1000; addr < 0x11000; addr += 0x1000) {
+                cache.RegisterIfAbsent(Addr(addr), 0x1000, false, 0, [&register_count]() {
+                    ++register_count;
+                    return true;
+                });
+            }
+        });
+    }
+    for (auto& thread : threads) {
+        thread.join();
+    }
+    EXPECT_EQ(register_count, 16);
+    EXPECT_EQ(cache.GetRangeCount(), 1);
+    EXPECT_EQ(cache.GetRegisteredBytes(), 0x10000);
+}
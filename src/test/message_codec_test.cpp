@@ -0,0 +1,130 @@
+#include "protocol/message_codec.h"
+
+#include <chrono>
+#include <cstdint>
+#include <stdexcept>
+#include <string>
+
+#include <gtest/gtest.h>
+#include <spdlog/spdlog.h>
+
+#include "core/atensor.h"
+#include "protocol/messages.h"
+
+using namespace astate;
+
+namespace {
+
+// 构造一个包含tensor_num个张量、每个张量shard_num个分片的元数据消息
+TensorRDMAMetaPublishMessage CreateMetaMessage(int tensor_num, int shard_num) {
+    TensorRDMAMetaPublishMessage msg;
+    msg.seq_id = 42;
+    msg.node_info = NodeInfo{"192.168.0.1", 12345, 23456};
+    int64_t size[] = {1024, 256};
+    int64_t stride[] = {256, 1};
+    uintptr_t addr = 0x7f0000000000;
+    for (int i = 0; i < tensor_num; ++i) {
+        for (int j = 0; j < shard_num; ++j) {
+            ShardedKey key{
+                "model.layers." + std::to_string(i) + ".self_attn.qkv_proj.weight",
+                {1024L * shard_num, 256},
+                {1024L * j, 0}};
+            ATStorage storage(1024 * 256 * 2, nullptr, ATDevice(ATDeviceType::CUDA, static_cast<ATDeviceIndex>(j % 8)));
+            ATensor atensor(size, stride, 0, 2, ATDtype::BFloat16, false, false, storage);
+            msg.tensor_rdma_metas[key]
+                = TensorMemoryRDMAInfo{reinterpret_cast<void*>(addr), 1024 * 256 * 2, "", atensor};
+            addr += 1024 * 256 * 2;
+        }
+    }
+    return msg;
+}
+
+void ExpectSameMessage(const TensorRDMAMetaPublishMessage& expected, const TensorRDMAMetaPublishMessage& actual) {
+    EXPECT_EQ(actual.seq_id, expected.seq_id);
+    EXPECT_EQ(actual.node_info, expected.node_info);
+    ASSERT_EQ(actual.tensor_rdma_metas.size(), expected.tensor_rdma_metas.size());
+    for (const auto& [key, info] : expected.tensor_rdma_metas) {
+        auto it = actual.tensor_rdma_metas.find(key);
+        ASSERT_NE(it, actual.tensor_rdma_metas.end()) << key.ToString();
+        EXPECT_EQ(it->second.addr, info.addr);
+        EXPECT_EQ(it->second.size, info.size);
+        EXPECT_EQ(it->second.rkey, info.rkey);
+        const ATensor& atensor = it->second.atensor_meta;
+        EXPECT_EQ(atensor.dim_num, info.atensor_meta.dim_num);
+        EXPECT_EQ(atensor.dtype, info.atensor_meta.dtype);
+        EXPECT_EQ(atensor.storage_offset, info.atensor_meta.storage_offset);
+        EXPECT_EQ(atensor.requires_grad, info.atensor_meta.requires_grad);
+        for (int32_t i = 0; i < atensor.dim_num; ++i) {
+            EXPECT_EQ(atensor.size[i], info.atensor_meta.size[i]);
+            EXPECT_EQ(atensor.stride[i], info.atensor_meta.stride[i]);
+        }
+        EXPECT_EQ(atensor.storage.storage_size, info.atensor_meta.storage.storage_size);
+        EXPECT_EQ(atensor.storage.device.device_type, info.atensor_meta.storage.device.device_type);
+        EXPECT_EQ(atensor.storage.device.device_index, info.atensor_meta.storage.device.device_index);
+    }
+}
+
+} // namespace
+
+// 测试二进制编解码的正确性
+TEST(MessageCodecTest, binary_round_trip) {
+    auto msg = CreateMetaMessage(4, 3);
+    // 负数偏移、标量张量、非空rkey
+    int64_t size[] = {1};
+    int64_t stride[] = {1};
+    ATensor atensor(
+        size, stride, -3, 1, ATDtype::Float, true, true, ATStorage(4, nullptr, ATDevice(ATDeviceType::CPU, 0)), true);
+    msg.tensor_rdma_metas[ShardedKey{"negative", {-1}, {-2}}]
+        = TensorMemoryRDMAInfo{reinterpret_cast<void*>(UINTPTR_MAX), 4, "rkey", atensor};
+    msg.tensor_rdma_metas[ShardedKey{"scalar", {}, {}}]
+        = TensorMemoryRDMAInfo{reinterpret_cast<void*>(0x1000), 4, "rkey", ATensor()};
+    msg.seq_id = -1;
+
+    ExpectSameMessage(msg, FromBinary(ToBinary(msg), TensorRDMAMetaPublishMessage{}));
+}
+
+// 测试截断和损坏的数据
+TEST(MessageCodecTest, binary_malformed) {
+    auto data = ToBinary(CreateMetaMessage(2, 2));
+    for (size_t size : {size_t(0), size_t(2), data.size() / 2, data.size() - 1}) {
+        EXPECT_THROW(FromBinary(data.substr(0, size), TensorRDMAMetaPublishMessage{}), std::runtime_error);
+    }
+    EXPECT_THROW(FromBinary(data + "x", TensorRDMAMetaPublishMessage{}), std::runtime_error);
+
+    auto bad_magic = data;
+    bad_magic[0] = 'X';
+    EXPECT_THROW(FromBinary(bad_magic, TensorRDMAMetaPublishMessage{}), std::runtime_error);
+    auto bad_version = data;
+    bad_version[2] = 99;
+    EXPECT_THROW(FromBinary(bad_version, TensorRDMAMetaPublishMessage{}), std::runtime_error);
+}
+
+// 对比二进制和JSON编解码的耗时与大小，耗时较长，需通过--gtest_also_run_disabled_tests显式运行
+TEST(MessageCodecTest, DISABLED_binary_vs_json_benchmark) {
+    auto msg = CreateMetaMessage(1000, 16);
+
+    auto start = std::chrono::steady_clock::now();
+    auto json_data = Serialize(ToJson(msg));
+    auto json_encoded = std::chrono::steady_clock::now();
+    auto json_msg = FromJson(Deserialize(json_data), TensorRDMAMetaPublishMessage{});
+    auto json_decoded = std::chrono::steady_clock::now();
+
+    auto binary_data = ToBinary(msg);
+    auto binary_encoded = std::chrono::steady_clock::now();
+    auto binary_msg = FromBinary(binary_data, TensorRDMAMetaPublishMessage{});
+    auto binary_decoded = std::chrono::steady_clock::now();
+
+    auto to_us = [](auto duration) { return std::chrono::duration_cast<std::chrono::microseconds>(duration).count(); };
+    SPDLOG_INFO(
+        "{} shards, json: {} bytes, encode {} us, decode {} us; binary: {} bytes, encode {} us, decode {} us",
+        msg.tensor_rdma_metas.size(),
+        json_data.size(),
+        to_us(json_encoded - start),
+        to_us(json_decoded - json_encoded),
+        binary_data.size(),
+        to_us(binary_encoded - json_decoded),
+        to_us(binary_decoded - binary_encoded));
+
+    ExpectSameMessage(json_msg, binary_msg);
+    EXPECT_LT(binary_data.size() * 5, json_data.size());
+}
@@ -0,0 +1,64 @@
+#include "transport/remote_inst_id_cache.h"
+
+#include <cstdint>
+#include <stdexcept>
+#include <string>
+
+#include <gtest/gtest.h>
+
+using namespace astate;
+
+// 测试实例id只在首次使用时查询
+TEST(RemoteInstIdCacheTest, query_once) {
+    int query_count = 0;
+    RemoteInstIdCache cache([&query_count](const std::string& /*remote_host*/, int remote_port) {
+        ++query_count;
+        return static_cast<uint64_t>(remote_port);
+    });
+
+    EXPECT_EQ(cache.Get("127.0.0.1", 8080), 8080);
+    EXPECT_EQ(cache.Get("127.0.0.1", 8080), 8080);
+    EXPECT_EQ(cache.Get("127.0.0.1", 8082), 8082);
+    EXPECT_EQ(query_count, 2);
+    EXPECT_EQ(cache.GetHitCount(), 1);
+    EXPECT_EQ(cache.GetMissCount(), 2);
+
+    cache.Clear();
+    EXPECT_EQ(cache.Get("127.0.0.1", 8080), 8080);
+    EXPECT_EQ(query_count, 3);
+}
+
+// 测试传输失败后实例id失效，重试时重新查询到重启后的实例id
+TEST(RemoteInstIdCacheTest, invalidate_on_failure) {
+    uint64_t current_inst_id = 1;
+    int query_count = 0;
+    RemoteInstIdCache cache([&](const std::string& /*remote_host*/, int /*remote_port*/) {
+        ++query_count;
+        return current_inst_id;
+    });
+    auto transfer = [&current_inst_id](uint64_t inst_id) {
+        if (inst_id != current_inst_id) {
+            throw std::runtime_error("Transfer execution failed");
+        }
+        return true;
+    };
+
+    EXPECT_TRUE(cache.RunWithInstId("127.0.0.1", 8080, transfer));
+    EXPECT_TRUE(cache.RunWithInstId("127.0.0.1", 8081, transfer));
+    EXPECT_EQ(query_count, 2);
+
+    // 对端重启，缓存的实例id失效，只有失败的端点被重新查询
+    current_inst_id = 2;
+    EXPECT_THROW(cache.RunWithInstId("127.0.0.1", 8080, transfer), std::runtime_error);
+    EXPECT_TRUE(cache.RunWithInstId("127.0.0.1", 8080, transfer));
+    EXPECT_EQ(query_count, 3);
+    EXPECT_EQ(cache.Get("127.0.0.1", 8081), 1);
+    EXPECT_EQ(query_count, 3);
+
+    // 查询失败不会缓存
+    RemoteInstIdCache failed_cache([](const std::string& /*remote_host*/, int /*remote_port*/) -> uint64_t {
+        throw std::runtime_error("Query remote instance id failed");
+    });
+    EXPECT_THROW(failed_cache.RunWithInstId("127.0.0.1", 8080, transfer), std::runtime_error);
+    EXPECT_EQ(failed_cache.GetMissCount(), 1);
+}
@@ -0,0 +1,161 @@
+#include "transfer/replica_selector.h"
+
+#include <algorithm>
+#include <cstdint>
+#include <memory>
+#include <numeric>
+#include <random>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <spdlog/spdlog.h>
+
+using namespace astate;
+
+namespace {
+
+NodeInfo Host(const std::string& hostname) {
+    return NodeInfo{hostname, 8000, 9000};
+}
+
+TensorRDMAInfo Replica(const std::string& hostname, size_t size, int device_index = -1) {
+    auto atensor = std::make_shared<ATensor>();
+    if (device_index >= 0) {
+        atensor->storage.device = ATDevice{ATDeviceType::CUDA, static_cast<ATDeviceIndex>(device_index)};
+    }
+    return TensorRDMAInfo{nullptr, size, "", Host(hostname), atensor};
+}
+
+struct SimTensor {
+    std::vector<TensorRDMAInfo> replicas;
+    size_t size{0};
+};
+
+/*
+ * 模拟一个TP=4、DP=2的训练集群：
+ * - TP切分的张量在同一TP rank的2个DP副本上，副本顺序固定
+ * - 未切分的张量（如embedding、norm）在全部8个节点上都有副本
+ */
+std::vector<SimTensor> BuildTrainerLayout(size_t trainer_num, size_t tp_size) {
+    std::mt19937 gen(42);
+    std::uniform_int_distribution<size_t> mb_dist(1, 64);
+    std::vector<SimTensor> tensors;
+    for (int layer = 0; layer < 32; ++layer) {
+        for (size_t tp = 0; tp < tp_size; ++tp) {
+            SimTensor tensor;
+            tensor.size = mb_dist(gen) << 20;
+            for (size_t host = tp; host < trainer_num; host += tp_size) {
+                tensor.replicas.push_back(Replica("trainer-" + std::to_string(host), tensor.size));
+            }
+            tensors.push_back(tensor);
+        }
+        SimTensor replicated;
+        replicated.size = mb_dist(gen) << 20;
+        for (size_t host = 0; host < trainer_num; ++host) {
+            replicated.replicas.push_back(Replica("trainer-" + std::to_string(host), replicated.size));
+        }
+        tensors.push_back(replicated);
+    }
+    return tensors;
+}
+
+/*
+ * 每个reader rank读取全部张量，每32个张量一个MultiGet批次：批次内的读取先全部选择副本并计入未完成字节，批次结束后释放
+ * @return: 每个trainer节点被读取的字节数的最大值与平均值之比
+ */
+double SimulateMaxToMeanRatio(const std::string& policy, size_t trainer_num, size_t reader_num) {
+    auto tensors = BuildTrainerLayout(trainer_num, 4);
+    std::vector<size_t> host_bytes(trainer_num, 0);
+    for (size_t rank = 0; rank < reader_num; ++rank) {
+        auto selector = ReplicaSelector::Create(policy, Host("rollout-" + std::to_string(rank)), rank, 10000);
+        std::vector<std::pair<NodeInfo, size_t>> batch;
+        for (size_t i = 0; i < tensors.size(); ++i) {
+            const auto& replica = tensors[i].replicas[selector->Select(tensors[i].replicas, -1)];
+            selector->Acquire(replica.node_info, replica.size);
+            batch.emplace_back(replica.node_info, replica.size);
+            host_bytes[std::stoul(replica.node_info.hostname_or_ip.substr(8))] += replica.size;
+            if (batch.size() == 32 || i + 1 == tensors.size()) {
+                for (const auto& read : batch) {
+                    selector->Release(read.first, read.second, true);
+                }
+                batch.clear();
+            }
+        }
+    }
+    double mean = static_cast<double>(std::accumulate(host_bytes.begin(), host_bytes.end(), size_t{0})) / trainer_num;
+    return static_cast<double>(*std::max_element(host_bytes.begin(), host_bytes.end())) / mean;
+}
+
+} // namespace
+
+// 测试按最少未完成字节选择副本时，各trainer节点被读取的字节更均衡
+TEST(ReplicaSelectorTest, simulate_even_spread) {
+    const size_t trainer_num = 8;
+    for (size_t reader_num : {1, 4}) {
+        double rank_ratio = SimulateMaxToMeanRatio("RANK", trainer_num, reader_num);
+        double round_robin_ratio = SimulateMaxToMeanRatio("ROUND_ROBIN", trainer_num, reader_num);
+        double least_outstanding_ratio = SimulateMaxToMeanRatio("LEAST_OUTSTANDING", trainer_num, reader_num);
+        SPDLOG_INFO(
+            "readers: {}, max/mean bytes per trainer, RANK: {}, ROUND_ROBIN: {}, LEAST_OUTSTANDING: {}",
+            reader_num,
+            rank_ratio,
+            round_robin_ratio,
+            least_outstanding_ratio);
+        EXPECT_LT(least_outstanding_ratio, rank_ratio);
+        EXPECT_LT(least_outstanding_ratio, 1.2);
+    }
+}
+
+// 测试优先选择同节点、同设备号的副本
+TEST(ReplicaSelectorTest, topology_aware) {
+    auto selector = ReplicaSelector::Create("TOPOLOGY_AWARE", Host("rollout-0"), 0, 10000);
+    std::vector<TensorRDMAInfo> replicas{
+        Replica("trainer-0", 1024, 0), Replica("trainer-1", 1024, 1), Replica("rollout-0", 1024, 2)};
+    EXPECT_EQ(selector->Select(replicas, 1), 2);
+
+    // 没有同节点的副本时选择同设备号（同一rail）的副本
+    replicas.pop_back();
+    EXPECT_EQ(selector->Select(replicas, 1), 1);
+    selector->Acquire(replicas[1].node_info, 1024);
+    EXPECT_EQ(selector->Select(replicas, 1), 1);
+
+    // 同样近的副本之间按未完成字节均衡
+    replicas.push_back(Replica("trainer-2", 1024, 1));
+    EXPECT_EQ(selector->Select(replicas, 1), 2);
+    EXPECT_EQ(selector->GetOutstandingBytes(replicas[1].node_info), 1024);
+}
+
+// 测试读取失败的节点在退避期内不再被选择
+TEST(ReplicaSelectorTest, failure_backoff) {
+    auto selector = ReplicaSelector::Create("RANK", Host("rollout-0"), 0, 60000);
+    std::vector<TensorRDMAInfo> replicas{Replica("trainer-0", 1024), Replica("trainer-1", 1024)};
+    EXPECT_EQ(selector->Select(replicas, -1), 0);
+
+    selector->Acquire(replicas[0].node_info, 1024);
+    selector->Release(replicas[0].node_info, 1024, false);
+    EXPECT_EQ(selector->GetOutstandingBytes(replicas[0].node_info), 0);
+    EXPECT_EQ(selector->Select(replicas, -1), 1);
+
+    // 全部副本都失败时仍然可以选择
+    selector->Release(replicas[1].node_info, 0, false);
+    EXPECT_EQ(selector->Select(replicas, -1), 0);
+
+    auto no_backoff = ReplicaSelector::Create("RANK", Host("rollout-0"), 0, 0);
+    no_backoff->Release(replicas[0].node_info, 0, false);
+    EXPECT_EQ(no_backoff->Select(replicas, -1), 0);
+}
+
+// 测试轮询选择和非法参数
+TEST(ReplicaSelectorTest, round_robin_and_invalid) {
+    auto selector = ReplicaSelector::Create("ROUND_ROBIN", Host("rollout-0"), 1, 10000);
+    std::vector<TensorRDMAInfo> replicas{
+        Replica("trainer-0", 1024), Replica("trainer-1", 1024), Replica("trainer-2", 1024)};
+    EXPECT_EQ(selector->Select(replicas, -1), 1);
+    EXPECT_EQ(selector->Select(replicas, -1), 2);
+    EXPECT_EQ(selector->Select(replicas, -1), 0);
+
+    EXPECT_THROW(selector->Select({}, -1), std::invalid_argument);
+    EXPECT_THROW(ReplicaSelector::Create("RANDOM", Host("rollout-0"), 0, 10000), std::invalid_argument);
+}
@@ -0,0 +1,93 @@
+#include "core/resharding_planner.h"
+
+#include <cstdint>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+using namespace astate;
+
+namespace {
+
+GlobalParallelConfig TpConfig(int32_t tp_size) {
+    GlobalParallelConfig config;
+    config.tp_size = tp_size;
+    return config;
+}
+
+} // namespace
+
+// 测试按推理侧的块边界切分训练分片
+TEST(ReshardingPlannerTest, split_by_inference_blocks) {
+    ReshardingPlanner planner(TpConfig(2), TpConfig(4));
+    ASSERT_TRUE(planner.NeedsResharding());
+
+    // 列切分的分片[8, 8]，偏移8，覆盖推理侧的第2、3块
+    auto column_plan = planner.Plan(ShardedKey{"up_proj", {8, 16}, {0, 8}}, {8, 8});
+    ASSERT_EQ(column_plan.size(), 2);
+    EXPECT_EQ(GetDimIndex(column_plan[0]), 1);
+    EXPECT_EQ(GetStart(column_plan[0]), 0);
+    EXPECT_EQ(GetOffset(column_plan[0]), 4);
+    EXPECT_EQ(GetShardedKey(column_plan[0]).global_offset, (std::vector<int64_t>{0, 8}));
+    EXPECT_EQ(GetStart(column_plan[1]), 4);
+    EXPECT_EQ(GetShardedKey(column_plan[1]).global_offset, (std::vector<int64_t>{0, 12}));
+
+    // 行切分的分片沿第0维切分，每块在行主序下是连续的
+    auto row_plan = planner.Plan(ShardedKey{"down_proj", {16, 8}, {0, 0}}, {8, 8});
+    ASSERT_EQ(row_plan.size(), 2);
+    EXPECT_EQ(GetDimIndex(row_plan[0]), 0);
+    EXPECT_EQ(GetOffset(row_plan[1]), 4);
+    EXPECT_EQ(GetShardedKey(row_plan[1]).global_offset, (std::vector<int64_t>{4, 0}));
+}
+
+// 测试不需要切分的情况
+TEST(ReshardingPlannerTest, no_resharding) {
+    // 推理tp是训练tp的约数，训练分片总在一个推理块内
+    ReshardingPlanner coarse(TpConfig(4), TpConfig(2));
+    EXPECT_FALSE(coarse.NeedsResharding());
+    EXPECT_TRUE(coarse.Plan(ShardedKey{"up_proj", {8, 16}, {0, 4}}, {8, 4}).empty());
+
+    ReshardingPlanner planner(TpConfig(2), TpConfig(4));
+    // 分片只在一个推理块内
+    EXPECT_TRUE(planner.Plan(ShardedKey{"up_proj", {8, 16}, {0, 4}}, {8, 4}).empty());
+    // 无法整除推理tp的维度不切分
+    EXPECT_TRUE(planner.Plan(ShardedKey{"up_proj", {8, 18}, {0, 0}}, {8, 9}).empty());
+    // 训练侧未切分且没有指定维度
+    EXPECT_TRUE(planner.Plan(ShardedKey{"norm", {16}, {0}}, {16}).empty());
+    // 形状维数不一致
+    EXPECT_TRUE(planner.Plan(ShardedKey{"up_proj", {8, 16}, {0, 0}}, {8}).empty());
+}
+
+// 测试训练侧未切分的张量按指定维度切分
+TEST(ReshardingPlannerTest, replicated_tensor) {
+    ReshardingPlanner planner(TpConfig(1), TpConfig(4));
+    auto plan = planner.Plan(ShardedKey{"embed_tokens", {16, 8}, {0, 0}}, {16, 8}, 0);
+    ASSERT_EQ(plan.size(), 4);
+    for (size_t i = 0; i < plan.size(); ++i) {
+        EXPECT_EQ(GetDimIndex(plan[i]), 0);
+        EXPECT_EQ(GetStart(plan[i]), i * 4);
+        EXPECT_EQ(GetOffset(plan[i]), 4);
+    }
+
+    // 指定的维度只对训练侧未切分的张量生效
+    ReshardingPlanner partial(TpConfig(2), TpConfig(4));
+    auto partial_plan = partial.Plan(ShardedKey{"up_proj", {8, 16}, {0, 0}}, {8, 8}, 0);
+    ASSERT_EQ(partial_plan.size(), 2);
+    EXPECT_EQ(GetDimIndex(partial_plan[0]), 1);
+}
+
+// 测试只切分训练tp切分的维度，专家或pp切分的维度不按推理块切分
+TEST(ReshardingPlannerTest, tp_partitioned_dim_only) {
+    ReshardingPlanner planner(TpConfig(2), TpConfig(4));
+    // 第0维按ep=3切分并跨推理块，第2维按tp切分
+    auto expert_plan = planner.Plan(ShardedKey{"experts", {12, 8, 16}, {4, 0, 8}}, {4, 8, 8});
+    ASSERT_EQ(expert_plan.size(), 2);
+    EXPECT_EQ(GetDimIndex(expert_plan[0]), 2);
+    EXPECT_EQ(GetShardedKey(expert_plan[1]).global_offset, (std::vector<int64_t>{4, 0, 12}));
+
+    // 只有非tp切分的维度时不切分
+    EXPECT_TRUE(planner.Plan(ShardedKey{"experts", {12, 16}, {4, 0}}, {4, 16}).empty());
+    // 训练tp未切分的张量按指定维度切分，指定维度被其他方式切分时不切分
+    EXPECT_EQ(planner.Plan(ShardedKey{"experts", {12, 16}, {4, 0}}, {4, 16}, 1).size(), 4);
+    EXPECT_TRUE(planner.Plan(ShardedKey{"experts", {12, 16}, {4, 0}}, {4, 16}, 0).empty());
+}
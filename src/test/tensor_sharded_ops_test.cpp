@@ -1,5 +1,7 @@
 #include "core/tensor_sharded_ops.h"
 
+#include <chrono>
+#include <random>
 #include <stdexcept>
 #include <vector>
 
@@ -137,6 +139,54 @@ TEST_F(TensorShardedOpsTest, copy_tensor_with_sharded_keys_unsafe_no_overlap) {
     EXPECT_TRUE(torch::allclose(targetTensor, torch::zeros({2, 3})));
 }
 
+// ==================== CopyShardsToTensorUnsafe Tests ====================
+
+TEST_F(TensorShardedOpsTest, copy_shards_to_tensor_unsafe_same_as_aten_copy) {
+    // Column shards [8, 4] and row shards [4, 16] assembled into sub-regions of a [8, 16] tensor
+    std::vector<std::pair<ShardedKey, torch::Tensor>> shards;
+    for (int64_t col = 0; col < 16; col += 4) {
+        shards.emplace_back(createShardedKey("w", {8, 16}, {0, col}), torch::rand({8, 4}));
+    }
+    std::vector<std::pair<ShardedKey, const torch::Tensor*>> sources;
+    for (const auto& shard : shards) {
+        sources.emplace_back(shard.first, &shard.second);
+    }
+
+    for (const auto& target :
+         {std::make_pair(createShardedKey("w", {8, 16}, {0, 0}), std::vector<int64_t>{8, 16}),
+          std::make_pair(createShardedKey("w", {8, 16}, {1, 3}), std::vector<int64_t>{5, 7}),
+          std::make_pair(createShardedKey("w", {8, 16}, {2, 5}), std::vector<int64_t>{3, 1})}) {
+        auto targetTensor = torch::zeros(target.second);
+        auto expected = torch::zeros(target.second);
+        ASSERT_TRUE(CopyShardsToTensorUnsafe(sources, target.first, targetTensor));
+        for (const auto& shard : shards) {
+            CopyTensorWithShardedKeysUnsafe(shard.first, shard.second, target.first, expected);
+        }
+        EXPECT_TRUE(torch::equal(targetTensor, expected));
+    }
+}
+
+TEST_F(TensorShardedOpsTest, copy_shards_to_tensor_unsafe_strided_views) {
+    // Copy a narrowed view into its local copy, as the resharded tensors on the write path
+    auto srcTensor = torch::rand({4, 32, 8});
+    auto view = srcTensor.narrow(1, 8, 16);
+    auto key = createShardedKey("w", {4, 16, 8}, {0, 0, 0});
+    auto localCopy = torch::zeros({4, 16, 8});
+    ASSERT_TRUE(CopyShardsToTensorUnsafe({{key, &view}}, key, localCopy));
+    EXPECT_TRUE(torch::equal(localCopy, view));
+
+    // The innermost dimension is not contiguous, nothing is copied
+    auto transposed = torch::rand({8, 4}).t();
+    auto target = torch::zeros({4, 8});
+    auto transposedKey = createShardedKey("w", {4, 8}, {0, 0});
+    EXPECT_FALSE(CopyShardsToTensorUnsafe({{transposedKey, &transposed}}, transposedKey, target));
+    EXPECT_TRUE(torch::equal(target, torch::zeros({4, 8})));
+
+    // Mismatched dtype
+    auto intTensor = torch::ones({4, 8}, torch::kInt32);
+    EXPECT_FALSE(CopyShardsToTensorUnsafe({{transposedKey, &intTensor}}, transposedKey, target));
+}
+
 // ==================== CoordsToFlatIndex Tests ====================
 
 TEST_F(TensorShardedOpsTest, coords_to_flat_index_2d) {
@@ -235,6 +285,43 @@ TEST_F(TensorShardedOpsTest, interval_merging_edge_cases) {
     EXPECT_EQ(intervals1[0].second, intervals2[0].first);
 }
 
+TEST_F(TensorShardedOpsTest, copy_region_to_segments) {
+    // Columns [2, 6) of rows [1, 3) in a contiguous [4, 8] tensor: one segment per row
+    auto srcTensor = createATensor(createTensor({4, 8}));
+    auto segments = CopyRegionToSegments(*srcTensor, {1, 2}, {2, 4}, 0);
+    ASSERT_EQ(segments.size(), 2);
+    EXPECT_EQ(segments[0], std::make_pair<int64_t, int64_t>(0, 4));
+    EXPECT_EQ(segments[1], std::make_pair<int64_t, int64_t>(8, 12));
+
+    // The gap of 4 elements between the rows is merged
+    segments = CopyRegionToSegments(*srcTensor, {1, 2}, {2, 4}, 4);
+    ASSERT_EQ(segments.size(), 1);
+    EXPECT_EQ(segments[0], std::make_pair<int64_t, int64_t>(0, 12));
+
+    // Full rows are contiguous
+    segments = CopyRegionToSegments(*srcTensor, {1, 0}, {2, 8}, 0);
+    ASSERT_EQ(segments.size(), 1);
+    EXPECT_EQ(segments[0], std::make_pair<int64_t, int64_t>(0, 16));
+
+    // 3D case
+    auto src3d = createATensor(createTensor({2, 3, 4}));
+    segments = CopyRegionToSegments(*src3d, {0, 1, 1}, {2, 2, 2}, 0);
+    ASSERT_EQ(segments.size(), 4);
+    EXPECT_EQ(segments[1], std::make_pair<int64_t, int64_t>(4, 6));
+    EXPECT_EQ(segments[3], std::make_pair<int64_t, int64_t>(16, 18));
+}
+
+TEST_F(TensorShardedOpsTest, copy_region_to_segments_unsupported) {
+    // Non-contiguous source tensor
+    auto transposed = createATensor(createTensor({8, 4}).t());
+    EXPECT_TRUE(CopyRegionToSegments(*transposed, {0, 0}, {2, 2}, 0).empty());
+
+    // Empty region and mismatched dimensions
+    auto srcTensor = createATensor(createTensor({4, 8}));
+    EXPECT_TRUE(CopyRegionToSegments(*srcTensor, {1, 2}, {0, 4}, 0).empty());
+    EXPECT_TRUE(CopyRegionToSegments(*srcTensor, {1}, {2}, 0).empty());
+}
+
 // ==================== ValidateCandidateFilterParams Tests ====================
 
 TEST_F(TensorShardedOpsTest, validate_candidate_filter_params_valid) {
@@ -664,6 +751,119 @@ TEST_F(TensorShardedOpsTest, large_number_of_candidates) {
     EXPECT_NO_THROW(FindCoveringCandidates(candidates, targetShard, *targetTensor));
 }
 
+// ==================== ShardIntervalIndex Tests ====================
+
+TEST_F(TensorShardedOpsTest, shard_interval_index_same_as_linear_search) {
+    auto src_torch_tensor = createTensor({10, 10});
+    auto srcTensor = createATensor(src_torch_tensor);
+    std::vector<std::pair<ShardedKey, ATensor>> candidates;
+    for (int i = 9; i >= 0; --i) {
+        for (int j = 0; j < 10; ++j) {
+            candidates.push_back({createShardedKey("c", {100, 100}, {i * 10, j * 10}), *srcTensor});
+        }
+    }
+    ShardIntervalIndex index(candidates);
+    ASSERT_EQ(index.Size(), candidates.size());
+
+    auto targetShard = createShardedKey("target", {100, 100}, {25, 35});
+    auto target_torch_tensor = createTensor({50, 20});
+    auto targetTensor = createATensor(target_torch_tensor);
+    auto expected = FindCoveringCandidates(candidates, targetShard, *targetTensor);
+    auto copyOps = index.FindCoveringCandidates(targetShard, *targetTensor);
+    ASSERT_EQ(copyOps.size(), expected.size());
+    for (size_t i = 0; i < copyOps.size(); ++i) {
+        EXPECT_EQ(copyOps[i].candidate_index, expected[i].candidate_index);
+        EXPECT_EQ(copyOps[i].src_offset, expected[i].src_offset);
+        EXPECT_EQ(copyOps[i].target_offset, expected[i].target_offset);
+        EXPECT_EQ(copyOps[i].copy_shape, expected[i].copy_shape);
+    }
+}
+
+TEST_F(TensorShardedOpsTest, shard_interval_index_coverage) {
+    auto src_torch_tensor1 = createTensor({4, 8});
+    auto srcTensor1 = createATensor(src_torch_tensor1);
+    auto src_torch_tensor2 = createTensor({3, 8});
+    auto srcTensor2 = createATensor(src_torch_tensor2);
+    auto target_torch_tensor = createTensor({8, 8});
+    auto targetTensor = createATensor(target_torch_tensor);
+    auto targetShard = createShardedKey("target", {8, 8}, {0, 0});
+
+    // Rows [4, 5) are missing
+    ShardIntervalIndex gap_index(
+        {{createShardedKey("c1", {8, 8}, {0, 0}), *srcTensor1}, {createShardedKey("c2", {8, 8}, {5, 0}), *srcTensor2}});
+    EXPECT_THROW((void)gap_index.FindCoveringCandidates(targetShard, *targetTensor), std::runtime_error);
+
+    // Overlapping candidates with the same volume as the target, rows [6, 8) are missing
+    ShardIntervalIndex overlap_index(
+        {{createShardedKey("c1", {8, 8}, {0, 0}), *srcTensor1}, {createShardedKey("c2", {8, 8}, {2, 0}), *srcTensor1}});
+    EXPECT_THROW((void)overlap_index.FindCoveringCandidates(targetShard, *targetTensor), std::runtime_error);
+
+    // Overlapping candidates covering the target
+    auto partialShard = createShardedKey("target", {8, 8}, {1, 0});
+    auto partial_torch_tensor = createTensor({5, 8});
+    auto partialTensor = createATensor(partial_torch_tensor);
+    EXPECT_EQ(overlap_index.FindCoveringCandidates(partialShard, *partialTensor).size(), 2);
+
+    // Mismatched target and empty index
+    auto mismatchShard = createShardedKey("target", {8, 16}, {0, 0});
+    EXPECT_THROW((void)overlap_index.FindCoveringCandidates(mismatchShard, *targetTensor), std::runtime_error);
+    EXPECT_THROW((void)ShardIntervalIndex().FindCoveringCandidates(targetShard, *targetTensor), std::runtime_error);
+}
+
+// Takes seconds, run it explicitly with --gtest_also_run_disabled_tests
+TEST_F(TensorShardedOpsTest, DISABLED_shard_interval_index_benchmark) {
+    // Query 9x9 targets over a grid of 4x4 candidate shards with 100 columns, compared with the linear search
+    auto src_torch_tensor = createTensor({4, 4});
+    auto srcTensor = createATensor(src_torch_tensor);
+    auto target_torch_tensor = createTensor({9, 9});
+    auto targetTensor = createATensor(target_torch_tensor);
+    std::mt19937 gen(42);
+    const int64_t cols = 100;
+    const int query_num = 100;
+    for (int64_t candidate_num : {1000, 10000, 100000}) {
+        const int64_t rows = candidate_num / cols;
+        std::vector<std::pair<ShardedKey, ATensor>> candidates;
+        candidates.reserve(candidate_num);
+        for (int64_t i = 0; i < rows; ++i) {
+            for (int64_t j = 0; j < cols; ++j) {
+                candidates.push_back({createShardedKey("c", {rows * 4, cols * 4}, {i * 4, j * 4}), *srcTensor});
+            }
+        }
+        std::shuffle(candidates.begin(), candidates.end(), gen);
+
+        std::uniform_int_distribution<int64_t> row_dist(0, (rows * 4) - 9);
+        std::uniform_int_distribution<int64_t> col_dist(0, (cols * 4) - 9);
+        std::vector<ShardedKey> targetShards;
+        for (int q = 0; q < query_num; ++q) {
+            targetShards.push_back(createShardedKey("target", {rows * 4, cols * 4}, {row_dist(gen), col_dist(gen)}));
+        }
+
+        auto build_start = std::chrono::high_resolution_clock::now();
+        ShardIntervalIndex index(candidates);
+        auto linear_start = std::chrono::high_resolution_clock::now();
+        size_t linear_ops = 0;
+        for (const auto& targetShard : targetShards) {
+            linear_ops += FindCoveringCandidates(candidates, targetShard, *targetTensor).size();
+        }
+        auto index_start = std::chrono::high_resolution_clock::now();
+        size_t index_ops = 0;
+        for (const auto& targetShard : targetShards) {
+            index_ops += index.FindCoveringCandidates(targetShard, *targetTensor).size();
+        }
+        auto index_end = std::chrono::high_resolution_clock::now();
+
+        EXPECT_EQ(index_ops, linear_ops);
+        auto to_us
+            = [](auto duration) { return std::chrono::duration_cast<std::chrono::microseconds>(duration).count(); };
+        SPDLOG_INFO(
+            "candidates: {}, build: {} us, linear search: {} us/query, interval index: {} us/query",
+            candidate_num,
+            to_us(linear_start - build_start),
+            to_us(index_start - linear_start) / query_num,
+            to_us(index_end - index_start) / query_num);
+    }
+}
+
 // ==================== Integration Tests ====================
 
 TEST_F(TensorShardedOpsTest, integration_test_complete_workflow) {
@@ -5,8 +5,11 @@
 #include <fstream>
 #include <future>
 #include <memory>
+#include <mutex>
 #include <string>
 #include <thread>
+#include <utility>
+#include <vector>
 
 #include <gtest/gtest.h>
 #include <spdlog/spdlog.h>
@@ -15,6 +18,7 @@
 #include "common/option.h"
 #include "core/atensor.h"
 #include "core/shardedkey.h"
+#include "core/utils.h"
 #include "transport/base_transport.h"
 #include "transport/rdma_transporter.h"
 #include "types.h"
@@ -66,13 +70,38 @@ class MockRDMATransporter : public RDMATransporter {
         const ExtendInfo* extend_info) override {
         const void* remote_addr = GetRemoteAddrFromExtendInfo(extend_info);
         memcpy(const_cast<void*>(recv_data), remote_addr, recv_size);
+        {
+            std::lock_guard<std::mutex> lock(received_mutex_);
+            received_.emplace_back(remote_addr, recv_size);
+        }
         return true;
     }
 
+    // Receive in the calling thread, as the async thread pool is only created by the real Start
+    void AsyncReceive(
+        const void* recv_data,
+        size_t recv_size,
+        const std::string& remote_host,
+        int remote_port,
+        const ExtendInfo* extend_info,
+        const ReceiveCallback& callback) override {
+        bool success = Receive(recv_data, recv_size, remote_host, remote_port, extend_info);
+        callback(success ? recv_data : nullptr, success ? recv_size : 0);
+    }
+
+    // Remote ranges read by Receive: <remote address, size>
+    std::vector<std::pair<const void*, size_t>> GetReceived() {
+        std::lock_guard<std::mutex> lock(received_mutex_);
+        return received_;
+    }
+
  private:
     std::string generateDataKey(const ExtendInfo* extend_info) {
         return std::to_string(reinterpret_cast<uintptr_t>(GetRemoteAddrFromExtendInfo(extend_info)));
     }
+
+    std::mutex received_mutex_;
+    std::vector<std::pair<const void*, size_t>> received_;
 };
 
 // No need to mock HTTP transporter - use real HTTP for control messages
@@ -80,8 +109,42 @@ class MockRDMATransporter : public RDMATransporter {
 // Enhanced TensorTransferPull that always uses HTTP for control messages and Mock RDMA for data transfer
 class TestTensorTransferPull : public TensorTransferPull {
  public:
-    TestTensorTransferPull() { data_rdma_transport_ = std::make_unique<MockRDMATransporter>(); }
+    TestTensorTransferPull() {
+        auto transport = std::make_unique<MockRDMATransporter>();
+        mock_transport_ = transport.get();
+        data_rdma_transport_ = std::move(transport);
+    }
     virtual ~TestTensorTransferPull() {}
+
+    MockRDMATransporter* GetMockTransport() { return mock_transport_; }
+
+    using TensorTransferPull::WaitForAllTensorReady;
+
+    // Remote address of the first replica of the tensor cached for the seq, nullptr if it is not cached
+    void* GetCachedRemoteAddr(int64_t seq_id, const ShardedKey& tensor_key) {
+        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
+        auto cache_it = remote_tensor_cache_.find(seq_id);
+        if (cache_it == remote_tensor_cache_.end()) {
+            return nullptr;
+        }
+        const auto* replicas = GetTensorRDMAInfoVector(tensor_key, cache_it->second);
+        return replicas == nullptr || replicas->empty() ? nullptr : replicas->front().addr;
+    }
+
+    // Whether any replica of the tensor is ready to be read for the seq
+    bool IsTensorReadable(int64_t seq_id, const ShardedKey& tensor_key) {
+        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
+        return !GetReadyReplicasUnsafe(seq_id, tensor_key).empty();
+    }
+
+    // Handle a weight ready message as if it was sent by the first peer
+    ResponseStatus ReceiveWeightReady(int64_t seq_id, uint64_t layout_hash) {
+        auto message = Serialize(ToJson(WeightReadyMessage{seq_id, peer_hosts_.front(), layout_hash, {}}));
+        return HandleWeightReady(WEIGHT_READY_REQUEST, message.c_str(), message.size());
+    }
+
+ private:
+    MockRDMATransporter* mock_transport_ = nullptr;
 };
 
 class TensorTransferPullIntegrationTest : public ::testing::Test {
@@ -162,6 +225,17 @@ class TensorTransferPullIntegrationTest : public ::testing::Test {
         return tensor;
     }
 
+    // Byte tensor of rows x cols whose rows are row_stride bytes apart
+    ATensor createTestTensor2D(int64_t rows, int64_t cols, int64_t row_stride, bool init_data = true) {
+        ATensor tensor = createTestTensor(static_cast<size_t>(((rows - 1) * row_stride) + cols), init_data);
+        delete[] tensor.size;
+        delete[] tensor.stride;
+        tensor.dim_num = 2;
+        tensor.size = new int64_t[2]{rows, cols};
+        tensor.stride = new int64_t[2]{row_stride, 1};
+        return tensor;
+    }
+
     void cleanupTensor(ATensor& tensor) {
         if (tensor.storage.data) {
             free(tensor.storage.data);
@@ -536,6 +610,248 @@ TEST_F(TensorTransferPullIntegrationTest, DualServerMultiTensorCommunication) {
     SPDLOG_INFO("Multi-tensor communication test completed");
 }
 
+// Test reading a column range of a contiguous shard by the segments of its memory
+TEST_F(TensorTransferPullIntegrationTest, DualServerSegmentMultiGet) {
+    ASSERT_TRUE(put_service_->Start(put_options_, parallel_config_)) << "PUT service should start";
+    ASSERT_TRUE(get_service_->Start(get_options_, parallel_config_)) << "GET service should start";
+
+    const int64_t rows = 8;
+    const int64_t cols = 16;
+    const int64_t seq_id = 200;
+    ShardedKey tensor_key;
+    tensor_key.key = "segment_test";
+    tensor_key.global_shape = {rows, cols};
+    tensor_key.global_offset = {0, 0};
+    ATensor put_tensor = createTestTensor2D(rows, cols, cols);
+    ASSERT_TRUE(put_service_->Put(seq_id, tensor_key, put_tensor));
+
+    // Columns [4, 12) of all the rows, which are 8 segments of 8 bytes with the gaps of 8 bytes between them
+    ATensor region{put_tensor};
+    ShardedKey region_key{tensor_key};
+    std::vector<std::pair<int64_t, int64_t>> segments;
+    ASSERT_TRUE(TryAdjustGlobalOffsetWithSegments(region, {rows, 8}, {0, 4}, 0, rows, region_key, segments));
+    EXPECT_EQ(region.storage_offset, 4);
+    EXPECT_EQ(region.size[1], 8);
+    EXPECT_EQ(region_key.global_offset, std::vector<int64_t>({0, 4}));
+    ASSERT_EQ(segments.size(), static_cast<size_t>(rows));
+    EXPECT_EQ(segments.front(), std::make_pair(int64_t{0}, int64_t{8}));
+    EXPECT_EQ(segments.back(), std::make_pair(int64_t{112}, int64_t{120}));
+
+    // The region keeps the layout of the remote shard, so the local tensor spans until the last segment
+    ATensor get_tensor = createTestTensor2D(rows, 8, cols, false);
+    get_tensor.storage_offset = region.storage_offset;
+    std::vector<TensorSegment> byte_segments;
+    for (const auto& segment : segments) {
+        byte_segments.push_back(
+            TensorSegment{static_cast<size_t>(segment.first), static_cast<size_t>(segment.second - segment.first)});
+    }
+    std::vector<std::pair<ShardedKey, ATensor>> get_tensors;
+    get_tensors.emplace_back(tensor_key, std::move(get_tensor));
+    ASSERT_TRUE(get_service_->MultiGet(seq_id, get_tensors, {byte_segments}));
+
+    // The segments land at their offsets, and the gaps are left untouched
+    const auto* put_data = static_cast<const uint8_t*>(put_tensor.storage.data);
+    const auto* get_data = static_cast<const uint8_t*>(get_tensors[0].second.storage.data);
+    for (int64_t row = 0; row < rows; ++row) {
+        for (int64_t col = 0; col < cols && (row * cols) + col < 120; ++col) {
+            auto index = (row * cols) + col;
+            if (col < 8) {
+                EXPECT_EQ(get_data[index], put_data[index + 4]) << "row " << row << ", col " << col;
+            } else {
+                EXPECT_EQ(get_data[index], 0) << "gap of row " << row << ", col " << col;
+            }
+        }
+    }
+
+    // Only the segments are read from the remote shard
+    std::vector<std::pair<const void*, size_t>> segment_reads;
+    for (const auto& read : get_service_->GetMockTransport()->GetReceived()) {
+        if (read.first >= put_data && read.first < put_data + (rows * cols)) {
+            segment_reads.push_back(read);
+        }
+    }
+    ASSERT_EQ(segment_reads.size(), byte_segments.size());
+    for (const auto& read : segment_reads) {
+        auto offset = static_cast<const uint8_t*>(read.first) - put_data - region.storage_offset;
+        EXPECT_EQ(offset % cols, 0) << "read at the gap offset " << offset;
+        EXPECT_EQ(read.second, size_t{8});
+    }
+
+    EXPECT_NO_THROW(get_service_->Complete());
+    EXPECT_NO_THROW(put_service_->Complete());
+    cleanupTensor(put_tensor);
+    cleanupTensor(get_tensors[0].second);
+    put_service_->Stop();
+    get_service_->Stop();
+}
+
+// Test the delta metas across the seqs: a reallocated tensor, a removed tensor and the steady state without metas
+TEST_F(TensorTransferPullIntegrationTest, DualServerDeltaLayoutAcrossSeqs) {
+    ASSERT_TRUE(put_service_->Start(put_options_, parallel_config_)) << "PUT service should start";
+    ASSERT_TRUE(get_service_->Start(get_options_, parallel_config_)) << "GET service should start";
+
+    const size_t tensor_size = 256;
+    ShardedKey moved_key = createTestKey("delta_moved");
+    ShardedKey removed_key = createTestKey("delta_removed");
+    ATensor moved_tensor = createTestTensor(tensor_size);
+    ATensor removed_tensor = createTestTensor(tensor_size);
+    ATensor reallocated_tensor = createTestTensor(tensor_size);
+    ATensor get_tensor = createTestTensor(tensor_size, false);
+    auto all_keys = [](const ShardedKey& /*key*/) { return true; };
+
+    // Seq 1: all the metas are published
+    ASSERT_TRUE(put_service_->MultiPut(1, {{moved_key, moved_tensor}, {removed_key, removed_tensor}}));
+    ASSERT_TRUE(get_service_->Get(1, removed_key, get_tensor));
+    EXPECT_EQ(memcmp(removed_tensor.storage.data, get_tensor.storage.data, tensor_size), 0);
+    ASSERT_TRUE(get_service_->Get(1, moved_key, get_tensor));
+    EXPECT_EQ(memcmp(moved_tensor.storage.data, get_tensor.storage.data, tensor_size), 0);
+    EXPECT_NO_THROW(get_service_->Complete());
+    EXPECT_NO_THROW(put_service_->Complete());
+    EXPECT_EQ(get_service_->GetCachedRemoteAddr(1, moved_key), moved_tensor.storage.data);
+    uint64_t layout_version = get_service_->GetRemoteLayoutVersion();
+
+    // Seq 2: the moved tensor is reallocated and the removed tensor is not put, the reader sees both once the writer
+    // completes
+    memset(reallocated_tensor.storage.data, 0xA5, tensor_size);
+    ASSERT_TRUE(put_service_->Put(2, moved_key, reallocated_tensor));
+    auto put_complete = std::async(std::launch::async, [this]() { put_service_->Complete(); });
+    auto shards = get_service_->GetAllTensorShards(2, all_keys);
+    ASSERT_EQ(shards.size(), 1U);
+    EXPECT_EQ(shards[0].first.key, moved_key.key);
+    EXPECT_EQ(get_service_->GetCachedRemoteAddr(2, moved_key), reallocated_tensor.storage.data);
+    EXPECT_EQ(get_service_->GetCachedRemoteAddr(2, removed_key), nullptr);
+    EXPECT_GT(get_service_->GetRemoteLayoutVersion(), layout_version);
+    ASSERT_TRUE(get_service_->Get(2, moved_key, get_tensor));
+    EXPECT_EQ(memcmp(reallocated_tensor.storage.data, get_tensor.storage.data, tensor_size), 0);
+    EXPECT_NO_THROW(get_service_->Complete());
+    put_complete.get();
+
+    // Seq 3: nothing is reallocated, so the metas of seq 2 are rebased without any meta message
+    layout_version = get_service_->GetRemoteLayoutVersion();
+    memset(reallocated_tensor.storage.data, 0x5A, tensor_size);
+    ASSERT_TRUE(put_service_->Put(3, moved_key, reallocated_tensor));
+    // A layout hash mismatching the patched metas is rejected, and the node is not treated as ready
+    EXPECT_FALSE(get_service_->ReceiveWeightReady(3, 1).success);
+    put_complete = std::async(std::launch::async, [this]() { put_service_->Complete(); });
+    shards = get_service_->GetAllTensorShards(3, all_keys);
+    ASSERT_EQ(shards.size(), 1U);
+    EXPECT_EQ(get_service_->GetCachedRemoteAddr(3, moved_key), reallocated_tensor.storage.data);
+    EXPECT_EQ(get_service_->GetRemoteLayoutVersion(), layout_version);
+    ASSERT_TRUE(get_service_->Get(3, moved_key, get_tensor));
+    EXPECT_EQ(memcmp(reallocated_tensor.storage.data, get_tensor.storage.data, tensor_size), 0);
+    EXPECT_NO_THROW(get_service_->Complete());
+    put_complete.get();
+
+    cleanupTensor(moved_tensor);
+    cleanupTensor(removed_tensor);
+    cleanupTensor(reallocated_tensor);
+    cleanupTensor(get_tensor);
+    put_service_->Stop();
+    get_service_->Stop();
+}
+
+// Test a tensor announced by TENSOR_READY_REQUEST is read before the writer completes the seq
+TEST_F(TensorTransferPullIntegrationTest, DualServerTensorReadyStreaming) {
+    ASSERT_TRUE(put_service_->Start(put_options_, parallel_config_)) << "PUT service should start";
+    ASSERT_TRUE(get_service_->Start(get_options_, parallel_config_)) << "GET service should start";
+
+    const size_t tensor_size = 256;
+    ShardedKey announced_key = createTestKey("streaming_announced");
+    ShardedKey pending_key = createTestKey("streaming_pending");
+    ATensor announced_tensor = createTestTensor(tensor_size);
+    ATensor pending_tensor = createTestTensor(tensor_size);
+    ATensor get_tensor = createTestTensor(tensor_size, false);
+
+    // Seq 1: the metas are published and the seq is completed, tensor readiness is streamed from the next seq on
+    ASSERT_TRUE(put_service_->MultiPut(1, {{announced_key, announced_tensor}, {pending_key, pending_tensor}}));
+    ASSERT_TRUE(get_service_->Get(1, announced_key, get_tensor));
+    ASSERT_TRUE(get_service_->Get(1, pending_key, get_tensor));
+    EXPECT_NO_THROW(get_service_->Complete());
+    EXPECT_NO_THROW(put_service_->Complete());
+
+    // Seq 2: only the announced tensor is put, the reader fetches it while the writer has not completed
+    memset(announced_tensor.storage.data, 0xA5, tensor_size);
+    ASSERT_TRUE(put_service_->Put(2, announced_key, announced_tensor));
+    ASSERT_TRUE(get_service_->Get(2, announced_key, get_tensor));
+    EXPECT_EQ(memcmp(announced_tensor.storage.data, get_tensor.storage.data, tensor_size), 0);
+    // The tensor not announced yet stays blocked until the writer completes
+    EXPECT_TRUE(get_service_->IsTensorReadable(2, announced_key));
+    EXPECT_FALSE(get_service_->IsTensorReadable(2, pending_key));
+
+    memset(pending_tensor.storage.data, 0x5A, tensor_size);
+    ASSERT_TRUE(put_service_->Put(2, pending_key, pending_tensor));
+    auto put_complete = std::async(std::launch::async, [this]() { put_service_->Complete(); });
+    ASSERT_TRUE(get_service_->Get(2, pending_key, get_tensor));
+    EXPECT_EQ(memcmp(pending_tensor.storage.data, get_tensor.storage.data, tensor_size), 0);
+    EXPECT_NO_THROW(get_service_->Complete());
+    put_complete.get();
+
+    cleanupTensor(announced_tensor);
+    cleanupTensor(pending_tensor);
+    cleanupTensor(get_tensor);
+    put_service_->Stop();
+    get_service_->Stop();
+}
+
+// Test a reader waiting for all the tensors ready is woken by the writer's weight ready message
+TEST_F(TensorTransferPullIntegrationTest, DualServerWaitWokenByComplete) {
+    ASSERT_TRUE(put_service_->Start(put_options_, parallel_config_)) << "PUT service should start";
+    ASSERT_TRUE(get_service_->Start(get_options_, parallel_config_)) << "GET service should start";
+
+    const size_t tensor_size = 256;
+    ShardedKey tensor_key = createTestKey("wait_woken");
+    ATensor put_tensor = createTestTensor(tensor_size);
+    ATensor get_tensor = createTestTensor(tensor_size, false);
+    ASSERT_TRUE(put_service_->Put(1, tensor_key, put_tensor));
+    ASSERT_TRUE(get_service_->Get(1, tensor_key, get_tensor));
+
+    auto all_keys = [](const ShardedKey& /*key*/) { return true; };
+    auto shards = std::async(std::launch::async, [&]() { return get_service_->GetAllTensorShards(1, all_keys); });
+    // The reader blocks until the writer completes the seq
+    EXPECT_EQ(shards.wait_for(std::chrono::milliseconds(200)), std::future_status::timeout);
+
+    auto start_time = std::chrono::steady_clock::now();
+    auto put_complete = std::async(std::launch::async, [this]() { put_service_->Complete(); });
+    ASSERT_EQ(shards.wait_for(std::chrono::milliseconds(1000)), std::future_status::ready);
+    EXPECT_LT(std::chrono::steady_clock::now() - start_time, std::chrono::milliseconds(1000));
+    EXPECT_EQ(shards.get().size(), 1U);
+    EXPECT_NO_THROW(get_service_->Complete());
+    put_complete.get();
+
+    cleanupTensor(put_tensor);
+    cleanupTensor(get_tensor);
+    put_service_->Stop();
+    get_service_->Stop();
+}
+
+// Test a wait which no control message satisfies is reported as failure once it times out
+TEST_F(TensorTransferPullIntegrationTest, DualServerWaitTimeout) {
+    ASSERT_TRUE(put_service_->Start(put_options_, parallel_config_)) << "PUT service should start";
+    ASSERT_TRUE(get_service_->Start(get_options_, parallel_config_)) << "GET service should start";
+
+    const size_t tensor_size = 256;
+    ShardedKey tensor_key = createTestKey("wait_timeout");
+    ATensor put_tensor = createTestTensor(tensor_size);
+    ATensor get_tensor = createTestTensor(tensor_size, false);
+    ASSERT_TRUE(put_service_->Put(1, tensor_key, put_tensor));
+    ASSERT_TRUE(get_service_->Get(1, tensor_key, get_tensor));
+
+    // The writer has not completed the seq, so the wait times out
+    auto start_time = std::chrono::steady_clock::now();
+    EXPECT_FALSE(get_service_->WaitForAllTensorReady(1, 200));
+    EXPECT_GE(std::chrono::steady_clock::now() - start_time, std::chrono::milliseconds(200));
+
+    auto put_complete = std::async(std::launch::async, [this]() { put_service_->Complete(); });
+    EXPECT_TRUE(get_service_->WaitForAllTensorReady(1, 2000));
+    EXPECT_NO_THROW(get_service_->Complete());
+    put_complete.get();
+
+    cleanupTensor(put_tensor);
+    cleanupTensor(get_tensor);
+    put_service_->Stop();
+    get_service_->Stop();
+}
+
 // Test concurrent dual server operations with mock RDMA
 TEST_F(TensorTransferPullIntegrationTest, DualServerConcurrentOperations) {
     // This test verifies that servers handle various error conditions gracefully
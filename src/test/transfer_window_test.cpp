@@ -0,0 +1,158 @@
+#include "transport/transfer_window.h"
+
+#include <chrono>
+#include <cstdint>
+#include <memory>
+#include <numeric>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+
+#include "common/option.h"
+#include "transfer/replica_selector.h"
+#include "transport/fake_transporter.h"
+#include "transport/rdma_transporter.h"
+
+namespace astate {
+class TransferWindowTest : public ::testing::Test {
+ public:
+    static constexpr size_t kAsyncThreadNum = 16;
+    static constexpr size_t kBufferNum = 64;
+    static constexpr size_t kBufferSize = 4096;
+
+    void SetUp() override {
+        transport_ = std::make_unique<FakeTransporter>(kAsyncThreadNum);
+        ASSERT_TRUE(transport_->Start(options_, parallel_config_));
+
+        // 远端数据为递增序列，本地缓冲区初始化为0
+        remote_buffers_.resize(kBufferNum, std::vector<uint8_t>(kBufferSize));
+        local_buffers_.resize(kBufferNum, std::vector<uint8_t>(kBufferSize, 0));
+        for (size_t i = 0; i < kBufferNum; ++i) {
+            std::iota(remote_buffers_[i].begin(), remote_buffers_[i].end(), static_cast<uint8_t>(i));
+        }
+    }
+
+    void TearDown() override { transport_->Stop(); }
+
+ protected:
+    Options options_;
+    AParallelConfig parallel_config_{};
+    std::unique_ptr<FakeTransporter> transport_;
+    std::vector<std::vector<uint8_t>> remote_buffers_;
+    std::vector<std::vector<uint8_t>> local_buffers_;
+};
+
+// 测试窗口内的异步读取全部完成且数据正确，同时在途传输数不超过窗口大小
+TEST_F(TransferWindowTest, AsyncReceiveWithinWindow) {
+    transport_->SetLatency(std::chrono::milliseconds(2));
+    TransferWindow window(transport_.get(), 8);
+
+    TransferBatch batch;
+    for (size_t i = 0; i < kBufferNum; ++i) {
+        window.AsyncReceive(
+            local_buffers_[i].data(),
+            kBufferSize,
+            "127.0.0.1",
+            0,
+            GetExtendInfoFromRemoteAddr(remote_buffers_[i].data()),
+            batch);
+    }
+    EXPECT_TRUE(batch.Wait());
+
+    EXPECT_EQ(transport_->GetTransferCount(), kBufferNum);
+    EXPECT_LE(transport_->GetMaxInflightCount(), 8U);
+    EXPECT_GT(transport_->GetMaxInflightCount(), 1U);
+    EXPECT_EQ(window.GetInflightCount(), 0U);
+    for (size_t i = 0; i < kBufferNum; ++i) {
+        EXPECT_EQ(local_buffers_[i], remote_buffers_[i]) << "Buffer " << i << " data should match";
+    }
+}
+
+// 测试同步读取
+TEST_F(TransferWindowTest, Receive) {
+    TransferWindow window(transport_.get(), 1);
+    EXPECT_TRUE(window.Receive(
+        local_buffers_[0].data(), kBufferSize, "127.0.0.1", 0, GetExtendInfoFromRemoteAddr(remote_buffers_[0].data())));
+    EXPECT_EQ(local_buffers_[0], remote_buffers_[0]);
+}
+
+// 测试传输失败时批次返回失败
+TEST_F(TransferWindowTest, FailedTransfer) {
+    transport_->SetFailure(true);
+    TransferWindow window(transport_.get(), 4);
+
+    TransferBatch batch;
+    for (size_t i = 0; i < 8; ++i) {
+        window.AsyncReceive(
+            local_buffers_[i].data(),
+            kBufferSize,
+            "127.0.0.1",
+            0,
+            GetExtendInfoFromRemoteAddr(remote_buffers_[i].data()),
+            batch);
+    }
+    EXPECT_FALSE(batch.Wait());
+    EXPECT_EQ(window.GetInflightCount(), 0U);
+}
+
+// 测试批次内每个传输的结果，只有失败节点的传输失败
+TEST_F(TransferWindowTest, TransferResultsByHost) {
+    transport_->SetFailedHost("trainer-1");
+    TransferWindow window(transport_.get(), 4);
+
+    TransferBatch batch;
+    std::vector<size_t> indexes;
+    for (size_t i = 0; i < 8; ++i) {
+        indexes.push_back(window.AsyncReceive(
+            local_buffers_[i].data(),
+            kBufferSize,
+            "trainer-" + std::to_string(i % 2),
+            0,
+            GetExtendInfoFromRemoteAddr(remote_buffers_[i].data()),
+            batch));
+    }
+    EXPECT_FALSE(batch.Wait());
+    for (size_t i = 0; i < 8; ++i) {
+        EXPECT_EQ(indexes[i], i);
+        EXPECT_EQ(batch.IsSucceeded(indexes[i]), i % 2 == 0) << "Transfer " << i;
+    }
+    EXPECT_EQ(transport_->GetTransferCount(), 4U);
+}
+
+// 测试副本读取失败后按实际结果释放，副本选择器在退避期内不再选择失败的副本
+TEST_F(TransferWindowTest, FailedReplicaSkippedBySelector) {
+    transport_->SetFailedHost("trainer-0");
+    TransferWindow window(transport_.get(), 4);
+    auto selector = ReplicaSelector::Create("RANK", NodeInfo{"rollout-0", 8000, 9000}, 0, 60000);
+    std::vector<TensorRDMAInfo> replicas;
+    for (size_t i = 0; i < 2; ++i) {
+        replicas.emplace_back(
+            remote_buffers_[i].data(), kBufferSize, "", NodeInfo{"trainer-" + std::to_string(i), 8000, 9000});
+    }
+
+    auto read_replica = [&](size_t buffer_index) {
+        const auto& replica = replicas[selector->Select(replicas, -1)];
+        selector->Acquire(replica.node_info, kBufferSize);
+        TransferBatch batch;
+        size_t index = window.AsyncReceive(
+            local_buffers_[buffer_index].data(),
+            kBufferSize,
+            replica.node_info.hostname_or_ip,
+            replica.node_info.rdma_port,
+            GetExtendInfoFromRemoteAddr(replica.addr),
+            batch);
+        batch.Wait();
+        selector->Release(replica.node_info, kBufferSize, batch.IsSucceeded(index));
+        return replica.node_info.hostname_or_ip;
+    };
+
+    // RANK策略首先选择trainer-0，读取失败后改为选择trainer-1
+    EXPECT_EQ(read_replica(0), "trainer-0");
+    EXPECT_EQ(local_buffers_[0], std::vector<uint8_t>(kBufferSize, 0));
+    EXPECT_EQ(read_replica(1), "trainer-1");
+    EXPECT_EQ(local_buffers_[1], remote_buffers_[1]);
+    EXPECT_EQ(read_replica(2), "trainer-1");
+}
+
+} // namespace astate
@@ -1,11 +1,18 @@
 #include "core/utils.h"
 
+#include <future>
+#include <thread>
+
 #include <gtest/gtest.h>
 #include <pybind11/embed.h>
 #include <pybind11/pybind11.h>
 #include <torch/torch.h>
 
+#include "astate/sharded_key_batch.h"
+#include "astate/sharding_spec.h"
+#include "astate/table_future.h"
 #include "core/atensor.h"
+#include "core/shardedkey.h"
 
 using namespace astate;
 
@@ -235,6 +242,173 @@ TEST_F(UtilsTest, batch_conversions) {
     }
 }
 
+// 测试批量Python对象转换
+TEST_F(UtilsTest, py_objects_to_sharded_tensors) {
+    torch::Tensor tensor = torch::ones({2, 2}, torch::kFloat32);
+    ShardedKey key{"weight", {2, 2}, {0, 0}};
+    std::vector<std::pair<ShardedKey, pybind11::object>> tensor_list{{key, TensorToPyObject(tensor)}};
+
+    auto tensors = PyObjectsToShardedTensors(tensor_list);
+    ASSERT_EQ(tensors.size(), 1);
+    EXPECT_EQ(tensors[0].first, key);
+    // 转换结果与Python张量共享存储
+    EXPECT_EQ(tensors[0].second.data_ptr(), tensor.data_ptr());
+
+    tensor_list.emplace_back(key, pybind11::none());
+    EXPECT_THROW(PyObjectsToShardedTensors(tensor_list), std::runtime_error);
+}
+
+// 测试批量张量校验
+TEST_F(UtilsTest, validate_tensor_list) {
+    ShardedKey key{"weight", {2, 2}, {0, 0}};
+    std::vector<std::pair<ShardedKey, pybind11::object>> tensor_list{
+        {key, TensorToPyObject(torch::ones({2, 2}, torch::kFloat32))}};
+    EXPECT_NO_THROW(ValidateTensorList(tensor_list));
+
+    // 空张量
+    tensor_list.emplace_back(key, TensorToPyObject(torch::empty({0}, torch::kFloat32)));
+    EXPECT_THROW(ValidateTensorList(tensor_list), std::invalid_argument);
+
+    // 非张量对象
+    tensor_list.pop_back();
+    tensor_list.emplace_back(key, pybind11::none());
+    EXPECT_THROW(ValidateTensorList(tensor_list), std::invalid_argument);
+    tensor_list.back().second = pybind11::int_(1);
+    EXPECT_THROW(ValidateTensorList(tensor_list), std::invalid_argument);
+}
+
+// 测试异步操作句柄
+TEST_F(UtilsTest, table_future) {
+    TableFuture empty_future;
+    EXPECT_FALSE(empty_future.Valid());
+    EXPECT_TRUE(empty_future.Done());
+
+    auto ready_future = MakeCompletedTableFuture([]() { return true; });
+    EXPECT_TRUE(ready_future.Done());
+    EXPECT_TRUE(ready_future.Wait(0));
+    EXPECT_TRUE(ready_future.Get());
+
+    auto failed_future = MakeCompletedTableFuture([]() -> bool { throw std::runtime_error("failed"); });
+    EXPECT_TRUE(failed_future.Done());
+    EXPECT_THROW(failed_future.Get(), std::runtime_error);
+
+    std::promise<bool> promise;
+    TableFuture pending_future(promise.get_future().share());
+    EXPECT_FALSE(pending_future.Done());
+    EXPECT_FALSE(pending_future.Wait(10));
+    std::thread setter([&promise]() { promise.set_value(false); });
+    EXPECT_TRUE(pending_future.Wait(-1));
+    EXPECT_FALSE(pending_future.Get());
+    setter.join();
+}
+
+// 测试分片规格生成ShardedKey
+TEST_F(UtilsTest, sharding_spec) {
+    EXPECT_THROW(ShardingSpec(2, 2), std::invalid_argument);
+
+    ShardingSpec spec(1, 4);
+    spec.SetShardDim("column", 0);
+    spec.SetShardDim("row", 1);
+
+    auto column_key = spec.GetShardedKey("column", {8, 16});
+    EXPECT_EQ(column_key.key, "column");
+    EXPECT_EQ(column_key.global_shape, std::vector<int64_t>({32, 16}));
+    EXPECT_EQ(column_key.global_offset, std::vector<int64_t>({8, 0}));
+
+    auto row_key = spec.GetShardedKey("row", {8, 16});
+    EXPECT_EQ(row_key.global_shape, std::vector<int64_t>({8, 64}));
+    EXPECT_EQ(row_key.global_offset, std::vector<int64_t>({0, 16}));
+
+    // 未指定维度的张量默认复制
+    auto bias_key = spec.GetShardedKey("bias", {16});
+    EXPECT_EQ(bias_key.global_shape, std::vector<int64_t>({16}));
+    EXPECT_EQ(bias_key.global_offset, std::vector<int64_t>({0}));
+
+    // 缓存复用与形状变化
+    EXPECT_EQ(spec.CachedKeyCount(), 3);
+    EXPECT_EQ(spec.GetShardedKey("column", {8, 16}), column_key);
+    EXPECT_EQ(spec.GetShardedKey("column", {4, 16}).global_shape, std::vector<int64_t>({16, 16}));
+    EXPECT_EQ(spec.CachedKeyCount(), 3);
+
+    // 返回的key是副本，缓存重建后仍然有效
+    const auto& kept_key = spec.GetShardedKey("row", {8, 16});
+    spec.SetShardDim("row", 0);
+    EXPECT_EQ(spec.GetShardedKey("row", {8, 16}).global_shape, std::vector<int64_t>({32, 16}));
+    EXPECT_EQ(kept_key.global_shape, std::vector<int64_t>({8, 64}));
+
+    spec.SetShardDim("bias", 2);
+    EXPECT_THROW(spec.GetShardedKey("bias", {16}), std::invalid_argument);
+
+    // 流水线并行的各stage按本地编号层，加上层偏移后的key不冲突
+    EXPECT_THROW(ShardingSpec(0, 1, ShardingSpec::kReplicated, -1), std::invalid_argument);
+    ShardingSpec stage_spec(0, 1, ShardingSpec::kReplicated, 4);
+    EXPECT_EQ(stage_spec.GetShardedKey("decoder.layers.0.mlp.weight", {16}).key, "decoder.layers.4.mlp.weight");
+    EXPECT_EQ(stage_spec.GetShardedKey("layers.12.bias", {16}).key, "layers.16.bias");
+    EXPECT_EQ(stage_spec.GetShardedKey("decoder.final_layernorm.weight", {16}).key, "decoder.final_layernorm.weight");
+    EXPECT_EQ(stage_spec.GetShardedKey("config.num_layers.1", {1}).key, "config.num_layers.1");
+    EXPECT_EQ(ShardingSpec(0, 1).GetShardedKey("decoder.layers.0.mlp.weight", {16}).key, "decoder.layers.0.mlp.weight");
+
+    // state dict转换
+    ShardingSpec dict_spec(0, 2, 0);
+    pybind11::dict state_dict;
+    state_dict["w"] = TensorToPyObject(torch::ones({2, 3}, torch::kFloat32));
+    auto tensor_list = StateDictToTensorList(state_dict, dict_spec);
+    ASSERT_EQ(tensor_list.size(), 1);
+    EXPECT_EQ(tensor_list[0].first.global_shape, std::vector<int64_t>({4, 3}));
+    state_dict["bad"] = pybind11::int_(1);
+    EXPECT_THROW(StateDictToTensorList(state_dict, dict_spec), std::invalid_argument);
+}
+
+// 测试ShardedKey批量类型
+TEST_F(UtilsTest, sharded_key_batch) {
+    std::vector<ShardedKey> keys{{"weight", {8, 16}, {4, 0}}, {"bias", {16}, {0}}, {"scalar", {}, {}}};
+    auto batch = ShardedKeyBatch::FromShardedKeys(keys);
+    ASSERT_EQ(batch.Size(), 3);
+    EXPECT_EQ(batch.MaxNdim(), 2);
+    EXPECT_EQ(batch.Name(1), "bias");
+    EXPECT_EQ(batch.ToShardedKeys(), keys);
+
+    // 非法的全局shape和offset
+    EXPECT_THROW(ShardedKeyBatch({"weight"}, {1, -1, 0}, 1), std::invalid_argument);
+    EXPECT_THROW(ShardedKeyBatch({"weight"}, {1, 8, 9}, 1), std::invalid_argument);
+
+    // 按扁平meta数组校验分片shape
+    std::vector<TorchTensorMeta> metas(3);
+    metas[0].size = {4, 16};
+    metas[1].size = {16};
+    EXPECT_NO_THROW(ValidateTensorMetaList(batch, metas));
+    metas[0].size = {5, 16};
+    EXPECT_THROW(ValidateTensorMetaList(batch, metas), std::invalid_argument);
+    metas[0].size = {4};
+    EXPECT_THROW(ValidateTensorMetaList(batch, metas), std::invalid_argument);
+    metas.pop_back();
+    EXPECT_THROW(ValidateTensorMetaList(batch, metas), std::invalid_argument);
+    std::vector<pybind11::object> tensors{
+        TensorToPyObject(torch::ones({4, 16})), TensorToPyObject(torch::ones({16})), TensorToPyObject(torch::ones({}))};
+    EXPECT_NO_THROW(ValidateTensorList(batch, tensors));
+    tensors[1] = TensorToPyObject(torch::ones({17}));
+    EXPECT_THROW(ValidateTensorList(batch, tensors), std::invalid_argument);
+
+    // 零拷贝构造
+    torch::Tensor meta = torch::tensor({2, 8, 16, 4, 0, 1, 16, 0, 0, 0}, torch::kInt64).reshape({2, 5});
+    auto tensor_batch = TensorToShardedKeyBatch({"weight", "bias"}, meta);
+    EXPECT_EQ(tensor_batch.GlobalShape(0), meta.data_ptr<int64_t>() + 1);
+    EXPECT_EQ(tensor_batch.GetShardedKey(0), keys[0]);
+    EXPECT_EQ(tensor_batch.GetShardedKey(1), keys[1]);
+
+    EXPECT_THROW(TensorToShardedKeyBatch({"weight"}, meta), std::invalid_argument);
+    EXPECT_THROW(TensorToShardedKeyBatch({"weight", "bias"}, meta.to(torch::kInt32)), std::invalid_argument);
+    meta[1][0] = 3;
+    EXPECT_THROW(TensorToShardedKeyBatch({"weight", "bias"}, meta), std::invalid_argument);
+
+    std::vector<int> values{1, 2};
+    EXPECT_THROW(ZipShardedKeyBatch(batch, values), std::invalid_argument);
+    values.push_back(3);
+    auto pairs = ZipShardedKeyBatch(batch, values);
+    EXPECT_EQ(pairs[2].first, keys[2]);
+    EXPECT_EQ(pairs[2].second, 3);
+}
+
 // 测试错误情况
 TEST_F(UtilsTest, error_handling) {
     // 测试不支持的数据类型 - 使用一个超出范围的值
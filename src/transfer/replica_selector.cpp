@@ -0,0 +1,180 @@
+#include "transfer/replica_selector.h"
+
+#include <algorithm>
+#include <limits>
+#include <stdexcept>
+#include <utility>
+
+namespace astate {
+
+namespace {
+
+class RankReplicaSelector : public ReplicaSelector {
+ public:
+    using ReplicaSelector::ReplicaSelector;
+
+ protected:
+    size_t Choose(
+        const std::vector<TensorRDMAInfo>& /*replicas*/,
+        const std::vector<size_t>& candidates,
+        int /*local_device_index*/) override {
+        return candidates[static_cast<size_t>(rank_) % candidates.size()];
+    }
+};
+
+class RoundRobinReplicaSelector : public ReplicaSelector {
+ public:
+    using ReplicaSelector::ReplicaSelector;
+
+ protected:
+    size_t Choose(
+        const std::vector<TensorRDMAInfo>& /*replicas*/,
+        const std::vector<size_t>& candidates,
+        int /*local_device_index*/) override {
+        return candidates[(static_cast<uint64_t>(rank_) + select_count_++) % candidates.size()];
+    }
+};
+
+class LeastOutstandingReplicaSelector : public ReplicaSelector {
+ public:
+    using ReplicaSelector::ReplicaSelector;
+
+ protected:
+    size_t Choose(
+        const std::vector<TensorRDMAInfo>& replicas,
+        const std::vector<size_t>& candidates,
+        int /*local_device_index*/) override {
+        return ChooseLeastOutstanding(replicas, candidates);
+    }
+};
+
+class TopologyAwareReplicaSelector : public ReplicaSelector {
+ public:
+    using ReplicaSelector::ReplicaSelector;
+
+ protected:
+    size_t Choose(
+        const std::vector<TensorRDMAInfo>& replicas,
+        const std::vector<size_t>& candidates,
+        int local_device_index) override {
+        // Keep the closest candidates only
+        int min_distance = std::numeric_limits<int>::max();
+        std::vector<size_t> closest;
+        for (size_t index : candidates) {
+            int distance = Distance(replicas[index], local_device_index);
+            if (distance < min_distance) {
+                min_distance = distance;
+                closest.clear();
+            }
+            if (distance == min_distance) {
+                closest.push_back(index);
+            }
+        }
+        return ChooseLeastOutstanding(replicas, closest);
+    }
+
+ private:
+    // 0: same host, 1: same device index on another host, 2: otherwise
+    [[nodiscard]] int Distance(const TensorRDMAInfo& replica, int local_device_index) const {
+        if (replica.node_info.hostname_or_ip == local_node_info_.hostname_or_ip) {
+            return 0;
+        }
+        int remote_device_index = -1;
+        if (replica.atensor != nullptr && replica.atensor->storage.device.device_type == ATDeviceType::CUDA) {
+            remote_device_index = replica.atensor->storage.device.device_index;
+        }
+        return remote_device_index == local_device_index ? 1 : 2;
+    }
+};
+
+} // namespace
+
+ReplicaSelector::ReplicaSelector(NodeInfo local_node_info, int64_t rank, int64_t failure_backoff_ms)
+    : local_node_info_(std::move(local_node_info)),
+      rank_(std::max<int64_t>(rank, 0)),
+      failure_backoff_(std::max<int64_t>(failure_backoff_ms, 0)) {
+}
+
+std::unique_ptr<ReplicaSelector> ReplicaSelector::Create(
+    const std::string& policy, const NodeInfo& local_node_info, int64_t rank, int64_t failure_backoff_ms) {
+    if (policy == "RANK") {
+        return std::make_unique<RankReplicaSelector>(local_node_info, rank, failure_backoff_ms);
+    }
+    if (policy == "ROUND_ROBIN") {
+        return std::make_unique<RoundRobinReplicaSelector>(local_node_info, rank, failure_backoff_ms);
+    }
+    if (policy == "LEAST_OUTSTANDING") {
+        return std::make_unique<LeastOutstandingReplicaSelector>(local_node_info, rank, failure_backoff_ms);
+    }
+    if (policy == "TOPOLOGY_AWARE") {
+        return std::make_unique<TopologyAwareReplicaSelector>(local_node_info, rank, failure_backoff_ms);
+    }
+    throw std::invalid_argument("Invalid replica selector policy: " + policy);
+}
+
+size_t ReplicaSelector::Select(const std::vector<TensorRDMAInfo>& replicas, int local_device_index) {
+    if (replicas.empty()) {
+        throw std::invalid_argument("No replica to select");
+    }
+
+    std::lock_guard<std::mutex> lock(mutex_);
+    // Skip the nodes failed recently, unless all of them failed
+    auto now = std::chrono::steady_clock::now();
+    std::vector<size_t> candidates;
+    candidates.reserve(replicas.size());
+    for (size_t i = 0; i < replicas.size(); ++i) {
+        auto it = node_states_.find(replicas[i].node_info);
+        if (it == node_states_.end() || it->second.backoff_until <= now) {
+            candidates.push_back(i);
+        }
+    }
+    if (candidates.empty()) {
+        for (size_t i = 0; i < replicas.size(); ++i) {
+            candidates.push_back(i);
+        }
+    }
+    return Choose(replicas, candidates, local_device_index);
+}
+
+void ReplicaSelector::Acquire(const NodeInfo& node_info, size_t bytes) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    node_states_[node_info].outstanding_bytes += bytes;
+}
+
+void ReplicaSelector::Release(const NodeInfo& node_info, size_t bytes, bool success) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    auto& state = node_states_[node_info];
+    state.outstanding_bytes -= std::min(state.outstanding_bytes, bytes);
+    if (!success) {
+        state.backoff_until = std::chrono::steady_clock::now() + failure_backoff_;
+    }
+}
+
+size_t ReplicaSelector::GetOutstandingBytes(const NodeInfo& node_info) const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return GetOutstandingBytesUnsafe(node_info);
+}
+
+size_t ReplicaSelector::GetOutstandingBytesUnsafe(const NodeInfo& node_info) const {
+    auto it = node_states_.find(node_info);
+    return it == node_states_.end() ? 0 : it->second.outstanding_bytes;
+}
+
+size_t ReplicaSelector::ChooseLeastOutstanding(
+    const std::vector<TensorRDMAInfo>& replicas, const std::vector<size_t>& candidates) {
+    // Start from a rotating position, so the ties go to the replicas in turn, and different ranks start differently
+    size_t start = (static_cast<uint64_t>(rank_) + select_count_++) % candidates.size();
+    size_t selected = candidates[start];
+    size_t min_bytes = GetOutstandingBytesUnsafe(replicas[selected].node_info);
+    for (size_t i = 1; i < candidates.size(); ++i) {
+        size_t index = candidates[(start + i) % candidates.size()];
+        size_t bytes = GetOutstandingBytesUnsafe(replicas[index].node_info);
+        if (bytes < min_bytes) {
+            min_bytes = bytes;
+            selected = index;
+        }
+    }
+    return selected;
+}
+
+} // namespace astate
@@ -0,0 +1,97 @@
+#pragma once
+
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include "protocol/messages.h"
+#include "transfer/types.h"
+
+namespace astate {
+
+/*
+ * ReplicaSelector chooses the replica to read a tensor from, among the remote nodes publishing the tensor.
+ * It keeps the bytes outstanding on every source node to balance the load, and skips the nodes whose reads failed
+ * recently as long as another replica is available. The policies implement Choose, and are created by name with
+ * Create:
+ *  - RANK: the replica of index role_rank % replica_num, the same one for every read of a rank.
+ *  - ROUND_ROBIN: the replicas in turn.
+ *  - LEAST_OUTSTANDING: the replica whose node has the least bytes outstanding.
+ *  - TOPOLOGY_AWARE: LEAST_OUTSTANDING among the closest replicas, on the same host first, then on the same device
+ *    index, i.e. the same rail of a rail-optimized network.
+ */
+class ReplicaSelector {
+ public:
+    ReplicaSelector(NodeInfo local_node_info, int64_t rank, int64_t failure_backoff_ms);
+    virtual ~ReplicaSelector() = default;
+
+    ReplicaSelector(const ReplicaSelector&) = delete;
+    ReplicaSelector& operator=(const ReplicaSelector&) = delete;
+
+    /*
+     * Create the selector of the policy.
+     * @param: policy: RANK, ROUND_ROBIN, LEAST_OUTSTANDING or TOPOLOGY_AWARE.
+     * @param: local_node_info: The node reading the replicas.
+     * @param: rank: The rank of the reader in its role, which spreads the readers over the replicas.
+     * @param: failure_backoff_ms: How long the node is skipped after a failed read.
+     * @return: The selector.
+     * @throws std::invalid_argument if the policy is unknown.
+     */
+    static std::unique_ptr<ReplicaSelector>
+    Create(const std::string& policy, const NodeInfo& local_node_info, int64_t rank, int64_t failure_backoff_ms);
+
+    /*
+     * Select the replica to read.
+     * @param: replicas: The replicas of the tensor, must not be empty.
+     * @param: local_device_index: The device index of the local tensor to read into, -1 for CPU.
+     * @return: The index of the selected replica.
+     */
+    size_t Select(const std::vector<TensorRDMAInfo>& replicas, int local_device_index);
+
+    // Account the bytes of a read submitted to the node.
+    void Acquire(const NodeInfo& node_info, size_t bytes);
+
+    // Account the bytes of a finished read of the node, the node is skipped for a while if the read failed.
+    void Release(const NodeInfo& node_info, size_t bytes, bool success);
+
+    [[nodiscard]] size_t GetOutstandingBytes(const NodeInfo& node_info) const;
+
+ protected:
+    /*
+     * Choose the replica among the candidates, called with mutex_ held.
+     * @param: replicas: The replicas of the tensor.
+     * @param: candidates: Indexes of the replicas available to read, not empty.
+     * @param: local_device_index: The device index of the local tensor.
+     * @return: The index of the selected replica.
+     */
+    virtual size_t
+    Choose(const std::vector<TensorRDMAInfo>& replicas, const std::vector<size_t>& candidates, int local_device_index)
+        = 0;
+
+    // The candidate of the least bytes outstanding, the ties are broken in turn to spread the idle reads.
+    size_t ChooseLeastOutstanding(const std::vector<TensorRDMAInfo>& replicas, const std::vector<size_t>& candidates);
+
+    [[nodiscard]] size_t GetOutstandingBytesUnsafe(const NodeInfo& node_info) const;
+
+    const NodeInfo local_node_info_;
+    const int64_t rank_;
+    // Number of the selections, which rotates the choice among the equal replicas
+    uint64_t select_count_{0};
+
+ private:
+    struct NodeState {
+        size_t outstanding_bytes{0};
+        std::chrono::steady_clock::time_point backoff_until{};
+    };
+
+    const std::chrono::milliseconds failure_backoff_;
+    mutable std::mutex mutex_;
+    std::unordered_map<NodeInfo, NodeState, NodeInfoHash> node_states_;
+};
+
+} // namespace astate
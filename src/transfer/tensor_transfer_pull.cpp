@@ -1,9 +1,11 @@
 #include "tensor_transfer_pull.h"
 
+#include <algorithm>
 #include <cstdint>
 #include <exception>
 #include <functional>
 #include <future>
+#include <iterator>
 #include <memory>
 #include <mutex>
 #include <set>
@@ -23,24 +25,25 @@
 #include "core/shardedkey.h"
 #include "core/utils.h"
 #include "discovery/discovery_manager.h"
+#include "protocol/message_codec.h"
 #include "protocol/messages.h"
 #include "tensor_transfer_service.h"
 #include "transport/base_transport.h"
 #include "transport/brpc_transport.h"
+#include "transport/memory_registration_cache.h"
 #include "transport/rdma_transporter.h"
+#include "transport/transfer_window.h"
 #include "types.h"
 
 namespace astate {
 
-TensorTransferPull::TensorTransferPull()
-    : random_gen_(rd_()) {
+TensorTransferPull::TensorTransferPull() {
     data_rdma_transport_ = std::make_unique<RDMATransporter>();
     control_transport_ = std::make_unique<BrpcTransport>();
 }
 
 TensorTransferPull::TensorTransferPull(ATensorStorageCtx* ctx)
-    : ctx_(ctx),
-      random_gen_(rd_()) {
+    : ctx_(ctx) {
     data_rdma_transport_ = std::make_unique<RDMATransporter>();
     // control_transport_ = std::make_unique<HTTPTransporter>();
     control_transport_ = std::make_unique<BrpcTransport>();
@@ -54,7 +57,9 @@ TensorTransferPull::~TensorTransferPull() {
 
 inline void TensorTransferPull::RegisterMemoryOrThrow(void* addr, size_t size, bool is_cuda, int device_index) {
     try {
-        bool success = data_rdma_transport_->RegisterMemory(addr, size, is_cuda, device_index);
+        bool success = registration_cache_.RegisterIfAbsent(addr, size, is_cuda, device_index, [&]() {
+            return data_rdma_transport_->RegisterMemory(addr, size, is_cuda, device_index);
+        });
         if (!success) {
             throw std::runtime_error("Failed to register memory");
         }
@@ -104,6 +109,16 @@ bool TensorTransferPull::Start(const Options& options, const AParallelConfig& pa
         if (init_success) {
             SPDLOG_INFO("RDMA transport service started successfully.");
         }
+        int max_inflight_transfers = GetOptionValue<int>(options, TRANSFER_ENGINE_MAX_INFLIGHT_TRANSFERS);
+        int async_thread_num = GetOptionValue<int>(options, TRANSPORT_ASYNC_THREAD_NUM);
+        if (max_inflight_transfers > async_thread_num) {
+            SPDLOG_WARN(
+                "Max in-flight transfers {} exceeds the {} async transport threads, the extra transfers only queue",
+                max_inflight_transfers,
+                async_thread_num);
+        }
+        transfer_window_ = std::make_unique<TransferWindow>(
+            data_rdma_transport_.get(), static_cast<size_t>(std::max(max_inflight_transfers, 1)));
 
         // Start control transport service
         RegisterHandlers();
@@ -146,6 +161,19 @@ bool TensorTransferPull::Start(const Options& options, const AParallelConfig& pa
         }
 
         enable_log_tensor_meta_ = GetOptionValue<bool>(options, TRANSFER_ENGINE_LOG_TENSOR_META);
+        enable_tensor_ready_streaming_ = GetOptionValue<bool>(options, TRANSFER_ENGINE_ENABLE_TENSOR_READY_STREAMING);
+        auto meta_message_codec = GetOptionValue<std::string>(options, TRANSFER_ENGINE_META_MESSAGE_CODEC);
+        if (meta_message_codec != "BINARY" && meta_message_codec != "JSON") {
+            throw std::invalid_argument("Invalid meta message codec: " + meta_message_codec);
+        }
+        use_binary_meta_codec_ = meta_message_codec == "BINARY";
+        auto replica_selector = GetOptionValue<std::string>(options, TRANSFER_ENGINE_REPLICA_SELECTOR);
+        replica_selector_ = ReplicaSelector::Create(
+            replica_selector,
+            local_node_info_,
+            parallel_config.role_rank,
+            GetOptionValue<int>(options, TRANSFER_ENGINE_REPLICA_FAILURE_BACKOFF_MS));
+        SPDLOG_INFO("Replica selector: {}", replica_selector);
         perf_metrics_controller_ = std::make_shared<PerfMetricsController>("tensor_transfer_pull_service", options);
         perf_stats_interval_ms_ = GetOptionValue<int64_t>(options, TRANSFER_ENGINE_PERF_STATS_INTERVAL_MS);
         SPDLOG_INFO(
@@ -173,6 +201,20 @@ void TensorTransferPull::Stop() {
     if (control_transport_ != nullptr && control_transport_->IsRunning()) {
         control_transport_->Stop();
     }
+    SPDLOG_INFO(
+        "Memory registration cache: registered {} bytes in {} ranges, hits: {}, misses: {}, register time: {} us",
+        registration_cache_.GetRegisteredBytes(),
+        registration_cache_.GetRangeCount(),
+        registration_cache_.GetHitCount(),
+        registration_cache_.GetMissCount(),
+        registration_cache_.GetRegisterTimeUs());
+    registration_cache_.Clear();
+    {
+        // Publish all the metas again after restarted
+        std::lock_guard<std::mutex> lock(publish_meta_mutex_);
+        published_metas_.clear();
+        put_keys_.clear();
+    }
 
     SPDLOG_INFO("Succesfully stop all transport services.");
 }
@@ -199,32 +241,7 @@ bool TensorTransferPull::Put(int64_t seq_id, const ShardedKey& tensor_key, const
         return false;
     }
 
-    // Register memory for further rdma transport
-    {
-        // TODO(root): Temporary lock to avoid register memory concurrently.
-        // It could be removed after libutrans supports the concurrent registration of memory.
-        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
-        RegisterMemoryOrThrow(
-            atensor.storage.data,
-            atensor.storage.GetStorageDataSize(),
-            atensor.storage.device.device_type == ATDeviceType::CUDA,
-            atensor.storage.device.device_index);
-    }
-
-    // Build RDMA meta message
-    TensorMemoryRDMAInfo rdma_info{atensor.storage.data, atensor.storage.GetStorageDataSize(), "", atensor};
-
-    TensorRDMAMetaPublishMessage meta_msg;
-    meta_msg.seq_id = seq_id;
-    meta_msg.node_info = local_node_info_;
-    meta_msg.tensor_rdma_metas[tensor_key] = rdma_info;
-
-    // Send the tensor rdma meta infos to all peers
-    // TODO(root): send weight ready message to all peers directly instead of publishing metas first.
-    if (!is_publish_meta_) {
-        return SendTensorRDMAMeta(meta_msg);
-    }
-    return true;
+    return PublishTensors(seq_id, {{tensor_key, atensor}});
 }
 
 bool TensorTransferPull::MultiPut(int64_t seq_id, const std::vector<std::pair<ShardedKey, ATensor>>& atensors) {
@@ -243,39 +260,78 @@ bool TensorTransferPull::MultiPut(int64_t seq_id, const std::vector<std::pair<Sh
         return false;
     }
 
-    // Send the tensor rdma meta infos to all peers if the metas have not been published yet.
-    // TODO(root): handle the case that the metas were changed.
-    if (!is_publish_meta_) {
-        TensorRDMAMetaPublishMessage meta_msg;
-        meta_msg.seq_id = seq_id;
-        meta_msg.node_info = local_node_info_;
-
-        for (const auto& pair : atensors) {
-            // Register memory for further rdma transport
+    return PublishTensors(seq_id, atensors);
+}
 
-            // TODO(root): Temporary lock to avoid register memory concurrently.
-            // It could be removed after libutrans supports the concurrent registration of memory.
-            std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
+namespace {
+// Whether the peers have to be told about the new meta of a tensor published before
+bool IsTensorMetaChanged(const TensorMemoryRDMAInfo& published, const TensorMemoryRDMAInfo& current) {
+    const auto& published_meta = published.atensor_meta;
+    const auto& current_meta = current.atensor_meta;
+    return published.addr != current.addr || published.size != current.size
+        || published_meta.dim_num != current_meta.dim_num || published_meta.dtype != current_meta.dtype
+        || published_meta.storage_offset != current_meta.storage_offset || !published_meta.IsShapeEqual(current_meta);
+}
+} // namespace
 
-            RegisterMemoryOrThrow(
-                pair.second.storage.data,
-                pair.second.storage.GetStorageDataSize(),
-                pair.second.storage.device.device_type == ATDeviceType::CUDA,
-                pair.second.storage.device.device_index);
+bool TensorTransferPull::PublishTensors(int64_t seq_id, const std::vector<std::pair<ShardedKey, ATensor>>& atensors) {
+    for (const auto& pair : atensors) {
+        // Register memory for further rdma transport
+        RegisterMemoryOrThrow(
+            pair.second.storage.data,
+            pair.second.storage.GetStorageDataSize(),
+            pair.second.storage.device.device_type == ATDeviceType::CUDA,
+            pair.second.storage.device.device_index);
+    }
 
-            // Build RDMA meta message
+    // Only the metas added or changed since they were published are sent, which are nothing in the steady state.
+    TensorRDMAMetaPublishMessage meta_msg;
+    meta_msg.seq_id = seq_id;
+    meta_msg.node_info = local_node_info_;
+    {
+        std::lock_guard<std::mutex> lock(publish_meta_mutex_);
+        for (const auto& pair : atensors) {
+            put_keys_.insert(pair.first);
             TensorMemoryRDMAInfo rdma_info{
                 pair.second.storage.data, pair.second.storage.GetStorageDataSize(), "", pair.second};
-            meta_msg.tensor_rdma_metas[pair.first] = rdma_info;
+            auto published_it = published_metas_.find(pair.first);
+            if (published_it != published_metas_.end() && !IsTensorMetaChanged(published_it->second, rdma_info)) {
+                continue;
+            }
+            published_metas_[pair.first] = rdma_info;
+            meta_msg.tensor_rdma_metas[pair.first] = std::move(rdma_info);
+        }
+    }
+
+    if (!meta_msg.tensor_rdma_metas.empty() && !SendTensorRDMAMeta(meta_msg)) {
+        // Publish the metas again on the next put
+        std::lock_guard<std::mutex> lock(publish_meta_mutex_);
+        for (const auto& pair : meta_msg.tensor_rdma_metas) {
+            published_metas_.erase(pair.first);
         }
+        return false;
+    }
 
-        return SendTensorRDMAMeta(meta_msg);
+    // The peers learn the tensors ready from the metas until the first seq completes. After that, only announce the
+    // tensors of the batch ready to let the peers read them before this node completes, e.g. the earlier pipeline
+    // stages are read while the later ones are still being written.
+    if (is_publish_meta_ && enable_tensor_ready_streaming_) {
+        TensorReadyMessage ready_msg{seq_id, local_node_info_, {}};
+        ready_msg.tensor_keys.reserve(atensors.size());
+        for (const auto& pair : atensors) {
+            ready_msg.tensor_keys.push_back(pair.first);
+        }
+        return SendTensorReady(ready_msg);
     }
     return true;
 }
 
-bool TensorTransferPull::Get(int64_t seq_id, const ShardedKey& tensor_key, ATensor& atensor) {
-    auto start_time = std::chrono::high_resolution_clock::now();
+bool TensorTransferPull::PrepareGet(
+    int64_t seq_id,
+    const ShardedKey& tensor_key,
+    ATensor& atensor,
+    RemoteRead& read,
+    const std::vector<TensorSegment>* segments) {
     if (!atensor.IsValid()) {
         SPDLOG_ERROR("Invalid tensor: {}", atensor.GetTensorInfo());
         return false;
@@ -297,27 +353,31 @@ bool TensorTransferPull::Get(int64_t seq_id, const ShardedKey& tensor_key, ATens
         atensor.storage.GetStorageDataSize(),
         atensor.storage.device.device_type == ATDeviceType::CUDA,
         atensor.storage.device.device_index);
-    auto register_end = std::chrono::high_resolution_clock::now();
 
     if (!WaitForTensorReady(seq_id, tensor_key, static_cast<int>(tensor_ready_timeout_ms_))) {
         return false;
     }
-    auto wait_end = std::chrono::high_resolution_clock::now();
 
-    auto cache_it = remote_tensor_cache_.find(seq_id);
-    if (cache_it == remote_tensor_cache_.end()) {
-        SPDLOG_ERROR("Tensor RDMA info not found for seq_id: {}", seq_id);
-        throw std::runtime_error("illegal state: Tensor RDMA info not found "
-                                 "with corresponding seq_id");
+    // The replicas are copied under the lock, as the control messages may patch the remote metas meanwhile
+    std::vector<TensorRDMAInfo> ready_replicas;
+    {
+        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
+        if (remote_tensor_cache_.find(seq_id) == remote_tensor_cache_.end()) {
+            SPDLOG_ERROR("Tensor RDMA info not found for seq_id: {}", seq_id);
+            throw std::runtime_error(
+                "illegal state: Tensor RDMA info not found "
+                "with corresponding seq_id");
+        }
+        ready_replicas = GetReadyReplicasUnsafe(seq_id, tensor_key);
     }
-    const auto* rdma_info_list = GetTensorRDMAInfoVector(tensor_key, cache_it->second);
-    if (rdma_info_list == nullptr || rdma_info_list->empty()) {
+    if (ready_replicas.empty()) {
         SPDLOG_ERROR("Tensor RDMA info not found for tensor_key: {}", tensor_key.key);
         throw std::runtime_error("illegal state: Tensor RDMA info not found");
     }
 
-    size_t random_index = parallel_config_.role_rank % rdma_info_list->size();
-    const auto* rdma_info = &((*rdma_info_list)[random_index]);
+    int local_device_index
+        = atensor.storage.device.device_type == ATDeviceType::CUDA ? atensor.storage.device.device_index : -1;
+    const auto* rdma_info = &ready_replicas[replica_selector_->Select(ready_replicas, local_device_index)];
     // if (atensor.storage_offset != rdma_info->atensor->storage_offset) {
     //     SPDLOG_ERROR("storage_offset mismatch, tensor_key: {}, atensor.storage_offset: {},
     //     rdma_info->atensor->storage_offset: {}", tensor_key.key
@@ -333,7 +393,10 @@ bool TensorTransferPull::Get(int64_t seq_id, const ShardedKey& tensor_key, ATens
     if (atensor.storage_offset != rdma_info->atensor->storage_offset && atensor.storage_offset != 0) {
         remote_byte_offset = GetStorageByteOffset(atensor.dtype, atensor.storage_offset);
     }
-    auto byte_size = GetTensorTotalByteSize(atensor);
+    // The segments span from the first byte of the tensor to the end of the last segment
+    bool read_segments = segments != nullptr && !segments->empty();
+    auto byte_size
+        = read_segments ? segments->back().offset + segments->back().length : GetTensorTotalByteSize(atensor);
     if (remote_byte_offset + byte_size > rdma_info->size) {
         SPDLOG_ERROR(
             "Tensor data size exceeds the size of the remote storage, "
@@ -348,52 +411,86 @@ bool TensorTransferPull::Get(int64_t seq_id, const ShardedKey& tensor_key, ATens
     }
 
     auto* remote_addr = static_cast<char*>(rdma_info->addr) + remote_byte_offset;
-    auto* local_addr = static_cast<char*>(atensor.storage.data);
-    ExtendInfo extend_info = GetExtendInfoFromRemoteAddr(remote_addr);
+    read.local_addr = atensor.storage.data;
+    read.byte_size = byte_size;
+    read.node_info = rdma_info->node_info;
+    read.extend_info = GetExtendInfoFromRemoteAddr(remote_addr);
+    read.remote_addr = remote_addr;
+    if (read_segments) {
+        read.segments = *segments;
+        read.byte_size = 0;
+        for (const auto& segment : read.segments) {
+            read.byte_size += segment.length;
+        }
+    }
+    replica_selector_->Acquire(read.node_info, read.byte_size);
+    return true;
+}
 
+bool TensorTransferPull::Get(int64_t seq_id, const ShardedKey& tensor_key, ATensor& atensor) {
+    auto start_time = std::chrono::high_resolution_clock::now();
+    RemoteRead read;
+    if (!PrepareGet(seq_id, tensor_key, atensor, read)) {
+        return false;
+    }
     auto read_prepare_end = std::chrono::high_resolution_clock::now();
 
-    bool ret = data_rdma_transport_->Receive(
-        local_addr, byte_size, rdma_info->node_info.hostname_or_ip, rdma_info->node_info.rdma_port, &extend_info);
+    bool ret = false;
+    try {
+        ret = transfer_window_->Receive(
+            read.local_addr, read.byte_size, read.node_info.hostname_or_ip, read.node_info.rdma_port, read.extend_info);
+    } catch (...) {
+        replica_selector_->Release(read.node_info, read.byte_size, false);
+        throw;
+    }
+    replica_selector_->Release(read.node_info, read.byte_size, ret);
     auto end_time = std::chrono::high_resolution_clock::now();
 
-    UpdateThroughputStatistic(rdma_info->node_info.GetHostWithRdmaPort(), byte_size);
+    UpdateThroughputStatistic(read.node_info.GetHostWithRdmaPort(), read.byte_size);
     auto stats_end = std::chrono::high_resolution_clock::now();
 
     if (perf_metrics_controller_->ShouldLogPerfMetric(seq_id)) {
-        auto register_duration = std::chrono::duration_cast<std::chrono::microseconds>(register_end - start_time);
-        auto wait_duration = std::chrono::duration_cast<std::chrono::microseconds>(wait_end - register_end);
-        auto read_prepare_duration = std::chrono::duration_cast<std::chrono::microseconds>(read_prepare_end - wait_end);
+        auto read_prepare_duration
+            = std::chrono::duration_cast<std::chrono::microseconds>(read_prepare_end - start_time);
         auto read_duration = std::chrono::duration_cast<std::chrono::microseconds>(end_time - read_prepare_end);
         auto stats_duration = std::chrono::duration_cast<std::chrono::microseconds>(stats_end - end_time);
         auto total_duration = std::chrono::duration_cast<std::chrono::microseconds>(stats_end - start_time);
 
         SPDLOG_INFO(
-            "Get tensor_key: {}, seq_id: {}, total cost {} us (register {} us, "
-            "wait {} us, read_prepare {} us, read {} "
-            "us, stats {} us), throughput {} MB/s from host {}, "
-            "local_thread_pool_pending_tasks: {}",
+            "Get tensor_key: {}, seq_id: {}, total cost {} us (read_prepare {} us, "
+            "read {} us, stats {} us), throughput {} MB/s from host {}, "
+            "local_thread_pool_pending_tasks: {}, inflight_transfers: {}",
             tensor_key.key,
             seq_id,
             total_duration.count(),
-            register_duration.count(),
-            wait_duration.count(),
             read_prepare_duration.count(),
             read_duration.count(),
             stats_duration.count(),
-            BYTES_TO_MB(byte_size) / US_TO_SEC(total_duration.count()),
-            rdma_info->node_info.GetHostWithRdmaPort(),
-            thread_pool_->GetTaskCount());
+            BYTES_TO_MB(read.byte_size) / US_TO_SEC(total_duration.count()),
+            read.node_info.GetHostWithRdmaPort(),
+            thread_pool_->GetTaskCount(),
+            transfer_window_->GetInflightCount());
     }
 
     return ret;
 }
 
 bool TensorTransferPull::MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, ATensor>>& atensors) {
+    return MultiGet(seq_id, atensors, {});
+}
+
+bool TensorTransferPull::MultiGet(
+    int64_t seq_id,
+    std::vector<std::pair<ShardedKey, ATensor>>& atensors,
+    const std::vector<std::vector<TensorSegment>>& segments) {
     if (atensors.empty()) {
         SPDLOG_WARN("No tensors to get for seq_id: {}", seq_id);
         return false;
     }
+    if (!segments.empty() && segments.size() != atensors.size()) {
+        SPDLOG_ERROR("Segments of {} tensors mismatch {} tensors to get", segments.size(), atensors.size());
+        return false;
+    }
 
     // Check if service is running before proceeding with operations
     if (!IsRunning()) {
@@ -406,28 +503,79 @@ bool TensorTransferPull::MultiGet(int64_t seq_id, std::vector<std::pair<ShardedK
         return false;
     }
 
-    // Use multithreading with std::ref to safely pass references
-    std::vector<std::future<bool>> futures;
-    futures.reserve(atensors.size());
-
-    for (auto& pair : atensors) {
-        // Copy the key and use std::ref for the tensor
-        ShardedKey key_copy = pair.first;
-        std::reference_wrapper<ATensor> tensor_ref = std::ref(pair.second);
-
-        futures.emplace_back(thread_pool_->Submit([this, seq_id, key_copy, tensor_ref]() -> bool {
-            // Get the actual reference from std::reference_wrapper
-            return Get(seq_id, key_copy, tensor_ref.get());
-        }));
+    // Prepare all the reads before submitting any of them, so that no read is left in flight on failure
+    std::vector<RemoteRead> reads;
+    reads.reserve(atensors.size());
+    auto release_reads = [this, &reads](bool success) {
+        for (const auto& read : reads) {
+            replica_selector_->Release(read.node_info, read.byte_size, success);
+        }
+    };
+    try {
+        for (size_t i = 0; i < atensors.size(); ++i) {
+            RemoteRead read;
+            if (!PrepareGet(
+                    seq_id, atensors[i].first, atensors[i].second, read, segments.empty() ? nullptr : &segments[i])) {
+                release_reads(true);
+                return false;
+            }
+            // Every prepared read is accounted, so the next replica is selected knowing the reads of the batch
+            reads.push_back(std::move(read));
+        }
+    } catch (...) {
+        release_reads(true);
+        throw;
     }
 
-    // Wait for all operations to complete
-    bool success = true;
-    for (auto& future : futures) {
-        success &= future.get();
+    // Keep the reads in flight together through the transfer window, so the latency is bounded by the slowest read
+    // instead of the sum of them. The batch waits for the submitted reads even on error.
+    TransferBatch batch;
+    // Indexes of the transfers of every read in the batch
+    std::vector<std::vector<size_t>> read_transfers(reads.size());
+    // Release every read with its own result, so that only the nodes whose reads failed are skipped for a while
+    auto release_read_results = [this, &reads, &read_transfers, &batch]() {
+        batch.Wait();
+        for (size_t i = 0; i < reads.size(); ++i) {
+            bool success = std::all_of(read_transfers[i].begin(), read_transfers[i].end(), [&batch](size_t index) {
+                return batch.IsSucceeded(index);
+            });
+            replica_selector_->Release(reads[i].node_info, reads[i].byte_size, success);
+        }
+    };
+    bool ret = false;
+    try {
+        for (size_t i = 0; i < reads.size(); ++i) {
+            const auto& read = reads[i];
+            if (read.segments.empty()) {
+                read_transfers[i].push_back(transfer_window_->AsyncReceive(
+                    read.local_addr,
+                    read.byte_size,
+                    read.node_info.hostname_or_ip,
+                    read.node_info.rdma_port,
+                    read.extend_info,
+                    batch));
+            } else {
+                // The segments are gathered from the remote tensor, and each lands at the same offset of the local
+                // tensor. They are in flight together with the other reads of the batch.
+                for (const auto& segment : read.segments) {
+                    read_transfers[i].push_back(transfer_window_->AsyncReceive(
+                        static_cast<char*>(read.local_addr) + segment.offset,
+                        segment.length,
+                        read.node_info.hostname_or_ip,
+                        read.node_info.rdma_port,
+                        GetExtendInfoFromRemoteAddr(read.remote_addr + segment.offset),
+                        batch));
+                }
+            }
+            UpdateThroughputStatistic(read.node_info.GetHostWithRdmaPort(), read.byte_size);
+        }
+        ret = batch.Wait();
+    } catch (...) {
+        release_read_results();
+        throw;
     }
-
-    return success;
+    release_read_results();
+    return ret;
 }
 
 bool TensorTransferPull::PreRegisterMemory(ATStorage& atensor_storage) {
@@ -439,6 +587,24 @@ bool TensorTransferPull::PreRegisterMemory(ATStorage& atensor_storage) {
     return true;
 }
 
+bool TensorTransferPull::DeregisterMemory(ATStorage& atensor_storage) {
+    bool success = registration_cache_.Deregister(
+        atensor_storage.data,
+        atensor_storage.GetStorageDataSize(),
+        atensor_storage.device.device_type == ATDeviceType::CUDA,
+        atensor_storage.device.device_index,
+        [this](const void* addr, size_t len) {
+            return data_rdma_transport_->DeregisterMemory(const_cast<void*>(addr), len);
+        });
+    if (!success) {
+        SPDLOG_ERROR(
+            "Failed to deregister memory, addr: {}, size: {}",
+            atensor_storage.data,
+            atensor_storage.GetStorageDataSize());
+    }
+    return success || skip_rdma_exception_for_test_;
+}
+
 void TensorTransferPull::Complete() {
     // If reading finished, send weight consumed message to all peers
     if (IsRead(current_data_operation_)) {
@@ -450,37 +616,50 @@ void TensorTransferPull::Complete() {
     if (IsWrite(current_data_operation_)) {
         SPDLOG_INFO("Complete write");
 
-        SendWeightReady(WeightReadyMessage{current_seq_id_, local_node_info_});
+        // The tensors published before but not put in this seq are removed, and the layout hash lets the peers
+        // verify that their patched metas are the same as the ones of this node.
+        WeightReadyMessage ready_msg{current_seq_id_, local_node_info_, 0, {}};
+        {
+            std::lock_guard<std::mutex> lock(publish_meta_mutex_);
+            for (auto it = published_metas_.begin(); it != published_metas_.end();) {
+                if (put_keys_.count(it->first) == 0) {
+                    ready_msg.removed_keys.push_back(it->first);
+                    it = published_metas_.erase(it);
+                } else {
+                    ready_msg.layout_hash += TensorLayoutEntryHash(it->first, it->second.addr, it->second.size);
+                    ++it;
+                }
+            }
+            put_keys_.clear();
+        }
+        if (!ready_msg.removed_keys.empty()) {
+            SPDLOG_INFO("Remove {} tensors not put in seq {}", ready_msg.removed_keys.size(), current_seq_id_);
+        }
+        SendWeightReady(ready_msg);
 
-        std::chrono::milliseconds wait_time_ms(0);
+        // Wait for all remote nodes to finish the data reading, which is notified by HandleWeightConsumed
+        std::unique_lock<std::mutex> lock(ctrl_message_mutex_);
         while (true) {
-            // Check if all remote nodes have finished the data reading
-            if (consumed_nodes_.size() == peer_hosts_.size()) {
+            if (ctrl_message_cv_.wait_for(lock, std::chrono::milliseconds(ONE_MINUTE_MS), [this]() {
+                    return consumed_nodes_.size() == peer_hosts_.size();
+                })) {
                 SPDLOG_INFO("Seq {} completed, all nodes have received weights", current_seq_id_);
                 break;
             }
 
-            if (wait_time_ms.count() > 0 && wait_time_ms.count() % ONE_MINUTE_MS == 0) {
-                std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
-
-                std::set<std::string> missing_nodes;
-                for (const auto& peer : peer_hosts_) {
-                    if (consumed_nodes_.find(peer) == consumed_nodes_.end()) {
-                        missing_nodes.insert(peer.hostname_or_ip + ":" + std::to_string(peer.rdma_port));
-                    }
+            std::set<std::string> missing_nodes;
+            for (const auto& peer : peer_hosts_) {
+                if (consumed_nodes_.find(peer) == consumed_nodes_.end()) {
+                    missing_nodes.insert(peer.hostname_or_ip + ":" + std::to_string(peer.rdma_port));
                 }
-                SPDLOG_INFO(
-                    "Seq {} progress: {}/{} nodes completed. Missing "
-                    "nodes: {}",
-                    current_seq_id_,
-                    peer_hosts_.size() - missing_nodes.size(),
-                    peer_hosts_.size(),
-                    (missing_nodes.empty() ? "none" : *missing_nodes.begin()));
             }
-
-
-            std::this_thread::sleep_for(std::chrono::milliseconds(10));
-            wait_time_ms += std::chrono::milliseconds(10);
+            SPDLOG_INFO(
+                "Seq {} progress: {}/{} nodes completed. Missing "
+                "nodes: {}",
+                current_seq_id_,
+                peer_hosts_.size() - missing_nodes.size(),
+                peer_hosts_.size(),
+                (missing_nodes.empty() ? "none" : *missing_nodes.begin()));
         }
     }
 
@@ -494,24 +673,139 @@ void TensorTransferPull::Complete() {
 
     // After all data operations are finished, reset current data operation and sequence id
     Clear(current_data_operation_);
-    last_completed_seq_id_ = current_seq_id_;
-    current_seq_id_ = -1;
-    ready_nodes_.clear();
-    consumed_nodes_.clear();
+    {
+        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
+        last_completed_seq_id_ = current_seq_id_;
+        current_seq_id_ = -1;
+        ready_nodes_.clear();
+        consumed_nodes_.clear();
+        // The peers may announce the tensors of the next seq already
+        for (auto it = ready_tensors_.begin(); it != ready_tensors_.end();) {
+            it = it->first <= last_completed_seq_id_ ? ready_tensors_.erase(it) : std::next(it);
+        }
+    }
     // TODO(root): update is_publish_meta_ to false when source nodes' infos were changed.
     is_publish_meta_ = true;
 }
 
+bool TensorTransferPull::WaitCtrlMessageCondition(
+    const std::function<bool()>& cond, const std::string& cond_name, int64_t max_wait_ms) {
+    auto start_time = std::chrono::steady_clock::now();
+    auto deadline = start_time + std::chrono::milliseconds(max_wait_ms);
+    std::unique_lock<std::mutex> lock(ctrl_message_mutex_);
+    while (!cond()) {
+        auto now = std::chrono::steady_clock::now();
+        if (now >= deadline) {
+            SPDLOG_ERROR(
+                "Wait for condition [{}] timeout, {}ms",
+                cond_name,
+                std::chrono::duration_cast<std::chrono::milliseconds>(now - start_time).count());
+            return false;
+        }
+        // Wake up at least once a minute to report the progress
+        if (ctrl_message_cv_.wait_until(lock, std::min(deadline, now + std::chrono::milliseconds(ONE_MINUTE_MS)))
+                == std::cv_status::timeout
+            && !cond() && std::chrono::steady_clock::now() < deadline) {
+            SPDLOG_INFO(
+                "Wait for condition [{}] {}ms",
+                cond_name,
+                std::chrono::duration_cast<std::chrono::milliseconds>(std::chrono::steady_clock::now() - start_time)
+                    .count());
+        }
+    }
+    return true;
+}
+
 void TensorTransferPull::SetPeerHosts(const std::vector<NodeInfo>& peer_hosts) {
     peer_hosts_ = peer_hosts;
+    {
+        // The new peers know none of the metas, so publish all of them again
+        std::lock_guard<std::mutex> lock(publish_meta_mutex_);
+        published_metas_.clear();
+    }
+}
+
+std::vector<TensorRDMAInfo>
+TensorTransferPull::GetReadyReplicasUnsafe(int64_t seq_id, const ShardedKey& tensor_key) const {
+    std::vector<TensorRDMAInfo> ready_replicas;
+    auto cache_it = remote_tensor_cache_.find(seq_id);
+    if (cache_it == remote_tensor_cache_.end()) {
+        return ready_replicas;
+    }
+    const auto* replicas = GetTensorRDMAInfoVector(tensor_key, cache_it->second);
+    if (replicas == nullptr) {
+        return ready_replicas;
+    }
+
+    bool all_ready = !is_publish_meta_ || ready_nodes_.size() == peer_hosts_.size();
+    const std::unordered_set<NodeInfo, NodeInfoHash>* announced_nodes = nullptr;
+    auto ready_it = ready_tensors_.find(seq_id);
+    if (ready_it != ready_tensors_.end()) {
+        auto key_it = ready_it->second.find(tensor_key);
+        if (key_it != ready_it->second.end()) {
+            announced_nodes = &key_it->second;
+        }
+    }
+    ready_replicas.reserve(replicas->size());
+    for (const auto& replica : *replicas) {
+        if (all_ready || ready_nodes_.count(replica.node_info) > 0
+            || (announced_nodes != nullptr && announced_nodes->count(replica.node_info) > 0)) {
+            ready_replicas.push_back(replica);
+        }
+    }
+    return ready_replicas;
+}
+
+TransferTensorMeta* TensorTransferPull::RebaseRemoteTensorMeta(int64_t seq_id) {
+    auto cache_it = remote_tensor_cache_.find(seq_id);
+    if (cache_it != remote_tensor_cache_.end()) {
+        return &(cache_it->second);
+    }
+
+    // Rebase on the latest previous seq
+    auto base_it = remote_tensor_cache_.end();
+    for (auto it = remote_tensor_cache_.begin(); it != remote_tensor_cache_.end(); ++it) {
+        if (it->first < seq_id && (base_it == remote_tensor_cache_.end() || it->first > base_it->first)) {
+            base_it = it;
+        }
+    }
+    if (base_it == remote_tensor_cache_.end()) {
+        return nullptr;
+    }
+    int64_t base_seq_id = base_it->first;
+    if (base_seq_id == current_seq_id_) {
+        // The delta metas of the next seq may arrive before the base seq completes, so keep the base one for reading
+        cache_it = remote_tensor_cache_.emplace(seq_id, base_it->second).first;
+    } else {
+        // Move the metas to the new seq without copying them
+        auto node = remote_tensor_cache_.extract(base_it);
+        node.key() = seq_id;
+        cache_it = remote_tensor_cache_.insert(std::move(node)).position;
+    }
+    for (auto it = remote_tensor_cache_.begin(); it != remote_tensor_cache_.end();) {
+        it = it->first < base_seq_id ? remote_tensor_cache_.erase(it) : std::next(it);
+    }
+    SPDLOG_INFO("Rebased remote tensor metas of seq_id={} on seq_id={}", seq_id, base_seq_id);
+    return &(cache_it->second);
 }
 
 bool TensorTransferPull::SendTensorRDMAMeta(const TensorRDMAMetaPublishMessage& meta) {
+    if (use_binary_meta_codec_) {
+        auto message_data = ToBinary(meta);
+        return SendCtrlMessageToMultiPeers(
+            TENSOR_RDMA_META_BINARY_REQUEST, meta.seq_id, message_data.data(), message_data.size(), peer_hosts_);
+    }
     auto message_data = Serialize(ToJson(meta));
     return SendCtrlMessageToMultiPeers(
         TENSOR_RDMA_META_REQUEST, meta.seq_id, message_data.c_str(), message_data.size(), peer_hosts_);
 }
 
+bool TensorTransferPull::SendTensorReady(const TensorReadyMessage& msg) {
+    auto message_data = Serialize(ToJson(msg));
+    return SendCtrlMessageToMultiPeers(
+        TENSOR_READY_REQUEST, msg.seq_id, message_data.c_str(), message_data.size(), peer_hosts_);
+}
+
 bool TensorTransferPull::SendWeightReady(const WeightReadyMessage& msg) {
     auto message_data = Serialize(ToJson(msg));
     return SendCtrlMessageToMultiPeers(
@@ -525,55 +819,65 @@ bool TensorTransferPull::SendWeightConsumed(const WeightConsumedMessage& msg) {
 }
 
 ResponseStatus
-TensorTransferPull::HandleTensorRDMAMeta(const std::string& /*request*/, const void* message, size_t message_size) {
+TensorTransferPull::HandleTensorRDMAMeta(const std::string& request, const void* message, size_t message_size) {
     try {
         std::string message_str(static_cast<const char*>(message), message_size);
-        if (is_debug_mode_) {
-            SPDLOG_INFO("Received RDMA meta message: {}", message_str);
+        TensorRDMAMetaPublishMessage msg;
+        if (request == TENSOR_RDMA_META_BINARY_REQUEST) {
+            msg = FromBinary(message_str, TensorRDMAMetaPublishMessage{});
+            if (is_debug_mode_) {
+                SPDLOG_INFO("Received RDMA meta message: {}", Serialize(ToJson(msg)));
+            }
+        } else {
+            if (is_debug_mode_) {
+                SPDLOG_INFO("Received RDMA meta message: {}", message_str);
+            }
+            msg = FromJson(Deserialize(message_str), TensorRDMAMetaPublishMessage{});
         }
-        auto json = Deserialize(message_str);
-        TensorRDMAMetaPublishMessage msg = FromJson(json, TensorRDMAMetaPublishMessage{});
 
         {
             std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
 
-            // First check if TransferTensorMeta exists for this seq_id
-            auto cache_it = remote_tensor_cache_.find(msg.seq_id);
-            TransferTensorMeta* transfer_meta = nullptr;
-
-            if (cache_it != remote_tensor_cache_.end()) {
-                // Exists, use existing one
-                transfer_meta = &(cache_it->second);
-            } else {
-                // Does not exist, create new one
-                auto result = remote_tensor_cache_.emplace(msg.seq_id, TransferTensorMeta{});
-                transfer_meta = &(result.first->second);
+            // The metas are the delta since the last seq, so patch the metas of the last seq in place
+            TransferTensorMeta* transfer_meta = RebaseRemoteTensorMeta(msg.seq_id);
+            if (transfer_meta == nullptr) {
+                transfer_meta = &(remote_tensor_cache_[msg.seq_id]);
                 SPDLOG_INFO("Created new transfer data for seq_id={}", msg.seq_id);
             }
+            uint64_t& layout_hash = remote_layout_hashes_[msg.node_info];
 
             // Process tensor information in the message
             for (const auto& pair : msg.tensor_rdma_metas) {
                 const ShardedKey& key = pair.first;
                 const TensorMemoryRDMAInfo& protocol_info = pair.second;
 
-                // Use emplace to construct TensorRDMAInfo directly in map, avoiding copy
-                // Since TensorRDMAInfo contains references, we need to create static NodeInfo
-                static std::unordered_map<int64_t, NodeInfo> node_info_cache;
-                NodeInfo& node_info = node_info_cache[msg.seq_id];
-                node_info.hostname_or_ip = msg.node_info.hostname_or_ip;
-                node_info.rdma_port = msg.node_info.rdma_port;
-                node_info.ctrl_flow_port = msg.node_info.ctrl_flow_port;
-
-                EmplaceTensorRDMAInfo(
-                    *transfer_meta,
-                    key,
-                    protocol_info.addr,
-                    protocol_info.size,
-                    protocol_info.rkey,
-                    node_info,
-                    std::make_shared<ATensor>(protocol_info.atensor_meta));
+                // Replace the meta published by the node before, e.g. the tensor was reallocated
+                TensorRDMAInfo* published_info = FindTensorRDMAInfo(*transfer_meta, key, msg.node_info);
+                if (published_info != nullptr) {
+                    layout_hash -= TensorLayoutEntryHash(key, published_info->addr, published_info->size);
+                    *published_info = TensorRDMAInfo{
+                        protocol_info.addr,
+                        protocol_info.size,
+                        protocol_info.rkey,
+                        msg.node_info,
+                        std::make_shared<ATensor>(protocol_info.atensor_meta)};
+                } else {
+                    EmplaceTensorRDMAInfo(
+                        *transfer_meta,
+                        key,
+                        protocol_info.addr,
+                        protocol_info.size,
+                        protocol_info.rkey,
+                        msg.node_info,
+                        std::make_shared<ATensor>(protocol_info.atensor_meta));
+                }
+                layout_hash += TensorLayoutEntryHash(key, protocol_info.addr, protocol_info.size);
+            }
+            if (!msg.tensor_rdma_metas.empty()) {
+                ++remote_layout_version_;
             }
         }
+        ctrl_message_cv_.notify_all();
 
         return ResponseStatus{true, "Success", ExtendInfo{}};
     } catch (const std::exception& e) {
@@ -593,7 +897,11 @@ TensorTransferPull::HandleWeightReady(const std::string& /*request*/, const void
         WeightReadyMessage msg = FromJson(json, WeightReadyMessage{});
 
         std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
+        if (msg.seq_id > last_completed_seq_id_) {
+            ApplyWeightReadyLayout(msg);
+        }
         ready_nodes_.insert(msg.node_info);
+        ctrl_message_cv_.notify_all();
 
         if (ready_nodes_.size() == peer_hosts_.size() && enable_local_cache_prefetch_) {
             int64_t seq_id = msg.seq_id;
@@ -615,6 +923,68 @@ TensorTransferPull::HandleWeightReady(const std::string& /*request*/, const void
     }
 }
 
+void TensorTransferPull::ApplyWeightReadyLayout(const WeightReadyMessage& msg) {
+    TransferTensorMeta* transfer_meta = RebaseRemoteTensorMeta(msg.seq_id);
+    if (transfer_meta == nullptr) {
+        // No meta was published by the peers
+        return;
+    }
+    uint64_t& layout_hash = remote_layout_hashes_[msg.node_info];
+    bool removed = false;
+    for (const auto& key : msg.removed_keys) {
+        const TensorRDMAInfo* published_info = FindTensorRDMAInfo(*transfer_meta, key, msg.node_info);
+        if (published_info != nullptr) {
+            layout_hash -= TensorLayoutEntryHash(key, published_info->addr, published_info->size);
+            RemoveTensorRDMAInfo(*transfer_meta, key, msg.node_info);
+            removed = true;
+        }
+    }
+    if (removed) {
+        ++remote_layout_version_;
+    }
+
+    // The peers of old versions do not send the layout hash
+    if (msg.layout_hash != 0 && msg.layout_hash != layout_hash) {
+        SPDLOG_ERROR(
+            "Layout hash mismatch of node {} in seq {}, expected: {}, actual: {}",
+            msg.node_info.ToString(),
+            msg.seq_id,
+            msg.layout_hash,
+            layout_hash);
+        throw std::runtime_error("illegal state: remote tensor layout hash mismatch");
+    }
+}
+
+ResponseStatus
+TensorTransferPull::HandleTensorReady(const std::string& /*request*/, const void* message, size_t message_size) {
+    try {
+        std::string message_str(static_cast<const char*>(message), message_size);
+        if (is_debug_mode_) {
+            SPDLOG_INFO("Received tensor ready message: {}", message_str);
+        }
+        auto json = Deserialize(message_str);
+        TensorReadyMessage msg = FromJson(json, TensorReadyMessage{});
+
+        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
+        if (msg.seq_id <= last_completed_seq_id_) {
+            SPDLOG_WARN(
+                "Received outdated tensor ready message, seq_id: {}, last_completed_seq_id: {}",
+                msg.seq_id,
+                last_completed_seq_id_);
+            return ResponseStatus{true, "Success", ExtendInfo{}};
+        }
+        auto& ready_tensors = ready_tensors_[msg.seq_id];
+        for (const auto& tensor_key : msg.tensor_keys) {
+            ready_tensors[tensor_key].insert(msg.node_info);
+        }
+        ctrl_message_cv_.notify_all();
+        return ResponseStatus{true, "Success", ExtendInfo{}};
+    } catch (const std::exception& e) {
+        SPDLOG_ERROR("Failed to process tensor ready message: {}", e.what());
+        return ResponseStatus{false, e.what(), ExtendInfo{}};
+    }
+}
+
 ResponseStatus
 TensorTransferPull::HandleWeightConsumed(const std::string& /*request*/, const void* message, size_t message_size) {
     try {
@@ -635,6 +1005,7 @@ TensorTransferPull::HandleWeightConsumed(const std::string& /*request*/, const v
             return ResponseStatus{false, "Outdated sequence ID", ExtendInfo{}};
         }
         consumed_nodes_.insert(msg.node_info);
+        ctrl_message_cv_.notify_all();
         return ResponseStatus{true, "Success", ExtendInfo{}};
 
     } catch (const std::exception& e) {
@@ -708,7 +1079,8 @@ TensorTransferPull::GetAllTensorShards(int64_t seq_id, std::function<bool(const
     std::vector<std::pair<ShardedKey, ATensor>> result;
 
     if (WaitForAllTensorReady(seq_id, tensor_ready_timeout_ms_)) {
-        std::lock_guard<std::mutex> lock(const_cast<std::mutex&>(data_mutex_));
+        // The delta metas patch remote_tensor_cache_ in place under ctrl_message_mutex_
+        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
 
         auto cache_it = remote_tensor_cache_.find(seq_id);
         if (cache_it != remote_tensor_cache_.end()) {
@@ -763,8 +1135,7 @@ bool TensorTransferPull::RawGet(
     ExtendInfo extend_info = GetExtendInfoFromRemoteAddr(remote_addr);
 
     UpdateThroughputStatistic(node_info.GetHostWithRdmaPort(), len);
-    return data_rdma_transport_->Receive(
-        astorage.data, len, node_info.hostname_or_ip, node_info.rdma_port, &extend_info);
+    return transfer_window_->Receive(astorage.data, len, node_info.hostname_or_ip, node_info.rdma_port, extend_info);
 }
 
 using TensorShardMap = std::unordered_map<ShardedKey, ATensor, ShardedKeyHash>;
@@ -833,7 +1204,8 @@ std::vector<CompactTensorInfo> TensorTransferPull::GetCompactTensorInfos(
     NodeMap node_map{};
     TransferTensorMeta target_transfer_meta{};
     if (WaitForAllTensorReady(seq_id, tensor_ready_timeout_ms_)) {
-        std::lock_guard<std::mutex> lock(const_cast<std::mutex&>(data_mutex_));
+        // The delta metas patch remote_tensor_cache_ in place under ctrl_message_mutex_
+        std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
 
         auto cache_it = remote_tensor_cache_.find(seq_id);
         if (cache_it != remote_tensor_cache_.end()) {
@@ -1,10 +1,11 @@
 #pragma once
 
 #include <atomic>
+#include <condition_variable>
 #include <cstdint>
+#include <functional>
 #include <memory>
 #include <mutex>
-#include <random>
 #include <string>
 #include <unordered_map>
 #include <unordered_set>
@@ -24,10 +25,13 @@
 #include "core/shardedkey.h"
 #include "discovery/discovery_manager.h"
 #include "protocol/messages.h"
+#include "transfer/replica_selector.h"
 #include "transfer/tensor_transfer_service.h"
 #include "transfer/types.h"
 #include "transport/base_transport.h"
+#include "transport/memory_registration_cache.h"
 #include "transport/rdma_transporter.h"
+#include "transport/transfer_window.h"
 
 namespace astate {
 /*
@@ -38,7 +42,10 @@ namespace astate {
 constexpr int64_t INIT_SEQ_ID = -1;
 
 constexpr const char* TENSOR_RDMA_META_REQUEST = "publish_tensor_rdma_meta";
+// The same message as TENSOR_RDMA_META_REQUEST, encoded by the binary codec
+constexpr const char* TENSOR_RDMA_META_BINARY_REQUEST = "publish_tensor_rdma_meta_bin";
 constexpr const char* WEIGHT_READY_REQUEST = "weight_ready";
+constexpr const char* TENSOR_READY_REQUEST = "tensor_ready";
 constexpr const char* WEIGHT_CONSUMED_REQUEST = "weight_consumed";
 
 class TensorTransferPull : public TensorTransferService {
@@ -56,12 +63,17 @@ class TensorTransferPull : public TensorTransferService {
 
     bool Get(int64_t seq_id, const ShardedKey& tensor_key, ATensor& atensor) override;
     bool MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, ATensor>>& atensors) override;
+    bool MultiGet(
+        int64_t seq_id,
+        std::vector<std::pair<ShardedKey, ATensor>>& atensors,
+        const std::vector<std::vector<TensorSegment>>& segments) override;
 
     bool
     RawGet(int64_t seq_id, const ATStorage& astorage, const NodeInfo& node_info, const void* remote_addr, size_t len)
         override;
 
     bool PreRegisterMemory(ATStorage& atensor_storage) override;
+    bool DeregisterMemory(ATStorage& atensor_storage) override;
 
     void Complete() override;
 
@@ -73,12 +85,18 @@ class TensorTransferPull : public TensorTransferService {
     [[nodiscard]] std::vector<CompactTensorInfo>
     GetCompactTensorInfos(int64_t seq_id, std::unordered_map<ShardedKey, ATensor, ShardedKeyHash> atensors) override;
 
+    [[nodiscard]] uint64_t GetRemoteLayoutVersion() const override { return remote_layout_version_; }
+
  protected:
     ATensorStorageCtx* ctx_ = nullptr;
 
     bool is_debug_mode_{false};
 
     std::unique_ptr<RDMATransporter> data_rdma_transport_;
+    // Memory ranges registered to data_rdma_transport_
+    MemoryRegistrationCache registration_cache_;
+    // Bounds the reads in flight on data_rdma_transport_
+    std::unique_ptr<TransferWindow> transfer_window_;
     std::unique_ptr<BaseControlTransport> control_transport_;
     std::unique_ptr<DiscoveryManager> discovery_manager_;
 
@@ -90,7 +108,9 @@ class TensorTransferPull : public TensorTransferService {
     ARole role_{};
 
     std::mutex ctrl_message_mutex_;
-    std::mutex data_mutex_;
+    // Notified with ctrl_message_mutex_ once a control message updated ready_nodes_, consumed_nodes_ or
+    // remote_tensor_cache_, which are all read and written with ctrl_message_mutex_ held
+    std::condition_variable ctrl_message_cv_;
 
     // std::unique_ptr<MutexWaitQueueThreadPool> thread_pool_;
     std::unique_ptr<ThreadPool> thread_pool_;
@@ -104,21 +124,39 @@ class TensorTransferPull : public TensorTransferService {
 
     std::unordered_set<NodeInfo, NodeInfoHash> consumed_nodes_;
 
-    // Remote tensor meta cache
+    // Remote tensor meta cache, the latest seq is rebased on the previous one and patched by the delta metas
     TransferCache remote_tensor_cache_; // seq_id -> tensor_transfer_meta collection
+    // Layout hash of the tensor metas of each remote node in the latest seq of remote_tensor_cache_
+    std::unordered_map<NodeInfo, uint64_t, NodeInfoHash> remote_layout_hashes_;
+    // Increased once remote_tensor_cache_ is patched by a meta message or the removed tensors of a ready node
+    std::atomic<uint64_t> remote_layout_version_{0};
     // Record which nodes have all data ready
     std::unordered_set<NodeInfo, NodeInfoHash> ready_nodes_;
+    // Tensors announced ready by TensorReadyMessage before their nodes are all ready: seq_id -> tensor key -> nodes
+    // announcing it, since a replica of the tensor is only readable on the nodes which have put it
+    std::unordered_map<
+        int64_t,
+        std::unordered_map<ShardedKey, std::unordered_set<NodeInfo, NodeInfoHash>, ShardedKeyHash>>
+        ready_tensors_;
+    bool enable_tensor_ready_streaming_{true};
+
+    std::mutex publish_meta_mutex_;
+    // Tensor metas published to the peers by this node: tensor key -> last published meta
+    std::unordered_map<ShardedKey, TensorMemoryRDMAInfo, ShardedKeyHash> published_metas_;
+    // Tensors put in the current seq, the published tensors not put again are removed from the peers at Complete
+    std::unordered_set<ShardedKey, ShardedKeyHash> put_keys_;
     // Waiting timeout for tensor ready / sequence ready
     int64_t tensor_ready_timeout_ms_{};
 
-    // Random number generator for load balancing
-    std::random_device rd_;
-    std::mt19937 random_gen_;
+    // Chooses the replica to read among the remote nodes publishing a tensor
+    std::unique_ptr<ReplicaSelector> replica_selector_;
 
     // skip rdma exception for test environment when rdma not working
     bool skip_rdma_exception_for_test_{false};
 
     bool enable_log_tensor_meta_{false};
+    // Send the tensor rdma metas by the binary codec instead of JSON
+    bool use_binary_meta_codec_{true};
     std::shared_ptr<PerfMetricsController> perf_metrics_controller_;
     uint64_t perf_stats_interval_ms_{};
     std::unordered_map<uint64_t, size_t> throughput_stats_;
@@ -127,14 +165,66 @@ class TensorTransferPull : public TensorTransferService {
 
     bool enable_local_cache_prefetch_{false};
 
+    // Located remote data of a tensor to read
+    struct RemoteRead {
+        void* local_addr{nullptr};
+        size_t byte_size{0};
+        NodeInfo node_info;
+        ExtendInfo extend_info;
+        // Remote address of the first byte of the tensor, and the segments to read, empty to read the whole tensor
+        char* remote_addr{nullptr};
+        std::vector<TensorSegment> segments;
+    };
+
+    /*
+     * Prepare the read of a tensor: register the local memory, wait for the remote tensor ready and locate it.
+     * The bytes of the prepared read are acquired from replica_selector_, and must be released once the read finishes.
+     * @param: segments: The segments of the tensor to read, sorted by offset, nullptr or empty to read the whole tensor.
+     * @return: True if the tensor could be read, false otherwise.
+     * @throws std::runtime_error if the remote tensor meta is not found or mismatched.
+     */
+    bool PrepareGet(
+        int64_t seq_id,
+        const ShardedKey& tensor_key,
+        ATensor& atensor,
+        RemoteRead& read,
+        const std::vector<TensorSegment>* segments = nullptr);
+
+    /*
+     * Register the memory of the tensors and publish the metas which are added or changed since they were published
+     * last time, then announce the tensors ready if the peers know the metas already.
+     * @param: seq_id: The sequence id of the put.
+     * @param: atensors: The tensors put.
+     * @return: True if the control messages are sent successfully.
+     */
+    bool PublishTensors(int64_t seq_id, const std::vector<std::pair<ShardedKey, ATensor>>& atensors);
+
+    /*
+     * Get the remote tensor metas of the seq, which are rebased on the latest previous seq for the first time, so
+     * that only the delta metas are applied to it. Must be called with ctrl_message_mutex_ held.
+     * @param: seq_id: The sequence id.
+     * @return: The remote tensor metas of the seq, nullptr if neither the seq nor a previous one is cached.
+     */
+    TransferTensorMeta* RebaseRemoteTensorMeta(int64_t seq_id);
+
+    /*
+     * Remove the tensors removed by the ready node from its remote tensor metas, and verify the patched metas by the
+     * layout hash. Must be called with ctrl_message_mutex_ held.
+     * @param: msg: The weight ready message of the node.
+     * @throws std::runtime_error if the layout hash mismatches, then the node is not treated as ready.
+     */
+    void ApplyWeightReadyLayout(const WeightReadyMessage& msg);
+
     // Send control messages when sync model weights
     bool SendTensorRDMAMeta(const TensorRDMAMetaPublishMessage& meta);
     bool SendWeightReady(const WeightReadyMessage& msg);
+    bool SendTensorReady(const TensorReadyMessage& msg);
     bool SendWeightConsumed(const WeightConsumedMessage& msg);
 
     // Receive control messages when sync model weights
     ResponseStatus HandleTensorRDMAMeta(const std::string& request, const void* message, size_t message_size);
     ResponseStatus HandleWeightReady(const std::string& request, const void* message, size_t message_size);
+    ResponseStatus HandleTensorReady(const std::string& request, const void* message, size_t message_size);
     ResponseStatus HandleWeightConsumed(const std::string& request, const void* message, size_t message_size);
 
     void RegisterHandlers() {
@@ -142,10 +232,19 @@ class TensorTransferPull : public TensorTransferService {
             TENSOR_RDMA_META_REQUEST, [this](const std::string& request, const void* message, size_t message_size) {
                 return this->HandleTensorRDMAMeta(request, message, message_size);
             });
+        control_transport_->RegisterHandler(
+            TENSOR_RDMA_META_BINARY_REQUEST,
+            [this](const std::string& request, const void* message, size_t message_size) {
+                return this->HandleTensorRDMAMeta(request, message, message_size);
+            });
         control_transport_->RegisterHandler(
             WEIGHT_READY_REQUEST, [this](const std::string& request, const void* message, size_t message_size) {
                 return this->HandleWeightReady(request, message, message_size);
             });
+        control_transport_->RegisterHandler(
+            TENSOR_READY_REQUEST, [this](const std::string& request, const void* message, size_t message_size) {
+                return this->HandleTensorReady(request, message, message_size);
+            });
         control_transport_->RegisterHandler(
             WEIGHT_CONSUMED_REQUEST, [this](const std::string& request, const void* message, size_t message_size) {
                 return this->HandleWeightConsumed(request, message, message_size);
@@ -176,44 +275,45 @@ class TensorTransferPull : public TensorTransferService {
         return true;
     };
 
+    /*
+     * Wait until the condition on the control message states is satisfied, which is checked with
+     * ctrl_message_mutex_ held every time ctrl_message_cv_ is notified.
+     * @param cond: The condition to wait for.
+     * @param cond_name: The name of the condition used in the logs.
+     * @param max_wait_ms: Max time to wait in milliseconds.
+     * @return: True if the condition is satisfied before timeout.
+     */
+    bool WaitCtrlMessageCondition(const std::function<bool()>& cond, const std::string& cond_name, int64_t max_wait_ms);
+
     bool WaitForAllTensorReady(const int64_t /*seq_id*/, int64_t max_wait_ms = 60000) {
-        return WaitCondition(
+        return WaitCtrlMessageCondition(
             [this]() { return ready_nodes_.size() == peer_hosts_.size(); }, "wait_for_all_tensor_ready", max_wait_ms);
     };
 
-    bool WaitForTensorReady(
-        const int64_t seq_id, const ShardedKey& tensor_key, int max_wait_ms = 60000, int interval_ms = 1000) {
+    bool WaitForTensorReady(const int64_t seq_id, const ShardedKey& tensor_key, int max_wait_ms = 60000) {
         if (is_publish_meta_) {
             {
-                // If published meta before, use the last cache meta.
+                // If published meta before, reuse the last cache meta patched by the delta metas.
                 std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
-                if (remote_tensor_cache_.find(seq_id) == remote_tensor_cache_.end()) {
-                    auto cache_it = remote_tensor_cache_.find(last_completed_seq_id_);
-                    if (cache_it == remote_tensor_cache_.end()) {
-                        SPDLOG_ERROR(
-                            "Cannot find remote_tensor_cache, using "
-                            "key(last_seq_id)={}",
-                            last_completed_seq_id_);
-                        throw std::runtime_error(
-                            "Cannot find remote_tensor_cache, using "
-                            "key(last_seq_id)="
-                            + std::to_string(last_completed_seq_id_));
-                    }
-                    TransferTensorMeta* transfer_meta = &(cache_it->second);
-                    remote_tensor_cache_.emplace(seq_id, *transfer_meta);
-                    // Remove the last cache meta.
-                    remote_tensor_cache_.erase(last_completed_seq_id_);
+                if (RebaseRemoteTensorMeta(seq_id) == nullptr) {
+                    SPDLOG_ERROR(
+                        "Cannot find remote_tensor_cache, using "
+                        "key(last_seq_id)={}",
+                        last_completed_seq_id_);
+                    throw std::runtime_error(
+                        "Cannot find remote_tensor_cache, using "
+                        "key(last_seq_id)="
+                        + std::to_string(last_completed_seq_id_));
                 }
             }
 
-            // TODO(root): Wait for all put nodes finished. Only need to wait the specified tensor ready in the
-            // future.
-            return WaitCondition(
-                [this]() { return ready_nodes_.size() == peer_hosts_.size(); },
-                "wait_for_all_tensor_ready",
+            // The metas are known already, so wait until a replica of the tensor is ready on its node.
+            return WaitCtrlMessageCondition(
+                [this, seq_id, &tensor_key]() { return !GetReadyReplicasUnsafe(seq_id, tensor_key).empty(); },
+                "wait_for_tensor_ready",
                 max_wait_ms);
         }
-        return WaitCondition(
+        return WaitCtrlMessageCondition(
             [this, seq_id, tensor_key]() {
                 auto transfer_meta = remote_tensor_cache_.find(seq_id);
                 if (transfer_meta == remote_tensor_cache_.end()) {
@@ -225,10 +325,19 @@ class TensorTransferPull : public TensorTransferService {
                 return true;
             },
             "wait_for_tensor_ready",
-            max_wait_ms,
-            interval_ms);
+            max_wait_ms);
     };
 
+    /*
+     * Get the replicas of the tensor which are ready to read, i.e. on the nodes which have announced the tensor ready
+     * or finished putting the seq. All the replicas are ready before the metas are published once, since the metas
+     * are only known once the tensors are put. ctrl_message_mutex_ must be held.
+     * @param seq_id: The sequence id.
+     * @param tensor_key: The tensor key.
+     * @return: Copies of the ready replicas, empty if none is ready.
+     */
+    std::vector<TensorRDMAInfo> GetReadyReplicasUnsafe(int64_t seq_id, const ShardedKey& tensor_key) const;
+
     // Send & receive control messages
     bool SendCtrlMessage(
         const std::string& request_name,
@@ -243,7 +352,8 @@ class TensorTransferPull : public TensorTransferService {
         size_t message_size,
         const std::vector<NodeInfo>& node_infos);
 
-    // Helper method to register memory with consistent error handling (throws on failure)
+    // Helper method to register memory with consistent error handling (throws on failure).
+    // The memory already registered is skipped by registration_cache_.
     void RegisterMemoryOrThrow(void* addr, size_t size, bool is_cuda, int device_index);
 
     void UpdateThroughputStatistic(const std::string& node_info, size_t tx_data_bytes) {
@@ -276,6 +386,7 @@ class TensorTransferPull : public TensorTransferService {
     void LogRemoteTensorMeta() {
         if (!is_publish_meta_ && enable_log_tensor_meta_) {
             // print the remote_tensor_cache_
+            std::lock_guard<std::mutex> lock(ctrl_message_mutex_);
             auto it = remote_tensor_cache_.find(current_seq_id_);
             if (it == remote_tensor_cache_.end()) {
                 SPDLOG_ERROR(
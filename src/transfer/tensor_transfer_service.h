@@ -73,17 +73,35 @@ class TensorTransferService {
 
     virtual bool Get(int64_t seq_id, const ShardedKey& tensor_key, ATensor& atensor) = 0;
     virtual bool MultiGet(int64_t seq_id, std::vector<std::pair<ShardedKey, ATensor>>& atensors) = 0;
+    /*
+     * Read only the given segments of the tensors, the i-th list of segments belongs to the i-th tensor, and an empty
+     * list reads the whole tensor. The bytes between the segments are left untouched in the local tensors.
+     */
+    virtual bool MultiGet(
+        int64_t seq_id,
+        std::vector<std::pair<ShardedKey, ATensor>>& atensors,
+        const std::vector<std::vector<TensorSegment>>& segments) = 0;
 
     virtual bool
     RawGet(int64_t seq_id, const ATStorage& astorage, const NodeInfo& node_info, const void* remote_addr, size_t len)
         = 0;
 
     virtual bool PreRegisterMemory(ATStorage& atensor_storage) = 0;
+    /*
+     * Deregister the registered memory overlapping the storage, which must be called before the storage is freed.
+     */
+    virtual bool DeregisterMemory(ATStorage& atensor_storage) = 0;
     virtual std::vector<CompactTensorInfo>
     GetCompactTensorInfos(int64_t seq_id, std::unordered_map<ShardedKey, ATensor, ShardedKeyHash> atensors) = 0;
 
     virtual void Complete() = 0;
 
+    /*
+     * Version of the remote tensor layout, which is increased whenever the remote tensor metas are patched by a
+     * layout or delta message, so the readers could invalidate what they derived from the former metas.
+     */
+    [[nodiscard]] virtual uint64_t GetRemoteLayoutVersion() const = 0;
+
     [[nodiscard]] virtual std::vector<std::pair<ShardedKey, ATensor>>
     GetAllTensorShards(int64_t seq_id, std::function<bool(const ShardedKey&)> filter) = 0;
 };
@@ -1,5 +1,6 @@
 #pragma once
 
+#include <algorithm>
 #include <cstdint>
 #include <memory>
 #include <string>
@@ -156,6 +157,12 @@ struct CompactTensorInfo {
     std::unordered_map<ShardedKey, ATensor, ShardedKeyHash> atensors;
 };
 
+// Byte range of a tensor to read, relative to the first byte of the tensor on both the local and the remote side
+struct TensorSegment {
+    size_t offset{0};
+    size_t length{0};
+};
+
 // Type conversion function implementations
 inline TensorRDMAInfo
 ConvertToTensorRDMAInfo(const TensorMemoryRDMAInfo& protocol_info, const NodeInfo& node_info, ATensor& atensor) {
@@ -223,4 +230,50 @@ inline void EmplaceTensorRDMAInfo(
         tx_tensor_data.emplace(tensor_key, std::move(vec));
     }
 }
+
+// Find the rdma info of the tensor published by the node, nullptr if not found
+inline TensorRDMAInfo*
+FindTensorRDMAInfo(TransferTensorMeta& tx_tensor_data, const ShardedKey& tensor_key, const NodeInfo& node_info) {
+    auto it = tx_tensor_data.find(tensor_key);
+    if (it == tx_tensor_data.end()) {
+        return nullptr;
+    }
+    auto info_it = std::find_if(it->second.begin(), it->second.end(), [&node_info](const TensorRDMAInfo& info) {
+        return info.node_info == node_info;
+    });
+    return info_it == it->second.end() ? nullptr : &(*info_it);
+}
+
+// Remove the rdma info of the tensor published by the node, and the tensor once no node publishes it
+inline bool
+RemoveTensorRDMAInfo(TransferTensorMeta& tx_tensor_data, const ShardedKey& tensor_key, const NodeInfo& node_info) {
+    auto it = tx_tensor_data.find(tensor_key);
+    if (it == tx_tensor_data.end()) {
+        return false;
+    }
+    auto& infos = it->second;
+    auto info_it = std::find_if(
+        infos.begin(), infos.end(), [&node_info](const TensorRDMAInfo& info) { return info.node_info == node_info; });
+    if (info_it == infos.end()) {
+        return false;
+    }
+    infos.erase(info_it);
+    if (infos.empty()) {
+        tx_tensor_data.erase(it);
+    }
+    return true;
+}
+
+// Hash of a tensor entry in the memory layout published by a node. The layout hash of a node is the sum of the hashes
+// of its entries, so it does not depend on the order of the entries and could be updated entry by entry.
+inline uint64_t TensorLayoutEntryHash(const ShardedKey& tensor_key, const void* addr, size_t size) {
+    uint64_t hash = ShardedKeyHash{}(tensor_key);
+    for (uint64_t value : {static_cast<uint64_t>(reinterpret_cast<uintptr_t>(addr)), static_cast<uint64_t>(size)}) {
+        hash ^= value + 0x9e3779b97f4a7c15ULL + (hash << 6) + (hash >> 2);
+    }
+    // splitmix64 finalizer, spreads the bits before the hashes are summed up
+    hash = (hash ^ (hash >> 30)) * 0xbf58476d1ce4e5b9ULL;
+    hash = (hash ^ (hash >> 27)) * 0x94d049bb133111ebULL;
+    return hash ^ (hash >> 31);
+}
 } // namespace astate
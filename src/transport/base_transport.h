@@ -91,6 +91,12 @@ class BaseDataTransport {
 
     ////////////////////// Async send and receive with callback
     /////////////////////////
+    /*
+     * The async methods return once the transfer is submitted, and the callback is called exactly once when it
+     * finishes, with the local address and size on success, or with nullptr and 0 on failure. The callback may be
+     * called from an internal thread of the transport. The extend information is copied before returning.
+     */
+
     /*
      * Send data to the remote endpoint asynchronously.
      * @param send_data: The local address to send.
@@ -0,0 +1,131 @@
+#include "transport/fake_transporter.h"
+
+#include <algorithm>
+#include <cstring>
+#include <stdexcept>
+#include <thread>
+
+#include <spdlog/spdlog.h>
+
+#include "transport/rdma_transporter.h"
+
+namespace astate {
+
+FakeTransporter::FakeTransporter(size_t async_thread_num)
+    : async_thread_num_(std::max<size_t>(async_thread_num, 1)) {
+}
+
+FakeTransporter::~FakeTransporter() {
+    Stop();
+}
+
+bool FakeTransporter::Start(const Options& /*options*/, const AParallelConfig& /*parallel_config*/) {
+    async_thread_pool_ = std::make_unique<ThreadPool>(async_thread_num_);
+    is_running_ = true;
+    SPDLOG_INFO("FakeTransporter started with {} async threads", async_thread_num_);
+    return true;
+}
+
+void FakeTransporter::Stop() {
+    if (!is_running_) {
+        return;
+    }
+    // Finish the pending async transfers before stopping
+    async_thread_pool_.reset();
+    is_running_ = false;
+}
+
+bool FakeTransporter::Send(
+    const void* send_data,
+    size_t send_size,
+    const std::string& remote_host,
+    int /*remote_port*/,
+    const ExtendInfo* extend_info) {
+    const void* remote_addr = GetRemoteAddrFromExtendInfo(extend_info);
+    if (send_data == nullptr || send_size == 0 || remote_addr == nullptr) {
+        throw std::invalid_argument("FakeTransporter::Send: invalid address or size");
+    }
+    return Transfer(const_cast<void*>(remote_addr), send_data, send_size, remote_host);
+}
+
+bool FakeTransporter::Receive(
+    const void* recv_data,
+    size_t recv_size,
+    const std::string& remote_host,
+    int /*remote_port*/,
+    const ExtendInfo* extend_info) {
+    const void* remote_addr = GetRemoteAddrFromExtendInfo(extend_info);
+    if (recv_data == nullptr || recv_size == 0 || remote_addr == nullptr) {
+        throw std::invalid_argument("FakeTransporter::Receive: invalid address or size");
+    }
+    return Transfer(const_cast<void*>(recv_data), remote_addr, recv_size, remote_host);
+}
+
+void FakeTransporter::AsyncSend(
+    const void* send_data,
+    size_t send_size,
+    const std::string& remote_host,
+    int remote_port,
+    const ExtendInfo* extend_info,
+    const SendCallback& callback) {
+    if (!is_running_) {
+        throw std::runtime_error("FakeTransporter::AsyncSend: transport is not running");
+    }
+    async_thread_pool_->Submit(
+        [this, send_data, send_size, remote_host, remote_port, extend_info = *extend_info, callback]() {
+            bool success = false;
+            try {
+                success = Send(send_data, send_size, remote_host, remote_port, &extend_info);
+            } catch (const std::exception& e) {
+                SPDLOG_ERROR("FakeTransporter::AsyncSend failed: {}", e.what());
+            }
+            callback(success ? send_data : nullptr, success ? send_size : 0);
+        });
+}
+
+void FakeTransporter::AsyncReceive(
+    const void* recv_data,
+    size_t recv_size,
+    const std::string& remote_host,
+    int remote_port,
+    const ExtendInfo* extend_info,
+    const ReceiveCallback& callback) {
+    if (!is_running_) {
+        throw std::runtime_error("FakeTransporter::AsyncReceive: transport is not running");
+    }
+    async_thread_pool_->Submit(
+        [this, recv_data, recv_size, remote_host, remote_port, extend_info = *extend_info, callback]() {
+            bool success = false;
+            try {
+                success = Receive(recv_data, recv_size, remote_host, remote_port, &extend_info);
+            } catch (const std::exception& e) {
+                SPDLOG_ERROR("FakeTransporter::AsyncReceive failed: {}", e.what());
+            }
+            callback(success ? recv_data : nullptr, success ? recv_size : 0);
+        });
+}
+
+bool FakeTransporter::Transfer(void* dst, const void* src, size_t size, const std::string& remote_host) {
+    size_t inflight_count = ++inflight_count_;
+    size_t max_inflight_count = max_inflight_count_;
+    while (inflight_count > max_inflight_count
+           && !max_inflight_count_.compare_exchange_weak(max_inflight_count, inflight_count)) {
+    }
+
+    if (latency_us_ > 0) {
+        std::this_thread::sleep_for(std::chrono::microseconds(latency_us_));
+    }
+    bool success = !fail_;
+    if (success) {
+        std::lock_guard<std::mutex> lock(failed_hosts_mutex_);
+        success = failed_hosts_.count(remote_host) == 0;
+    }
+    if (success) {
+        std::memcpy(dst, src, size);
+        ++transfer_count_;
+    }
+    --inflight_count_;
+    return success;
+}
+
+} // namespace astate
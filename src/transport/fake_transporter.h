@@ -0,0 +1,98 @@
+#pragma once
+
+#include <atomic>
+#include <chrono>
+#include <cstddef>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_set>
+
+#include "common/option.h"
+#include "common/thread_pool.h"
+#include "transport/base_transport.h"
+
+namespace astate {
+
+/*
+ * FakeTransporter is an in-process data transport for tests without RDMA hardware.
+ * The remote address in the extend information is an address of the current process, so receiving copies from it
+ * and sending copies to it. Async transfers run on a thread pool after the configured latency.
+ */
+class FakeTransporter : public BaseDataTransport {
+ public:
+    explicit FakeTransporter(size_t async_thread_num = 4);
+    ~FakeTransporter() override;
+
+    FakeTransporter(const FakeTransporter&) = delete;
+    FakeTransporter& operator=(const FakeTransporter&) = delete;
+    FakeTransporter(FakeTransporter&&) = delete;
+    FakeTransporter& operator=(FakeTransporter&&) = delete;
+
+    [[nodiscard]] bool Start(const Options& options, const AParallelConfig& parallel_config) override;
+
+    void Stop() override;
+
+    [[nodiscard]] int GetBindPort() const override { return 0; }
+
+    [[nodiscard]] bool Send(
+        const void* send_data,
+        size_t send_size,
+        const std::string& remote_host,
+        int remote_port,
+        const ExtendInfo* extend_info) override;
+
+    [[nodiscard]] bool Receive(
+        const void* recv_data,
+        size_t recv_size,
+        const std::string& remote_host,
+        int remote_port,
+        const ExtendInfo* extend_info) override;
+
+    void AsyncSend(
+        const void* send_data,
+        size_t send_size,
+        const std::string& remote_host,
+        int remote_port,
+        const ExtendInfo* extend_info,
+        const SendCallback& callback) override;
+
+    void AsyncReceive(
+        const void* recv_data,
+        size_t recv_size,
+        const std::string& remote_host,
+        int remote_port,
+        const ExtendInfo* extend_info,
+        const ReceiveCallback& callback) override;
+
+    ////////////////////// Test controls //////////////////////
+    // Latency of each transfer
+    void SetLatency(std::chrono::microseconds latency) { latency_us_ = latency.count(); }
+    // Fail the following transfers if set
+    void SetFailure(bool fail) { fail_ = fail; }
+    // Fail the following transfers of the remote host
+    void SetFailedHost(const std::string& remote_host) {
+        std::lock_guard<std::mutex> lock(failed_hosts_mutex_);
+        failed_hosts_.insert(remote_host);
+    }
+
+    [[nodiscard]] size_t GetTransferCount() const { return transfer_count_; }
+    // Max number of the transfers in flight at the same time
+    [[nodiscard]] size_t GetMaxInflightCount() const { return max_inflight_count_; }
+
+ private:
+    bool Transfer(void* dst, const void* src, size_t size, const std::string& remote_host);
+
+    size_t async_thread_num_;
+    std::unique_ptr<ThreadPool> async_thread_pool_;
+
+    std::atomic<long> latency_us_{0};
+    std::atomic<bool> fail_{false};
+    std::mutex failed_hosts_mutex_;
+    std::unordered_set<std::string> failed_hosts_;
+    std::atomic<size_t> transfer_count_{0};
+    std::atomic<size_t> inflight_count_{0};
+    std::atomic<size_t> max_inflight_count_{0};
+};
+
+} // namespace astate
@@ -0,0 +1,182 @@
+#include "transport/memory_registration_cache.h"
+
+#include <algorithm>
+#include <chrono>
+#include <iterator>
+#include <utility>
+#include <vector>
+
+namespace astate {
+
+bool MemoryRegistrationCache::RegisterIfAbsent(
+    const void* addr, size_t len, bool is_cuda, int device_index, const RegisterFunc& register_func) {
+    auto start = reinterpret_cast<uintptr_t>(addr);
+    auto end = start + len;
+    DeviceKey device{is_cuda, device_index};
+    {
+        RWSpinGuard guard(ranges_lock_, false);
+        if (ContainsUnsafe(start, end, device)) {
+            ++hits_;
+            return true;
+        }
+    }
+
+    std::lock_guard<std::mutex> register_lock(register_mutex_);
+    // The range may be registered by another thread while waiting for the lock
+    {
+        RWSpinGuard guard(ranges_lock_, false);
+        if (ContainsUnsafe(start, end, device)) {
+            ++hits_;
+            return true;
+        }
+    }
+
+    ++misses_;
+    auto begin_time = std::chrono::steady_clock::now();
+    bool success = register_func();
+    register_time_us_
+        += std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::steady_clock::now() - begin_time).count();
+    if (!success) {
+        return false;
+    }
+
+    RWSpinGuard guard(ranges_lock_, true);
+    InsertUnsafe(start, end, device);
+    return true;
+}
+
+bool MemoryRegistrationCache::Deregister(
+    const void* addr, size_t len, bool is_cuda, int device_index, const DeregisterFunc& deregister_func) {
+    auto start = reinterpret_cast<uintptr_t>(addr);
+    auto end = start + len;
+    std::lock_guard<std::mutex> register_lock(register_mutex_);
+    std::vector<std::pair<uintptr_t, uintptr_t>> removed_regions;
+    {
+        RWSpinGuard guard(ranges_lock_, true);
+        auto device_it = ranges_.find(DeviceKey{is_cuda, device_index});
+        if (device_it == ranges_.end()) {
+            return true;
+        }
+        auto& device_regions = device_it->second;
+        auto& regions = device_regions.regions;
+        // Only the regions starting within max_region_len before start could overlap the range
+        uintptr_t first_start = start > device_regions.max_region_len ? start - device_regions.max_region_len : 0;
+        for (auto it = regions.lower_bound(first_start); it != regions.end() && it->first < end;) {
+            if (it->second > start) {
+                removed_regions.emplace_back(*it);
+                it = regions.erase(it);
+            } else {
+                ++it;
+            }
+        }
+        if (removed_regions.empty()) {
+            return true;
+        }
+
+        // Rebuild the merged ranges of the device from the remaining regions
+        size_t device_bytes = 0;
+        for (const auto& [range_start, range_end] : device_regions.ranges) {
+            device_bytes += range_end - range_start;
+        }
+        device_regions.ranges.clear();
+        device_regions.max_region_len = 0;
+        size_t remaining_bytes = 0;
+        for (const auto& [region_start, region_end] : regions) {
+            remaining_bytes += MergeRange(device_regions.ranges, region_start, region_end);
+            device_regions.max_region_len = std::max(device_regions.max_region_len, region_end - region_start);
+        }
+        registered_bytes_ -= device_bytes - remaining_bytes;
+        if (regions.empty()) {
+            ranges_.erase(device_it);
+        }
+    }
+
+    bool success = true;
+    for (const auto& [region_start, region_end] : removed_regions) {
+        success &= deregister_func(reinterpret_cast<const void*>(region_start), region_end - region_start);
+    }
+    return success;
+}
+
+bool MemoryRegistrationCache::Contains(const void* addr, size_t len, bool is_cuda, int device_index) const {
+    auto start = reinterpret_cast<uintptr_t>(addr);
+    RWSpinGuard guard(ranges_lock_, false);
+    return ContainsUnsafe(start, start + len, DeviceKey{is_cuda, device_index});
+}
+
+void MemoryRegistrationCache::Clear() {
+    RWSpinGuard guard(ranges_lock_, true);
+    ranges_.clear();
+    registered_bytes_ = 0;
+}
+
+size_t MemoryRegistrationCache::GetRangeCount() const {
+    RWSpinGuard guard(ranges_lock_, false);
+    size_t count = 0;
+    for (const auto& [device, device_regions] : ranges_) {
+        count += device_regions.ranges.size();
+    }
+    return count;
+}
+
+size_t MemoryRegistrationCache::GetRegionCount() const {
+    RWSpinGuard guard(ranges_lock_, false);
+    size_t count = 0;
+    for (const auto& [device, device_regions] : ranges_) {
+        count += device_regions.regions.size();
+    }
+    return count;
+}
+
+bool MemoryRegistrationCache::ContainsUnsafe(uintptr_t start, uintptr_t end, const DeviceKey& device) const {
+    auto device_it = ranges_.find(device);
+    if (device_it == ranges_.end()) {
+        return false;
+    }
+    // The merged ranges are disjoint, so only the last range starting at or before start could cover it
+    const auto& device_regions = device_it->second;
+    auto range_it = device_regions.ranges.upper_bound(start);
+    if (range_it == device_regions.ranges.begin() || std::prev(range_it)->second < end) {
+        return false;
+    }
+
+    // Look for a single region covering it among the regions starting at or before start, where only those starting
+    // within max_region_len before end could reach end
+    const auto& regions = device_regions.regions;
+    for (auto it = regions.upper_bound(start); it != regions.begin();) {
+        --it;
+        if (it->first + device_regions.max_region_len < end) {
+            break;
+        }
+        if (it->second >= end) {
+            return true;
+        }
+    }
+    return false;
+}
+
+void MemoryRegistrationCache::InsertUnsafe(uintptr_t start, uintptr_t end, const DeviceKey& device) {
+    auto& device_regions = ranges_[device];
+    device_regions.regions.emplace(start, end);
+    device_regions.max_region_len = std::max(device_regions.max_region_len, end - start);
+    registered_bytes_ += MergeRange(device_regions.ranges, start, end);
+}
+
+size_t MemoryRegistrationCache::MergeRange(RangeMap& ranges, uintptr_t start, uintptr_t end) {
+    // Merge the ranges overlapping or adjacent to [start, end)
+    auto it = ranges.upper_bound(start);
+    if (it != ranges.begin() && std::prev(it)->second >= start) {
+        --it;
+    }
+    size_t merged_bytes = 0;
+    while (it != ranges.end() && it->first <= end) {
+        start = std::min(start, it->first);
+        end = std::max(end, it->second);
+        merged_bytes += it->second - it->first;
+        it = ranges.erase(it);
+    }
+    ranges.emplace(start, end);
+    return (end - start) - merged_bytes;
+}
+
+} // namespace astate
@@ -0,0 +1,110 @@
+#pragma once
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <map>
+#include <mutex>
+#include <utility>
+
+#include "common/lock_utils.h"
+
+namespace astate {
+
+/*
+ * MemoryRegistrationCache records the memory regions registered to the data transport, so the ranges which are
+ * already registered are not registered again on every transfer.
+ * A transfer needs a single registered region containing its whole range, so the lookups answer against the
+ * individually registered regions. The regions are also merged per device into disjoint ranges, which account the
+ * registered bytes and reject the ranges out of any region quickly.
+ * Lookups only take a read lock, while the registrations and deregistrations are serialized, since the transport does
+ * not support registering memory concurrently.
+ */
+class MemoryRegistrationCache {
+ public:
+    using RegisterFunc = std::function<bool()>;
+    using DeregisterFunc = std::function<bool(const void* addr, size_t len)>;
+
+    /*
+     * Register the memory range by register_func unless it is covered by the registered ranges.
+     * @param addr: The start address of the memory.
+     * @param len: The length of the memory.
+     * @param is_cuda: Whether the memory is on a CUDA device.
+     * @param device_index: The index of the device.
+     * @param register_func: The function to register the memory to the transport.
+     * @return: True if the memory is registered, false if register_func failed.
+     */
+    bool
+    RegisterIfAbsent(const void* addr, size_t len, bool is_cuda, int device_index, const RegisterFunc& register_func);
+
+    /*
+     * Deregister all the registered regions overlapping the memory range by deregister_func, e.g. before the memory
+     * is freed. The regions are removed from the cache even if deregister_func fails, as the memory is going away.
+     * @param addr: The start address of the memory.
+     * @param len: The length of the memory.
+     * @param is_cuda: Whether the memory is on a CUDA device.
+     * @param device_index: The index of the device.
+     * @param deregister_func: The function to deregister a region from the transport.
+     * @return: True if all the overlapping regions are deregistered.
+     */
+    bool
+    Deregister(const void* addr, size_t len, bool is_cuda, int device_index, const DeregisterFunc& deregister_func);
+
+    /*
+     * Check whether the memory range is covered by a single registered region.
+     * @param addr: The start address of the memory.
+     * @param len: The length of the memory.
+     * @param is_cuda: Whether the memory is on a CUDA device.
+     * @param device_index: The index of the device.
+     * @return: True if covered, false otherwise.
+     */
+    [[nodiscard]] bool Contains(const void* addr, size_t len, bool is_cuda, int device_index) const;
+
+    /*
+     * Remove all the registered ranges, e.g. after the transport is restarted.
+     */
+    void Clear();
+
+    // Total bytes of the registered ranges
+    [[nodiscard]] size_t GetRegisteredBytes() const { return registered_bytes_; }
+    // Number of the registered ranges after merging
+    [[nodiscard]] size_t GetRangeCount() const;
+    // Number of the individually registered regions
+    [[nodiscard]] size_t GetRegionCount() const;
+    [[nodiscard]] uint64_t GetHitCount() const { return hits_; }
+    [[nodiscard]] uint64_t GetMissCount() const { return misses_; }
+    // Total time spent in register_func
+    [[nodiscard]] uint64_t GetRegisterTimeUs() const { return register_time_us_; }
+
+ private:
+    // (is_cuda, device_index)
+    using DeviceKey = std::pair<bool, int>;
+    // start address -> end address
+    using RangeMap = std::map<uintptr_t, uintptr_t>;
+
+    struct DeviceRegions {
+        // The registered regions, several of which may start at the same address
+        std::multimap<uintptr_t, uintptr_t> regions;
+        size_t max_region_len{0};
+        // Disjoint ranges merged from the regions
+        RangeMap ranges;
+    };
+
+    bool ContainsUnsafe(uintptr_t start, uintptr_t end, const DeviceKey& device) const;
+    void InsertUnsafe(uintptr_t start, uintptr_t end, const DeviceKey& device);
+    // Merge the range into the disjoint ranges, and return the bytes newly covered
+    static size_t MergeRange(RangeMap& ranges, uintptr_t start, uintptr_t end);
+
+    std::map<DeviceKey, DeviceRegions> ranges_;
+    mutable RWSpinLock ranges_lock_;
+    // Serializes the registrations to the transport
+    std::mutex register_mutex_;
+
+    std::atomic<size_t> registered_bytes_{0};
+    std::atomic<uint64_t> hits_{0};
+    std::atomic<uint64_t> misses_{0};
+    std::atomic<uint64_t> register_time_us_{0};
+};
+
+} // namespace astate
@@ -258,6 +258,9 @@ bool RDMATransporter::Start(const Options& options, const AParallelConfig& paral
     // Initialize performance metrics logging
     InitializePerfMetricsThread(options);
 
+    int async_thread_num = GetOptionValue<int>(options, TRANSPORT_ASYNC_THREAD_NUM);
+    async_thread_pool_ = std::make_unique<ThreadPool>(std::max(async_thread_num, 1));
+
     is_running_ = true;
     SPDLOG_INFO("RDMATransporter started");
     // sleep 1s for server to start
@@ -285,6 +288,11 @@ void RDMATransporter::Stop() {
         SPDLOG_INFO("Performance metrics logging thread stopped");
     }
 
+    // Finish the pending async transfers
+    async_thread_pool_.reset();
+    // The peers of the next start may be different instances
+    inst_id_cache_.Clear();
+
     // std::lock_guard<std::mutex> lock_ctx(rctx_mutex_);
     // for (const auto& [addr, ctx] : rctxs_) {
     //     // Clean up each remote context
@@ -325,50 +333,45 @@ bool RDMATransporter::Send(
     int retry_count = GetOptionValue<int>(options_, TRANSPORT_SEND_RETRY_COUNT);
     int retry_sleep_ms = GetOptionValue<int>(options_, TRANSPORT_SEND_RETRY_SLEEP_MS);
 
+    // A failure invalidates the cached instance id of the remote endpoint, so the retry queries it again
     auto send_func = [&]() -> bool {
-        uint64_t remote_inst_id = UTRANS_INVALID_INST_ID;
-        int ret = utrans_query_instid(ctx_, remote_host.c_str(), remote_port, &remote_inst_id);
-        if (ret != UTRANS_RET_SUCC) {
-            SPDLOG_ERROR("Query remote instance id failed, remote_addr={}:{}, ret={}", remote_host, remote_port, ret);
-            throw std::runtime_error(
-                "Query remote instance id failed, remote_addr= " + remote_host + ":" + std::to_string(remote_port)
-                + ", ret=" + std::to_string(ret));
-        }
-        trans_req_t req{
-            remote_inst_id,
-            USER_OP_WRITE,
-            1,
-            const_cast<void*>(rbuf),
-            nullptr,
-            {{const_cast<void*>(local_addr), static_cast<uint32_t>(send_size)}}};
-        trans_conf_t conf{4, 1024 * 1024, write_timeout_ms_};
-        utrans_req_info_t* op_info = utrans_exec_transfer(ctx_, &req, &conf);
-        if (op_info == nullptr) {
-            SPDLOG_ERROR(
-                "Transfer execution failed (utrans_exec_transfer returned "
-                "nullptr), remote_addr={}:{}",
-                remote_host,
-                remote_port);
-            throw std::runtime_error("utrans_exec_transfer failed");
-        }
-        if (utrans_get_req_exec_result(op_info) != URES_SUCCESS) {
-            int status = utrans_get_req_exec_result(op_info);
-            SPDLOG_ERROR(
-                "Transfer execution failed with status: {}, remote_addr={}:{}, "
-                "inst_id={}, laddr={}, raddr={}, "
-                "length={}",
-                status,
-                remote_host,
-                remote_port,
-                req.inst_id,
-                PointerToHexString(req.lbuf_seg[0].addr_beg),
-                PointerToHexString(req.rbuf),
-                req.lbuf_seg[0].trz_size);
+        return inst_id_cache_.RunWithInstId(remote_host, remote_port, [&](uint64_t remote_inst_id) {
+            trans_req_t req{
+                remote_inst_id,
+                USER_OP_WRITE,
+                1,
+                const_cast<void*>(rbuf),
+                nullptr,
+                {{const_cast<void*>(local_addr), static_cast<uint32_t>(send_size)}}};
+            trans_conf_t conf{4, 1024 * 1024, write_timeout_ms_};
+            utrans_req_info_t* op_info = utrans_exec_transfer(ctx_, &req, &conf);
+            if (op_info == nullptr) {
+                SPDLOG_ERROR(
+                    "Transfer execution failed (utrans_exec_transfer returned "
+                    "nullptr), remote_addr={}:{}",
+                    remote_host,
+                    remote_port);
+                throw std::runtime_error("utrans_exec_transfer failed");
+            }
+            if (utrans_get_req_exec_result(op_info) != URES_SUCCESS) {
+                int status = utrans_get_req_exec_result(op_info);
+                SPDLOG_ERROR(
+                    "Transfer execution failed with status: {}, remote_addr={}:{}, "
+                    "inst_id={}, laddr={}, raddr={}, "
+                    "length={}",
+                    status,
+                    remote_host,
+                    remote_port,
+                    req.inst_id,
+                    PointerToHexString(req.lbuf_seg[0].addr_beg),
+                    PointerToHexString(req.rbuf),
+                    req.lbuf_seg[0].trz_size);
+                utrans_unref_req_info(op_info);
+                throw std::runtime_error("Transfer execution failed with status: " + std::to_string(status));
+            }
             utrans_unref_req_info(op_info);
-            throw std::runtime_error("Transfer execution failed with status: " + std::to_string(status));
-        }
-        utrans_unref_req_info(op_info);
-        return true;
+            return true;
+        });
     };
 
     try {
@@ -432,58 +435,52 @@ bool RDMATransporter::Receive(
     int retry_count = GetOptionValue<int>(options_, TRANSPORT_RECEIVE_RETRY_COUNT);
     int retry_sleep_ms = GetOptionValue<int>(options_, TRANSPORT_RECEIVE_RETRY_SLEEP_MS);
 
+    // A failure invalidates the cached instance id of the remote endpoint, so the retry queries it again
     auto recv_func = [&]() -> bool {
-        uint64_t remote_inst_id = UTRANS_INVALID_INST_ID;
-        int ret = utrans_query_instid(ctx_, remote_host.c_str(), remote_port, &remote_inst_id);
-        if (ret != UTRANS_RET_SUCC) {
-            SPDLOG_ERROR("Query remote instance id failed, remote_addr={}:{}, ret={}", remote_host, remote_port, ret);
-            throw std::runtime_error(
-                "Query remote instance id failed, remote_addr= " + remote_host + ":" + std::to_string(remote_port)
-                + ", ret=" + std::to_string(ret));
-        }
-
-        trans_req_t req{
-            remote_inst_id,
-            USER_OP_READ,
-            1,
-            const_cast<void*>(rbuf),
-            nullptr,
-            {{const_cast<void*>(local_addr), static_cast<uint32_t>(recv_size)}}};
-        trans_conf_t conf{4, 1024 * 1024, read_timeout_ms_};
-        utrans_req_info_t* op_info = utrans_exec_transfer(ctx_, &req, &conf);
-        if (op_info == nullptr) {
-            SPDLOG_ERROR(
-                "Transfer execution failed (utrans_exec_transfer returned "
-                "nullptr), remote_addr={}:{}, inst_id={}, "
-                "laddr={}, raddr={}, length={}",
-                remote_host,
-                remote_port,
-                req.inst_id,
-                PointerToHexString(req.lbuf_seg[0].addr_beg),
-                PointerToHexString(req.rbuf),
-                req.lbuf_seg[0].trz_size);
-            throw std::runtime_error("utrans_exec_transfer failed");
-        }
+        return inst_id_cache_.RunWithInstId(remote_host, remote_port, [&](uint64_t remote_inst_id) {
+            trans_req_t req{
+                remote_inst_id,
+                USER_OP_READ,
+                1,
+                const_cast<void*>(rbuf),
+                nullptr,
+                {{const_cast<void*>(local_addr), static_cast<uint32_t>(recv_size)}}};
+            trans_conf_t conf{4, 1024 * 1024, read_timeout_ms_};
+            utrans_req_info_t* op_info = utrans_exec_transfer(ctx_, &req, &conf);
+            if (op_info == nullptr) {
+                SPDLOG_ERROR(
+                    "Transfer execution failed (utrans_exec_transfer returned "
+                    "nullptr), remote_addr={}:{}, inst_id={}, "
+                    "laddr={}, raddr={}, length={}",
+                    remote_host,
+                    remote_port,
+                    req.inst_id,
+                    PointerToHexString(req.lbuf_seg[0].addr_beg),
+                    PointerToHexString(req.rbuf),
+                    req.lbuf_seg[0].trz_size);
+                throw std::runtime_error("utrans_exec_transfer failed");
+            }
 
-        if (utrans_get_req_exec_result(op_info) != URES_SUCCESS) {
-            int status = utrans_get_req_exec_result(op_info);
-            SPDLOG_ERROR(
-                "Transfer execution failed with status: {}, remote_addr={}:{}, "
-                "inst_id={}, laddr={}, raddr={}, "
-                "length={}",
-                status,
-                remote_host,
-                remote_port,
-                req.inst_id,
-                PointerToHexString(req.lbuf_seg[0].addr_beg),
-                PointerToHexString(req.rbuf),
-                req.lbuf_seg[0].trz_size);
+            if (utrans_get_req_exec_result(op_info) != URES_SUCCESS) {
+                int status = utrans_get_req_exec_result(op_info);
+                SPDLOG_ERROR(
+                    "Transfer execution failed with status: {}, remote_addr={}:{}, "
+                    "inst_id={}, laddr={}, raddr={}, "
+                    "length={}",
+                    status,
+                    remote_host,
+                    remote_port,
+                    req.inst_id,
+                    PointerToHexString(req.lbuf_seg[0].addr_beg),
+                    PointerToHexString(req.rbuf),
+                    req.lbuf_seg[0].trz_size);
+                utrans_unref_req_info(op_info);
+                throw std::runtime_error("Transfer execution failed with status: " + std::to_string(status));
+            }
             utrans_unref_req_info(op_info);
-            throw std::runtime_error("Transfer execution failed with status: " + std::to_string(status));
-        }
-        utrans_unref_req_info(op_info);
 
-        return true;
+            return true;
+        });
     };
 
     try {
@@ -527,23 +524,59 @@ bool RDMATransporter::Receive(
 }
 
 void RDMATransporter::AsyncSend(
-    const void* /*local_addr*/,
-    size_t /*send_size*/,
-    const std::string& /*remote_host*/,
-    int /*remote_port*/,
-    const ExtendInfo* /*extend_info*/,
-    const SendCallback& /*callback*/) {
-    throw std::runtime_error("Not implemented");
+    const void* local_addr,
+    size_t send_size,
+    const std::string& remote_host,
+    int remote_port,
+    const ExtendInfo* extend_info,
+    const SendCallback& callback) {
+    if (async_thread_pool_ == nullptr) {
+        SPDLOG_ERROR("Async thread pool not initialized");
+        throw std::runtime_error("RDMATransporter::AsyncSend: transport is not started");
+    }
+    if (extend_info == nullptr) {
+        throw std::invalid_argument("RDMATransporter::AsyncSend: extend info is null");
+    }
+    // utrans does not expose the state of an asynchronous request to poll, so the transfers are completed by the
+    // async threads, which keep up to TRANSPORT_ASYNC_THREAD_NUM transfers in flight.
+    async_thread_pool_->Submit(
+        [this, local_addr, send_size, remote_host, remote_port, extend_info = *extend_info, callback]() {
+            bool success = false;
+            try {
+                success = Send(local_addr, send_size, remote_host, remote_port, &extend_info);
+            } catch (const std::exception& e) {
+                SPDLOG_ERROR(
+                    "RDMATransporter::AsyncSend failed: {}, remote_addr={}:{}", e.what(), remote_host, remote_port);
+            }
+            callback(success ? local_addr : nullptr, success ? send_size : 0);
+        });
 }
 
 void RDMATransporter::AsyncReceive(
-    const void* /*local_addr*/,
-    size_t /*recv_size*/,
-    const std::string& /*remote_host*/,
-    int /*remote_port*/,
-    const ExtendInfo* /*extend_info*/,
-    const ReceiveCallback& /*callback*/) {
-    throw std::runtime_error("Not implemented");
+    const void* local_addr,
+    size_t recv_size,
+    const std::string& remote_host,
+    int remote_port,
+    const ExtendInfo* extend_info,
+    const ReceiveCallback& callback) {
+    if (async_thread_pool_ == nullptr) {
+        SPDLOG_ERROR("Async thread pool not initialized");
+        throw std::runtime_error("RDMATransporter::AsyncReceive: transport is not started");
+    }
+    if (extend_info == nullptr) {
+        throw std::invalid_argument("RDMATransporter::AsyncReceive: extend info is null");
+    }
+    async_thread_pool_->Submit(
+        [this, local_addr, recv_size, remote_host, remote_port, extend_info = *extend_info, callback]() {
+            bool success = false;
+            try {
+                success = Receive(local_addr, recv_size, remote_host, remote_port, &extend_info);
+            } catch (const std::exception& e) {
+                SPDLOG_ERROR(
+                    "RDMATransporter::AsyncReceive failed: {}, remote_addr={}:{}", e.what(), remote_host, remote_port);
+            }
+            callback(success ? local_addr : nullptr, success ? recv_size : 0);
+        });
 }
 
 bool RDMATransporter::RegisterMemory(void* addr, size_t len, bool is_vram, int gpu_id_or_numa_node) {
@@ -577,6 +610,18 @@ bool RDMATransporter::DeregisterMemory(void* addr, size_t len) {
     return result;
 }
 
+uint64_t RDMATransporter::QueryRemoteInstId(const std::string& remote_host, int remote_port) {
+    uint64_t remote_inst_id = UTRANS_INVALID_INST_ID;
+    int ret = utrans_query_instid(ctx_, remote_host.c_str(), remote_port, &remote_inst_id);
+    if (ret != UTRANS_RET_SUCC) {
+        SPDLOG_ERROR("Query remote instance id failed, remote_addr={}:{}, ret={}", remote_host, remote_port, ret);
+        throw std::runtime_error(
+            "Query remote instance id failed, remote_addr= " + remote_host + ":" + std::to_string(remote_port)
+            + ", ret=" + std::to_string(ret));
+    }
+    return remote_inst_id;
+}
+
 void RDMATransporter::PerfMetricsLoggingThread() {
     SPDLOG_INFO("Performance metrics logging thread started");
 
@@ -596,6 +641,10 @@ void RDMATransporter::PerfMetricsLoggingThread() {
             if (ctx_ != nullptr) {
                 utrans_print_perf_info(ctx_);
             }
+            SPDLOG_INFO(
+                "Remote instance id cache hits: {}, misses: {}",
+                inst_id_cache_.GetHitCount(),
+                inst_id_cache_.GetMissCount());
         }
     }
 
@@ -15,9 +15,11 @@
 #include "common/numa_aware_allocator.h"
 #include "common/option.h"
 #include "common/rdma_type.h"
+#include "common/thread_pool.h"
 #include "core/atensor.h"
 #include "transfer/types.h"
 #include "transport/base_transport.h"
+#include "transport/remote_inst_id_cache.h"
 
 namespace astate {
 
@@ -90,6 +92,10 @@ class RDMATransporter : public BaseDataTransport {
      */
     bool DeregisterMemory(void* addr, size_t len);
 
+    // Hit and miss count of the remote instance id cache
+    [[nodiscard]] uint64_t GetInstIdCacheHitCount() const { return inst_id_cache_.GetHitCount(); }
+    [[nodiscard]] uint64_t GetInstIdCacheMissCount() const { return inst_id_cache_.GetMissCount(); }
+
     ////////////////////// Getters //////////////////////
     int GetWriteTimeout() const { return write_timeout_ms_; }
     int GetReadTimeout() const { return read_timeout_ms_; }
@@ -157,6 +163,16 @@ class RDMATransporter : public BaseDataTransport {
 
     std::mutex close_mutex_;
 
+    // Query the utrans instance id of the remote endpoint, throws std::runtime_error on failure
+    uint64_t QueryRemoteInstId(const std::string& remote_host, int remote_port);
+
+    RemoteInstIdCache inst_id_cache_{[this](const std::string& remote_host, int remote_port) {
+        return QueryRemoteInstId(remote_host, remote_port);
+    }};
+
+    // Threads running the async transfers
+    std::unique_ptr<ThreadPool> async_thread_pool_;
+
     std::atomic<bool> enable_perf_metrics_{true};
     std::atomic<long> perf_stats_interval_ms_{500}; // Default 500ms
     std::atomic<bool> perf_logging_thread_running_{false};
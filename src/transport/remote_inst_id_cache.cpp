@@ -0,0 +1,39 @@
+#include "transport/remote_inst_id_cache.h"
+
+#include <utility>
+
+namespace astate {
+
+RemoteInstIdCache::RemoteInstIdCache(QueryFunc query_func)
+    : query_func_(std::move(query_func)) {
+}
+
+uint64_t RemoteInstIdCache::Get(const std::string& remote_host, int remote_port) {
+    std::string remote_addr = ToRemoteAddr(remote_host, remote_port);
+    {
+        RWSpinGuard guard(lock_, false);
+        auto it = inst_ids_.find(remote_addr);
+        if (it != inst_ids_.end()) {
+            ++hits_;
+            return it->second;
+        }
+    }
+
+    ++misses_;
+    uint64_t remote_inst_id = query_func_(remote_host, remote_port);
+    RWSpinGuard guard(lock_, true);
+    inst_ids_[remote_addr] = remote_inst_id;
+    return remote_inst_id;
+}
+
+void RemoteInstIdCache::Invalidate(const std::string& remote_host, int remote_port) {
+    RWSpinGuard guard(lock_, true);
+    inst_ids_.erase(ToRemoteAddr(remote_host, remote_port));
+}
+
+void RemoteInstIdCache::Clear() {
+    RWSpinGuard guard(lock_, true);
+    inst_ids_.clear();
+}
+
+} // namespace astate
@@ -0,0 +1,79 @@
+#pragma once
+
+#include <atomic>
+#include <cstdint>
+#include <functional>
+#include <string>
+#include <unordered_map>
+
+#include "common/lock_utils.h"
+
+namespace astate {
+
+/*
+ * RemoteInstIdCache caches the transport instance ids of the remote endpoints, so they are not queried on every
+ * transfer. The id of an endpoint is invalidated when a transfer to it fails, since the peer may have been restarted
+ * with a new instance id, and the retry queries it again.
+ */
+class RemoteInstIdCache {
+ public:
+    // Queries the instance id of the remote endpoint, throws on failure
+    using QueryFunc = std::function<uint64_t(const std::string& remote_host, int remote_port)>;
+
+    explicit RemoteInstIdCache(QueryFunc query_func);
+
+    /*
+     * Get the instance id of the remote endpoint, which is queried on the first use and cached
+     * @param remote_host: The host of the remote endpoint.
+     * @param remote_port: The port of the remote endpoint.
+     * @return: remote instance id
+     * @throws: the exception of the query function
+     */
+    uint64_t Get(const std::string& remote_host, int remote_port);
+
+    /*
+     * Run a transfer to the remote endpoint with its instance id, the id is invalidated if the transfer throws
+     * @param remote_host: The host of the remote endpoint.
+     * @param remote_port: The port of the remote endpoint.
+     * @param transfer_func: Runs the transfer with the instance id, and throws on failure.
+     * @return: The result of transfer_func
+     */
+    template <typename TransferFunc>
+    auto RunWithInstId(const std::string& remote_host, int remote_port, TransferFunc&& transfer_func) {
+        try {
+            return transfer_func(Get(remote_host, remote_port));
+        } catch (...) {
+            Invalidate(remote_host, remote_port);
+            throw;
+        }
+    }
+
+    /*
+     * Invalidate the cached instance id of the remote endpoint
+     * @param remote_host: The host of the remote endpoint.
+     * @param remote_port: The port of the remote endpoint.
+     */
+    void Invalidate(const std::string& remote_host, int remote_port);
+
+    /*
+     * Invalidate all the cached instance ids, e.g. when the transport is stopped
+     */
+    void Clear();
+
+    [[nodiscard]] uint64_t GetHitCount() const { return hits_; }
+    [[nodiscard]] uint64_t GetMissCount() const { return misses_; }
+
+ private:
+    static std::string ToRemoteAddr(const std::string& remote_host, int remote_port) {
+        return remote_host + ":" + std::to_string(remote_port);
+    }
+
+    QueryFunc query_func_;
+    // "host:port" -> instance id
+    std::unordered_map<std::string, uint64_t> inst_ids_;
+    RWSpinLock lock_;
+    std::atomic<uint64_t> hits_{0};
+    std::atomic<uint64_t> misses_{0};
+};
+
+} // namespace astate
@@ -0,0 +1,102 @@
+#include "transport/transfer_window.h"
+
+#include <algorithm>
+#include <exception>
+
+namespace astate {
+
+bool TransferBatch::Wait() {
+    std::unique_lock<std::mutex> lock(mutex_);
+    done_cv_.wait(lock, [this]() { return pending_ == 0; });
+    return success_;
+}
+
+bool TransferBatch::IsSucceeded(size_t index) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return index < results_.size() && results_[index];
+}
+
+size_t TransferBatch::Add() {
+    std::lock_guard<std::mutex> lock(mutex_);
+    ++pending_;
+    results_.push_back(false);
+    return results_.size() - 1;
+}
+
+void TransferBatch::Done(size_t index, bool success) {
+    // Notify while holding the lock, as the batch may be destroyed by the waiter right after it is unlocked
+    std::lock_guard<std::mutex> lock(mutex_);
+    success_ &= success;
+    results_[index] = success;
+    if (--pending_ == 0) {
+        done_cv_.notify_all();
+    }
+}
+
+TransferWindow::TransferWindow(BaseDataTransport* transport, size_t max_inflight)
+    : transport_(transport),
+      max_inflight_(std::max<size_t>(max_inflight, 1)) {
+}
+
+size_t TransferWindow::AsyncReceive(
+    const void* recv_data,
+    size_t recv_size,
+    const std::string& remote_host,
+    int remote_port,
+    const ExtendInfo& extend_info,
+    TransferBatch& batch) {
+    AcquireSlot();
+    size_t index = batch.Add();
+    try {
+        transport_->AsyncReceive(
+            recv_data,
+            recv_size,
+            remote_host,
+            remote_port,
+            &extend_info,
+            [this, &batch, index](const void* data, size_t /*size*/) {
+                ReleaseSlot();
+                batch.Done(index, data != nullptr);
+                return true;
+            });
+    } catch (const std::exception& e) {
+        // The transfer was not submitted, so the callback would never be called
+        SPDLOG_ERROR("Failed to submit async receive from {}:{}: {}", remote_host, remote_port, e.what());
+        ReleaseSlot();
+        batch.Done(index, false);
+        throw;
+    }
+    return index;
+}
+
+bool TransferWindow::Receive(
+    const void* recv_data,
+    size_t recv_size,
+    const std::string& remote_host,
+    int remote_port,
+    const ExtendInfo& extend_info) {
+    TransferBatch batch;
+    AsyncReceive(recv_data, recv_size, remote_host, remote_port, extend_info, batch);
+    return batch.Wait();
+}
+
+size_t TransferWindow::GetInflightCount() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return inflight_;
+}
+
+void TransferWindow::AcquireSlot() {
+    std::unique_lock<std::mutex> lock(mutex_);
+    slot_cv_.wait(lock, [this]() { return inflight_ < max_inflight_; });
+    ++inflight_;
+}
+
+void TransferWindow::ReleaseSlot() {
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        --inflight_;
+    }
+    slot_cv_.notify_one();
+}
+
+} // namespace astate
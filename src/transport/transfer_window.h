@@ -0,0 +1,108 @@
+#pragma once
+
+#include <condition_variable>
+#include <cstddef>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include "transport/base_transport.h"
+
+namespace astate {
+
+/*
+ * TransferBatch is a group of async transfers which are waited for together.
+ * The destructor waits for the pending transfers, since they refer to the memory of the caller.
+ */
+class TransferBatch {
+ public:
+    TransferBatch() = default;
+    ~TransferBatch() { Wait(); }
+
+    TransferBatch(const TransferBatch&) = delete;
+    TransferBatch& operator=(const TransferBatch&) = delete;
+    TransferBatch(TransferBatch&&) = delete;
+    TransferBatch& operator=(TransferBatch&&) = delete;
+
+    /*
+     * Wait for all the transfers of the batch to finish.
+     * @return: True if all the transfers succeeded, false otherwise.
+     */
+    bool Wait();
+
+    /*
+     * Whether a transfer of the batch succeeded, which is known once the batch is waited for.
+     * @param index: The index of the transfer in the batch, returned when it is submitted.
+     * @return: True if the transfer succeeded, false if it failed or is still pending.
+     */
+    [[nodiscard]] bool IsSucceeded(size_t index);
+
+ private:
+    friend class TransferWindow;
+
+    // Add a transfer to the batch, and return its index in the batch
+    size_t Add();
+    void Done(size_t index, bool success);
+
+    std::mutex mutex_;
+    std::condition_variable done_cv_;
+    size_t pending_{0};
+    bool success_{true};
+    // Result of every transfer of the batch by the index
+    std::vector<bool> results_;
+};
+
+/*
+ * TransferWindow keeps the async transfers of a data transport in flight, up to max_inflight at the same time.
+ * Submitting blocks while the window is full, so a few threads could keep many transfers outstanding without
+ * overloading the transport.
+ */
+class TransferWindow {
+ public:
+    TransferWindow(BaseDataTransport* transport, size_t max_inflight);
+
+    /*
+     * Receive data from the remote endpoint asynchronously once an in-flight slot is available.
+     * @param recv_data: The local address to receive.
+     * @param recv_size: The size of the data to receive.
+     * @param remote_host: The host of the remote endpoint.
+     * @param remote_port: The port of the remote endpoint.
+     * @param extend_info: The extend information of the transport.
+     * @param batch: The batch to wait for the transfer.
+     * @return: The index of the transfer in the batch.
+     */
+    size_t AsyncReceive(
+        const void* recv_data,
+        size_t recv_size,
+        const std::string& remote_host,
+        int remote_port,
+        const ExtendInfo& extend_info,
+        TransferBatch& batch);
+
+    /*
+     * Receive data from the remote endpoint synchronously within the window.
+     * @return: True if the data is received successfully, false otherwise.
+     */
+    bool Receive(
+        const void* recv_data,
+        size_t recv_size,
+        const std::string& remote_host,
+        int remote_port,
+        const ExtendInfo& extend_info);
+
+    [[nodiscard]] size_t GetMaxInflight() const { return max_inflight_; }
+    [[nodiscard]] size_t GetInflightCount() const;
+
+ private:
+    void AcquireSlot();
+    void ReleaseSlot();
+
+    BaseDataTransport* transport_;
+    size_t max_inflight_;
+
+    mutable std::mutex mutex_;
+    std::condition_variable slot_cv_;
+    size_t inflight_{0};
+};
+
+} // namespace astate